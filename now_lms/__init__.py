@@ -42,6 +42,7 @@ from werkzeug.exceptions import HTTPException
 # ---------------------------------------------------------------------------------------
 # Local resources
 # ---------------------------------------------------------------------------------------
+from now_lms.auth import cargar_identidad
 from now_lms.cache import cache
 from now_lms.config import (
     AUTO_MIGRATE,
@@ -56,33 +57,11 @@ from now_lms.config import (
     images,
     log_messages,
 )
-from now_lms.db import Configuracion, Usuario, database
+from now_lms.db import Configuracion, database
 from now_lms.db.info import app_info, course_info, lms_info
-from now_lms.db.initial_data import (
-    asignar_cursos_a_categoria,
-    asignar_cursos_a_etiquetas,
-    asignar_programas_a_categoria,
-    asignar_programas_a_etiquetas,
-    crear_blog_post_predeterminado,
-    crear_categorias,
-    crear_certificacion,
-    crear_certificados,
-    crear_curso_autoaprendizaje,
-    crear_curso_demo,
-    crear_curso_demo1,
-    crear_curso_demo2,
-    crear_curso_demo3,
-    crear_curso_predeterminado,
-    crear_etiquetas,
-    crear_evaluacion_predeterminada,
-    crear_paginas_estaticas_predeterminadas,
-    crear_programa,
-    crear_recurso_descargable,
-    crear_usuarios_predeterminados,
-    populate_custmon_data_dir,
-    populate_custom_theme_dir,
-    system_info,
-)
+from now_lms.db.replicas import init_replicas
+from now_lms.db.reporting import init_reporting
+from now_lms.db.sqlite_tuning import init_sqlite_tuning
 from now_lms.db.tools import (
     crear_configuracion_predeterminada,
     cuenta_cursos_por_programa,
@@ -115,7 +94,9 @@ from now_lms.db.tools import (
     verifica_moderador_asignado_a_curso,
     verificar_avance_recurso,
 )
+from now_lms.db_pool import pool_options_from_env
 from now_lms.i18n import _
+from now_lms.image_derivatives import image_variants
 from now_lms.logs import log
 from now_lms.misc import (
     ESTILO_ALERTAS,
@@ -125,6 +106,9 @@ from now_lms.misc import (
     limpiar_html,
     markdown_to_clean_html,
 )
+from now_lms.optional_modules import paypal_enabled, register_optional_blueprints
+from now_lms.static_assets import init_static_assets
+from now_lms.template_cache import init_template_cache
 from now_lms.themes import current_theme
 from now_lms.version import CODE_NAME, VERSION
 from now_lms.vistas._helpers import (
@@ -140,7 +124,6 @@ from now_lms.vistas._helpers import (
 from now_lms.vistas.announcements.admin import admin_announcements
 from now_lms.vistas.announcements.instructor import instructor_announcements
 from now_lms.vistas.announcements.public import public_announcements
-from now_lms.vistas.blog import blog
 from now_lms.vistas.calendar import calendar
 from now_lms.vistas.categories import category
 from now_lms.vistas.certificates import certificate
@@ -152,15 +135,12 @@ from now_lms.vistas.forum import forum
 from now_lms.vistas.groups import group
 from now_lms.vistas.health import health_bp
 from now_lms.vistas.home import home
-from now_lms.vistas.masterclass import masterclass
 from now_lms.vistas.messages import msg
 from now_lms.vistas.page_info import page_info
-from now_lms.vistas.paypal import check_paypal_enabled, paypal
 from now_lms.vistas.profiles.admin import admin_profile
 from now_lms.vistas.profiles.instructor import instructor_profile
 from now_lms.vistas.profiles.moderator import moderator_profile
 from now_lms.vistas.profiles.user import user_profile
-from now_lms.vistas.programs import program
 from now_lms.vistas.public_api import public_api
 from now_lms.vistas.resources import resource_d
 from now_lms.vistas.settings import setting
@@ -205,6 +185,9 @@ def inicializa_extenciones_terceros(flask_app: Flask) -> None:
         flask_app.config.from_mapping({"ALEMBIC": {"script_location": migrations_dir}})
 
         database.init_app(flask_app)
+        init_replicas(flask_app)
+        init_sqlite_tuning(flask_app, database.engine)
+        init_reporting(flask_app)
         alembic.init_app(flask_app)
 
         # Initialize session storage for Gunicorn multi-worker support
@@ -240,7 +223,6 @@ def registrar_modulos_en_la_aplicacion_principal(flask_app: Flask):
     log.trace("Registering modules in the main application.")
 
     with flask_app.app_context():
-        flask_app.register_blueprint(blog)
         flask_app.register_blueprint(calendar)
         flask_app.register_blueprint(category)
         flask_app.register_blueprint(certificate)
@@ -254,7 +236,6 @@ def registrar_modulos_en_la_aplicacion_principal(flask_app: Flask):
         flask_app.register_blueprint(home)
         flask_app.register_blueprint(msg)
         flask_app.register_blueprint(page_info)
-        flask_app.register_blueprint(program)
         flask_app.register_blueprint(public_api)
         flask_app.register_blueprint(resource_d)
         flask_app.register_blueprint(setting)
@@ -263,8 +244,6 @@ def registrar_modulos_en_la_aplicacion_principal(flask_app: Flask):
         flask_app.register_blueprint(footer_links)
         flask_app.register_blueprint(tag)
         flask_app.register_blueprint(user)
-        flask_app.register_blueprint(masterclass)
-        flask_app.register_blueprint(paypal)
         # User profiles
         flask_app.register_blueprint(admin_profile)
         flask_app.register_blueprint(instructor_profile)
@@ -275,6 +254,8 @@ def registrar_modulos_en_la_aplicacion_principal(flask_app: Flask):
         flask_app.register_blueprint(admin_announcements)
         flask_app.register_blueprint(instructor_announcements)
         flask_app.register_blueprint(public_announcements)
+        # Blog, master classes, programs and PayPal, only when enabled.
+        register_optional_blueprints(flask_app)
 
 
 # ---------------------------------------------------------------------------------------
@@ -282,10 +263,8 @@ def registrar_modulos_en_la_aplicacion_principal(flask_app: Flask):
 # ---------------------------------------------------------------------------------------
 @administrador_sesion.user_loader
 def cargar_sesion(identidad):
-    """Devuelve la entrada correspondiente al usuario que inicio sesión desde la base de datos."""
-    if identidad is not None:
-        return database.session.get(Usuario, identidad)
-    return None
+    """Devuelve el usuario que inicio sesión, desde la cache de identidades si es posible."""
+    return cargar_identidad(identidad)
 
 
 @administrador_sesion.unauthorized_handler
@@ -362,6 +341,7 @@ def define_variables_globales_jinja2(flask_app: Flask):
     flask_app.jinja_env.globals["get_custom_pages"] = get_custom_pages
     flask_app.jinja_env.globals["get_footer_enlaces"] = get_footer_enlaces
     flask_app.jinja_env.globals["get_locale"] = get_locale
+    flask_app.jinja_env.globals["image_variants"] = image_variants
     flask_app.jinja_env.globals["get_one_from_db"] = get_one_record
     flask_app.jinja_env.globals["get_slideshowid"] = get_slideshowid
     flask_app.jinja_env.globals["iconos_recursos"] = ICONOS_RECURSOS
@@ -378,7 +358,7 @@ def define_variables_globales_jinja2(flask_app: Flask):
     flask_app.jinja_env.globals["markdown2html"] = markdown_to_clean_html
     flask_app.jinja_env.globals["moderador_asignado"] = verifica_moderador_asignado_a_curso
     flask_app.jinja_env.globals["parametros_url"] = concatenar_parametros_a_url
-    flask_app.jinja_env.globals["paypal_enabled"] = check_paypal_enabled
+    flask_app.jinja_env.globals["paypal_enabled"] = paypal_enabled
     flask_app.jinja_env.globals["paypal_id"] = get_paypal_id
     flask_app.jinja_env.globals["pyversion"] = python_version()
     flask_app.jinja_env.globals["site_logo"] = get_site_logo
@@ -486,6 +466,13 @@ def create_app(app_name="now_lms", testing=False, config_overrides=None):
     if config_overrides:
         flask_app.config.update(config_overrides)
 
+    # Size the connection pool for the final database URI and the worker plan;
+    # options given in the configuration take precedence.
+    flask_app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **pool_options_from_env(str(flask_app.config.get("SQLALCHEMY_DATABASE_URI", "")), development=DESARROLLO),
+        **(flask_app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}),
+    }
+
     # Configure for testing if needed
     if testing or TESTING:
         flask_app.config.update(
@@ -513,6 +500,8 @@ def create_app(app_name="now_lms", testing=False, config_overrides=None):
         configure_uploads(flask_app, files)
         configure_uploads(flask_app, audio)
         define_variables_globales_jinja2(flask_app)
+        init_static_assets(flask_app)
+        init_template_cache(flask_app)
 
         # Register request handlers and error handlers
         _register_before_request_handlers(flask_app)
@@ -718,6 +707,33 @@ def initial_setup(with_examples=False, with_tests=False, flask_app=None):
                 raise RuntimeError(f"Required session table '{session_table}' is missing.")
             log.info(f"Verified that session table '{session_table}' exists in database schema.")
 
+        # Setup-only module: 2k lines of sample data, imported when a database is created.
+        from now_lms.db.initial_data import (
+            asignar_cursos_a_categoria,
+            asignar_cursos_a_etiquetas,
+            asignar_programas_a_categoria,
+            asignar_programas_a_etiquetas,
+            crear_blog_post_predeterminado,
+            crear_categorias,
+            crear_certificacion,
+            crear_certificados,
+            crear_curso_autoaprendizaje,
+            crear_curso_demo,
+            crear_curso_demo1,
+            crear_curso_demo2,
+            crear_curso_demo3,
+            crear_curso_predeterminado,
+            crear_etiquetas,
+            crear_evaluacion_predeterminada,
+            crear_paginas_estaticas_predeterminadas,
+            crear_programa,
+            crear_recurso_descargable,
+            crear_usuarios_predeterminados,
+            populate_custmon_data_dir,
+            populate_custom_theme_dir,
+            system_info,
+        )
+
         system_info(app_to_use)
         log.debug("Database schema created successfully.")
         log.debug("Loading sample data.")
@@ -785,6 +801,8 @@ def init_app(with_examples=False, flask_app=None):
 
             # Always populate custom directories if environment variables are set
             # This ensures custom data/themes are available even when DB already exists
+            from now_lms.db.initial_data import populate_custmon_data_dir, populate_custom_theme_dir
+
             populate_custmon_data_dir()
             populate_custom_theme_dir()
 
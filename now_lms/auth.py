@@ -24,13 +24,16 @@ from argon2.exceptions import VerifyMismatchError
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from flask import abort, current_app, flash, redirect, url_for
-from flask_login import current_user
+from flask import abort, current_app, flash, has_app_context, redirect, url_for
+from flask_login import UserMixin, current_user
+from sqlalchemy import event
 
 # ---------------------------------------------------------------------------------------
 # Local resources
 # ---------------------------------------------------------------------------------------
+from now_lms.cache import two_tier_delete, two_tier_get, two_tier_set
 from now_lms.db import Configuracion, MailConfig, Usuario, database
+from now_lms.db.replicas import RoutingSession
 from now_lms.i18n import _
 from now_lms.logs import log
 
@@ -105,6 +108,86 @@ def usuario_requiere_verificacion_email() -> bool:
     return False
 
 
+# ---------------------------------------------------------------------------------------
+# Identidad del usuario que inició sesión.
+# ---------------------------------------------------------------------------------------
+# Campos que se leen en casi todas las peticiones: control de acceso y barra de navegación.
+IDENTITY_FIELDS = ("id", "usuario", "tipo", "activo", "correo_electronico_verificado", "nombre", "apellido", "portada")
+# Marca en ``Session.info`` con los usuarios modificados en la transacción.
+PENDING_IDENTITIES = "usuarios_modificados"
+
+
+def _identity_key(identidad: str) -> str:
+    return f"user_identity:{identidad}"
+
+
+class UsuarioSesion(UserMixin):
+    """Usuario que inició sesión, construido desde la cache.
+
+    Los campos de ``IDENTITY_FIELDS`` se leen sin consultar la base de datos; el
+    primer acceso a cualquier otro atributo carga el registro ``Usuario`` completo.
+    """
+
+    def __init__(self, datos: dict[str, Any]):
+        self.__dict__.update(datos)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        registro = self.__dict__.get("_registro")
+        if registro is None:
+            registro = database.session.get(Usuario, self.__dict__["id"])
+            if registro is None:
+                raise AttributeError(name)
+            self.__dict__["_registro"] = registro
+        return getattr(registro, name)
+
+    def __repr__(self) -> str:
+        return f"<UsuarioSesion {self.usuario}>"
+
+
+def cargar_identidad(identidad: str | None) -> UsuarioSesion | Usuario | None:
+    """Devuelve el usuario de la sesión, desde la cache si es posible."""
+    if identidad is None:
+        return None
+    timeout = current_app.config.get("USER_CACHE_TIMEOUT", 60)
+    if not timeout:
+        return database.session.get(Usuario, identidad)
+    datos = two_tier_get(_identity_key(identidad))
+    if datos is None:
+        registro = database.session.get(Usuario, identidad)
+        if registro is None:
+            return None
+        datos = {campo: getattr(registro, campo) for campo in IDENTITY_FIELDS}
+        two_tier_set(_identity_key(identidad), datos, timeout)
+    return UsuarioSesion(datos)
+
+
+def invalidar_identidad(identidad: str) -> None:
+    """Descarta la identidad guardada en cache de un usuario."""
+    two_tier_delete(_identity_key(identidad))
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_modified_users(session: Any, _flush_context: Any) -> None:
+    for instance in (*session.dirty, *session.deleted):
+        if isinstance(instance, Usuario) and instance.id:
+            session.info.setdefault(PENDING_IDENTITIES, set()).add(instance.id)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _invalidate_after_commit(session: Any) -> None:
+    identidades = session.info.pop(PENDING_IDENTITIES, None)
+    if identidades and has_app_context():
+        for identidad in identidades:
+            invalidar_identidad(identidad)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_modified_users(session: Any) -> None:
+    session.info.pop(PENDING_IDENTITIES, None)
+
+
 # ---------------------------------------------------------------------------------------
 # Comprobar el acceso a un perfil de acuerdo con el perfil del usuario.
 # ---------------------------------------------------------------------------------------
@@ -8,7 +8,10 @@ from __future__ import annotations
 # ---------------------------------------------------------------------------------------
 # Standard library
 # ---------------------------------------------------------------------------------------
+import threading
+import time
 from os import environ
+from typing import Any
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
@@ -88,6 +91,82 @@ else:
 cache: Cache = Cache()
 
 
+# ---------------------------------------------------------------------------------------
+# Cache en dos niveles.
+# ---------------------------------------------------------------------------------------
+class _CacheLocal:
+    """Primer nivel: diccionario del proceso con expiración corta.
+
+    Evita ir al servidor de cache en cada petición por valores que se leen siempre,
+    como la identidad del usuario. Al invalidar solo se borra la copia de este
+    proceso, por eso las entradas viven pocos segundos.
+    """
+
+    def __init__(self, ttl: float = 5, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: Any, timeout: float) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (time.monotonic() + min(self.ttl, timeout), value)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+cache_local = _CacheLocal()
+
+
+def two_tier_get(key: str) -> Any:
+    """Lee ``key`` de la cache del proceso y, si no está, de la cache compartida."""
+    value = cache_local.get(key)
+    if value is not None:
+        return value
+    try:
+        value = cache.get(key)
+    except Exception as e:
+        log.warning(f"Error reading {key} from cache: {e}")
+        return None
+    if value is not None:
+        cache_local.set(key, value, cache_local.ttl)
+    return value
+
+
+def two_tier_set(key: str, value: Any, timeout: int) -> None:
+    """Guarda ``value`` en los dos niveles de cache."""
+    cache_local.set(key, value, timeout)
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception as e:
+        log.warning(f"Error writing {key} to cache: {e}")
+
+
+def two_tier_delete(key: str) -> None:
+    """Borra ``key`` de los dos niveles de cache."""
+    cache_local.delete(key)
+    try:
+        cache.delete(key)
+    except Exception as e:
+        log.warning(f"Error deleting {key} from cache: {e}")
+
+
 # ---------------------------------------------------------------------------------------
 # Opciones de cache.
 # ---------------------------------------------------------------------------------------
@@ -180,6 +259,7 @@ def cache_incr(key: str, timeout: int = 60) -> int:
 def invalidate_all_cache() -> bool:
     """Invalida toda la cache del sistema cuando cambia el tema."""
     try:
+        cache_local.clear()
         if CTYPE != "NullCache":
             cache.clear()
             log.trace("Cache invalidated due to theme change")
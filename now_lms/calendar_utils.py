@@ -10,12 +10,14 @@ import threading
 # ---------------------------------------------------------------------------------------
 # Standard library
 # ---------------------------------------------------------------------------------------
+from collections.abc import Iterable
 from datetime import date, datetime, time
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
 # ---------------------------------------------------------------------------------------
 from flask import current_app
+from sqlalchemy import delete, insert, update
 
 # ---------------------------------------------------------------------------------------
 # Local resources
@@ -27,12 +29,25 @@ from now_lms.logs import log
 
 def create_events_for_student_enrollment(user_id: str, course_id: str) -> None:
     """Create calendar events when a student enrolls in a course."""
+    create_events_for_student_enrollments(user_id, [course_id])
+
+
+def create_events_for_student_enrollments(user_id: str, course_ids: Iterable[str]) -> None:
+    """Create the missing calendar events of a student for several courses at once.
+
+    Runs one query for the dated meet resources, one for the evaluations with a deadline,
+    one for the events the student already has and a single multi-row INSERT, no matter
+    how many courses or resources are involved.
+    """
+    course_ids = list(dict.fromkeys(course_ids))
+    if not course_ids:
+        return
+
     try:
-        # Get course resources of type 'meet' with dates
         meet_resources = (
             database.session.execute(
                 database.select(CursoRecurso)
-                .filter(CursoRecurso.curso == course_id)
+                .filter(CursoRecurso.curso.in_(course_ids))
                 .filter(CursoRecurso.tipo == "meet")
                 .filter(CursoRecurso.fecha.is_not(None))
             )
@@ -40,80 +55,112 @@ def create_events_for_student_enrollment(user_id: str, course_id: str) -> None:
             .all()
         )
 
-        # Get evaluations with deadlines
-        evaluations = (
-            database.session.execute(
-                database.select(Evaluation)
-                .join(Evaluation.section)
-                .filter(CursoSeccion.curso == course_id)
-                .filter(Evaluation.available_until.is_not(None))
-            )
-            .scalars()
-            .all()
-        )
+        evaluations = database.session.execute(
+            database.select(Evaluation, CursoSeccion.curso)
+            .join(Evaluation.section)
+            .filter(CursoSeccion.curso.in_(course_ids))
+            .filter(Evaluation.available_until.is_not(None))
+        ).all()
 
-        events_created = 0
+        if not meet_resources and not evaluations:
+            return
+
+        existing = database.session.execute(
+            database.select(UserEvent.resource_id, UserEvent.evaluation_id)
+            .filter(UserEvent.user_id == user_id)
+            .filter(UserEvent.course_id.in_(course_ids))
+        ).all()
+        existing_resources = {row.resource_id for row in existing if row.resource_id}
+        existing_evaluations = {row.evaluation_id for row in existing if row.evaluation_id}
+
+        app_timezone = _get_app_timezone()
+        new_events: list[dict] = []
 
-        # Create events for meet resources
         for resource in meet_resources:
-            start_time = _combine_date_time(resource.fecha, resource.hora_inicio)
-            end_time = _combine_date_time(resource.fecha, resource.hora_fin) if resource.hora_fin else None
-
-            # Check if event already exists
-            existing_event = database.session.execute(
-                database.select(UserEvent).filter(UserEvent.user_id == user_id).filter(UserEvent.resource_id == resource.id)
-            ).scalar_one_or_none()
-
-            if not existing_event:
-                event = UserEvent(
-                    user_id=user_id,
-                    course_id=course_id,
-                    section_id=resource.seccion,
-                    resource_id=resource.id,
-                    resource_type="meet",
-                    title=resource.nombre,
-                    description=resource.descripcion,
-                    start_time=start_time,
-                    end_time=end_time,
-                    timezone=_get_app_timezone(),
-                    status="pending",
-                )
-                database.session.add(event)
-                events_created += 1
-
-        # Create events for evaluations
-        for evaluation in evaluations:
-            # Check if event already exists
-            existing_event = database.session.execute(
-                database.select(UserEvent)
-                .filter(UserEvent.user_id == user_id)
-                .filter(UserEvent.evaluation_id == evaluation.id)
-            ).scalar_one_or_none()
-
-            if not existing_event:
-                event = UserEvent(
-                    user_id=user_id,
-                    course_id=course_id,
-                    section_id=evaluation.section_id,
-                    evaluation_id=evaluation.id,
-                    resource_type="evaluation",
-                    title=_("Fecha límite: {title}").format(title=evaluation.title),
-                    description=evaluation.description,
-                    start_time=evaluation.available_until,
-                    timezone=_get_app_timezone(),
-                    status="pending",
-                )
-                database.session.add(event)
-                events_created += 1
+            if resource.id in existing_resources:
+                continue
+            new_events.append(
+                {
+                    "user_id": user_id,
+                    "course_id": resource.curso,
+                    "section_id": resource.seccion,
+                    "resource_id": resource.id,
+                    "resource_type": "meet",
+                    "title": resource.nombre,
+                    "description": resource.descripcion,
+                    "start_time": _combine_date_time(resource.fecha, resource.hora_inicio),
+                    "end_time": _combine_date_time(resource.fecha, resource.hora_fin) if resource.hora_fin else None,
+                    "timezone": app_timezone,
+                    "status": "pending",
+                }
+            )
 
+        for evaluation, evaluation_course in evaluations:
+            if evaluation.id in existing_evaluations:
+                continue
+            new_events.append(
+                {
+                    "user_id": user_id,
+                    "course_id": evaluation_course,
+                    "section_id": evaluation.section_id,
+                    "evaluation_id": evaluation.id,
+                    "resource_type": "evaluation",
+                    "title": _("Fecha límite: {title}").format(title=evaluation.title),
+                    "description": evaluation.description,
+                    "start_time": evaluation.available_until,
+                    "timezone": app_timezone,
+                    "status": "pending",
+                }
+            )
+
+        if new_events:
+            database.session.execute(insert(UserEvent), new_events)
         database.session.commit()
-        log.info(f"Created {events_created} calendar events for user {user_id} in course {course_id}")
+        log.info(f"Created {len(new_events)} calendar events for user {user_id} in course(s) {', '.join(course_ids)}")
 
     except Exception as e:
-        log.error(f"Error creating calendar events for user {user_id} in course {course_id}: {e}")
+        log.error(f"Error creating calendar events for user {user_id} in course(s) {', '.join(course_ids)}: {e}")
         database.session.rollback()
 
 
+def schedule_events_for_student_enrollments(user_id: str, course_ids: Iterable[str]) -> None:
+    """Create calendar events for new enrollments without blocking the enrollment request.
+
+    The fan-out runs in a background thread with its own application context; when
+    testing it runs inline so the events are visible as soon as the call returns.
+    """
+    schedule_events_for_students([user_id], course_ids)
+
+
+def schedule_events_for_students(user_ids: Iterable[str], course_ids: Iterable[str]) -> None:
+    """Create the calendar events of several students enrolled in the same courses.
+
+    All students are handled by a single background thread, one after another.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    course_ids = list(dict.fromkeys(course_ids))
+    if not user_ids or not course_ids:
+        return
+
+    app = current_app._get_current_object()
+    if app.config.get("TESTING"):
+        for user_id in user_ids:
+            create_events_for_student_enrollments(user_id, course_ids)
+        return
+
+    def _create_in_background():
+        with app.app_context():
+            try:
+                for user_id in user_ids:
+                    create_events_for_student_enrollments(user_id, course_ids)
+            finally:
+                database.session.remove()
+
+    thread = threading.Thread(target=_create_in_background)
+    thread.daemon = True
+    thread.start()
+
+
 def update_meet_resource_events(resource_id: str) -> None:
     """Update all user events when a meet resource is modified."""
 
@@ -129,28 +176,22 @@ def update_meet_resource_events(resource_id: str) -> None:
                 if not resource or resource.tipo != "meet":
                     return
 
-                # Get all events related to this resource
-                events = (
-                    database.session.execute(database.select(UserEvent).filter(UserEvent.resource_id == resource_id))
-                    .scalars()
-                    .all()
+                # Every event of the resource gets the same values: one UPDATE, no rows loaded.
+                result = database.session.execute(
+                    update(UserEvent)
+                    .where(UserEvent.resource_id == resource_id)
+                    .values(
+                        title=resource.nombre,
+                        description=resource.descripcion,
+                        start_time=_combine_date_time(resource.fecha, resource.hora_inicio),
+                        end_time=_combine_date_time(resource.fecha, resource.hora_fin) if resource.hora_fin else None,
+                        timezone=_get_app_timezone(),
+                    )
+                    .execution_options(synchronize_session=False)
                 )
 
-                updates_made = 0
-                for event in events:
-                    # Update event details
-                    start_time = _combine_date_time(resource.fecha, resource.hora_inicio)
-                    end_time = _combine_date_time(resource.fecha, resource.hora_fin) if resource.hora_fin else None
-
-                    event.title = resource.nombre
-                    event.description = resource.descripcion
-                    event.start_time = start_time
-                    event.end_time = end_time
-                    event.timezone = _get_app_timezone()
-                    updates_made += 1
-
                 database.session.commit()
-                log.info(f"Updated {updates_made} calendar events for resource {resource_id}")
+                log.info(f"Updated {result.rowcount} calendar events for resource {resource_id}")
 
         except Exception as e:
             log.error(f"Error updating calendar events for resource {resource_id}: {e}")
@@ -178,24 +219,21 @@ def update_evaluation_events(evaluation_id: str) -> None:
                 if not evaluation:
                     return
 
-                # Get all events related to this evaluation
-                events = (
-                    database.session.execute(database.select(UserEvent).filter(UserEvent.evaluation_id == evaluation_id))
-                    .scalars()
-                    .all()
+                # Every event of the evaluation gets the same values: one UPDATE, no rows loaded.
+                result = database.session.execute(
+                    update(UserEvent)
+                    .where(UserEvent.evaluation_id == evaluation_id)
+                    .values(
+                        title=_("Fecha límite: {title}").format(title=evaluation.title),
+                        description=evaluation.description,
+                        start_time=evaluation.available_until,
+                        timezone=_get_app_timezone(),
+                    )
+                    .execution_options(synchronize_session=False)
                 )
 
-                updates_made = 0
-                for event in events:
-                    # Update event details
-                    event.title = _("Fecha límite: {title}").format(title=evaluation.title)
-                    event.description = evaluation.description
-                    event.start_time = evaluation.available_until
-                    event.timezone = _get_app_timezone()
-                    updates_made += 1
-
                 database.session.commit()
-                log.info(f"Updated {updates_made} calendar events for evaluation {evaluation_id}")
+                log.info(f"Updated {result.rowcount} calendar events for evaluation {evaluation_id}")
 
         except Exception as e:
             log.error(f"Error updating calendar events for evaluation {evaluation_id}: {e}")
@@ -249,21 +287,15 @@ def _get_app_timezone() -> str:
 def cleanup_events_for_course_unenrollment(user_id: str, course_id: str) -> None:
     """Remove calendar events when a student unenrolls from a course."""
     try:
-        # Delete all events for this user and course
-        events_to_delete = (
-            database.session.execute(
-                database.select(UserEvent).filter(UserEvent.user_id == user_id).filter(UserEvent.course_id == course_id)
-            )
-            .scalars()
-            .all()
+        result = database.session.execute(
+            delete(UserEvent)
+            .where(UserEvent.user_id == user_id)
+            .where(UserEvent.course_id == course_id)
+            .execution_options(synchronize_session=False)
         )
 
-        count = len(events_to_delete)
-        for event in events_to_delete:
-            database.session.delete(event)
-
         database.session.commit()
-        log.info(f"Removed {count} calendar events for user {user_id} unenrolling from course {course_id}")
+        log.info(f"Removed {result.rowcount} calendar events for user {user_id} unenrolling from course {course_id}")
 
     except Exception as e:
         log.error(f"Error removing calendar events for user {user_id} from course {course_id}: {e}")
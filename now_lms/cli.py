@@ -81,24 +81,43 @@ def seed():
 
 
 @database.command()
-def backup():
+@click.option(
+    "--compress",
+    type=click.Choice(["auto", "zstd", "gzip", "none"]),
+    default="auto",
+    show_default=True,
+    help="auto uses zstd when available and gzip otherwise.",
+)
+@click.option("--jobs", type=click.IntRange(min=1), default=None, help="Parallel pg_dump jobs (PostgreSQL only).")
+@click.option("--keep", type=click.IntRange(min=0), default=0, show_default=True, help="Backups to keep, 0 keeps all.")
+def backup(compress, jobs, keep):
     """Make a backup of system data."""
     from now_lms.db.backup import db_backup
 
-    db_backup()
+    with lms_app.app_context():
+        try:
+            backup_file = db_backup(compress=compress, jobs=jobs, keep=keep)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+    click.echo(f"Backup written to {backup_file}")
 
 
 @database.command()
 @click.argument(
     "backup_sql_file",
-    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, path_type=Path),
+    type=click.Path(exists=True, file_okay=True, dir_okay=True, readable=True, path_type=Path),
 )
-def restore(backup_sql_file: Path):
+@click.option("--jobs", type=click.IntRange(min=1), default=None, help="Parallel pg_restore jobs (PostgreSQL only).")
+def restore(backup_sql_file: Path, jobs):
     """Restore the system from a backup."""
     from now_lms.db.backup import db_backup_restore
 
     click.echo(f"Processing back un from: {backup_sql_file}")
-    db_backup_restore(backup_sql_file)
+    with lms_app.app_context():
+        try:
+            db_backup_restore(backup_sql_file, jobs=jobs)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
 
 
 @database.command()
@@ -133,43 +152,90 @@ def engine():
         click.echo(f"Database Engine: {db_engine}")
 
 
+@database.command()
+@click.option("--verbose", is_flag=True, default=False, help="Print the SQL and the full plan of every query.")
+def explain(verbose):
+    """Show the query plan of the hot queries and flag sequential scans."""
+    from now_lms.db.explain import explain_hot_queries
+
+    with lms_app.app_context():
+        results = explain_hot_queries()
+    for result in results:
+        if result.seq_scans:
+            click.echo(f"SEQ SCAN  {result.name}: {', '.join(result.seq_scans)}")
+        else:
+            click.echo(f"OK        {result.name}")
+        if verbose:
+            click.echo(f"    {result.sql}")
+            for line in result.plan:
+                click.echo(f"    {line}")
+    flagged = sum(1 for result in results if result.seq_scans)
+    click.echo(f"{flagged} of {len(results)} queries scan a whole table.")
+    if flagged:
+        click.echo("Run 'lmsctl database migrate' to create missing indexes; small tables may be scanned by design.")
+
+
+@database.command()
+@click.option(
+    "--mode",
+    type=click.Choice(["passive", "full", "restart", "truncate"], case_sensitive=False),
+    default="passive",
+    show_default=True,
+    help="truncate also empties the WAL file; full, restart and truncate wait for running writers.",
+)
+def checkpoint(mode):
+    """Copy the SQLite WAL file into the database."""
+    from now_lms.db.sqlite_tuning import checkpoint as wal_checkpoint
+
+    with lms_app.app_context():
+        try:
+            result = wal_checkpoint(db.engine, mode)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+    if result["log_pages"] < 0:
+        click.echo("The database is not in WAL mode, nothing to do.")
+        return
+    click.echo(f"Checkpointed {result['checkpointed']} of {result['log_pages']} WAL pages.")
+    if result["busy"]:
+        click.echo("The checkpoint did not finish because of running transactions, try again later.")
+
+
 @database.group()
 def session():
     """Session management tools."""
 
 
+def _database_session_interface():
+    """Return the SQLAlchemy session interface, or None after telling the user why not."""
+    from flask_session.sqlalchemy import SqlAlchemySessionInterface
+
+    session_type = lms_app.config.get("SESSION_TYPE")
+    if session_type != "sqlalchemy" or not isinstance(lms_app.session_interface, SqlAlchemySessionInterface):
+        click.echo(
+            f"Session backend is '{session_type}', not 'sqlalchemy'. This command only works with SQLAlchemy session backend."
+        )
+        return None
+    return lms_app.session_interface
+
+
 @session.command("clear")
-def session_clear():
+@click.option("--batch", default=None, type=int, help="Rows deleted per transaction (default: NOW_LMS_SESSION_CLEANUP_BATCH).")
+def session_clear(batch):
     """Delete expired sessions from the database."""
     with lms_app.app_context():
-        from datetime import datetime, timezone
+        from now_lms.session_storage import delete_expired_sessions
 
-        # Check if session type is SQLAlchemy
-        session_type = lms_app.config.get("SESSION_TYPE")
-
-        if session_type != "sqlalchemy":
-            click.echo(
-                f"Session backend is '{session_type}', not 'sqlalchemy'. This command only works with SQLAlchemy session backend."
-            )
+        interface = _database_session_interface()
+        if interface is None:
             return
-
-        # Get the session table name
         table_name = lms_app.config.get("SESSION_SQLALCHEMY_TABLE", "flask_sessions")
 
         try:
-            # Query and delete expired sessions
-            from sqlalchemy import text
-
-            now_utc = datetime.now(timezone.utc)
-            result = db.session.execute(text(f"DELETE FROM {table_name} WHERE expiry <= :now"), {"now": now_utc})
-            deleted_count = result.rowcount
-            db.session.commit()
-
+            deleted_count = delete_expired_sessions(interface, batch or lms_app.config.get("SESSION_CLEANUP_BATCH", 1000))
             click.echo(f"Deleted {deleted_count} expired session(s) from {table_name} table.")
             log.info(f"Cleared {deleted_count} expired sessions")
 
         except Exception as e:
-            db.session.rollback()
             click.echo(f"Error clearing expired sessions: {e}")
             log.error(f"Error clearing expired sessions: {e}")
             raise
@@ -177,38 +243,26 @@ def session_clear():
 
 @session.command("stats")
 def session_stats():
-    """Return the number of active sessions."""
+    """Report the size and churn of the session table."""
     with lms_app.app_context():
-        from datetime import datetime, timezone
+        from now_lms.session_storage import session_stats as collect_session_stats
 
-        # Check if session type is SQLAlchemy
-        session_type = lms_app.config.get("SESSION_TYPE")
-
-        if session_type != "sqlalchemy":
-            click.echo(
-                f"Session backend is '{session_type}', not 'sqlalchemy'. This command only works with SQLAlchemy session backend."
-            )
+        interface = _database_session_interface()
+        if interface is None:
             return
-
-        # Get the session table name
         table_name = lms_app.config.get("SESSION_SQLALCHEMY_TABLE", "flask_sessions")
 
         try:
-            # Count active sessions (not expired)
-            from sqlalchemy import text
-
-            now_utc = datetime.now(timezone.utc)
-            result = db.session.execute(text(f"SELECT COUNT(*) FROM {table_name} WHERE expiry > :now"), {"now": now_utc})
-            active_count = result.scalar()
-
-            # Count total sessions
-            total_result = db.session.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-            total_count = total_result.scalar()
+            stats = collect_session_stats(interface, lms_app.permanent_session_lifetime)
 
             click.echo(f"Session statistics for {table_name} table:")
-            click.echo(f"  Active sessions: {active_count}")
-            click.echo(f"  Expired sessions: {total_count - active_count}")
-            click.echo(f"  Total sessions: {total_count}")
+            click.echo(f"  Active sessions: {stats['active']}")
+            click.echo(f"  Expired sessions: {stats['expired']}")
+            click.echo(f"  Total sessions: {stats['total']}")
+            click.echo(f"  Written in the last hour: {stats['written_last_hour']}")
+            click.echo(f"  Payload size: {stats['payload_bytes']} bytes ({stats['average_bytes']} bytes per session)")
+            if stats["table_bytes"] is not None:
+                click.echo(f"  Table size on disk: {stats['table_bytes']} bytes")
 
         except Exception as e:
             click.echo(f"Error retrieving session statistics: {e}")
@@ -255,6 +309,7 @@ def system():
         click.echo(f"  Python implementation: {config_info_data.sys._python_implementation}")
         click.echo(f"  Database engine: {config_info_data._dbengine}")
         click.echo(f"  Cache type: {config_info_data._cache_type}")
+        _print_pool_info()
 
         click.echo("Host Information:")
         click.echo(f"  Operating System: {config_info_data.sys._system}")
@@ -262,6 +317,30 @@ def system():
         click.echo(f"  Architecture: {config_info_data.sys._arch[0]}")
 
 
+def _print_pool_info():
+    """Print the connection pool plan and the pool use of this process."""
+    from now_lms.db import database
+    from now_lms.db_pool import max_connections_from_env, pool_stats
+
+    stats = pool_stats(database.engine)
+    click.echo("Database Pool:")
+    click.echo(f"  Pool class: {stats['class']}")
+    if "size" not in stats:
+        return
+    workers, threads = _get_workers_threads()
+    per_worker = stats["size"] + max(stats["max_overflow"], 0)
+    budget = max_connections_from_env() or "unlimited"
+    click.echo(f"  Worker plan: {workers} workers x {threads} threads")
+    click.echo(f"  Pool size: {stats['size']} (+{stats['max_overflow']} overflow, timeout {stats['timeout']}s)")
+    click.echo(f"  Connections: {per_worker} per worker, {per_worker * workers} total (budget: {budget})")
+    click.echo(f"  Checked out: {stats['checked_out']} (saturation {stats['saturation']:.0%})")
+    if "checkouts" in stats:
+        click.echo(
+            f"  Checkouts: {stats['checkouts']}, wait avg {stats['wait_avg_ms']} ms, max {stats['wait_max_ms']} ms, "
+            f"timeouts {stats['timeouts']}, peak saturation {stats['peak_saturation']:.0%}"
+        )
+
+
 @info.command()
 def path():
     """Directorios used by the current setup."""
@@ -283,6 +362,48 @@ def routes():
             click.echo(f"{rule.endpoint} -> {rule.rule}")
 
 
+def _import_times() -> list[tuple[int, int, str]]:
+    """Import NOW LMS in a fresh interpreter and return (self, cumulative, module) in microseconds."""
+    import subprocess  # nosec B404
+    import sys
+
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", "import now_lms"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise click.ClickException(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "Import failed.")
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = (part.strip() for part in line.removeprefix("import time:").split("|", 2))
+        if own.isdigit():
+            times.append((int(own), int(cumulative), name))
+    return times
+
+
+@info.command()
+@click.option("--limit", default=25, show_default=True, help="Number of modules to list.")
+@click.option("--prefix", default="", help="Only list modules whose name starts with this prefix, e.g. now_lms.")
+def startup(limit, prefix):
+    """Report the import time of each module when loading NOW LMS."""
+    from now_lms.optional_modules import OPTIONAL_BLUEPRINTS, OPTIONAL_MODULES_EXTENSION
+
+    times = _import_times()
+    total = next((cumulative for _own, cumulative, name in times if name == "now_lms"), 0)
+    click.echo(f"Importing now_lms (includes creating the application): {total / 1000:.0f} ms")
+    skipped = lms_app.extensions.get(OPTIONAL_MODULES_EXTENSION, ())
+    loaded = [name for name in OPTIONAL_BLUEPRINTS if name not in skipped]
+    click.echo(f"Optional modules loaded: {', '.join(loaded) or 'none'}; not loaded: {', '.join(sorted(skipped)) or 'none'}")
+    click.echo(f"{'Cumulative ms':>14} {'Self ms':>9}  Module")
+    selected = [row for row in times if row[2].lstrip().startswith(prefix)]
+    for own, cumulative, name in sorted(selected, key=lambda row: row[1], reverse=True)[:limit]:
+        click.echo(f"{cumulative / 1000:14.1f} {own / 1000:9.1f}  {name.strip()}")
+
+
 def _get_port():
     """Return the port from environment variables, defaulting to 8080."""
     return environ.get("LMS_PORT") or environ.get("PORT") or 8080
@@ -343,6 +464,7 @@ def _run_flask_dev_server(port):
 def _run_gunicorn(port, workers, threads):
     """Start the Gunicorn WSGI server. Raises ImportError if not installed."""
     from gunicorn.app.base import BaseApplication
+    from now_lms.preload import preload_for_fork
     from now_lms.session_config import reset_connections_after_fork
 
     class StandaloneApplication(BaseApplication):
@@ -374,6 +496,7 @@ def _run_gunicorn(port, workers, threads):
         "accesslog": "-",
         "errorlog": "-",
         "loglevel": "info",
+        **preload_for_fork(lms_app),
     }
 
     log.info(f"Starting Gunicorn WSGI server on port {port} with {workers} workers and {threads} threads per worker.")
@@ -734,6 +857,230 @@ def set_password():
         click.echo(f"Password updated successfully for user '{usuario.usuario}'.")
 
 
+@lms_app.cli.group()
+def assets():
+    """Static asset tools."""
+
+
+@assets.command("build")
+def assets_build():
+    """Fingerprint and precompress static files and write the asset manifest."""
+    from now_lms.static_assets import MANIFEST_NAME, build_assets
+
+    static_dir = Path(lms_app.static_folder)
+    stats = build_assets(static_dir)
+    click.echo(
+        f"{stats['assets']} assets ({stats['written']} written, {stats['compressed']} precompressed, "
+        f"{stats['removed']} stale removed)."
+    )
+    click.echo(f"Manifest: {static_dir / MANIFEST_NAME}")
+    click.echo("Restart the application to serve the fingerprinted names.")
+
+
+@assets.command("clean")
+def assets_clean():
+    """Remove fingerprinted copies and the asset manifest."""
+    from now_lms.static_assets import MANIFEST_NAME, load_manifest
+
+    static_dir = Path(lms_app.static_folder)
+    manifest = load_manifest(static_dir)
+    if not manifest:
+        click.echo("No asset manifest found.")
+        return
+    for hashed in manifest["assets"].values():
+        for suffix in ("", ".br", ".gz"):
+            (static_dir / (hashed + suffix)).unlink(missing_ok=True)
+    (static_dir / MANIFEST_NAME).unlink()
+    click.echo(f"Removed {len(manifest['assets'])} fingerprinted assets.")
+
+
+@lms_app.cli.group()
+def templates():
+    """Jinja template tools."""
+
+
+@templates.command("precompile")
+def templates_precompile():
+    """Compile every template into the bytecode cache."""
+    from now_lms.template_cache import precompile_templates
+
+    if lms_app.jinja_env.bytecode_cache is None:
+        click.echo("Template bytecode cache is disabled (NOW_LMS_TEMPLATE_CACHE=off).")
+        return
+    stats = precompile_templates(lms_app)
+    click.echo(f"{stats['templates']} templates compiled, {stats['failed']} failed.")
+
+
+@templates.command("clear")
+def templates_clear():
+    """Remove the compiled templates from the bytecode cache."""
+    if lms_app.jinja_env.bytecode_cache is None:
+        click.echo("Template bytecode cache is disabled (NOW_LMS_TEMPLATE_CACHE=off).")
+        return
+    lms_app.jinja_env.bytecode_cache.clear()
+    click.echo("Template bytecode cache cleared.")
+
+
+@lms_app.cli.group()
+def reports():
+    """Dashboard summary tables."""
+
+
+@reports.command("refresh")
+def reports_refresh():
+    """Recompute every dashboard summary from the source tables."""
+    from now_lms.db import CourseSummary, DailySummary, StaffSummary
+    from now_lms.db.reporting import refresh_summaries
+
+    with lms_app.app_context():
+        if not refresh_summaries():
+            raise click.ClickException("Could not refresh the dashboard summaries, see the log for details.")
+        counts = [
+            db.session.execute(db.select(db.func.count(model.id))).scalar()
+            for model in (CourseSummary, StaffSummary, DailySummary)
+        ]
+    click.echo(f"Summaries refreshed: {counts[0]} courses, {counts[1]} instructors and moderators, {counts[2]} days.")
+
+
+@lms_app.cli.group()
+def images():
+    """Uploaded image tools."""
+
+
+@images.command("backfill")
+@click.option("--force", is_flag=True, default=False, help="Regenerate copies that are already up to date.")
+def images_backfill(force):
+    """Generate resized WebP/JPEG copies of previously uploaded images."""
+    from now_lms.config import DIRECTORIO_UPLOAD_IMAGENES
+    from now_lms.image_derivatives import available_formats, backfill_derivatives
+
+    if not available_formats():
+        click.echo("Pillow is not installed; no image copies can be generated.")
+        return
+    stats = backfill_derivatives(DIRECTORIO_UPLOAD_IMAGENES, force=force)
+    click.echo(f"{stats['images']} images, {stats['written']} resized copies written.")
+
+
+@lms_app.cli.group()
+def pdf():
+    """PDF resource tools."""
+
+
+@pdf.command("previews")
+@click.option("--force", is_flag=True, default=False, help="Regenerate previews that are already up to date.")
+@click.option(
+    "--workers", type=int, default=None, help="Processes used to render pages (default: NOW_LMS_PDF_PREVIEW_WORKERS)."
+)
+def pdf_previews(force, workers):
+    """Render page images and extract text of previously uploaded PDF resources."""
+    from flask import current_app
+
+    from now_lms.db import CursoRecurso, database
+    from now_lms.pdf_previews import available, backfill_previews
+
+    if not available():
+        click.echo("pypdfium2 is not installed; install now-lms[pdf-previews] to render PDF pages.")
+        return
+    paths = []
+    for recurso in database.session.execute(database.select(CursoRecurso).filter_by(tipo="pdf")).scalars():
+        config = current_app.upload_set_config.get(recurso.base_doc_url)
+        if config is not None and recurso.doc:
+            paths.append(str(Path(config.destination) / recurso.doc))
+    stats = backfill_previews(paths, force=force, workers=workers or current_app.config.get("PDF_PREVIEW_WORKERS", 2))
+    click.echo(f"{stats['pdfs']} PDFs, {stats['pages']} pages rendered, {stats['failed']} failed.")
+
+
+@lms_app.cli.group()
+def storage():
+    """Content-addressed upload store tools."""
+
+
+@storage.command("gc")
+@click.option("--dry-run", is_flag=True, default=False, help="Report what would be removed without deleting.")
+def storage_gc(dry_run):
+    """Remove stored files that no upload path references anymore."""
+    from now_lms.file_store import collect_garbage
+
+    stats = collect_garbage(dry_run=dry_run)
+    verb = "Would remove" if dry_run else "Removed"
+    click.echo(f"{verb} {stats['removed']} unreferenced files ({stats['bytes']} bytes).")
+
+
+@storage.command("dedupe")
+def storage_dedupe():
+    """Link existing uploads into the content-addressed store."""
+    from now_lms.config import DIRECTORIO_BASE_ARCHIVOS_USUARIO
+    from now_lms.file_store import deduplicate_tree
+
+    stats = deduplicate_tree(str(DIRECTORIO_BASE_ARCHIVOS_USUARIO))
+    click.echo(f"{stats['files']} files stored, {stats['linked']} duplicates linked ({stats['bytes_saved']} bytes saved).")
+
+
+@storage.command("push")
+def storage_push():
+    """Copy existing uploads to the configured storage backend."""
+    from now_lms.config import DIRECTORIO_BASE_ARCHIVOS_USUARIO
+    from now_lms.storage import LocalStorage, get_storage
+
+    backend = get_storage()
+    if not backend.remote:
+        click.echo("NOW_LMS_STORAGE is local, nothing to push.")
+        return
+    copied = 0
+    for key in LocalStorage(str(DIRECTORIO_BASE_ARCHIVOS_USUARIO)).keys():
+        if not backend.exists(key):
+            backend.put(key, str(DIRECTORIO_BASE_ARCHIVOS_USUARIO / key))
+            copied += 1
+    click.echo(f"{copied} files copied to the storage backend.")
+
+
+@storage.command("stats")
+def storage_stats():
+    """Show the size of the content-addressed store."""
+    from now_lms.file_store import store_stats
+
+    stats = store_stats()
+    click.echo(f"Stored files: {stats['blobs']} ({stats['bytes']} bytes)")
+    click.echo(f"References: {stats['references']}")
+    click.echo(f"Unreferenced: {stats['orphans']}")
+    click.echo(f"Saved by deduplication: {stats['bytes_saved']} bytes")
+
+
+@lms_app.cli.group()
+def enroll():
+    """Enrollment tools."""
+
+
+@enroll.command("import")
+@click.argument("import_file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None, help="File format (default: by extension)."
+)
+@click.option("--course", "course_code", default=None, help="Course code for rows without course_code.")
+@click.option("--program", "program_code", default=None, help="Program code for rows without program_code.")
+@click.option("--no-email", is_flag=True, default=False, help="Do not send welcome emails.")
+@click.option("--workers", type=int, default=None, help="Processes used to hash passwords (default: one per CPU).")
+@click.option("--chunk-size", type=int, default=500, show_default=True, help="Rows per transaction.")
+def enroll_import(import_file, fmt, course_code, program_code, no_email, workers, chunk_size):
+    """Import enrollments from a CSV or NDJSON file."""
+    from now_lms.enrollment_import import detect_format, format_report, import_enrollments
+
+    with lms_app.app_context():
+        with import_file.open(encoding="utf-8-sig", newline="") as stream:
+            report = import_enrollments(
+                stream,
+                fmt or detect_format(import_file.name),
+                course_code=course_code,
+                program_code=program_code,
+                send_emails=not no_email,
+                workers=workers,
+                chunk_size=chunk_size,
+                background=False,
+            )
+        for line in format_report(report):
+            click.echo(line)
+
+
 @lms_app.cli.group()
 def cache():
     """Cache management tools."""
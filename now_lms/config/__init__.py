@@ -19,11 +19,14 @@ from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 # Third-party libraries
 # ---------------------------------------------------------------------------------------
 from appdirs import AppDirs
-from flask_uploads import AUDIO, DOCUMENTS, IMAGES, UploadSet
+from flask_uploads import AUDIO, DOCUMENTS, IMAGES
 
 # ---------------------------------------------------------------------------------------
 # Local resources
 # ---------------------------------------------------------------------------------------
+from now_lms.file_store import ContentAddressedUploadSet
+from now_lms.storage import STORAGE_BACKENDS
+from now_lms.template_cache import TEMPLATE_CACHE_MODES
 from now_lms.logs import log
 
 if TYPE_CHECKING:
@@ -138,6 +141,17 @@ DIRECTORIO_ARCHIVOS_PRIVADOS: str = path.join(DIRECTORIO_BASE_ARCHIVOS_USUARIO,
 DIRECTORIO_UPLOAD_IMAGENES: str = path.join(DIRECTORIO_ARCHIVOS_PUBLICOS, "images")
 DIRECTORIO_UPLOAD_ARCHIVOS: str = path.join(DIRECTORIO_ARCHIVOS_PUBLICOS, "files")
 DIRECTORIO_UPLOAD_AUDIO: str = path.join(DIRECTORIO_ARCHIVOS_PUBLICOS, "audio")
+# Almacén por contenido; debe estar en el mismo sistema de archivos que las subidas. Sin
+# NOW_LMS_DATA_DIR se usa el directorio de datos del usuario, fuera del paquete.
+DIRECTORIO_ALMACEN_ARCHIVOS: str = environ.get("NOW_LMS_FILE_STORE_DIR") or (
+    path.join(DIRECTORIO_ARCHIVOS_PRIVADOS, ".store")
+    if custom_data_dir
+    else path.join(DIRECTORIO_BASE_APP.user_data_dir, "store")
+)
+# Caché local de la aplicación, fuera del paquete, que puede no tener permisos de escritura.
+DIRECTORIO_CACHE: str = DIRECTORIO_BASE_APP.user_cache_dir
+# Bytecode de las plantillas compiladas.
+DIRECTORIO_CACHE_PLANTILLAS: str = environ.get("NOW_LMS_TEMPLATE_CACHE_DIR") or path.join(DIRECTORIO_CACHE, "templates")
 
 # Crea los directorios si no existen.
 if not path.isdir(DIRECTORIO_BASE_ARCHIVOS_USUARIO):
@@ -190,6 +204,7 @@ if not DESARROLLO and CONFIGURACION["SECRET_KEY"] == "dev":
     )
 
 CONFIGURACION["SQLALCHEMY_DATABASE_URI"] = environ.get("DATABASE_URL") or SQLITE  # nosec
+# El tamaño del pool se agrega en create_app según los workers e hilos, ver now_lms/db_pool.py.
 CONFIGURACION["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
@@ -200,6 +215,64 @@ CONFIGURACION["UPLOADS_AUTOSERVE"] = True
 CONFIGURACION["UPLOADED_FILES_DEST"] = DIRECTORIO_UPLOAD_ARCHIVOS
 CONFIGURACION["UPLOADED_IMAGES_DEST"] = DIRECTORIO_UPLOAD_IMAGENES
 CONFIGURACION["UPLOADED_AUDIO_DEST"] = DIRECTORIO_UPLOAD_AUDIO
+# Los PDF de certificados incrustan el código QR como data URI en lugar de pedirlo por HTTP.
+CONFIGURACION["CERTIFICATE_QR_INLINE"] = environ.get("NOW_LMS_CERTIFICATE_QR_INLINE", "1").strip().lower() in VALORES_TRUE
+# Usar los nombres con huella de ``lmsctl assets build`` cuando exista el manifiesto.
+CONFIGURACION["STATIC_ASSETS_MANIFEST"] = environ.get("NOW_LMS_STATIC_ASSETS_MANIFEST", "1").strip().lower() in VALORES_TRUE
+# Entrega de archivos protegidos por el proxy frontal tras validar el acceso en la aplicación:
+# "x-accel" (nginx, Caddy) o "x-sendfile" (Apache, lighttpd). Vacío sirve los archivos desde Python.
+_FILE_OFFLOAD = environ.get("NOW_LMS_FILE_OFFLOAD", "").strip().lower()
+_FILE_OFFLOAD_ALIASES = {"nginx": "x-accel", "caddy": "x-accel", "apache": "x-sendfile", "lighttpd": "x-sendfile"}
+_FILE_OFFLOAD = _FILE_OFFLOAD_ALIASES.get(_FILE_OFFLOAD, _FILE_OFFLOAD)
+if _FILE_OFFLOAD not in ("", "x-accel", "x-sendfile"):
+    log.warning(f"Unknown NOW_LMS_FILE_OFFLOAD value: {_FILE_OFFLOAD}, serving files from the application.")
+    _FILE_OFFLOAD = ""
+CONFIGURACION["FILE_OFFLOAD"] = _FILE_OFFLOAD
+CONFIGURACION["FILE_OFFLOAD_PREFIX"] = environ.get("NOW_LMS_FILE_OFFLOAD_PREFIX", "/_protected/").strip()
+# Genera copias reducidas (WebP/JPEG) de las imágenes subidas para servirlas con ``srcset``.
+CONFIGURACION["IMAGE_DERIVATIVES"] = environ.get("NOW_LMS_IMAGE_DERIVATIVES", "1").strip().lower() in VALORES_TRUE
+# Convierte los PDF subidos en imágenes por página y texto para el visor, ver now_lms/pdf_previews.py.
+CONFIGURACION["PDF_PREVIEWS"] = environ.get("NOW_LMS_PDF_PREVIEWS", "0").strip().lower() in VALORES_TRUE
+try:
+    CONFIGURACION["PDF_PREVIEW_WORKERS"] = max(1, int(environ.get("NOW_LMS_PDF_PREVIEW_WORKERS", "2")))
+except ValueError:
+    log.warning("Invalid NOW_LMS_PDF_PREVIEW_WORKERS value, using 2 processes.")
+    CONFIGURACION["PDF_PREVIEW_WORKERS"] = 2
+
+# Guarda cada archivo subido una sola vez por contenido; las rutas de los cursos son enlaces duros.
+CONFIGURACION["FILE_DEDUP"] = environ.get("NOW_LMS_FILE_DEDUP", "1").strip().lower() in VALORES_TRUE
+CONFIGURACION["FILE_STORE_DIR"] = DIRECTORIO_ALMACEN_ARCHIVOS
+
+_STORAGE = environ.get("NOW_LMS_STORAGE", "local").strip().lower()
+if _STORAGE not in STORAGE_BACKENDS:
+    log.warning(f"Unknown NOW_LMS_STORAGE value: {_STORAGE}, storing files on the local disk.")
+    _STORAGE = "local"
+if _STORAGE == "s3" and not environ.get("NOW_LMS_S3_BUCKET", "").strip():
+    log.warning("NOW_LMS_STORAGE=s3 requires NOW_LMS_S3_BUCKET, storing files on the local disk.")
+    _STORAGE = "local"
+CONFIGURACION["STORAGE_BACKEND"] = _STORAGE
+CONFIGURACION["S3_BUCKET"] = environ.get("NOW_LMS_S3_BUCKET", "").strip()
+CONFIGURACION["S3_PREFIX"] = environ.get("NOW_LMS_S3_PREFIX", "").strip()
+CONFIGURACION["S3_ENDPOINT_URL"] = environ.get("NOW_LMS_S3_ENDPOINT_URL", "").strip()
+CONFIGURACION["S3_REGION"] = environ.get("NOW_LMS_S3_REGION", "").strip()
+CONFIGURACION["S3_PRESIGNED_URLS"] = environ.get("NOW_LMS_S3_PRESIGNED_URLS", "1").strip().lower() in VALORES_TRUE
+try:
+    CONFIGURACION["S3_PRESIGNED_EXPIRES"] = int(environ.get("NOW_LMS_S3_PRESIGNED_EXPIRES", "300"))
+except ValueError:
+    log.warning("Invalid NOW_LMS_S3_PRESIGNED_EXPIRES value, using 300 seconds.")
+    CONFIGURACION["S3_PRESIGNED_EXPIRES"] = 300
+
+# Caché de bytecode de las plantillas Jinja compartida entre workers, ver now_lms/template_cache.py.
+_TEMPLATE_CACHE = environ.get("NOW_LMS_TEMPLATE_CACHE", "auto").strip().lower()
+if _TEMPLATE_CACHE in VALORES_TRUE:
+    _TEMPLATE_CACHE = "auto"
+elif _TEMPLATE_CACHE in ("0", "false", "no", "off", "none"):
+    _TEMPLATE_CACHE = "off"
+elif _TEMPLATE_CACHE not in TEMPLATE_CACHE_MODES:
+    log.warning(f"Unknown NOW_LMS_TEMPLATE_CACHE value: {_TEMPLATE_CACHE}, using auto.")
+    _TEMPLATE_CACHE = "auto"
+CONFIGURACION["TEMPLATE_CACHE"] = _TEMPLATE_CACHE
+CONFIGURACION["TEMPLATE_CACHE_DIR"] = DIRECTORIO_CACHE_PLANTILLAS
 
 if DESARROLLO:
     log.warning("Using default configuration.")
@@ -240,11 +313,58 @@ if DATABASE_URL_BASE := CONFIGURACION.get("SQLALCHEMY_DATABASE_URI"):
         log.info(f"Database URI corrected: {DATABASE_URL_BASE} → {DATABASE_URL_CORREGIDA}")
         CONFIGURACION["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL_CORREGIDA
 
+# Réplicas de solo lectura para las vistas marcadas con @read_replica, ver now_lms/db/replicas.py.
+CONFIGURACION["REPLICA_URLS"] = [
+    corregir_url_base_datos(url.strip()) for url in environ.get("NOW_LMS_REPLICA_URLS", "").split(",") if url.strip()
+]
+try:
+    CONFIGURACION["REPLICA_STICKY_SECONDS"] = max(0, int(environ.get("NOW_LMS_REPLICA_STICKY_SECONDS", "10")))
+except ValueError:
+    log.warning("Invalid NOW_LMS_REPLICA_STICKY_SECONDS value, using 10 seconds.")
+    CONFIGURACION["REPLICA_STICKY_SECONDS"] = 10
+
+# Modo de producción de SQLite (WAL, PRAGMAs y escrituras en serie), ver now_lms/db/sqlite_tuning.py.
+CONFIGURACION["SQLITE_TUNING"] = environ.get("NOW_LMS_SQLITE_TUNING", "1").strip().lower() in VALORES_TRUE
+for _clave, _defecto in (("SQLITE_BUSY_TIMEOUT", 5000), ("SQLITE_MMAP_SIZE", 268435456), ("SQLITE_CACHE_SIZE", 65536)):
+    try:
+        CONFIGURACION[_clave] = max(0, int(environ.get(f"NOW_LMS_{_clave}", str(_defecto))))
+    except ValueError:
+        log.warning(f"Invalid NOW_LMS_{_clave} value, using {_defecto}.")
+        CONFIGURACION[_clave] = _defecto
+
+# Registra solo los módulos opcionales activos, ver now_lms/optional_modules.py.
+CONFIGURACION["LAZY_BLUEPRINTS"] = environ.get("NOW_LMS_LAZY_BLUEPRINTS", "1").strip().lower() in VALORES_TRUE
+
+# Segundos que la identidad del usuario que inició sesión se guarda en cache, ver now_lms/auth.py.
+try:
+    CONFIGURACION["USER_CACHE_TIMEOUT"] = max(0, int(environ.get("NOW_LMS_USER_CACHE_TIMEOUT", "60")))
+except ValueError:
+    log.warning("Invalid NOW_LMS_USER_CACHE_TIMEOUT value, using 60 seconds.")
+    CONFIGURACION["USER_CACHE_TIMEOUT"] = 60
+
+# Precarga con gc.freeze() antes de crear los workers de Gunicorn, ver now_lms/preload.py.
+CONFIGURACION["GC_FREEZE"] = environ.get("NOW_LMS_GC_FREEZE", "1").strip().lower() in VALORES_TRUE
+try:
+    CONFIGURACION["WORKER_MEMORY_SAMPLE_DELAY"] = max(0, int(environ.get("NOW_LMS_WORKER_MEMORY_SAMPLE_DELAY", "60")))
+except ValueError:
+    log.warning("Invalid NOW_LMS_WORKER_MEMORY_SAMPLE_DELAY value, using 60 seconds.")
+    CONFIGURACION["WORKER_MEMORY_SAMPLE_DELAY"] = 60
+
+# Sesiones guardadas en la base de datos, ver now_lms/session_storage.py.
+CONFIGURACION["SESSION_COMPACT"] = environ.get("NOW_LMS_SESSION_COMPACT", "0").strip().lower() in VALORES_TRUE
+for _clave, _defecto in (("SESSION_CLEANUP_INTERVAL", 900), ("SESSION_CLEANUP_BATCH", 1000)):
+    try:
+        CONFIGURACION[_clave] = max(0, int(environ.get(f"NOW_LMS_{_clave}", str(_defecto))))
+    except ValueError:
+        log.warning(f"Invalid NOW_LMS_{_clave} value, using {_defecto}.")
+        CONFIGURACION[_clave] = _defecto
+
 # < --------------------------------------------------------------------------------------------- >
 # Configuración de Directorio de carga de archivos.
-images = UploadSet("images", IMAGES)
-files = UploadSet("files", DOCUMENTS)
-audio = UploadSet("audio", AUDIO)
+# Los archivos guardados se deduplican en DIRECTORIO_ALMACEN_ARCHIVOS, ver now_lms/file_store.py.
+images = ContentAddressedUploadSet("images", IMAGES)
+files = ContentAddressedUploadSet("files", DOCUMENTS)
+audio = ContentAddressedUploadSet("audio", AUDIO)
 
 
 # < --------------------------------------------------------------------------------------------- >
@@ -20,6 +20,7 @@ from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import event, select
 from sqlalchemy.exc import SQLAlchemyError
 
+from now_lms.db.replicas import RoutingSession
 from now_lms.i18n import _
 
 __all__ = [
@@ -43,7 +44,8 @@ __all__ = [
 
 # < --------------------------------------------------------------------------------------------- >
 # Definición principal de la clase del ORM.
-database: SQLAlchemy = SQLAlchemy()
+# RoutingSession envía las lecturas de las vistas marcadas con @read_replica a las réplicas.
+database: SQLAlchemy = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 def eliminar_base_de_datos_segura():
@@ -230,7 +232,11 @@ class UsuarioGrupoMiembro(database.Model, BaseTabla):
 class Curso(database.Model, BaseTabla):
     """Un curso es la base del aprendizaje en NOW LMS."""
 
-    __table_args__ = (database.UniqueConstraint("codigo", name="curso_codigo_unico"),)
+    __table_args__ = (
+        database.UniqueConstraint("codigo", name="curso_codigo_unico"),
+        # Catálogo: cursos públicos y abiertos.
+        database.Index("ix_curso_publico_estado", "publico", "estado"),
+    )
     # Información básica
     nombre = database.Column(database.String(150), nullable=False)
     codigo = database.Column(database.String(20), unique=True, index=True)
@@ -341,6 +347,8 @@ class CourseLibrary(database.Model, BaseTabla):
 class CursoSeccion(database.Model, BaseTabla):
     """Los cursos tienen secciones para dividir el contenido en secciones logicas."""
 
+    __table_args__ = (database.Index("ix_curso_seccion_curso_indice", "curso", "indice"),)
+
     curso = database.Column(
         database.String(20), database.ForeignKey(LLAVE_FORANEA_CURSO, ondelete="CASCADE"), nullable=False, index=True
     )
@@ -356,6 +364,9 @@ class CursoSeccion(database.Model, BaseTabla):
 class CursoRecurso(database.Model, BaseTabla):
     """Una sección de un curso consta de una serie de recursos."""
 
+    # Navegación anterior/siguiente dentro de una sección.
+    __table_args__ = (database.Index("ix_curso_recurso_seccion_indice", "seccion", "indice"),)
+
     indice = database.Column(database.Integer(), index=True)
     seccion = database.Column(
         database.String(26), database.ForeignKey(LLAVE_FORANEA_SECCION, ondelete="CASCADE"), nullable=False, index=True
@@ -394,7 +405,9 @@ class CursoRecursoAvance(database.Model, BaseTabla):
     """
 
     __table_args__ = (
+        # La restricción única también sirve las búsquedas por (usuario, curso).
         database.UniqueConstraint("usuario", "curso", "recurso", name="unique_avance_por_usuario_curso_recurso"),
+        database.Index("ix_curso_recurso_avance_usuario_recurso", "usuario", "recurso"),
     )
 
     curso = database.Column(
@@ -511,6 +524,9 @@ class SlideShowResource(database.Model, BaseTabla):
     )
     title = database.Column(database.String(150), nullable=False)
     theme = database.Column(database.String(20), nullable=False, default="simple")
+    # Diapositivas ya saneadas y renderizadas al guardar; los visores no consultan `slide`.
+    rendered_html = database.Column(database.Text, nullable=True)
+    rendered_version = database.Column(database.Integer, nullable=True)
 
     # Relationships
     course = database.relationship("Curso", foreign_keys=[course_id])
@@ -941,6 +957,8 @@ class Mensaje(database.Model, BaseTabla):
 class MessageThread(database.Model, BaseTabla):
     """Message threads for course communication between students and instructors/moderators."""
 
+    __table_args__ = (database.Index("ix_message_thread_course_id", "course_id"),)
+
     course_id = database.Column(
         database.String(20), database.ForeignKey(LLAVE_FORANEA_CURSO, ondelete="CASCADE"), nullable=False
     )
@@ -957,6 +975,8 @@ class MessageThread(database.Model, BaseTabla):
 class Message(database.Model, BaseTabla):
     """Individual messages within a thread."""
 
+    __table_args__ = (database.Index("ix_message_thread_id_timestamp", "thread_id", "timestamp"),)
+
     thread_id = database.Column(
         database.String(26), database.ForeignKey("message_thread.id", ondelete="CASCADE"), nullable=False
     )
@@ -1149,6 +1169,7 @@ class EvaluationAttempt(database.Model, BaseTabla):
     """A student's attempt at an evaluation."""
 
     __tablename__ = "evaluation_attempt"
+    __table_args__ = (database.Index("ix_evaluation_attempt_evaluation_id_user_id", "evaluation_id", "user_id"),)
 
     evaluation_id = database.Column(
         database.String(26), database.ForeignKey(FOREIGN_KEY_EVALUATION_ID, ondelete="CASCADE"), nullable=False, index=True
@@ -1483,6 +1504,7 @@ class UserEvent(database.Model, BaseTabla):
     """User events for calendar functionality - tracks key dates for students."""
 
     __tablename__ = "user_events"
+    __table_args__ = (database.Index("ix_user_events_user_id_resource_id", "user_id", "resource_id"),)
 
     user_id = database.Column(database.String(150), database.ForeignKey(LLAVE_FORANEA_USUARIO), nullable=False, index=True)
     course_id = database.Column(
@@ -1586,6 +1608,65 @@ class RemoteEnrollmentRequest(database.Model, BaseTabla):
     raw_payload_json = database.Column(database.Text, nullable=True)
 
 
+# Tablas de resumen para los paneles, actualizadas en segundo plano por now_lms/db/reporting.py.
+class CourseSummary(database.Model, BaseTabla):
+    """Totales de un curso para los paneles."""
+
+    curso = database.Column(database.String(20), unique=True, nullable=False, index=True)
+    students = database.Column(database.Integer(), default=0, nullable=False)
+    completions = database.Column(database.Integer(), default=0, nullable=False)
+    certificates = database.Column(database.Integer(), default=0, nullable=False)
+    payments = database.Column(database.Integer(), default=0, nullable=False)
+    revenue = database.Column(database.Numeric(12, 2, asdecimal=True), default=0, nullable=False)
+    open_threads = database.Column(database.Integer(), default=0, nullable=False)
+    closed_threads = database.Column(database.Integer(), default=0, nullable=False)
+    refreshed = database.Column(database.DateTime, default=utc_now, nullable=False)
+
+
+class StaffSummary(database.Model, BaseTabla):
+    """Totales de los cursos de un instructor o moderador para su panel."""
+
+    __table_args__ = (database.UniqueConstraint("usuario", "rol", name="uq_staff_summary_usuario_rol"),)
+
+    usuario = database.Column(database.String(150), nullable=False, index=True)
+    rol = database.Column(database.String(20), nullable=False)  # instructor, moderator
+    courses = database.Column(database.Integer(), default=0, nullable=False)
+    students = database.Column(database.Integer(), default=0, nullable=False)
+    certificates = database.Column(database.Integer(), default=0, nullable=False)
+    open_threads = database.Column(database.Integer(), default=0, nullable=False)
+    refreshed = database.Column(database.DateTime, default=utc_now, nullable=False)
+
+
+class DailySummary(database.Model, BaseTabla):
+    """Actividad de un día: inscripciones, certificados, pagos y usuarios nuevos."""
+
+    fecha = database.Column(database.Date, unique=True, nullable=False, index=True)
+    enrollments = database.Column(database.Integer(), default=0, nullable=False)
+    certificates = database.Column(database.Integer(), default=0, nullable=False)
+    payments = database.Column(database.Integer(), default=0, nullable=False)
+    revenue = database.Column(database.Numeric(12, 2, asdecimal=True), default=0, nullable=False)
+    new_users = database.Column(database.Integer(), default=0, nullable=False)
+    refreshed = database.Column(database.DateTime, default=utc_now, nullable=False)
+
+
+class SiteSummary(database.Model, BaseTabla):
+    """Totales del sitio para el panel de administración, una sola fila."""
+
+    users = database.Column(database.Integer(), default=0, nullable=False)
+    inactive_users = database.Column(database.Integer(), default=0, nullable=False)
+    unverified_users = database.Column(database.Integer(), default=0, nullable=False)
+    courses = database.Column(database.Integer(), default=0, nullable=False)
+    enrollments = database.Column(database.Integer(), default=0, nullable=False)
+    resources = database.Column(database.Integer(), default=0, nullable=False)
+    certificates = database.Column(database.Integer(), default=0, nullable=False)
+    unread_messages = database.Column(database.Integer(), default=0, nullable=False)
+    open_threads = database.Column(database.Integer(), default=0, nullable=False)
+    closed_threads = database.Column(database.Integer(), default=0, nullable=False)
+    paypal_payments = database.Column(database.Integer(), default=0, nullable=False)
+    paypal_revenue = database.Column(database.Numeric(12, 2, asdecimal=True), default=0, nullable=False)
+    refreshed = database.Column(database.DateTime, default=utc_now, nullable=False)
+
+
 # Event listeners for audit field population and validation
 def _populate_new_audit_fields(instance: BaseTabla, current_user_id: str | None, current_date) -> None:
     """Populate creation audit fields for a new model instance."""
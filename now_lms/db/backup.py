@@ -1,128 +1,321 @@
 # SPDX-License-Identifier: Apache-2.0
 # SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
 
-"""Database backup functionality for NOW LMS."""
+"""
+Database backup functionality for NOW LMS.
+
+Respaldos en línea, comprimidos y en paralelo:
+
+- SQLite se copia con la API de respaldo en línea de SQLite, que obtiene una copia
+  consistente aunque la aplicación siga escribiendo.
+- PostgreSQL usa ``pg_dump -Fd -j N``: un directorio con un archivo comprimido por
+  tabla, volcado y restaurado (``pg_restore -j N``) en paralelo.
+- MySQL y MariaDB usan ``mysqldump --single-transaction``, cuya salida se comprime
+  mientras se lee.
+
+La compresión es zstd si ``zstandard`` está instalado (``pip install now-lms[zstd]``)
+y gzip en caso contrario. Con ``keep`` solo se conservan los respaldos más recientes.
+"""
 
 from __future__ import annotations
 
 # ---------------------------------------------------------------------------------------
 # Standard library
 # ---------------------------------------------------------------------------------------
+import gzip
 import os
+import re
 import shutil
+import sqlite3
 import subprocess  # nosec B404 - Subprocess used for legitimate database backup operations
+import tempfile
 from datetime import datetime
 from pathlib import Path
+from typing import IO, Any
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
 # ---------------------------------------------------------------------------------------
 from flask import current_app
-from sqlalchemy.engine import make_url
+from sqlalchemy.engine import URL, make_url
 
 # ---------------------------------------------------------------------------------------
 # Local resources
 # ---------------------------------------------------------------------------------------
-from now_lms.config import DIRECTORIO_ARCHIVOS_PRIVADOS, DIRECTORIO_PRINCICIPAL
+from now_lms.config import DIRECTORIO_ARCHIVOS_PRIVADOS
+from now_lms.logs import log
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 BACKUP_DIR = os.path.join(DIRECTORIO_ARCHIVOS_PRIVADOS, "database", "backup")
+BACKUP_PREFIX = "nowlmsbackup_"
+COMPRESSION_METHODS = ("auto", "zstd", "gzip", "none")
+SUFFIXES = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+# Páginas copiadas por paso de la API de respaldo de SQLite; entre pasos otros procesos pueden escribir.
+SQLITE_BACKUP_PAGES = 4096
+CHUNK_SIZE = 1024 * 1024
 
-with current_app.app_context():
-    DBURI = str(current_app.config.get("SQLALCHEMY_DATABASE_URI"))
-    DBURL = make_url(DBURI)
-    DBNAME = DBURL.database
-    DBUSER = DBURL.username
-    DBPASS = DBURL.password
-    DBHOST = DBURL.host
-    DBPORT = str(DBURL.port)
-    DBENGINE = DBURL.drivername
-
-
-def db_backup():
-    """Genera un respaldo de la base de datos."""
-    TIME_STAMP = datetime.now().strftime("%Y%m%d-%H%M%S")
-    BACKUP_FILE = os.path.join(BACKUP_DIR, f"nowlmsbackup_{TIME_STAMP}.sql")
-    BACKUP_FILE = Path(BACKUP_FILE)
-
-    os.makedirs(BACKUP_DIR, exist_ok=True)
-
-    if not BACKUP_FILE.exists():
-        BACKUP_FILE.touch()
-
-    with current_app.app_context():
-        if "sqlite" in DBURI:
-            ARCHIVO_ORIGEN = Path(str(DIRECTORIO_PRINCICIPAL) + "/now_lms.db")
-            shutil.copy2(ARCHIVO_ORIGEN, BACKUP_FILE)
-        elif "postgresql" in DBURI:
-            os.environ["PGPASSWORD"] = DBPASS
-            subprocess.run(  # nosec B603, B607 - Legitimate pg_dump command for database backup
-                ["pg_dump", "-h", DBHOST, "-p", DBPORT, "-U", DBUSER, "-F", "c", "-b", "-v", "-f", BACKUP_FILE, DBNAME]
-            )
-            os.environ["PGPASSWORD"] = ""
-        elif "mysql" in DBURI:
-            with BACKUP_FILE.open("w", encoding="utf-8") as f:
-                subprocess.run(  # nosec B603, B607 - Legitimate mysqldump command for database backup
-                    ["mysqldump", "-h", DBHOST, "-P", DBPORT, "-u", DBUSER, f"--password={DBPASS}", DBNAME],
-                    stdout=f,
-                )
-
-
-def _restaurar_postgresql(backup_sql_file):
-    comando = [
-        "psql",
-        f"--host={DBHOST}",
-        f"--port={DBPORT or 5432}",
-        f"--username={DBUSER}",
-        f"--dbname={DBNAME}",
-        "-f",
-        backup_sql_file,
-    ]
-
-    os.environ["PGPASSWORD"] = DBPASS
-
-    print(f"Ejecutando: {' '.join(comando)}")
-
-    resultado = subprocess.run(  # nosec B603 - Legitimate database restore operation
-        comando,
-    )
 
-    os.environ["PGPASSWORD"] = ""
+def _database_url() -> URL:
+    return make_url(str(current_app.config.get("SQLALCHEMY_DATABASE_URI")))
 
-    if resultado.returncode != 0:
-        raise RuntimeError("Error al restaurar la base de datos PostgreSQL con psql")
+
+def default_jobs() -> int:
+    """Procesos en paralelo para ``pg_dump`` y ``pg_restore``."""
+    return max(1, min(4, os.cpu_count() or 1))
 
 
-def _restaurar_mysql(backup_sql_file):
-    comando = [
-        "mysql",
-        f"-h{DBHOST}",
-        f"-P{DBPORT or 3306}",
-        f"-u{DBUSER}",
-        f"-p{DBPASS}",
-        DBNAME,
-    ]
+def compression_method(method: str = "auto") -> str:
+    """Resuelve ``auto`` a zstd o gzip según las librerías instaladas."""
+    if method == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if method == "zstd" and zstandard is None:
+        raise RuntimeError("zstd compression requires the zstandard library: pip install now-lms[zstd]")
+    return method
 
-    print(f"Ejecutando: {' '.join(comando[:-1])} [password oculto] {comando[-1]}")
 
-    with open(backup_sql_file, "rb") as sql_file:
-        resultado = subprocess.run(comando, stdin=sql_file)  # nosec B603 - Legitimate database restore operation
+def _open_write(path: Path, method: str) -> IO[bytes]:
+    if method == "zstd":
+        return zstandard.open(path, "wb")
+    if method == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    return open(path, "wb")
 
+
+def _open_read(path: Path) -> IO[bytes]:
+    """Abre un respaldo descomprimiéndolo según su extensión."""
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("Restoring a .zst backup requires the zstandard library: pip install now-lms[zstd]")
+        return zstandard.open(path, "rb")
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _run(command: list[str], env: dict[str, str] | None = None, **kwargs: Any) -> None:
+    # Passwords go through the environment, the command line is safe to log.
+    log.info(f"Running: {' '.join(command)}")
+    resultado = subprocess.run(command, env=env, **kwargs)  # nosec B603 - Fixed database client commands
     if resultado.returncode != 0:
-        raise RuntimeError("Error al restaurar la base de datos MySQL con mysql")
+        raise RuntimeError(f"{command[0]} exited with status {resultado.returncode}")
+
+
+def _pipe_from(command: list[str], env: dict[str, str], destination: IO[bytes]) -> None:
+    """Copia la salida de ``command`` en ``destination`` sin guardarla completa en memoria."""
+    with subprocess.Popen(command, stdout=subprocess.PIPE, env=env) as proceso:  # nosec B603
+        shutil.copyfileobj(proceso.stdout, destination, CHUNK_SIZE)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"{command[0]} exited with status {proceso.returncode}")
+
+
+def _pipe_to(command: list[str], env: dict[str, str], source: IO[bytes]) -> None:
+    """Envía ``source`` a la entrada de ``command`` por partes."""
+    with subprocess.Popen(command, stdin=subprocess.PIPE, env=env) as proceso:  # nosec B603
+        try:
+            shutil.copyfileobj(source, proceso.stdin, CHUNK_SIZE)
+            proceso.stdin.close()
+        except BrokenPipeError:
+            # The client stopped reading; its exit status says why.
+            pass
+    if proceso.returncode != 0:
+        raise RuntimeError(f"{command[0]} exited with status {proceso.returncode}")
+
+
+# ---------------------------------------------------------------------------------------
+# SQLite
+# ---------------------------------------------------------------------------------------
+def _sqlite_copy(origen: str | Path, destino: str | Path) -> None:
+    """Copia una base de datos SQLite con la API de respaldo en línea."""
+    source = sqlite3.connect(str(origen))
+    target = sqlite3.connect(str(destino))
+    try:
+        source.backup(target, pages=SQLITE_BACKUP_PAGES)
+    finally:
+        target.close()
+        source.close()
+
+
+def _backup_sqlite(url: URL, backup_file: Path, method: str) -> None:
+    if method == "none":
+        _sqlite_copy(url.database, backup_file)
+        return
+    with tempfile.TemporaryDirectory(dir=backup_file.parent) as tmp:
+        snapshot = Path(tmp) / "snapshot.db"
+        _sqlite_copy(url.database, snapshot)
+        with open(snapshot, "rb") as source, _open_write(backup_file, method) as target:
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+
+
+def _restore_sqlite(url: URL, backup_file: Path) -> None:
+    if backup_file.suffix not in (".zst", ".gz"):
+        _sqlite_copy(backup_file, url.database)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / "snapshot.db"
+        with _open_read(backup_file) as source, open(snapshot, "wb") as target:
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+        _sqlite_copy(snapshot, url.database)
+
+
+# ---------------------------------------------------------------------------------------
+# PostgreSQL
+# ---------------------------------------------------------------------------------------
+def _pg_connection(url: URL) -> tuple[list[str], dict[str, str]]:
+    args = ["-h", url.host or "localhost", "-p", str(url.port or 5432), "-U", url.username or ""]
+    env = dict(os.environ)
+    if url.password:
+        env["PGPASSWORD"] = url.password
+    return args, env
+
+
+def _pg_dump_compression(method: str) -> str:
+    """Opción ``--compress`` de ``pg_dump``, que comprime cada tabla por su cuenta.
+
+    pg_dump 16 acepta zstd y nombres de método; las versiones anteriores solo un nivel gzip.
+    """
+    version = subprocess.run(["pg_dump", "--version"], capture_output=True, text=True).stdout  # nosec B603, B607
+    match = re.search(r"(\d+)", version)
+    named = bool(match and int(match.group(1)) >= 16)
+    if method == "none":
+        return "none" if named else "0"
+    if method in ("auto", "zstd") and named:
+        return "zstd"
+    if method == "zstd":
+        log.info("pg_dump older than 16 does not support zstd, using gzip.")
+    return "gzip" if named else "6"
+
+
+def _backup_postgresql(url: URL, backup_dir: Path, method: str, jobs: int) -> None:
+    args, env = _pg_connection(url)
+    _run(
+        [
+            "pg_dump",
+            *args,
+            "--format=directory",
+            f"--jobs={jobs}",
+            f"--compress={_pg_dump_compression(method)}",
+            f"--file={backup_dir}",
+            url.database or "",
+        ],
+        env=env,
+    )
+
+
+def _restore_postgresql(url: URL, backup_file: Path, jobs: int) -> None:
+    args, env = _pg_connection(url)
+    if backup_file.is_dir() or _is_pg_custom_format(backup_file):
+        # Directory and custom format archives restore in parallel.
+        _run(
+            ["pg_restore", *args, f"--jobs={jobs}", "--clean", "--if-exists", f"--dbname={url.database}", str(backup_file)],
+            env=env,
+        )
+        return
+    # Plain SQL, possibly compressed.
+    with _open_read(backup_file) as source:
+        _pipe_to(["psql", *args, f"--dbname={url.database}", "--quiet"], env, source)
+
+
+def _is_pg_custom_format(backup_file: Path) -> bool:
+    with open(backup_file, "rb") as f:
+        return f.read(5) == b"PGDMP"
+
+
+# ---------------------------------------------------------------------------------------
+# MySQL / MariaDB
+# ---------------------------------------------------------------------------------------
+def _mysql_connection(url: URL) -> tuple[list[str], dict[str, str]]:
+    args = ["-h", url.host or "localhost", "-P", str(url.port or 3306), "-u", url.username or ""]
+    env = dict(os.environ)
+    if url.password:
+        # Keeps the password out of the process list.
+        env["MYSQL_PWD"] = url.password
+    return args, env
+
+
+def _backup_mysql(url: URL, backup_file: Path, method: str) -> None:
+    args, env = _mysql_connection(url)
+    command = ["mysqldump", *args, "--single-transaction", "--quick", "--routines", "--triggers", url.database or ""]
+    with _open_write(backup_file, method) as target:
+        _pipe_from(command, env, target)
+
+
+def _restore_mysql(url: URL, backup_file: Path) -> None:
+    args, env = _mysql_connection(url)
+    with _open_read(backup_file) as source:
+        _pipe_to(["mysql", *args, url.database or ""], env, source)
+
+
+# ---------------------------------------------------------------------------------------
+# Interfaz pública.
+# ---------------------------------------------------------------------------------------
+def rotate_backups(directory: str | Path = BACKUP_DIR, keep: int = 0) -> list[Path]:
+    """Elimina los respaldos más antiguos dejando los ``keep`` más recientes; 0 los conserva todos."""
+    if keep <= 0 or not os.path.isdir(directory):
+        return []
+    backups = sorted(p for p in Path(directory).iterdir() if p.name.startswith(BACKUP_PREFIX))
+    removed = backups[:-keep]
+    for path in removed:
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+        log.info(f"Removed old backup {path.name}")
+    return removed
+
+
+def db_backup(compress: str = "auto", jobs: int | None = None, keep: int = 0, directory: str | Path = BACKUP_DIR) -> Path:
+    """Genera un respaldo de la base de datos y devuelve su ruta."""
+    url = _database_url()
+    jobs = jobs or default_jobs()
+    os.makedirs(directory, exist_ok=True)
+    name = BACKUP_PREFIX + datetime.now().strftime("%Y%m%d-%H%M%S")
 
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        method = compression_method(compress)
+        backup_file = Path(directory) / f"{name}.sqlite{SUFFIXES[method]}"
+    elif backend == "postgresql":
+        backup_file = Path(directory) / f"{name}.pgdump"
+    elif backend in ("mysql", "mariadb"):
+        method = compression_method(compress)
+        backup_file = Path(directory) / f"{name}.sql{SUFFIXES[method]}"
+    else:
+        raise RuntimeError(f"Backups are not supported for the {backend} database engine.")
 
-def _restaurar_sqlite(backup_sql_file):
+    try:
+        if backend == "sqlite":
+            _backup_sqlite(url, backup_file, method)
+        elif backend == "postgresql":
+            _backup_postgresql(url, backup_file, compress, jobs)
+        else:
+            _backup_mysql(url, backup_file, method)
+    except BaseException:
+        # An incomplete backup must not count towards the retention.
+        if backup_file.is_dir():
+            shutil.rmtree(backup_file, ignore_errors=True)
+        elif backup_file.exists():
+            backup_file.unlink()
+        raise
 
-    ARCHIVO_DESTINO = Path(str(DIRECTORIO_PRINCICIPAL) + "/now_lms.db")
-    shutil.copy2(backup_sql_file, ARCHIVO_DESTINO)
+    log.info(f"Database backup written to {backup_file}")
+    rotate_backups(directory, keep)
+    return backup_file
 
 
-def db_backup_restore(backup_sql_file):
+def db_backup_restore(backup_sql_file: str | Path, jobs: int | None = None) -> None:
     """Restaura la base de datos desde un respaldo."""
-    with current_app.app_context():
-        if "postgresql" in DBURI:
-            _restaurar_postgresql(backup_sql_file)
-        elif "mysql" in DBURI:
-            _restaurar_mysql(backup_sql_file)
-        elif "sqlite" in DBURI:
-            _restaurar_sqlite(backup_sql_file)
+    url = _database_url()
+    backup_file = Path(backup_sql_file)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        _restore_postgresql(url, backup_file, jobs or default_jobs())
+    elif backend in ("mysql", "mariadb"):
+        _restore_mysql(url, backup_file)
+    elif backend == "sqlite":
+        _restore_sqlite(url, backup_file)
+    else:
+        raise RuntimeError(f"Restoring is not supported for the {backend} database engine.")
@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Query plans of the hot queries of the application (``lmsctl database explain``)."""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import json
+from types import SimpleNamespace
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from sqlalchemy import text
+from sqlalchemy.sql import Select
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.db import database, select
+
+# Placeholder values: the plan depends on the filtered columns, not on the values.
+SAMPLE_ID = "01JZZZZZZZZZZZZZZZZZZZZZZZ"
+SAMPLE_USER = "usuario"
+SAMPLE_COURSE = "curso"
+
+
+def hot_queries() -> dict[str, Select]:
+    """Queries that run on most page views, with the columns they filter on."""
+    from now_lms.db import (
+        Curso,
+        CursoRecurso,
+        CursoRecursoAvance,
+        CursoSeccion,
+        EstudianteCurso,
+        EvaluationAttempt,
+        Message,
+        MessageThread,
+        UserEvent,
+    )
+
+    return {
+        "course progress (usuario, curso)": select(CursoRecursoAvance).filter_by(usuario=SAMPLE_USER, curso=SAMPLE_COURSE),
+        "resource progress (usuario, recurso)": select(CursoRecursoAvance).filter_by(usuario=SAMPLE_USER, recurso=SAMPLE_ID),
+        "enrollment (usuario, curso)": select(EstudianteCurso).filter_by(usuario=SAMPLE_USER, curso=SAMPLE_COURSE),
+        "evaluation attempts (evaluation_id, user_id)": select(EvaluationAttempt).filter_by(
+            evaluation_id=SAMPLE_ID, user_id=SAMPLE_USER
+        ),
+        "resource events (user_id, resource_id)": select(UserEvent).filter_by(user_id=SAMPLE_USER, resource_id=SAMPLE_ID),
+        "next resources (seccion, indice)": select(CursoRecurso)
+        .filter(CursoRecurso.seccion == SAMPLE_ID, CursoRecurso.indice >= 1)
+        .order_by(CursoRecurso.indice),
+        "course sections (curso, indice)": select(CursoSeccion).filter_by(curso=SAMPLE_COURSE).order_by(CursoSeccion.indice),
+        "catalog (publico, estado)": select(Curso).filter(Curso.publico.is_(True), Curso.estado == "open"),
+        "course threads (course_id)": select(MessageThread).filter_by(course_id=SAMPLE_COURSE),
+        "thread messages (thread_id, timestamp)": select(Message).filter_by(thread_id=SAMPLE_ID).order_by(Message.timestamp),
+    }
+
+
+def _postgresql_plan(connection: Any, sql: str) -> tuple[list[str], list[str]]:
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    lines: list[str] = []
+    seq_scans: list[str] = []
+
+    def walk(node: dict, depth: int) -> None:
+        relation = node.get("Relation Name")
+        lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else ""))
+        if node["Node Type"] == "Seq Scan":
+            seq_scans.append(relation)
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"], 0)
+    return lines, seq_scans
+
+
+def _mysql_plan(connection: Any, sql: str) -> tuple[list[str], list[str]]:
+    rows = connection.execute(text(f"EXPLAIN {sql}")).mappings().all()
+    lines = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+    # type=ALL is a full table scan.
+    return lines, [row["table"] for row in rows if row["type"] == "ALL"]
+
+
+def _sqlite_plan(connection: Any, sql: str) -> tuple[list[str], list[str]]:
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    lines = [row[-1] for row in rows]
+    # "SCAN t" reads the whole table, "SEARCH t USING INDEX ..." does not.
+    seq_scans = [line.split()[1] for line in lines if line.startswith("SCAN ") and "USING" not in line]
+    return lines, seq_scans
+
+
+PLANNERS = {
+    "postgresql": _postgresql_plan,
+    "mysql": _mysql_plan,
+    "mariadb": _mysql_plan,
+    "sqlite": _sqlite_plan,
+}
+
+
+def explain_hot_queries() -> list[SimpleNamespace]:
+    """Run EXPLAIN for each hot query on the configured database and flag sequential scans."""
+    engine = database.engine
+    planner = PLANNERS.get(engine.dialect.name)
+    if planner is None:
+        raise RuntimeError(f"EXPLAIN is not supported for the {engine.dialect.name} database engine.")
+
+    results = []
+    with engine.connect() as connection:
+        for name, query in hot_queries().items():
+            sql = str(query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            plan, seq_scans = planner(connection, sql)
+            results.append(SimpleNamespace(name=name, sql=sql, plan=plan, seq_scans=seq_scans))
+    return results
@@ -0,0 +1,145 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Lecturas desde réplicas de la base de datos.
+
+Con ``NOW_LMS_REPLICA_URLS`` (URLs separadas por comas) las vistas de solo
+lectura marcadas con ``@read_replica`` ejecutan sus consultas SELECT en una
+réplica elegida al azar por petición. Todo lo demás sigue en la base de datos
+principal: escrituras, ``with_for_update``, SQL textual, cualquier consulta
+posterior a un flush o a un ``insert``/``update``/``delete`` masivo aún no
+confirmado y las vistas sin el decorador.
+
+Para que un usuario lea sus propias escrituras, una petición POST/PUT/PATCH/DELETE
+que escribe en la base de datos deja la cookie ``now_lms_primary`` durante
+``NOW_LMS_REPLICA_STICKY_SECONDS``; mientras exista, las lecturas de ese navegador
+van a la principal.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import functools
+import random
+from collections.abc import Callable
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import Flask, current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql import Select
+from werkzeug.wrappers import Response
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+
+REPLICAS_EXTENSION = "now_lms_replicas"
+PRIMARY_COOKIE = "now_lms_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Marca en ``Session.info`` de cambios enviados a la principal y aún no confirmados.
+PENDING_WRITES = "pending_writes"
+
+
+def _replica_engine() -> Any:
+    """Réplica de la petición actual, o ``None`` si la lectura debe ir a la principal."""
+    if not has_request_context() or not getattr(request, "read_replica", False):
+        return None
+    engines = current_app.extensions.get(REPLICAS_EXTENSION)
+    if not engines or request.cookies.get(PRIMARY_COOKIE):
+        return None
+    if not hasattr(request, "replica_engine"):
+        request.replica_engine = random.choice(engines)  # nosec B311
+    return request.replica_engine
+
+
+class RoutingSession(Session):
+    """Sesión que envía las consultas de solo lectura de las vistas marcadas a una réplica."""
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, bind: Any = None, **kwargs: Any) -> Any:
+        """Usa una réplica para SELECT simples sin cambios pendientes; si no, la principal."""
+        if (
+            bind is None
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and not self.info.get(PENDING_WRITES)
+        ):
+            engine = _replica_engine()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _mark_write(session: Session) -> None:
+    session.info[PENDING_WRITES] = True
+    if has_request_context():
+        request.database_write = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_pending_writes(session: Session, _flush_context: Any) -> None:
+    _mark_write(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_bulk_writes(orm_execute_state: Any) -> None:
+    # Bulk insert(), update() and delete() statements do not flush.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write(orm_execute_state.session)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+@event.listens_for(RoutingSession, "after_rollback")
+def _clear_pending_writes(session: Session) -> None:
+    session.info.pop(PENDING_WRITES, None)
+
+
+def read_replica(view: Callable) -> Callable:
+    """Permite que una vista GET lea de las réplicas configuradas."""
+
+    @functools.wraps(view)
+    def decorated_view(*args: Any, **kwargs: Any) -> Any:
+        if request.method in SAFE_METHODS:
+            request.read_replica = True
+        return view(*args, **kwargs)
+
+    return decorated_view
+
+
+def _stick_to_primary(response: Response) -> Response:
+    """Envía las lecturas del usuario a la principal tras una escritura suya."""
+    if request.method not in SAFE_METHODS and getattr(request, "database_write", False):
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            "1",
+            max_age=current_app.config.get("REPLICA_STICKY_SECONDS", 10),
+            httponly=True,
+            samesite="Lax",
+            secure=request.is_secure,
+        )
+    return response
+
+
+def init_replicas(app: Flask) -> None:
+    """Crea los motores de las réplicas configuradas en ``REPLICA_URLS``."""
+    engines = []
+    for index, url in enumerate(app.config.get("REPLICA_URLS") or []):
+        try:
+            engines.append(create_engine(url, **(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})))
+        except Exception as e:
+            # The URL may carry a password, log only its position.
+            log.warning(f"Invalid database replica URL #{index + 1}: {type(e).__name__}")
+    if not engines:
+        return
+    app.extensions[REPLICAS_EXTENSION] = engines
+    app.after_request(_stick_to_primary)
+    log.info(f"Reading from {len(engines)} database replicas.")
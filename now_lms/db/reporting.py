@@ -0,0 +1,618 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Tablas de resumen para los paneles.
+
+Los paneles de instructores, moderadores y administradores leen sus totales de
+``CourseSummary``, ``StaffSummary``, ``DailySummary`` y ``SiteSummary`` en lugar
+de contar inscripciones, certificados, pagos y mensajes en cada carga.
+
+Al confirmar una transacción que cambia inscripciones, asignaciones de docentes
+o moderadores, certificados, pagos, avances, hilos de mensajes, usuarios, cursos,
+recursos o mensajes de contacto, incluidas las sentencias ``insert``, ``update``
+y ``delete`` en bloque, se recalculan en segundo plano solo las filas
+afectadas: los cursos tocados, el personal de esos cursos, los días de los
+registros y los totales del sitio. Solo cuentan los cambios de las columnas que
+suman los resúmenes: guardar el último acceso de un usuario no recalcula nada y el
+avance de un estudiante solo actualiza los cursos completados de su curso. Las
+actualizaciones que llegan mientras otra
+está en curso se acumulan y se procesan juntas. Al hacer pruebas se ejecutan en
+línea.
+
+``lmsctl reports refresh`` recalcula todas las tablas, por ejemplo después de
+migrar una base de datos existente.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import chain
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import Date, Numeric, cast, event, func
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import SQLAlchemyError
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.db import (
+    Certificacion,
+    ContactMessage,
+    CourseSummary,
+    Curso,
+    CursoRecurso,
+    CursoUsuarioAvance,
+    DailySummary,
+    DocenteCurso,
+    EstudianteCurso,
+    MessageThread,
+    ModeradorCurso,
+    Pago,
+    SiteSummary,
+    StaffSummary,
+    Usuario,
+    database,
+    select,
+    utc_now,
+)
+from now_lms.db.replicas import RoutingSession
+from now_lms.logs import log
+
+REPORTING_EXTENSION = "now_lms_reporting"
+# Marca en ``Session.info`` con los resúmenes afectados por la transacción en curso.
+PENDING_SUMMARIES = "pending_summaries"
+
+# Modelo -> columna con el código del curso.
+COURSE_COLUMNS = {
+    EstudianteCurso: "curso",
+    DocenteCurso: "curso",
+    ModeradorCurso: "curso",
+    Certificacion: "curso",
+    Pago: "curso",
+    CursoUsuarioAvance: "curso",
+    MessageThread: "course_id",
+}
+# Modelo -> columna con la fecha del registro en DailySummary.
+DATE_COLUMNS = {
+    EstudianteCurso: "creado",
+    Certificacion: "fecha",
+    Pago: "fecha",
+    Usuario: "creado",
+}
+STAFF_ROLES = {DocenteCurso: "instructor", ModeradorCurso: "moderator"}
+
+# Modelo -> columnas que cambian los conteos de cada resumen. Crear o borrar un registro
+# siempre cuenta; una actualización que no toca estas columnas, como el ``ultimo_acceso``
+# que se guarda en cada inicio de sesión, no recalcula nada.
+COURSE_COUNTED = {
+    EstudianteCurso: {"curso", "usuario", "vigente"},
+    DocenteCurso: {"curso", "usuario", "vigente"},
+    ModeradorCurso: {"curso", "usuario", "vigente"},
+    Certificacion: {"curso"},
+    Pago: {"curso", "estado", "monto"},
+    CursoUsuarioAvance: {"curso", "completado"},
+    MessageThread: {"course_id", "status"},
+}
+DATE_COUNTED = {
+    EstudianteCurso: {"creado"},
+    Certificacion: {"fecha"},
+    Pago: {"fecha", "estado", "monto"},
+    Usuario: {"creado"},
+}
+SITE_COUNTED: dict[Any, set[str]] = {
+    EstudianteCurso: set(),
+    Certificacion: set(),
+    Pago: {"estado", "metodo", "monto"},
+    MessageThread: {"status"},
+    Usuario: {"activo", "correo_electronico_verificado"},
+    Curso: set(),
+    CursoRecurso: set(),
+    ContactMessage: {"status"},
+}
+TRACKED_MODELS = {*COURSE_COUNTED, *SITE_COUNTED}
+
+
+def _key_columns(model: Any) -> list[str]:
+    """Columnas de ``model`` que indican qué resúmenes dependen de un registro."""
+    columns = [COURSE_COLUMNS.get(model), "usuario" if model in STAFF_ROLES else None, DATE_COLUMNS.get(model)]
+    return [column for column in columns if column]
+
+
+def _counted_columns(model: Any) -> set[str]:
+    """Columnas de ``model`` que cambian algún resumen."""
+    return COURSE_COUNTED.get(model, set()) | DATE_COUNTED.get(model, set()) | SITE_COUNTED.get(model, set())
+
+
+def _counts(counted: dict[Any, set[str]], model: Any, changed: set[str] | None) -> bool:
+    """Indica si el cambio de ``changed`` (``None`` al crear o borrar) afecta a ``counted``."""
+    return model in counted and (changed is None or bool(changed & counted[model]))
+
+
+@dataclass
+class SummaryChanges:
+    """Filas de resumen que deben recalcularse."""
+
+    courses: set[str] = field(default_factory=set)
+    # Cursos en los que solo cambió el número de estudiantes que completaron el curso.
+    completions: set[str] = field(default_factory=set)
+    staff: set[tuple[str, str]] = field(default_factory=set)
+    dates: set[date] = field(default_factory=set)
+    site: bool = False
+
+    def __bool__(self) -> bool:
+        """Indica si hay algo que recalcular."""
+        return bool(self.courses or self.completions or self.staff or self.dates or self.site)
+
+    def update(self, other: SummaryChanges) -> None:
+        """Agrega los cambios de ``other``."""
+        self.courses |= other.courses
+        self.completions |= other.completions
+        self.staff |= other.staff
+        self.dates |= other.dates
+        self.site = self.site or other.site
+
+    def add(self, instance: Any, changed: set[str] | None = None) -> None:
+        """Registra los resúmenes que dependen de ``instance``.
+
+        ``changed`` son las columnas modificadas de un registro existente; ``None``
+        indica que el registro se creó o se borró.
+        """
+        model = type(instance)
+        if model in TRACKED_MODELS:
+            self.add_row(model, {column: getattr(instance, column) for column in _key_columns(model)}, changed)
+
+    def add_row(self, model: Any, values: dict[str, Any], changed: set[str] | None = None) -> None:
+        """Registra los resúmenes que dependen de un registro de ``model`` con ``values``."""
+        if model not in TRACKED_MODELS:
+            return
+        self.site = self.site or _counts(SITE_COUNTED, model, changed)
+        if _counts(COURSE_COUNTED, model, changed):
+            if curso := values.get(COURSE_COLUMNS[model]):
+                (self.completions if model is CursoUsuarioAvance else self.courses).add(curso)
+            if model in STAFF_ROLES and (usuario := values.get("usuario")):
+                self.staff.add((usuario, STAFF_ROLES[model]))
+        if _counts(DATE_COUNTED, model, changed) and (value := values.get(DATE_COLUMNS[model])):
+            self.dates.add(value.date() if isinstance(value, datetime) else value)
+
+
+# ---------------------------------------------------------------------------------------
+# Cálculo de los resúmenes.
+# ---------------------------------------------------------------------------------------
+def _grouped(key: Any, value: Any, *criteria: Any, keys: set | None = None, joins: tuple = ()) -> dict:
+    """``{key: value}`` agrupado por ``key``, limitado a ``keys`` si se indica."""
+    stmt = select(key, value)
+    for join in joins:
+        stmt = stmt.join(*join)
+    stmt = stmt.where(*criteria)
+    if keys is not None:
+        stmt = stmt.where(key.in_(keys))
+    return {row[0]: row[1] for row in database.session.execute(stmt.group_by(key)).all()}
+
+
+def _existing(column: Any, keys: set | None, *criteria: Any) -> dict:
+    """Filas de resumen existentes por su clave ``column``."""
+    stmt = select(column.class_).where(*criteria)
+    if keys is not None:
+        stmt = stmt.where(column.in_(keys))
+    return {getattr(row, column.key): row for row in database.session.execute(stmt).scalars()}
+
+
+def _store(row: Any, model: Any, key: dict[str, Any], values: dict[str, Any]) -> None:
+    """Actualiza la fila de resumen ``row``, o la crea con ``key`` si no existe."""
+    if row is None:
+        row = model(**key)
+        database.session.add(row)
+    for name, value in values.items():
+        setattr(row, name, value)
+    row.refreshed = utc_now()
+
+
+def _completions(codes: set[str] | None) -> dict:
+    return _grouped(CursoUsuarioAvance.curso, func.count(CursoUsuarioAvance.id), CursoUsuarioAvance.completado, keys=codes)
+
+
+def _refresh_completions(codes: set[str]) -> None:
+    """Actualiza solo ``completions`` de los cursos ``codes``; crea las filas que falten."""
+    existing = _existing(CourseSummary.curso, codes)
+    completions = _completions(codes)
+    for codigo, row in existing.items():
+        _store(row, CourseSummary, {"curso": codigo}, {"completions": completions.get(codigo, 0)})
+    if missing := codes - set(existing):
+        _refresh_courses(missing)
+
+
+def _refresh_courses(codes: set[str] | None) -> None:
+    existing = _existing(CourseSummary.curso, codes)
+    courses = set(_grouped(Curso.codigo, func.count(Curso.id), keys=codes))
+    students = _grouped(EstudianteCurso.curso, func.count(EstudianteCurso.id), EstudianteCurso.vigente, keys=codes)
+    completions = _completions(codes)
+    certificates = _grouped(Certificacion.curso, func.count(Certificacion.id), keys=codes)
+    completed = Pago.estado == "completed"
+    payments = _grouped(Pago.curso, func.count(Pago.id), completed, keys=codes)
+    revenue = _grouped(Pago.curso, func.sum(cast(Pago.monto, Numeric)), completed, keys=codes)
+    open_threads = _grouped(MessageThread.course_id, func.count(MessageThread.id), MessageThread.status == "open", keys=codes)
+    closed_threads = _grouped(
+        MessageThread.course_id, func.count(MessageThread.id), MessageThread.status == "closed", keys=codes
+    )
+
+    for codigo in courses:
+        _store(
+            existing.get(codigo),
+            CourseSummary,
+            {"curso": codigo},
+            {
+                "students": students.get(codigo, 0),
+                "completions": completions.get(codigo, 0),
+                "certificates": certificates.get(codigo, 0),
+                "payments": payments.get(codigo, 0),
+                "revenue": revenue.get(codigo) or 0,
+                "open_threads": open_threads.get(codigo, 0),
+                "closed_threads": closed_threads.get(codigo, 0),
+            },
+        )
+    # Summaries of deleted courses.
+    for codigo, row in existing.items():
+        if codigo not in courses:
+            database.session.delete(row)
+
+
+def _staff_of(codes: set[str]) -> set[tuple[str, str]]:
+    """Instructores y moderadores de los cursos ``codes``."""
+    staff: set[tuple[str, str]] = set()
+    if not codes:
+        return staff
+    for model, rol in STAFF_ROLES.items():
+        for usuario in database.session.execute(select(model.usuario).where(model.curso.in_(codes))).scalars():
+            staff.add((usuario, rol))
+    return staff
+
+
+def _refresh_staff(staff: set[tuple[str, str]] | None) -> None:
+    for model, rol in STAFF_ROLES.items():
+        if staff is None:
+            users = set(database.session.execute(select(model.usuario).distinct()).scalars())
+        else:
+            users = {usuario for usuario, staff_rol in staff if staff_rol == rol}
+        if not users:
+            continue
+
+        courses = _grouped(model.usuario, func.count(model.id), model.vigente, keys=users)
+        students = _grouped(
+            model.usuario,
+            func.count(EstudianteCurso.usuario.distinct()),
+            model.vigente,
+            EstudianteCurso.vigente,
+            keys=users,
+            joins=((EstudianteCurso, EstudianteCurso.curso == model.curso),),
+        )
+        certificates = _grouped(
+            model.usuario,
+            func.count(Certificacion.id),
+            model.vigente,
+            keys=users,
+            joins=((Certificacion, Certificacion.curso == model.curso),),
+        )
+        open_threads = _grouped(
+            model.usuario,
+            func.count(MessageThread.id),
+            model.vigente,
+            MessageThread.status == "open",
+            keys=users,
+            joins=((MessageThread, MessageThread.course_id == model.curso),),
+        )
+
+        existing = _existing(StaffSummary.usuario, users, StaffSummary.rol == rol)
+        for usuario in users:
+            _store(
+                existing.get(usuario),
+                StaffSummary,
+                {"usuario": usuario, "rol": rol},
+                {
+                    "courses": courses.get(usuario, 0),
+                    "students": students.get(usuario, 0),
+                    "certificates": certificates.get(usuario, 0),
+                    "open_threads": open_threads.get(usuario, 0),
+                },
+            )
+
+
+def _as_date(value: Any) -> date:
+    # SQLite returns DATE() as text.
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _refresh_days(dates: set[date] | None) -> None:
+    pago_fecha = func.date(Pago.fecha, type_=Date)
+    completed = Pago.estado == "completed"
+    enrollments = _grouped(EstudianteCurso.creado, func.count(EstudianteCurso.id), keys=dates)
+    certificates = _grouped(Certificacion.fecha, func.count(Certificacion.id), keys=dates)
+    payments = {_as_date(k): v for k, v in _grouped(pago_fecha, func.count(Pago.id), completed, keys=dates).items()}
+    revenue = {
+        _as_date(k): v for k, v in _grouped(pago_fecha, func.sum(cast(Pago.monto, Numeric)), completed, keys=dates).items()
+    }
+    new_users = _grouped(Usuario.creado, func.count(Usuario.id), keys=dates)
+
+    existing = _existing(DailySummary.fecha, dates)
+    days = set(dates) if dates is not None else set(chain(enrollments, certificates, payments, new_users))
+    for fecha in days:
+        _store(
+            existing.get(fecha),
+            DailySummary,
+            {"fecha": fecha},
+            {
+                "enrollments": enrollments.get(fecha, 0),
+                "certificates": certificates.get(fecha, 0),
+                "payments": payments.get(fecha, 0),
+                "revenue": revenue.get(fecha) or 0,
+                "new_users": new_users.get(fecha, 0),
+            },
+        )
+
+
+def _count(model: Any, *criteria: Any) -> int:
+    return database.session.execute(select(func.count(model.id)).where(*criteria)).scalar() or 0
+
+
+def _sum(column: Any, *criteria: Any) -> Any:
+    return database.session.execute(select(func.sum(cast(column, Numeric))).where(*criteria)).scalar() or 0
+
+
+def _refresh_site() -> None:
+    paypal = (Pago.estado == "completed", Pago.metodo == "paypal")
+    _store(
+        database.session.execute(select(SiteSummary)).scalars().first(),
+        SiteSummary,
+        {},
+        {
+            "users": _count(Usuario),
+            "inactive_users": _count(Usuario, Usuario.activo.is_(False)),
+            "unverified_users": _count(Usuario, Usuario.correo_electronico_verificado.is_(False)),
+            "courses": _count(Curso),
+            "enrollments": _count(EstudianteCurso),
+            "resources": _count(CursoRecurso),
+            "certificates": _count(Certificacion),
+            "unread_messages": _count(ContactMessage, ContactMessage.status == "not_seen"),
+            "open_threads": _count(MessageThread, MessageThread.status == "open"),
+            "closed_threads": _count(MessageThread, MessageThread.status == "closed"),
+            "paypal_payments": _count(Pago, *paypal),
+            "paypal_revenue": _sum(Pago.monto, *paypal),
+        },
+    )
+
+
+# Serializa los recálculos de un proceso: dos hilos no crean la misma fila a la vez.
+_refresh_lock = threading.RLock()
+
+
+def refresh_summaries(changes: SummaryChanges | None = None) -> bool:
+    """Recalcula las filas afectadas por ``changes``, o todas las tablas si es ``None``."""
+    with _refresh_lock:
+        try:
+            if changes is None:
+                _refresh_courses(None)
+                _refresh_staff(None)
+                _refresh_days(None)
+                _refresh_site()
+            else:
+                if changes.courses:
+                    _refresh_courses(changes.courses)
+                if completions := changes.completions - changes.courses:
+                    _refresh_completions(completions)
+                if staff := changes.staff | _staff_of(changes.courses):
+                    _refresh_staff(staff)
+                if changes.dates:
+                    _refresh_days(changes.dates)
+                if changes.site:
+                    _refresh_site()
+            database.session.commit()
+            return True
+        except SQLAlchemyError as e:
+            log.warning(f"Could not refresh the dashboard summaries: {e}")
+            database.session.rollback()
+            return False
+
+
+# ---------------------------------------------------------------------------------------
+# Actualización en segundo plano al confirmar cambios.
+# ---------------------------------------------------------------------------------------
+_pending = SummaryChanges()
+_pending_lock = threading.Lock()
+_worker_running = False
+
+
+def _drain(app: Flask) -> None:
+    """Procesa los cambios acumulados hasta que no queden más."""
+    global _pending, _worker_running
+
+    with app.app_context():
+        try:
+            while True:
+                with _pending_lock:
+                    if not _pending:
+                        return
+                    batch, _pending = _pending, SummaryChanges()
+                refresh_summaries(batch)
+        finally:
+            with _pending_lock:
+                _worker_running = False
+            database.session.remove()
+
+
+def schedule_refresh(changes: SummaryChanges) -> None:
+    """Recalcula los resúmenes afectados sin bloquear la petición.
+
+    Al hacer pruebas se ejecuta en línea, en un contexto de aplicación propio para no
+    usar la sesión que acaba de confirmar.
+    """
+    global _worker_running
+
+    app = current_app._get_current_object()
+    if app.config.get("TESTING"):
+        with app.app_context():
+            refresh_summaries(changes)
+        return
+
+    with _pending_lock:
+        _pending.update(changes)
+        if _worker_running:
+            return
+        _worker_running = True
+    thread = threading.Thread(target=_drain, args=(app,))
+    thread.daemon = True
+    thread.start()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_changes(session: Any, _flush_context: Any) -> None:
+    if not has_app_context() or REPORTING_EXTENSION not in current_app.extensions:
+        return
+    changes = session.info.setdefault(PENDING_SUMMARIES, SummaryChanges())
+    for instance in chain(session.new, session.deleted):
+        changes.add(instance)
+    for instance in session.dirty:
+        if type(instance) in TRACKED_MODELS:
+            changes.add(instance, _changed_columns(instance))
+
+
+def _changed_columns(instance: Any) -> set[str]:
+    """Columnas contadas en los resúmenes que cambiaron en ``instance``."""
+    attrs = sa_inspect(instance).attrs
+    return {name for name in _counted_columns(type(instance)) if attrs[name].history.has_changes()}
+
+
+def _bulk_changed_columns(orm_execute_state: Any) -> set[str] | None:
+    """Columnas que asigna un ``update`` masivo; ``None`` para ``insert``, ``delete`` o si no se conocen."""
+    if not orm_execute_state.is_update:
+        return None
+    parameters = orm_execute_state.parameters
+    rows = parameters if isinstance(parameters, list) else [parameters or {}]
+    # update().values() keeps the values in the statement: treat it as changing everything.
+    return set().union(*rows) - {"id"} or None
+
+
+def _bulk_rows(orm_execute_state: Any, model: Any) -> list[dict[str, Any]]:
+    """Valores clave de los registros que escribe una sentencia ``insert``, ``update`` o ``delete``."""
+    parameters = orm_execute_state.parameters
+    rows = [dict(row) for row in parameters] if isinstance(parameters, list) else [dict(parameters or {})]
+    if orm_execute_state.is_insert:
+        # Column defaults are applied by the database: a missing date is today's.
+        for row in rows:
+            if model in DATE_COLUMNS:
+                row.setdefault(DATE_COLUMNS[model], date.today())
+        return rows
+
+    # Updates and deletes: read the keys of the rows they touch before they run.
+    columns = [getattr(model, column) for column in _key_columns(model)]
+    if not columns:
+        return rows
+    stmt = select(*columns)
+    if (where := orm_execute_state.statement.whereclause) is not None:
+        stmt = stmt.where(where)
+    elif ids := [row["id"] for row in rows if "id" in row]:
+        stmt = stmt.where(model.id.in_(ids))
+    connection = orm_execute_state.session.connection()
+    return rows + [dict(row._mapping) for row in connection.execute(stmt)]
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state: Any) -> None:
+    # Bulk insert(), update() and delete() statements do not flush, so after_flush misses them.
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if not has_app_context() or REPORTING_EXTENSION not in current_app.extensions:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in TRACKED_MODELS:
+        return
+    changed = _bulk_changed_columns(orm_execute_state)
+    if changed is not None and not changed & _counted_columns(mapper.class_):
+        return
+    changes = orm_execute_state.session.info.setdefault(PENDING_SUMMARIES, SummaryChanges())
+    for row in _bulk_rows(orm_execute_state, mapper.class_):
+        changes.add_row(mapper.class_, row, changed)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _refresh_after_commit(session: Any) -> None:
+    changes = session.info.pop(PENDING_SUMMARIES, None)
+    if changes and has_app_context():
+        schedule_refresh(changes)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_changes(session: Any) -> None:
+    session.info.pop(PENDING_SUMMARIES, None)
+
+
+def init_reporting(app: Flask) -> None:
+    """Activa la actualización de las tablas de resumen al confirmar cambios."""
+    app.extensions[REPORTING_EXTENSION] = True
+
+
+# ---------------------------------------------------------------------------------------
+# Lectura desde los paneles.
+# ---------------------------------------------------------------------------------------
+def staff_summary(usuario: str, rol: str) -> StaffSummary:
+    """Resumen de un instructor o moderador; se calcula en el momento si aún no existe."""
+    stmt = select(StaffSummary).filter_by(usuario=usuario, rol=rol)
+    row = database.session.execute(stmt).scalars().first()
+    if row is None and refresh_summaries(SummaryChanges(staff={(usuario, rol)})):
+        row = database.session.execute(stmt).scalars().first()
+    return row or StaffSummary(usuario=usuario, rol=rol, courses=0, students=0, certificates=0, open_threads=0)
+
+
+def site_summary() -> SiteSummary:
+    """Totales del sitio; se calculan en el momento si aún no existen."""
+    row = database.session.execute(select(SiteSummary)).scalars().first()
+    if row is None and refresh_summaries(SummaryChanges(site=True)):
+        row = database.session.execute(select(SiteSummary)).scalars().first()
+    return row or SiteSummary(
+        users=0,
+        inactive_users=0,
+        unverified_users=0,
+        courses=0,
+        enrollments=0,
+        resources=0,
+        certificates=0,
+        unread_messages=0,
+        open_threads=0,
+        closed_threads=0,
+        paypal_payments=0,
+        paypal_revenue=0,
+    )
+
+
+def course_summaries(codes: list[str]) -> dict[str, CourseSummary]:
+    """Resúmenes de los cursos ``codes`` por código."""
+    if not codes:
+        return {}
+    rows = database.session.execute(select(CourseSummary).where(CourseSummary.curso.in_(codes))).scalars()
+    return {row.curso: row for row in rows}
+
+
+def recent_activity(days: int = 30) -> dict[str, Any]:
+    """Inscripciones, certificados, pagos y usuarios nuevos de los últimos ``days`` días."""
+    since = date.today() - timedelta(days=days - 1)
+    row = database.session.execute(
+        select(
+            func.coalesce(func.sum(DailySummary.enrollments), 0),
+            func.coalesce(func.sum(DailySummary.certificates), 0),
+            func.coalesce(func.sum(DailySummary.payments), 0),
+            func.coalesce(func.sum(DailySummary.revenue), 0),
+            func.coalesce(func.sum(DailySummary.new_users), 0),
+        ).where(DailySummary.fecha >= since)
+    ).one()
+    return dict(zip(("enrollments", "certificates", "payments", "revenue", "new_users"), row))
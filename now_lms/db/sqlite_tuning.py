@@ -0,0 +1,143 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Modo de producción para bases de datos SQLite.
+
+Con una base de datos SQLite en archivo cada conexión nueva recibe un perfil de
+PRAGMAs pensado para varios hilos de Waitress o Gunicorn: diario WAL (los
+lectores no bloquean al escritor), ``busy_timeout`` para esperar en lugar de
+fallar con "database is locked", ``synchronous=NORMAL``, ``mmap_size``,
+``cache_size`` y tablas temporales en memoria.
+
+SQLite admite un solo escritor a la vez. Dentro de un proceso las sesiones que
+escriben se turnan con un candado: la primera escritura de una transacción lo
+toma y se libera al confirmarla o revertirla, de modo que los hilos esperan en
+orden en lugar de competir por el bloqueo del archivo. Entre procesos el
+``busy_timeout`` cumple la misma función.
+
+``lmsctl database checkpoint`` copia el contenido del archivo WAL a la base de
+datos y, con ``--mode truncate``, lo deja vacío.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import threading
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.db.replicas import RoutingSession
+from now_lms.logs import log
+
+SQLITE_EXTENSION = "now_lms_sqlite_write_lock"
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+# Marca en ``Session.info`` de la sesión que tiene el candado de escritura.
+WRITE_LOCK_HELD = "sqlite_write_lock"
+
+
+def is_file_database(engine: Engine) -> bool:
+    """Indica si el motor usa una base de datos SQLite guardada en un archivo."""
+    database = engine.url.database
+    return engine.dialect.name == "sqlite" and bool(database) and database != ":memory:" and "mode=memory" not in database
+
+
+def sqlite_pragmas(config: dict) -> dict[str, Any]:
+    """PRAGMAs que se aplican a cada conexión nueva."""
+    return {
+        "journal_mode": "WAL",
+        "busy_timeout": config.get("SQLITE_BUSY_TIMEOUT", 5000),
+        "synchronous": "NORMAL",
+        "mmap_size": config.get("SQLITE_MMAP_SIZE", 268435456),
+        # A negative cache_size is in KiB instead of pages.
+        "cache_size": -abs(config.get("SQLITE_CACHE_SIZE", 65536)),
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: dict[str, Any]) -> None:
+    """Aplica ``pragmas`` a cada conexión que abra ``engine``."""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _write_lock() -> threading.Lock | None:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get(SQLITE_EXTENSION)
+
+
+def _acquire_write_lock(session: Any) -> None:
+    """Toma el candado de escritura la primera vez que la transacción escribe."""
+    if session.info.get(WRITE_LOCK_HELD):
+        return
+    lock = _write_lock()
+    if lock is None:
+        return
+    timeout = current_app.config.get("SQLITE_BUSY_TIMEOUT", 5000) / 1000
+    if lock.acquire(timeout=timeout):
+        session.info[WRITE_LOCK_HELD] = lock
+    else:
+        # Let SQLite's own busy handler decide rather than failing here.
+        log.warning("Waited too long for the SQLite write lock, writing without it.")
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _lock_before_flush(session: Any, _flush_context: Any, _instances: Any) -> None:
+    _acquire_write_lock(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _lock_before_bulk_write(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _acquire_write_lock(orm_execute_state.session)
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_write_lock(session: Any, transaction: Any) -> None:
+    if transaction.parent is not None:
+        return
+    lock = session.info.pop(WRITE_LOCK_HELD, None)
+    if lock is not None:
+        lock.release()
+
+
+def init_sqlite_tuning(app: Flask, engine: Engine) -> None:
+    """Configura el modo de producción si ``engine`` es una base de datos SQLite en archivo."""
+    if not app.config.get("SQLITE_TUNING") or not is_file_database(engine):
+        return
+    apply_sqlite_pragmas(engine, sqlite_pragmas(app.config))
+    app.extensions[SQLITE_EXTENSION] = threading.Lock()
+    log.info("SQLite production mode: WAL journal and serialized writes.")
+
+
+def checkpoint(engine: Engine, mode: str = "PASSIVE") -> dict[str, int]:
+    """Ejecuta ``PRAGMA wal_checkpoint`` y devuelve las páginas del WAL y las copiadas."""
+    mode = mode.upper()
+    if mode not in CHECKPOINT_MODES:
+        raise ValueError(f"Unknown checkpoint mode: {mode}")
+    if engine.dialect.name != "sqlite":
+        raise RuntimeError(f"Checkpoints only apply to SQLite, not to {engine.dialect.name}.")
+    with engine.connect() as connection:
+        busy, log_pages, checkpointed = connection.execute(text(f"PRAGMA wal_checkpoint({mode})")).one()
+    return {"busy": busy, "log_pages": log_pages, "checkpointed": checkpointed}
@@ -56,6 +56,7 @@ from now_lms.db import (
     database,
 )
 from now_lms.i18n import _
+from now_lms.image_derivatives import remove_derivatives
 from now_lms.logs import log
 
 # < --------------------------------------------------------------------------------------------- >
@@ -355,6 +356,7 @@ def elimina_logo_perzonalizado():
 
     try:
         remove(LOGO)
+        remove_derivatives(LOGO)
         database.session.commit()
     except FileNotFoundError:
         pass
@@ -380,6 +382,7 @@ def elimina_logo_perzonalizado_curso(course_code: str | None):
     if not LOGO.startswith(path.realpath(DIRECTORIO_UPLOAD_IMAGENES)):
         return
     remove(LOGO)
+    remove_derivatives(LOGO)
 
     curso = database.session.execute(database.select(Curso).filter_by(codigo=course_code)).scalars().first()
     curso.portada = False
@@ -396,6 +399,7 @@ def elimina_logo_perzonalizado_programa(course_code: str):
     LOGO = path.join(DIRECTORIO_UPLOAD_IMAGENES, "program" + programa.codigo, "logo.jpg")
 
     remove(LOGO)
+    remove_derivatives(LOGO)
 
 
 def elimina_imagen_usuario(ulid: str):
@@ -409,6 +413,7 @@ def elimina_imagen_usuario(ulid: str):
 
     try:
         remove(LOGO)
+        remove_derivatives(LOGO)
         flash(_("Imagen de usuario eliminada correctamente."), "success")
     except FileNotFoundError:
         flash(_("Imagen de usuario no existe."), "error")
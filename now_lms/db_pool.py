@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Database connection pool sizing and instrumentation."""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import threading
+from os import environ
+from time import perf_counter
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+
+# Connections kept for threads outside the request cycle (mail, previews, derivatives).
+BACKGROUND_CONNECTIONS = 1
+DEFAULT_POOL_RECYCLE = 1800
+DEFAULT_POOL_TIMEOUT = 10
+
+
+class InstrumentedQueuePool(QueuePool):
+    """``QueuePool`` that records how long threads wait to check out a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """Create the pool with empty wait counters."""
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.checked_out_max = 0
+
+    def connect(self) -> Any:
+        """Check out a connection, recording the wait."""
+        start = perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.checked_out_max = max(self.checked_out_max, self.checkedout())
+        return connection
+
+
+def _env_int(names: tuple[str, ...], default: int) -> int:
+    for name in names:
+        value = environ.get(name)
+        if value:
+            try:
+                return int(value)
+            except (ValueError, TypeError):
+                log.warning(f"Invalid {name} value, using {default}.")
+    return default
+
+
+def pool_options(workers: int, threads: int, max_connections: int = 0) -> dict[str, Any]:
+    """
+    Size the connection pool of each worker from the worker and thread plan.
+
+    Each worker gets one connection per thread plus one for background threads. With
+    ``max_connections`` (the connections the database allows this application) the
+    connections of all workers together never exceed that budget: when the budget is
+    smaller, requests queue for ``pool_timeout`` seconds instead of failing in the
+    database with "too many connections".
+
+    Args:
+        workers: Worker processes (Gunicorn workers, 1 for Waitress).
+        threads: Threads per worker.
+        max_connections: Connection budget for all workers, 0 for no limit.
+
+    Returns:
+        Options for ``create_engine``.
+    """
+    workers = max(1, workers)
+    wanted = max(1, threads) + BACKGROUND_CONNECTIONS
+    pool_size = wanted
+    max_overflow = max(1, threads // 2)
+    if max_connections > 0:
+        per_worker = max(1, max_connections // workers)
+        if max_connections < workers:
+            log.warning(
+                f"NOW_LMS_DB_MAX_CONNECTIONS={max_connections} is lower than the {workers} workers, "
+                "each worker still needs one connection."
+            )
+        pool_size = min(wanted, per_worker)
+        max_overflow = min(max_overflow, per_worker - pool_size)
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": _env_int(("NOW_LMS_DB_POOL_RECYCLE",), DEFAULT_POOL_RECYCLE),
+        "pool_timeout": _env_int(("NOW_LMS_DB_POOL_TIMEOUT",), DEFAULT_POOL_TIMEOUT),
+    }
+
+
+def max_connections_from_env() -> int:
+    """Connection budget shared by all workers, 0 if unlimited."""
+    return _env_int(("NOW_LMS_DB_MAX_CONNECTIONS", "DB_MAX_CONNECTIONS"), 0)
+
+
+def pool_options_from_env(database_url: str, development: bool = False) -> dict[str, Any]:
+    """Pool options for ``database_url`` using the worker plan of ``get_worker_config_from_env``."""
+    if database_url.startswith("sqlite"):
+        # SQLite uses its own pools (a single connection for in-memory databases).
+        return {}
+    if development:
+        workers, threads = 1, 1
+    else:
+        from now_lms.worker_config import get_worker_config_from_env
+
+        workers, threads = get_worker_config_from_env()
+    return pool_options(workers, threads, max_connections_from_env())
+
+
+def pool_stats(engine: Any) -> dict[str, Any]:
+    """Size, use and checkout wait times of the pool of this process."""
+    pool = engine.pool
+    stats: dict[str, Any] = {"class": type(pool).__name__}
+    if not isinstance(pool, QueuePool):
+        return stats
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    stats.update(
+        {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "checked_out": checked_out,
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+        }
+    )
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update(
+                {
+                    "checkouts": pool.checkouts,
+                    "timeouts": pool.timeouts,
+                    "wait_avg_ms": round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+                    "wait_max_ms": round(pool.wait_max * 1000, 3),
+                    "peak_saturation": round(pool.checked_out_max / capacity, 3) if capacity else 0.0,
+                }
+            )
+    return stats
@@ -0,0 +1,613 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Importación masiva de inscripciones desde archivos CSV o NDJSON.
+
+Cada fila describe un estudiante y el curso o programa al que se inscribe:
+
+    email,username,first_name,last_name,course_code,program_code
+
+Solo ``email`` es obligatorio; ``course_code`` o ``program_code`` pueden venir del
+archivo o de un valor por defecto. El archivo se procesa por bloques: cada bloque
+resuelve usuarios, cursos e inscripciones existentes con pocas consultas, crea los
+usuarios faltantes (las contraseñas temporales se cifran con argon2 en un pool de
+procesos), inserta inscripciones y avance de forma masiva y confirma una vez. Los
+eventos de calendario y los correos de bienvenida se envían en segundo plano.
+
+Desde el panel de administración el archivo se importa en un solo hilo de fondo
+(``start_import_job``), sin pool de procesos: un servidor web con varios hilos no
+debe crear procesos con ``fork``.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import csv
+import json
+import os
+import secrets
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from os import cpu_count
+from typing import IO, Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import current_app
+from sqlalchemy import func, insert, or_, update
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.auth import proteger_passwd
+from now_lms.cache import cache
+from now_lms.db import (
+    Curso,
+    EstudianteCurso,
+    Pago,
+    Programa,
+    ProgramaCurso,
+    ProgramaEstudiante,
+    Usuario,
+    database,
+    generador_de_codigos_unicos,
+)
+from now_lms.logs import log
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_CHUNK_SIZE = 500
+# Below this many new users per block a process pool costs more than it saves.
+HASH_POOL_MIN_BATCH = 16
+MAX_REPORTED_ERRORS = 200
+PAYMENT_METHOD = "bulk_import"
+# Resumen de las importaciones iniciadas desde el panel, por identificador de trabajo.
+IMPORT_JOB_PREFIX = "enrollment_import/"
+IMPORT_JOB_TIMEOUT = 24 * 60 * 60
+
+
+@dataclass
+class ImportRow:
+    """Fila validada del archivo de importación."""
+
+    line: int
+    email: str
+    username: str
+    first_name: str
+    last_name: str
+    course_code: str
+    program_code: str
+
+
+@dataclass
+class ImportReport:
+    """Resumen de una importación: filas creadas, omitidas y fallidas."""
+
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    users_created: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        """Filas procesadas."""
+        return self.created + self.skipped + self.failed
+
+    def fail(self, line: int, message: str) -> None:
+        """Registra una fila fallida; solo se conservan los primeros errores."""
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Representación serializable del resumen."""
+        return {
+            "created": self.created,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "users_created": self.users_created,
+            "errors": [{"line": line, "message": message} for line, message in self.errors],
+        }
+
+
+@dataclass
+class _FollowUp:
+    """Trabajo posterior a una inscripción: eventos de calendario y correo."""
+
+    usuario: str
+    new_user: bool
+    course_codes: list[str]
+    target_kind: str
+    target_code: str
+
+
+def detect_format(filename: str | None) -> str:
+    """Deduce el formato a partir de la extensión del archivo."""
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def iter_rows(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """Recorre el archivo fila por fila sin cargarlo completo en memoria.
+
+    Produce ``(línea, fila, error)``; ``fila`` es ``None`` cuando no se pudo leer.
+    """
+    if fmt == "ndjson":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                yield line_number, None, "invalid JSON"
+                continue
+            if not isinstance(data, dict):
+                yield line_number, None, "each line must be a JSON object"
+                continue
+            yield line_number, data, None
+    else:
+        reader = csv.DictReader(stream)
+        for data in reader:
+            yield reader.line_num, data, None
+
+
+def _text(value: Any) -> str:
+    return str(value).strip() if value is not None else ""
+
+
+def parse_row(
+    line: int, data: dict[str, Any], default_course: str | None = None, default_program: str | None = None
+) -> ImportRow:
+    """Valida una fila; lanza ``ValueError`` con el motivo si no es válida."""
+    data = {_text(key).lower(): value for key, value in data.items() if key is not None}
+    email = _text(data.get("email")).lower()
+    if not email or "@" not in email:
+        raise ValueError("a valid email is required")
+
+    course_code = _text(data.get("course_code")) or (default_course or "")
+    program_code = _text(data.get("program_code")) or (default_program or "")
+    if bool(course_code) == bool(program_code):
+        raise ValueError("exactly one of course_code or program_code is required")
+
+    username = _text(data.get("username")) or email
+    if len(username) > 150:
+        raise ValueError("username is too long")
+
+    return ImportRow(
+        line=line,
+        email=email,
+        username=username,
+        first_name=_text(data.get("first_name")) or email.split("@")[0],
+        last_name=_text(data.get("last_name")),
+        course_code=course_code,
+        program_code=program_code,
+    )
+
+
+class _PasswordHasher:
+    """Cifra contraseñas con argon2, en un pool de procesos cuando el lote lo justifica."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+
+    def hash_many(self, passwords: list[str]) -> list[bytes]:
+        if self.workers <= 1 or len(passwords) < HASH_POOL_MIN_BATCH:
+            return [proteger_passwd(password) for password in passwords]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._pool.map(proteger_passwd, passwords, chunksize=chunksize))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def import_enrollments(
+    stream: IO[str],
+    fmt: str = "csv",
+    *,
+    course_code: str | None = None,
+    program_code: str | None = None,
+    created_by: str | None = None,
+    send_emails: bool = True,
+    base_url: str | None = None,
+    workers: int | None = None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    background: bool = True,
+) -> ImportReport:
+    """Importa inscripciones desde un archivo CSV o NDJSON.
+
+    :param stream: Archivo de texto abierto.
+    :param fmt: ``csv`` o ``ndjson``.
+    :param course_code: Curso por defecto para filas sin ``course_code``.
+    :param program_code: Programa por defecto para filas sin ``program_code``.
+    :param created_by: Usuario registrado como autor de los registros creados.
+    :param send_emails: Enviar correo de bienvenida a cada estudiante inscrito.
+    :param base_url: URL base de los enlaces en los correos (por defecto ``SERVER_NAME``).
+    :param workers: Procesos para cifrar contraseñas; por defecto uno por CPU.
+    :param chunk_size: Filas por transacción.
+    :param background: Enviar los correos y crear los eventos en un hilo; la línea de
+        comandos los procesa antes de terminar, un hilo daemon moriría con el proceso.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    report = ImportReport()
+    hasher = _PasswordHasher(workers if workers is not None else (cpu_count() or 1))
+    chunk: list[ImportRow] = []
+    try:
+        for line, data, error in iter_rows(stream, fmt):
+            if data is None:
+                report.fail(line, error or "unreadable row")
+                continue
+            try:
+                chunk.append(parse_row(line, data, course_code, program_code))
+            except ValueError as e:
+                report.fail(line, str(e))
+                continue
+            if len(chunk) >= chunk_size:
+                _process_chunk(chunk, report, hasher, created_by, send_emails, base_url, background)
+                chunk = []
+        if chunk:
+            _process_chunk(chunk, report, hasher, created_by, send_emails, base_url, background)
+    finally:
+        hasher.close()
+
+    log.info(
+        f"Enrollment import finished: {report.created} created, {report.skipped} skipped, "
+        f"{report.failed} failed, {report.users_created} new users"
+    )
+    return report
+
+
+def _process_chunk(
+    rows: list[ImportRow],
+    report: ImportReport,
+    hasher: _PasswordHasher,
+    created_by: str | None,
+    send_emails: bool,
+    base_url: str | None,
+    background: bool,
+) -> None:
+    """Importa un bloque en una transacción y encola el trabajo posterior."""
+    failures: list[tuple[int, str]] = []
+    try:
+        created, skipped, users_created, follow_ups = _import_chunk(rows, failures, hasher, created_by)
+        database.session.commit()
+    except Exception as e:
+        database.session.rollback()
+        log.error(f"Error importing enrollments (lines {rows[0].line}-{rows[-1].line}): {e}")
+        invalid = dict(failures)
+        for row in rows:
+            report.fail(row.line, invalid.get(row.line, "database error"))
+        return
+
+    for line, message in failures:
+        report.fail(line, message)
+    report.created += created
+    report.skipped += skipped
+    report.users_created += users_created
+    if follow_ups:
+        _queue_follow_ups(follow_ups, send_emails, base_url, background)
+
+
+def _import_chunk(
+    rows: list[ImportRow], failures: list[tuple[int, str]], hasher: _PasswordHasher, created_by: str | None
+) -> tuple[int, int, int, list[_FollowUp]]:
+    """Agrega a la sesión los usuarios, pagos e inscripciones de un bloque; no confirma.
+
+    Las filas inválidas se agregan a ``failures`` como (línea, mensaje).
+    """
+    from now_lms.vistas.courses.helpers import _sembrar_avance_inscripciones
+
+    emails = {row.email for row in rows}
+    usernames = {row.username for row in rows}
+    known = database.session.execute(
+        database.select(Usuario.usuario, Usuario.correo_electronico, Usuario.nombre, Usuario.apellido).filter(
+            or_(func.lower(Usuario.correo_electronico).in_(emails), Usuario.usuario.in_(usernames))
+        )
+    ).all()
+    by_email = {(u.correo_electronico or "").lower(): u for u in known if u.correo_electronico}
+    taken = {u.usuario for u in known}
+
+    cursos = {
+        c.codigo: c
+        for c in database.session.execute(
+            database.select(Curso.codigo, Curso.nombre, Curso.precio).filter(
+                Curso.codigo.in_({row.course_code for row in rows if row.course_code})
+            )
+        ).all()
+    }
+    programas = {
+        p.codigo: p
+        for p in database.session.execute(
+            database.select(Programa.id, Programa.codigo, Programa.nombre).filter(
+                Programa.codigo.in_({row.program_code for row in rows if row.program_code})
+            )
+        ).all()
+    }
+    cursos_programa: dict[str, list[str]] = {}
+    for programa, curso in database.session.execute(
+        database.select(ProgramaCurso.programa, ProgramaCurso.curso).filter(ProgramaCurso.programa.in_(programas))
+    ).tuples():
+        cursos_programa.setdefault(programa, []).append(curso)
+
+    # Resolve each row to a user and a list of courses.
+    new_users: dict[str, dict[str, Any]] = {}
+    billing: dict[str, dict[str, str]] = {}
+    resolved: list[tuple[ImportRow, str, list[str]]] = []
+    for row in rows:
+        if row.course_code and row.course_code not in cursos:
+            failures.append((row.line, f"course '{row.course_code}' not found"))
+            continue
+        if row.program_code and row.program_code not in programas:
+            failures.append((row.line, f"program '{row.program_code}' not found"))
+            continue
+
+        if row.email in by_email:
+            usuario = by_email[row.email].usuario
+        elif row.email in new_users:
+            usuario = new_users[row.email]["usuario"]
+        elif row.username in taken:
+            failures.append((row.line, f"username '{row.username}' is already in use"))
+            continue
+        else:
+            usuario = row.username
+            taken.add(usuario)
+            new_users[row.email] = {
+                "usuario": usuario,
+                "nombre": row.first_name,
+                "apellido": row.last_name,
+                "correo_electronico": row.email,
+                "tipo": "student",
+                "activo": False,
+                "correo_electronico_verificado": False,
+                "visible": True,
+                "creado_por": created_by,
+            }
+        if usuario not in billing:
+            source = new_users.get(row.email) or by_email[row.email]._asdict()
+            billing[usuario] = {
+                "nombre": source["nombre"] or usuario,
+                "apellido": source["apellido"] or "",
+                "correo_electronico": row.email,
+            }
+        course_codes = [row.course_code] if row.course_code else cursos_programa.get(row.program_code, [])
+        resolved.append((row, usuario, course_codes))
+
+    usuarios = {usuario for _row, usuario, _courses in resolved}
+    all_courses = {code for _row, _usuario, courses in resolved for code in courses}
+    enrollments = {
+        (e.usuario, e.curso): e
+        for e in database.session.execute(
+            database.select(
+                EstudianteCurso.id, EstudianteCurso.usuario, EstudianteCurso.curso, EstudianteCurso.vigente
+            ).filter(EstudianteCurso.usuario.in_(usuarios), EstudianteCurso.curso.in_(all_courses))
+        ).all()
+    }
+    program_enrollments = set(
+        database.session.execute(
+            database.select(ProgramaEstudiante.usuario, ProgramaEstudiante.programa).filter(
+                ProgramaEstudiante.usuario.in_(usuarios),
+                ProgramaEstudiante.programa.in_([p.id for p in programas.values()]),
+            )
+        ).tuples()
+    )
+
+    hoy = datetime.now(timezone.utc).date()
+    descripcion = f"Bulk enrollment import by {created_by}" if created_by else "Bulk enrollment import"
+    pagos: list[dict[str, Any]] = []
+    inscripciones: list[dict[str, Any]] = []
+    reactivaciones: list[dict[str, Any]] = []
+    programas_nuevos: list[dict[str, Any]] = []
+    pares: list[tuple[str, str]] = []
+    follow_ups: list[_FollowUp] = []
+    created = skipped = 0
+    for row, usuario, course_codes in resolved:
+        nuevos: list[str] = []
+        for code in course_codes:
+            existente = enrollments.get((usuario, code))
+            if (usuario, code) in pares or (existente is not None and existente.vigente):
+                continue
+            pago_id = generador_de_codigos_unicos()
+            pagos.append(
+                {
+                    "id": pago_id,
+                    "usuario": usuario,
+                    "curso": code,
+                    "estado": "completed",
+                    "metodo": PAYMENT_METHOD,
+                    "monto": 0,
+                    "descripcion": descripcion,
+                    "audit": False,
+                    "creado": hoy,
+                    "creado_por": created_by,
+                    **billing[usuario],
+                }
+            )
+            if existente is not None:
+                reactivaciones.append({"id": existente.id, "vigente": True, "pago": pago_id, "modificado_por": created_by})
+            else:
+                inscripciones.append(
+                    {
+                        "curso": code,
+                        "usuario": usuario,
+                        "vigente": True,
+                        "pago": pago_id,
+                        "creado": hoy,
+                        "creado_por": created_by,
+                    }
+                )
+            pares.append((usuario, code))
+            nuevos.append(code)
+
+        nuevo_programa = False
+        if row.program_code:
+            programa_id = programas[row.program_code].id
+            if (usuario, programa_id) not in program_enrollments:
+                program_enrollments.add((usuario, programa_id))
+                programas_nuevos.append({"usuario": usuario, "programa": programa_id, "creado": hoy, "creado_por": created_by})
+                nuevo_programa = True
+
+        if not nuevos and not nuevo_programa:
+            skipped += 1
+            continue
+        created += 1
+        follow_ups.append(
+            _FollowUp(
+                usuario=usuario,
+                new_user=row.email in new_users,
+                course_codes=nuevos,
+                target_kind="program" if row.program_code else "course",
+                target_code=row.program_code or row.course_code,
+            )
+        )
+
+    if new_users:
+        passwords = [secrets.token_urlsafe(12) for _user in new_users]
+        for user, acceso in zip(new_users.values(), hasher.hash_many(passwords)):
+            user["acceso"] = acceso
+        database.session.execute(insert(Usuario), list(new_users.values()))
+    if pagos:
+        database.session.execute(insert(Pago), pagos)
+    if inscripciones:
+        database.session.execute(insert(EstudianteCurso), inscripciones)
+    if reactivaciones:
+        database.session.execute(update(EstudianteCurso), reactivaciones)
+    if programas_nuevos:
+        database.session.execute(insert(ProgramaEstudiante), programas_nuevos)
+    _sembrar_avance_inscripciones(pares)
+
+    return created, skipped, len(new_users), follow_ups
+
+
+def _queue_follow_ups(follow_ups: list[_FollowUp], send_emails: bool, base_url: str | None, background: bool) -> None:
+    """Crea eventos de calendario y envía correos de bienvenida, en segundo plano si ``background``."""
+    app = current_app._get_current_object()
+
+    def _run() -> None:
+        from now_lms.calendar_utils import create_events_for_student_enrollments
+        from now_lms.vistas.public_api import send_enrollment_email
+
+        for job in follow_ups:
+            if job.course_codes:
+                create_events_for_student_enrollments(job.usuario, job.course_codes)
+        if not send_emails:
+            return
+
+        usuarios = {
+            u.usuario: u
+            for u in database.session.execute(
+                database.select(Usuario).filter(Usuario.usuario.in_({job.usuario for job in follow_ups}))
+            ).scalars()
+        }
+        targets: dict[tuple[str, str], Any] = {}
+        for kind, model in (("course", Curso), ("program", Programa)):
+            codes = {job.target_code for job in follow_ups if job.target_kind == kind}
+            if codes:
+                for obj in database.session.execute(database.select(model).filter(model.codigo.in_(codes))).scalars():
+                    targets[(kind, obj.codigo)] = obj
+
+        with app.test_request_context(base_url=base_url):
+            for job in follow_ups:
+                user = usuarios.get(job.usuario)
+                target = targets.get((job.target_kind, job.target_code))
+                if user is not None and target is not None:
+                    send_enrollment_email(user, target, job.new_user, sync=True)
+
+    if app.config.get("TESTING"):
+        _run()
+        return
+
+    if not background:
+        try:
+            _run()
+        except Exception as e:
+            log.error(f"Error processing enrollment import notifications: {e}")
+        return
+
+    def _run_in_background() -> None:
+        with app.app_context():
+            try:
+                _run()
+            except Exception as e:
+                log.error(f"Error processing enrollment import notifications: {e}")
+            finally:
+                database.session.remove()
+
+    thread = threading.Thread(target=_run_in_background)
+    thread.daemon = True
+    thread.start()
+
+
+def start_import_job(file_path: str, fmt: str, **options: Any) -> str:
+    """Importa ``file_path`` en un hilo de fondo y devuelve el identificador del trabajo.
+
+    Todo el trabajo, correos y eventos incluidos, corre en ese hilo y cifra las
+    contraseñas sin pool de procesos. El archivo se borra al terminar y el resumen se
+    guarda en la caché (ver ``import_job_report``). Al hacer pruebas se ejecuta en línea.
+    """
+    job_id = secrets.token_urlsafe(12)
+    app = current_app._get_current_object()
+
+    def _run() -> None:
+        try:
+            with open(file_path, encoding="utf-8-sig", newline="") as stream:
+                report = import_enrollments(stream, fmt, workers=1, background=False, **options)
+        except UnicodeDecodeError:
+            report = ImportReport()
+            report.fail(0, "the file is not UTF-8 encoded")
+        finally:
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+        cache.set(IMPORT_JOB_PREFIX + job_id, report, timeout=IMPORT_JOB_TIMEOUT)
+
+    if app.config.get("TESTING"):
+        _run()
+        return job_id
+
+    def _run_in_background() -> None:
+        with app.app_context():
+            try:
+                _run()
+            except Exception as e:
+                log.error(f"Error importing enrollments from {file_path}: {e}")
+            finally:
+                database.session.remove()
+
+    thread = threading.Thread(target=_run_in_background)
+    thread.daemon = True
+    thread.start()
+    return job_id
+
+
+def import_job_report(job_id: str) -> ImportReport | None:
+    """Resumen de una importación iniciada con ``start_import_job``, o ``None`` si aún no termina."""
+    return cache.get(IMPORT_JOB_PREFIX + job_id)
+
+
+def format_report(report: ImportReport) -> Iterable[str]:
+    """Líneas de texto con el resumen de la importación."""
+    yield f"Created: {report.created}"
+    yield f"Skipped: {report.skipped}"
+    yield f"Failed: {report.failed}"
+    yield f"New users: {report.users_created}"
+    for line, message in report.errors:
+        yield f"  line {line}: {message}"
+    if report.failed > len(report.errors):
+        yield f"  ... {report.failed - len(report.errors)} more"
@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Almacén de archivos direccionado por contenido.
+
+Cada archivo subido se guarda una sola vez en ``FILE_STORE_DIR`` bajo su SHA-256
+y las rutas de siempre (``images/<curso>/logo.jpg``, ``files/<curso>/library/...``)
+quedan como enlaces duros a ese archivo. El sistema de archivos lleva la cuenta
+de referencias: borrar una ruta la decrementa y ``lmsctl storage gc`` elimina los
+archivos del almacén que ya no tienen ninguna ruta apuntándolos.
+
+Los archivos del almacén no deben modificarse en sitio: para reemplazar un
+archivo se escribe uno nuevo y se renombra encima, como ya hacen las subidas.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import errno
+import os
+from hashlib import sha256
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import current_app
+from flask_uploads import UploadSet
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+from now_lms.storage import publish
+
+HASH_BUFFER_SIZE = 1024 * 1024
+# Directorios que nunca se deduplican: copias reducidas de imágenes, páginas de PDF y caché de plantillas.
+SKIPPED_DIRS = ("_sizes", "_pages", ".cache")
+_links_supported = True
+
+
+def store_dir() -> str | None:
+    """Directorio del almacén, o ``None`` si la deduplicación está desactivada."""
+    if not current_app.config.get("FILE_DEDUP", True):
+        return None
+    return current_app.config.get("FILE_STORE_DIR")
+
+
+def file_digest(file_path: str) -> str:
+    """SHA-256 de un archivo leído por bloques."""
+    digest = sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(HASH_BUFFER_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def blob_path(store: str, digest: str) -> str:
+    """Ruta del archivo del almacén para un resumen dado."""
+    return os.path.join(store, digest[:2], digest[2:4], digest)
+
+
+def deduplicate(file_path: str) -> str | None:
+    """Convierte ``file_path`` en una referencia al almacén y devuelve su resumen.
+
+    Si el contenido ya existe en el almacén la ruta pasa a apuntar a ese archivo;
+    si no, el archivo se agrega al almacén. Devuelve ``None`` si la deduplicación
+    está desactivada o el sistema de archivos no admite enlaces duros.
+    """
+    global _links_supported
+
+    store = store_dir()
+    if not store or not _links_supported or not os.path.isfile(file_path):
+        return None
+
+    digest = file_digest(file_path)
+    blob = blob_path(store, digest)
+    try:
+        if os.path.exists(blob):
+            if not os.path.samefile(blob, file_path):
+                tmp = f"{file_path}.{digest[:8]}.tmp"
+                os.link(blob, tmp)
+                os.replace(tmp, file_path)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.link(file_path, blob)
+    except OSError as e:
+        if e.errno in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+            _links_supported = False
+            log.warning(f"Upload deduplication disabled, hard links are not available in {store}: {e}")
+            return None
+        raise
+    return digest
+
+
+def deduplicate_tree(root: str) -> dict[str, int]:
+    """Deduplica todos los archivos existentes bajo ``root``."""
+    store = os.path.realpath(store_dir() or "")
+    stats = {"files": 0, "linked": 0, "bytes_saved": 0}
+    for directory, dirs, filenames in os.walk(root):
+        dirs[:] = [d for d in dirs if os.path.realpath(os.path.join(directory, d)) != store and d not in SKIPPED_DIRS]
+        for filename in filenames:
+            if filename.startswith("."):
+                continue
+            file_path = os.path.join(directory, filename)
+            before = os.stat(file_path)
+            if before.st_nlink > 1:
+                # Already a reference to the store.
+                continue
+            if deduplicate(file_path) is None:
+                return stats
+            stats["files"] += 1
+            after = os.stat(file_path)
+            if after.st_ino != before.st_ino:
+                stats["linked"] += 1
+                stats["bytes_saved"] += after.st_size
+    return stats
+
+
+def store_stats() -> dict[str, int]:
+    """Cantidad de archivos del almacén, referencias y espacio ahorrado."""
+    stats = {"blobs": 0, "references": 0, "orphans": 0, "bytes": 0, "bytes_saved": 0}
+    store = store_dir()
+    if not store:
+        return stats
+    for directory, _dirs, filenames in os.walk(store):
+        for filename in filenames:
+            st = os.stat(os.path.join(directory, filename))
+            references = st.st_nlink - 1
+            stats["blobs"] += 1
+            stats["references"] += references
+            stats["orphans"] += references == 0
+            stats["bytes"] += st.st_size
+            stats["bytes_saved"] += st.st_size * max(references - 1, 0)
+    return stats
+
+
+def collect_garbage(dry_run: bool = False) -> dict[str, int]:
+    """Elimina los archivos del almacén que ninguna ruta referencia."""
+    stats = {"removed": 0, "bytes": 0}
+    store = store_dir()
+    if not store:
+        return stats
+    for directory, _dirs, filenames in os.walk(store, topdown=False):
+        for filename in filenames:
+            file_path = os.path.join(directory, filename)
+            st = os.stat(file_path)
+            if st.st_nlink > 1:
+                continue
+            stats["removed"] += 1
+            stats["bytes"] += st.st_size
+            if not dry_run:
+                os.remove(file_path)
+        if not dry_run and directory != store and not os.listdir(directory):
+            os.rmdir(directory)
+    return stats
+
+
+class ContentAddressedUploadSet(UploadSet):
+    """``UploadSet`` cuyos archivos guardados quedan enlazados al almacén por contenido."""
+
+    def save(self, storage: Any, folder: str | None = None, name: str | None = None) -> str:
+        """Guarda el archivo como siempre, lo deduplica y lo copia al almacenamiento remoto."""
+        saved = super().save(storage, folder=folder, name=name)
+        deduplicate(self.path(saved))
+        publish(self.path(saved))
+        return saved
@@ -14,7 +14,7 @@ import datetime
 # ---------------------------------------------------------------------------------------
 from flask_mde import MdeField
 from flask_wtf import FlaskForm
-from flask_wtf.file import FileAllowed, FileField
+from flask_wtf.file import FileAllowed, FileField, FileRequired
 from wtforms import (
     BooleanField,
     DateField,
@@ -1127,6 +1127,18 @@ class AdminProgramEnrollmentForm(FlaskForm):
     )
 
 
+class BulkEnrollmentImportForm(FlaskForm):
+    """Formulario para importar inscripciones desde un archivo CSV o NDJSON."""
+
+    archivo = FileField(
+        _l("Archivo"),
+        validators=[FileRequired(), FileAllowed(["csv", "ndjson", "jsonl"], _l("Solo archivos CSV o NDJSON"))],
+    )
+    course_code = StringField(_l("Curso por defecto (opcional)"), validators=[Optional(), Length(max=20)])
+    program_code = StringField(_l("Programa por defecto (opcional)"), validators=[Optional(), Length(max=10)])
+    send_emails = BooleanField(_l("Enviar correo de bienvenida"), default=True)
+
+
 class EnlaceUtilForm(FlaskForm):
     """Formulario para crear/editar enlaces útiles en el footer."""
 
@@ -0,0 +1,223 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Versiones reducidas de las imágenes subidas por los usuarios.
+
+Al subir un logo, una portada o un avatar se generan en segundo plano copias de
+algunos anchos fijos en WebP (y AVIF si Pillow lo soporta) con una copia JPEG de
+respaldo, dentro de un subdirectorio ``_sizes`` junto al original. La macro
+``macros/responsive_image.j2`` usa ``image_variants`` para emitir ``srcset`` y
+``lmsctl images backfill`` genera las copias de imágenes subidas anteriormente.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import os
+import re
+import threading
+from pathlib import Path
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import current_app, url_for
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover
+    Image = None  # type: ignore[assignment]
+
+WIDTHS = (320, 640, 1280)
+DERIVATIVES_DIR = "_sizes"
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tiff", ".tif", ".avif"}
+# Extension, Pillow format and save options; the first formats are preferred by the browser.
+FORMATS = (
+    ("avif", "AVIF", {"quality": 55}),
+    ("webp", "WEBP", {"quality": 80, "method": 4}),
+    ("jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+)
+# Only images in the public uploads are candidates for derivatives.
+PUBLIC_IMAGES_PREFIX = "files/public/images/"
+# Variants found per image, see _variant_names.
+VARIANTS_CACHE_SIZE = 4096
+_VARIANTS_CACHE: dict[str, tuple[tuple[int, int], dict[str, list[tuple[int, str]]]]] = {}
+
+
+def available_formats() -> list[tuple[str, str, dict]]:
+    """Formatos de salida que la instalación de Pillow puede escribir."""
+    if Image is None:
+        return []
+    return [fmt for fmt in FORMATS if fmt[0] != "avif" or features.check("avif")]
+
+
+def derivative_path(original: Path, width: int, ext: str) -> Path:
+    """Ruta de la copia de ``original`` con el ancho y formato indicados."""
+    return original.parent / DERIVATIVES_DIR / f"{original.stem}-{width}.{ext}"
+
+
+def _derivative_pattern(original: Path) -> re.Pattern[str]:
+    return re.compile(re.escape(original.stem) + r"-(\d+)\.(" + "|".join(fmt[0] for fmt in FORMATS) + r")$")
+
+
+def remove_derivatives(original: str | Path) -> None:
+    """Elimina las copias reducidas de una imagen."""
+    original = Path(original)
+    sizes_dir = original.parent / DERIVATIVES_DIR
+    if not sizes_dir.is_dir():
+        return
+    pattern = _derivative_pattern(original)
+    for entry in sizes_dir.iterdir():
+        if pattern.match(entry.name):
+            entry.unlink(missing_ok=True)
+
+
+def generate_derivatives(original: str | Path, force: bool = False) -> int:
+    """Genera las copias reducidas de una imagen y devuelve cuántos archivos escribió.
+
+    Se generan los anchos de ``WIDTHS`` menores al de la imagen y, si no es más ancha
+    que el mayor de ellos, una copia a su ancho original. Las copias más recientes que
+    el original se conservan salvo con ``force``.
+    """
+    original = Path(original)
+    formats = available_formats()
+    if not formats or original.suffix.lower() not in SOURCE_EXTENSIONS or not original.is_file():
+        return 0
+
+    source_mtime = original.stat().st_mtime
+    written = 0
+    try:
+        with Image.open(original) as img:
+            img = ImageOps.exif_transpose(img)
+            widths = [w for w in WIDTHS if w < img.width]
+            if img.width <= WIDTHS[-1]:
+                widths.append(img.width)
+            (original.parent / DERIVATIVES_DIR).mkdir(exist_ok=True)
+            for width in widths:
+                resized = None
+                for ext, pil_format, options in formats:
+                    target = derivative_path(original, width, ext)
+                    if not force and target.exists() and target.stat().st_mtime >= source_mtime:
+                        continue
+                    if resized is None:
+                        height = max(1, round(img.height * width / img.width))
+                        resized = img.resize((width, height), Image.Resampling.LANCZOS)
+                    frame = resized
+                    if pil_format == "JPEG" and frame.mode not in ("RGB", "L"):
+                        frame = _flatten(frame)
+                    elif frame.mode not in ("RGB", "RGBA", "L", "LA"):
+                        frame = frame.convert("RGBA")
+                    tmp = target.with_name(target.name + ".tmp")
+                    frame.save(tmp, format=pil_format, **options)
+                    os.replace(tmp, target)
+                    written += 1
+    except (OSError, ValueError) as e:
+        log.warning(f"Could not create image derivatives for {original}: {e}")
+    return written
+
+
+def _flatten(img):
+    """Convierte a RGB sobre fondo blanco para formatos sin transparencia."""
+    img = img.convert("RGBA")
+    background = Image.new("RGB", img.size, (255, 255, 255))
+    background.paste(img, mask=img.getchannel("A"))
+    return background
+
+
+def schedule_derivatives(original: str | Path) -> None:
+    """Genera las copias de una imagen recién subida sin bloquear la petición.
+
+    Al hacer pruebas se ejecuta en línea para que las copias existan al terminar la llamada.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get("IMAGE_DERIVATIVES", True) or not available_formats():
+        return
+    if app.config.get("TESTING"):
+        generate_derivatives(original, force=True)
+        return
+
+    thread = threading.Thread(target=generate_derivatives, args=(original,), kwargs={"force": True})
+    thread.daemon = True
+    thread.start()
+
+
+def backfill_derivatives(directory: str | Path, force: bool = False) -> dict[str, int]:
+    """Genera las copias faltantes de todas las imágenes de un directorio."""
+    stats = {"images": 0, "written": 0}
+    for root, dirs, filenames in os.walk(directory):
+        dirs[:] = [d for d in dirs if d != DERIVATIVES_DIR]
+        for filename in filenames:
+            path = Path(root) / filename
+            if path.suffix.lower() not in SOURCE_EXTENSIONS:
+                continue
+            stats["images"] += 1
+            stats["written"] += generate_derivatives(path, force=force)
+    return stats
+
+
+def _variant_names(original: Path) -> dict[str, list[tuple[int, str]]]:
+    """Copias vigentes de una imagen por formato, como (ancho, nombre de archivo).
+
+    El resultado se guarda por proceso y se recalcula cuando cambia la fecha de
+    modificación del original o del directorio de copias, que cambia cada vez que
+    ``generate_derivatives`` escribe una copia (``os.replace``) o se borra alguna.
+    """
+    sizes_dir = original.parent / DERIVATIVES_DIR
+    try:
+        version = (original.stat().st_mtime_ns, sizes_dir.stat().st_mtime_ns)
+    except OSError:
+        return {}
+    key = str(original)
+    cached = _VARIANTS_CACHE.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    try:
+        entries = {entry.name: entry.stat().st_mtime_ns for entry in os.scandir(sizes_dir)}
+    except OSError:
+        return {}
+    pattern = _derivative_pattern(original)
+    candidates: dict[str, list[tuple[int, str]]] = {}
+    for name, mtime in entries.items():
+        match = pattern.match(name)
+        if match and mtime >= version[0]:
+            candidates.setdefault(match.group(2), []).append((int(match.group(1)), name))
+    for names in candidates.values():
+        names.sort()
+
+    if len(_VARIANTS_CACHE) >= VARIANTS_CACHE_SIZE:
+        _VARIANTS_CACHE.clear()
+    _VARIANTS_CACHE[key] = (version, candidates)
+    return candidates
+
+
+def image_variants(filename: str) -> dict[str, str]:
+    """Valores ``srcset`` por formato de una imagen del directorio estático.
+
+    Devuelve un diccionario vacío si la imagen no tiene copias vigentes, de modo que
+    la plantilla use solo la imagen original.
+    """
+    relpath = filename.lstrip("/")
+    static_folder = current_app.static_folder
+    if not relpath.startswith(PUBLIC_IMAGES_PREFIX) or ".." in relpath.split("/") or not static_folder:
+        return {}
+    candidates = _variant_names(Path(static_folder) / relpath)
+
+    base_url = Path(relpath).parent.as_posix() + "/" + DERIVATIVES_DIR + "/"
+    variants = {}
+    for ext, _format, _options in FORMATS:
+        if ext in candidates:
+            variants[ext] = ", ".join(
+                f"{url_for('static', filename=base_url + name)} {width}w" for width, name in candidates[ext]
+            )
+    return variants
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""Store the rendered HTML of each slide show.
+
+Slide decks are rendered once when they are saved and viewers read the stored
+fragment instead of every slide. Existing decks have no fragment yet and are
+rendered on their first view.
+
+Revision ID: 20260801_000000
+Revises: 20260730_000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20260801_000000"
+down_revision = "20260730_000000"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add rendered_html and rendered_version to slide_show_resource."""
+    inspector = sa.inspect(op.get_bind())
+    if "slide_show_resource" not in inspector.get_table_names():
+        return
+
+    columns = {col["name"] for col in inspector.get_columns("slide_show_resource")}
+    if "rendered_html" not in columns:
+        op.add_column("slide_show_resource", sa.Column("rendered_html", sa.Text(), nullable=True))
+    if "rendered_version" not in columns:
+        op.add_column("slide_show_resource", sa.Column("rendered_version", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the rendered slide show columns."""
+    inspector = sa.inspect(op.get_bind())
+    if "slide_show_resource" not in inspector.get_table_names():
+        return
+
+    columns = {col["name"] for col in inspector.get_columns("slide_show_resource")}
+    with op.batch_alter_table("slide_show_resource") as batch_op:
+        if "rendered_version" in columns:
+            batch_op.drop_column("rendered_version")
+        if "rendered_html" in columns:
+            batch_op.drop_column("rendered_html")
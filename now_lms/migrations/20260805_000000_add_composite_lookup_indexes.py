@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""Add composite indexes for the hot lookup paths.
+
+Progress, attempts, calendar events, prev/next navigation, the catalog and
+course messages filter on column pairs that only had single-column indexes,
+so the database picked one index and filtered the rest row by row. The
+(usuario, curso) progress lookups are already served by the leading columns
+of unique_avance_por_usuario_curso_recurso.
+
+Revision ID: 20260805_000000
+Revises: 20260801_000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20260805_000000"
+down_revision = "20260801_000000"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("curso_recurso_avance", "ix_curso_recurso_avance_usuario_recurso", ["usuario", "recurso"]),
+    ("evaluation_attempt", "ix_evaluation_attempt_evaluation_id_user_id", ["evaluation_id", "user_id"]),
+    ("user_events", "ix_user_events_user_id_resource_id", ["user_id", "resource_id"]),
+    ("curso_recurso", "ix_curso_recurso_seccion_indice", ["seccion", "indice"]),
+    ("curso_seccion", "ix_curso_seccion_curso_indice", ["curso", "indice"]),
+    ("curso", "ix_curso_publico_estado", ["publico", "estado"]),
+    ("message_thread", "ix_message_thread_course_id", ["course_id"]),
+    ("message", "ix_message_thread_id_timestamp", ["thread_id", "timestamp"]),
+)
+
+
+def _existing_indexes(inspector, table: str) -> set[str] | None:
+    """Return the index names of a table, or None if the table does not exist."""
+    if table not in inspector.get_table_names():
+        return None
+    return {index.get("name") for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Create the indexes that are missing."""
+    inspector = sa.inspect(op.get_bind())
+    for table, name, columns in INDEXES:
+        existing = _existing_indexes(inspector, table)
+        if existing is not None and name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Drop the indexes."""
+    inspector = sa.inspect(op.get_bind())
+    for table, name, _columns in INDEXES:
+        existing = _existing_indexes(inspector, table)
+        if existing is not None and name in existing:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,109 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""Add the summary tables read by the dashboards.
+
+course_summary, staff_summary, daily_summary and site_summary hold the totals
+shown on the instructor, moderator and admin panels. They are refreshed in the
+background when the source rows change; run ``lmsctl reports refresh`` once after
+upgrading to fill them for an existing database (the panels also compute a
+missing summary on first load).
+
+Revision ID: 20260810_000000
+Revises: 20260805_000000
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+
+from now_lms.db import utc_now
+
+revision = "20260810_000000"
+down_revision = "20260805_000000"
+branch_labels = None
+depends_on = None
+
+
+def _audit_columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", sa.String(26), primary_key=True, nullable=False, index=True),
+        sa.Column("timestamp", sa.DateTime, nullable=False, default=utc_now),
+        sa.Column("creado", sa.Date, nullable=False, default=date.today),
+        sa.Column("creado_por", sa.String(150), nullable=True),
+        sa.Column("modificado", sa.DateTime, nullable=True),
+        sa.Column("modificado_por", sa.String(150), nullable=True),
+    ]
+
+
+def _counters(*names: str) -> list[sa.Column]:
+    return [sa.Column(name, sa.Integer(), nullable=False, server_default="0") for name in names]
+
+
+def _money(name: str) -> sa.Column:
+    return sa.Column(name, sa.Numeric(12, 2), nullable=False, server_default="0")
+
+
+def _refreshed() -> sa.Column:
+    return sa.Column("refreshed", sa.DateTime, nullable=False, default=utc_now)
+
+
+TABLES = {
+    "course_summary": lambda: [
+        sa.Column("curso", sa.String(20), nullable=False, unique=True, index=True),
+        *_counters("students", "completions", "certificates", "payments"),
+        _money("revenue"),
+        *_counters("open_threads", "closed_threads"),
+        _refreshed(),
+    ],
+    "staff_summary": lambda: [
+        sa.Column("usuario", sa.String(150), nullable=False, index=True),
+        sa.Column("rol", sa.String(20), nullable=False),
+        *_counters("courses", "students", "certificates", "open_threads"),
+        _refreshed(),
+        sa.UniqueConstraint("usuario", "rol", name="uq_staff_summary_usuario_rol"),
+    ],
+    "daily_summary": lambda: [
+        sa.Column("fecha", sa.Date, nullable=False, unique=True, index=True),
+        *_counters("enrollments", "certificates", "payments"),
+        _money("revenue"),
+        *_counters("new_users"),
+        _refreshed(),
+    ],
+    "site_summary": lambda: [
+        *_counters(
+            "users",
+            "inactive_users",
+            "unverified_users",
+            "courses",
+            "enrollments",
+            "resources",
+            "certificates",
+            "unread_messages",
+            "open_threads",
+            "closed_threads",
+            "paypal_payments",
+        ),
+        _money("paypal_revenue"),
+        _refreshed(),
+    ],
+}
+
+
+def upgrade() -> None:
+    """Create the summary tables that are missing."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table, columns in TABLES.items():
+        if table not in existing:
+            op.create_table(table, *_audit_columns(), *columns())
+
+
+def downgrade() -> None:
+    """Drop the summary tables."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for table in TABLES:
+        if table in existing:
+            op.drop_table(table)
@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""Index the expiry column of the session table.
+
+Expired sessions are now deleted in batches by a background thread, which
+selects them by expiry. The table is created by Flask-Session and may not
+exist when Redis stores the sessions; then there is nothing to do.
+
+Revision ID: 20260815_000000
+Revises: 20260810_000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20260815_000000"
+down_revision = "20260810_000000"
+branch_labels = None
+depends_on = None
+
+TABLE = "flask_sessions"
+INDEX = "ix_flask_sessions_expiry"
+
+
+def _existing_indexes() -> set[str] | None:
+    """Return the index names of the session table, or None if it does not exist."""
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        return None
+    return {index.get("name") for index in inspector.get_indexes(TABLE)}
+
+
+def upgrade() -> None:
+    """Create the index if the session table exists."""
+    existing = _existing_indexes()
+    if existing is not None and INDEX not in existing:
+        op.create_index(INDEX, TABLE, ["expiry"])
+
+
+def downgrade() -> None:
+    """Drop the index."""
+    existing = _existing_indexes()
+    if existing is not None and INDEX in existing:
+        op.drop_index(INDEX, table_name=TABLE)
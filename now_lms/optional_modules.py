@@ -0,0 +1,105 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Carga diferida de los módulos opcionales.
+
+El blog, las clases magistrales, los programas y los pagos con PayPal se activan
+desde la configuración del sitio. Sus vistas solo se importan y registran cuando
+la opción está activa al iniciar la aplicación, así un sitio que no los usa no
+paga su tiempo de importación ni su memoria en cada worker. Una opción activada
+después del inicio necesita reiniciar el servidor.
+
+Con ``NOW_LMS_LAZY_BLUEPRINTS=0``, al hacer pruebas o si la configuración no se
+puede leer (base de datos sin iniciar) se registran todos.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+from importlib import import_module
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import Flask, current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.db import Configuracion, PaypalConfig, database
+from now_lms.logs import log
+
+OPTIONAL_MODULES_EXTENSION = "now_lms_optional_modules"
+
+# Nombre del blueprint: (módulo que lo define, opción que lo activa).
+OPTIONAL_BLUEPRINTS: dict[str, tuple[str, str]] = {
+    "blog": ("now_lms.vistas.blog", "enable_blog"),
+    "masterclass": ("now_lms.vistas.masterclass", "enable_masterclass"),
+    "program": ("now_lms.vistas.programs", "enable_programs"),
+    "paypal": ("now_lms.vistas.paypal", "paypal"),
+}
+
+
+def enabled_features() -> dict[str, bool] | None:
+    """Lee las opciones que activan los módulos opcionales, o None si no se pueden leer."""
+    try:
+        config = database.session.execute(database.select(Configuracion)).scalar_one_or_none()
+        paypal = database.session.execute(database.select(PaypalConfig)).scalars().first()
+    except SQLAlchemyError:
+        database.session.rollback()
+        return None
+    if config is None:
+        return None
+    return {
+        "enable_blog": bool(config.enable_blog),
+        "enable_masterclass": bool(config.enable_masterclass),
+        "enable_programs": bool(config.enable_programs),
+        "paypal": bool(paypal is not None and paypal.enable),
+    }
+
+
+def paypal_enabled() -> bool:
+    """Indica si los pagos con PayPal están activos, sin importar las vistas de PayPal."""
+    return bool((enabled_features() or {}).get("paypal"))
+
+
+def _disabled_module_url(error: Exception, endpoint: str, _values: dict[str, Any]) -> str:
+    """Enlaces a un módulo opcional no cargado apuntan a ``#`` en lugar de fallar."""
+    skipped = current_app.extensions.get(OPTIONAL_MODULES_EXTENSION, ())
+    if endpoint.partition(".")[0] in skipped:
+        return "#"
+    raise error
+
+
+def register_optional_blueprints(flask_app: Flask) -> list[str]:
+    """Registra los módulos opcionales activos y devuelve los que se omitieron."""
+    features = None
+    if flask_app.config.get("LAZY_BLUEPRINTS", True) and not flask_app.config.get("TESTING"):
+        features = enabled_features()
+
+    skipped = []
+    for name, (module, feature) in OPTIONAL_BLUEPRINTS.items():
+        if features is not None and not features[feature]:
+            skipped.append(name)
+            continue
+        flask_app.register_blueprint(getattr(import_module(module), name))
+
+    flask_app.extensions[OPTIONAL_MODULES_EXTENSION] = frozenset(skipped)
+    if skipped:
+        flask_app.url_build_error_handlers.append(_disabled_module_url)
+        log.info(f"Optional modules not loaded: {', '.join(skipped)}.")
+    return skipped
+
+
+def modules_needing_restart(flask_app: Flask) -> list[str]:
+    """Módulos activados en la configuración que este proceso no cargó."""
+    skipped = flask_app.extensions.get(OPTIONAL_MODULES_EXTENSION, ())
+    features = enabled_features() or {}
+    return [name for name in skipped if features.get(OPTIONAL_BLUEPRINTS[name][1])]
@@ -0,0 +1,212 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Vistas previas de los recursos PDF generadas en el servidor.
+
+Con ``NOW_LMS_PDF_PREVIEWS=1`` cada PDF subido se convierte en segundo plano en
+una imagen WebP por página y un archivo con el texto de cada página, dentro de
+``_pages/<nombre>`` junto al PDF. El visor carga las páginas a medida que el
+estudiante se desplaza, en lugar de descargar el PDF completo y dibujarlo con
+pdf.js, y usa el texto para la búsqueda. La conversión usa ``pypdfium2`` en un
+pool de procesos para no ocupar los workers web.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import json
+import os
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import current_app
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+from now_lms.storage import publish
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+PAGES_DIR = "_pages"
+MANIFEST_NAME = "manifest.json"
+TEXT_NAME = "text.json"
+# Ancho de las páginas renderizadas; el visor las escala con CSS.
+PAGE_WIDTH = 1280
+MAX_SCALE = 3.0
+# Incrementar cuando cambie el formato de salida: las vistas previas existentes se ignoran.
+PREVIEW_VERSION = 1
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def available() -> bool:
+    """Indica si ``pypdfium2`` está instalado."""
+    return pdfium is not None
+
+
+def preview_dir(pdf_path: str | Path) -> Path:
+    """Directorio de las vistas previas de un PDF."""
+    pdf_path = Path(pdf_path)
+    return pdf_path.parent / PAGES_DIR / pdf_path.stem
+
+
+def page_filename(page: int) -> str:
+    """Nombre del archivo de una página, numeradas desde 1."""
+    return f"page-{page:04d}.webp"
+
+
+def _source_stamp(pdf_path: str | Path) -> dict[str, int]:
+    st = os.stat(pdf_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _write_json(file_path: Path, data: Any) -> None:
+    tmp = file_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, file_path)
+
+
+def load_manifest(pdf_path: str | Path) -> dict[str, Any] | None:
+    """Manifiesto de las vistas previas, o ``None`` si faltan o el PDF cambió desde que se generaron."""
+    try:
+        with open(preview_dir(pdf_path) / MANIFEST_NAME, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != PREVIEW_VERSION or manifest.get("source") != _source_stamp(pdf_path):
+            return None
+    except (OSError, ValueError):
+        return None
+    return manifest
+
+
+def load_text(pdf_path: str | Path) -> list[str]:
+    """Texto extraído de cada página."""
+    try:
+        with open(preview_dir(pdf_path) / TEXT_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def generate_previews(pdf_path: str | Path, force: bool = False) -> int:
+    """Renderiza cada página como WebP y extrae su texto; devuelve las páginas escritas.
+
+    Se ejecuta en los procesos del pool, por lo que no usa el contexto de Flask.
+    """
+    if not available() or (not force and load_manifest(pdf_path) is not None):
+        return 0
+
+    out = preview_dir(pdf_path)
+    out.mkdir(parents=True, exist_ok=True)
+    stamp = _source_stamp(pdf_path)
+    pages: list[dict[str, int]] = []
+    texts: list[str] = []
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                width = page.get_width()
+                scale = min(PAGE_WIDTH / width, MAX_SCALE) if width else 1.0
+                image = page.render(scale=scale).to_pil()
+                image.save(out / page_filename(index + 1), format="WEBP", quality=80, method=4)
+                pages.append({"width": image.width, "height": image.height})
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range())
+                textpage.close()
+            finally:
+                page.close()
+    finally:
+        pdf.close()
+
+    for stale in out.glob("page-*.webp"):
+        if int(stale.stem.split("-")[1]) > len(pages):
+            stale.unlink()
+    _write_json(out / TEXT_NAME, texts)
+    # The manifest goes last: until it exists the viewer keeps using pdf.js.
+    _write_json(out / MANIFEST_NAME, {"version": PREVIEW_VERSION, "source": stamp, "pages": pages})
+    return len(pages)
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        return _executor
+
+
+def _publish_previews(pdf_path: str | Path) -> None:
+    """Copia las vistas previas al almacenamiento remoto, si hay uno configurado."""
+    for file_path in sorted(preview_dir(pdf_path).iterdir()):
+        publish(str(file_path))
+
+
+def _generate(app: Any, pdf_path: str, in_pool: bool = True) -> None:
+    with app.app_context():
+        try:
+            if in_pool:
+                executor = _get_executor(app.config.get("PDF_PREVIEW_WORKERS", 2))
+                pages = executor.submit(generate_previews, pdf_path, True).result()
+            else:
+                pages = generate_previews(pdf_path, force=True)
+            _publish_previews(pdf_path)
+            log.info(f"PDF previews generated for {pdf_path}: {pages} pages")
+        except Exception as e:
+            # A damaged PDF keeps the pdf.js viewer, it must not fail the upload.
+            log.warning(f"Could not generate PDF previews for {pdf_path}: {e}")
+
+
+def schedule_previews(pdf_path: str | Path) -> None:
+    """Genera las vistas previas de un PDF recién subido sin bloquear la petición.
+
+    Al hacer pruebas se ejecuta en línea para que las páginas existan al terminar la llamada.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get("PDF_PREVIEWS") or not available():
+        return
+    if app.config.get("TESTING"):
+        _generate(app, str(pdf_path), in_pool=False)
+        return
+
+    thread = threading.Thread(target=_generate, args=(app, str(pdf_path)))
+    thread.daemon = True
+    thread.start()
+
+
+def backfill_previews(pdf_paths: Iterable[str], force: bool = False, workers: int = 2) -> dict[str, int]:
+    """Genera las vistas previas faltantes de varios PDF en un pool de procesos."""
+    stats = {"pdfs": 0, "pages": 0, "failed": 0}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(generate_previews, p, force): p for p in pdf_paths if os.path.isfile(p)}
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            try:
+                pages = future.result()
+            except Exception as e:
+                log.warning(f"Could not generate PDF previews for {pdf_path}: {e}")
+                stats["failed"] += 1
+                continue
+            stats["pdfs"] += 1
+            stats["pages"] += pages
+            if pages:
+                _publish_previews(pdf_path)
+    return stats
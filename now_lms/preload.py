@@ -0,0 +1,81 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Precarga de la aplicación antes de crear los workers de Gunicorn.
+
+El proceso maestro construye la aplicación, compila las plantillas y congela el
+recolector de basura (``gc.freeze()``) justo antes de cada fork. Así los objetos
+creados al iniciar no se vuelven a escribir en los workers y sus páginas de
+memoria siguen compartidas (copy-on-write). Cada worker mide su memoria única
+poco después de iniciar y la guarda para calcular el número de workers del
+siguiente arranque, ver now_lms/worker_config.py.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import gc
+from threading import Timer
+from typing import Any, Callable
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import Flask
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+from now_lms.template_cache import precompile_templates
+from now_lms.worker_config import record_worker_memory
+
+
+def warm_up(app: Flask) -> dict[str, int]:
+    """Compila las plantillas en el proceso maestro para que los workers las hereden."""
+    with app.app_context():
+        stats = precompile_templates(app)
+    gc.collect()
+    log.info(f"Preloaded {stats['templates']} templates before starting the workers.")
+    return stats
+
+
+def freeze_before_fork(_server: Any, _worker: Any) -> None:
+    """Hook ``pre_fork``: mueve los objetos existentes a la generación permanente."""
+    gc.collect()
+    gc.freeze()
+
+
+def _measure_worker(pid: int) -> None:
+    memory_mb = record_worker_memory(pid=pid)
+    if memory_mb is not None:
+        log.info(f"Gunicorn worker {pid} unique memory after startup: {memory_mb:.1f} MB")
+
+
+def memory_probe(delay: int) -> Callable[[Any], None]:
+    """Hook ``post_worker_init`` que mide la memoria única del worker ``delay`` segundos después."""
+
+    def post_worker_init(worker: Any) -> None:
+        timer = Timer(delay, _measure_worker, args=(worker.pid,))
+        timer.daemon = True
+        timer.start()
+
+    return post_worker_init
+
+
+def preload_for_fork(app: Flask) -> dict[str, Callable[..., None]]:
+    """Prepara la aplicación para el fork y devuelve los hooks de Gunicorn."""
+    hooks: dict[str, Callable[..., None]] = {}
+    if not app.config.get("GC_FREEZE", True):
+        return hooks
+    warm_up(app)
+    hooks["pre_fork"] = freeze_before_fork
+    delay = app.config.get("WORKER_MEMORY_SAMPLE_DELAY", 60)
+    if delay:
+        hooks["post_worker_init"] = memory_probe(delay)
+    return hooks
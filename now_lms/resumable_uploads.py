@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Subidas reanudables por desplazamiento para archivos grandes.
+
+Protocolo inspirado en tus (https://tus.io), reducido a lo necesario:
+
+- ``POST`` crea la subida con el nombre y el tamaño total del archivo.
+- ``HEAD`` devuelve cuántos bytes ya recibió el servidor (``Upload-Offset``).
+- ``PATCH`` con ``Upload-Offset`` agrega bytes desde ese desplazamiento.
+- ``DELETE`` cancela la subida.
+
+Los bytes se escriben directamente en un archivo ``.upload-<id>.part`` dentro del
+directorio de destino, en bloques de tamaño fijo, por lo que la memoria del worker no
+depende del tamaño del archivo. El SHA-256 se calcula al vuelo: el estado del hash se
+conserva en memoria entre peticiones y solo se vuelve a leer lo ya recibido si la
+subida continúa en otro proceso o después de reiniciar el servidor. Al completarse,
+el archivo se renombra a su nombre final sin copiarlo.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from hashlib import sha256
+from typing import IO, Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from ulid import ULID
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+# Incomplete uploads older than this are removed by ``expire_uploads``.
+UPLOAD_MAX_AGE = 24 * 60 * 60
+_UPLOAD_ID_RE = re.compile(r"^[0-9A-HJKMNP-TV-Z]{26}$")
+# Hash en curso de las subidas de este proceso: id -> (bytes procesados, sha256).
+HASH_STATES_MAX = 1024
+_hash_states: dict[str, tuple[int, Any]] = {}
+_hash_states_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """Error de protocolo con el código HTTP que debe recibir el cliente."""
+
+    def __init__(self, message: str, status: int = 400):
+        """Guarda el código HTTP junto al mensaje."""
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Upload:
+    """Estado persistido de una subida en curso."""
+
+    id: str
+    filename: str
+    size: int
+    owner: str
+    created: float = field(default_factory=time.time)
+    checksum: str | None = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+    offset: int = 0
+
+    @property
+    def complete(self) -> bool:
+        """Indica si ya se recibieron todos los bytes."""
+        return self.offset >= self.size
+
+
+def _part_path(directory: str, upload_id: str) -> str:
+    return os.path.join(directory, f".upload-{upload_id}.part")
+
+
+def _info_path(directory: str, upload_id: str) -> str:
+    return os.path.join(directory, f".upload-{upload_id}.json")
+
+
+def create_upload(
+    directory: str,
+    filename: str,
+    size: int,
+    owner: str,
+    *,
+    max_size: int,
+    checksum: str | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> Upload:
+    """Registra una nueva subida y crea su archivo parcial vacío."""
+    if size < 0:
+        raise UploadError("Invalid upload size.")
+    if size > max_size:
+        raise UploadError("Upload exceeds the maximum file size.", 413)
+    if checksum is not None and not re.fullmatch(r"[0-9a-f]{64}", checksum):
+        raise UploadError("Checksum must be a hex SHA-256 digest.")
+
+    os.makedirs(directory, exist_ok=True)
+    upload = Upload(id=str(ULID()), filename=filename, size=size, owner=owner, checksum=checksum, metadata=metadata or {})
+    with open(_part_path(directory, upload.id), "xb"):
+        pass
+    _write_info(directory, upload)
+    return upload
+
+
+def _write_info(directory: str, upload: Upload) -> None:
+    info = asdict(upload)
+    info.pop("offset")
+    tmp = _info_path(directory, upload.id) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    os.replace(tmp, _info_path(directory, upload.id))
+
+
+def load_upload(directory: str, upload_id: str) -> Upload | None:
+    """Lee el estado de una subida; el desplazamiento es el tamaño del archivo parcial."""
+    if not _UPLOAD_ID_RE.match(upload_id):
+        return None
+    try:
+        with open(_info_path(directory, upload_id), encoding="utf-8") as f:
+            upload = Upload(**json.load(f))
+        upload.offset = os.path.getsize(_part_path(directory, upload_id))
+    except (OSError, ValueError, TypeError):
+        return None
+    return upload
+
+
+def _hash_prefix(part_path: str, length: int) -> Any:
+    """SHA-256 de los primeros ``length`` bytes del archivo parcial, leídos por bloques."""
+    digest = sha256()
+    with open(part_path, "rb") as f:
+        while length > 0 and (block := f.read(min(UPLOAD_BUFFER_SIZE, length))):
+            digest.update(block)
+            length -= len(block)
+    return digest
+
+
+def _resume_digest(part_path: str, upload_id: str, offset: int) -> Any:
+    """Hash de los ``offset`` bytes ya recibidos, desde memoria si este proceso lo tiene."""
+    with _hash_states_lock:
+        state = _hash_states.pop(upload_id, None)
+    if state is not None and state[0] == offset:
+        return state[1]
+    if offset == 0:
+        return sha256()
+    # The previous chunk went to another process, or the server restarted.
+    return _hash_prefix(part_path, offset)
+
+
+def _save_digest(upload_id: str, offset: int, digest: Any) -> None:
+    with _hash_states_lock:
+        if len(_hash_states) >= HASH_STATES_MAX:
+            _hash_states.pop(next(iter(_hash_states)))
+        _hash_states[upload_id] = (offset, digest)
+
+
+def _forget_digest(upload_id: str) -> None:
+    with _hash_states_lock:
+        _hash_states.pop(upload_id, None)
+
+
+def append_chunk(directory: str, upload: Upload, offset: int, stream: IO[bytes]) -> str | None:
+    """Escribe en el archivo parcial los bytes de ``stream`` a partir de ``offset``.
+
+    Devuelve el SHA-256 del archivo cuando la subida queda completa, ``None`` si aún
+    faltan bytes. Un bloque que excede el tamaño declarado se rechaza con 413; los
+    bloques anteriores de la misma petición se conservan y la subida puede continuar
+    desde el desplazamiento que indique ``HEAD``.
+    """
+    if offset != upload.offset:
+        raise UploadError("Upload-Offset does not match the received bytes.", 409)
+
+    part_path = _part_path(directory, upload.id)
+    digest = _resume_digest(part_path, upload.id, offset)
+    remaining = upload.size - offset
+    with open(part_path, "r+b") as f:
+        f.seek(offset)
+        while True:
+            block = stream.read(UPLOAD_BUFFER_SIZE)
+            if not block:
+                break
+            if len(block) > remaining:
+                f.truncate(offset)
+                upload.offset = offset
+                _save_digest(upload.id, offset, digest)
+                raise UploadError("Upload exceeds the declared size.", 413)
+            f.write(block)
+            digest.update(block)
+            remaining -= len(block)
+            offset += len(block)
+    upload.offset = offset
+
+    if not upload.complete:
+        _save_digest(upload.id, offset, digest)
+        return None
+    if os.path.getsize(part_path) != upload.size:
+        raise UploadError("Upload-Offset does not match the received bytes.", 409)
+    checksum = digest.hexdigest()
+    if upload.checksum and checksum != upload.checksum:
+        with open(part_path, "r+b") as f:
+            f.truncate(0)
+        upload.offset = 0
+        raise UploadError("Checksum mismatch, the upload was restarted.", 460)
+    return checksum
+
+
+def finish_upload(directory: str, upload: Upload, final_name: str) -> str:
+    """Renombra el archivo completo a ``final_name`` en el mismo directorio."""
+    destination = os.path.realpath(os.path.join(directory, final_name))
+    if os.path.dirname(destination) != os.path.realpath(directory):
+        raise UploadError("Invalid destination path.")
+    if os.path.exists(destination):
+        raise UploadError("A file with that name already exists.", 409)
+    os.replace(_part_path(directory, upload.id), destination)
+    os.remove(_info_path(directory, upload.id))
+    _forget_digest(upload.id)
+    return destination
+
+
+def cancel_upload(directory: str, upload_id: str) -> None:
+    """Elimina el archivo parcial y el estado de una subida."""
+    _forget_digest(upload_id)
+    for file_path in (_part_path(directory, upload_id), _info_path(directory, upload_id)):
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+
+def expire_uploads(directory: str, max_age: int = UPLOAD_MAX_AGE) -> int:
+    """Elimina las subidas incompletas más antiguas que ``max_age`` segundos."""
+    removed = 0
+    limit = time.time() - max_age
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        match = re.match(r"^\.upload-([0-9A-Z]{26})\.part$", entry.name)
+        if match and entry.stat().st_mtime < limit:
+            cancel_upload(directory, match.group(1))
+            removed += 1
+    if removed:
+        log.info(f"Removed {removed} expired uploads from {directory}")
+    return removed
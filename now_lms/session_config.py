@@ -97,7 +97,8 @@ def get_session_config(app: Flask | None = None) -> dict[str, object] | None:
         "SESSION_COOKIE_HTTPONLY": True,
         "SESSION_COOKIE_SECURE": os.environ.get("FLASK_ENV") == "production",
         "SESSION_COOKIE_SAMESITE": "Lax",
-        "SESSION_CLEANUP_N_REQUESTS": 100,  # Cleanup expired sessions every 100 requests on average
+        # Expired rows are deleted by a background thread, see now_lms/session_storage.py.
+        "SESSION_CLEANUP_N_REQUESTS": None,
     }
 
 
@@ -130,6 +131,10 @@ def _initialize_session_backend(app: Flask, session_config: dict) -> None:
 
     app.config.update(session_config)
     Session(app)
+    if session_config.get("SESSION_TYPE") == "sqlalchemy":
+        from now_lms.session_storage import install_session_storage
+
+        install_session_storage(app)
     if not isinstance(app.session_interface, ServerSideSessionInterface):
         raise RuntimeError(f"Flask-Session did not install a server-side interface for {session_config.get('SESSION_TYPE')}")
 
@@ -281,9 +286,10 @@ def reset_connections_after_fork(_server, _worker) -> None:
     # disposing inherited pools in the child process.
     from now_lms import lms_app
     from now_lms.db import database
+    from now_lms.db.replicas import REPLICAS_EXTENSION
 
     with lms_app.app_context():
-        for engine in database.engines.values():
+        for engine in [*database.engines.values(), *lms_app.extensions.get(REPLICAS_EXTENSION, [])]:
             engine.dispose(close=False)
 
     redis_client = lms_app.config.get("SESSION_REDIS")
@@ -0,0 +1,281 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Efficient database-backed session storage.
+
+Flask-Session's SQLAlchemy backend reads the session row on every request and,
+because ``SESSION_REFRESH_EACH_REQUEST`` is on by default, writes it back on
+every response, and deletes expired rows from inside a random request. This
+module replaces the interface Flask-Session builds with a subclass that reuses
+its session model, so that:
+
+- A session whose payload did not change is not written again until less than
+  half of its lifetime is left; the idle timeout therefore lies between half
+  and the whole ``PERMANENT_SESSION_LIFETIME``.
+- Writes are a single ``UPDATE`` (``INSERT`` for new sessions) instead of a
+  ``SELECT`` followed by an ``UPDATE``.
+- The ``expiry`` column is indexed by migration 20260815_000000.
+- Expired rows are deleted in batches by a background thread in every worker
+  process, every ``NOW_LMS_SESSION_CLEANUP_INTERVAL`` seconds.
+- With ``NOW_LMS_SESSION_COMPACT`` large payloads are stored zlib-compressed.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import hashlib
+import os
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import Flask, Request
+from flask_session.base import MsgSpecSerializer, ServerSideSession, ServerSideSessionInterface
+from flask_session.sqlalchemy import SqlAlchemySessionInterface
+from itsdangerous import want_bytes
+from sqlalchemy import case, cast, func, select
+from sqlalchemy.dialects.postgresql import REGCLASS
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+
+# zlib streams start with 0x78 ("x"); msgpack and JSON encodings of a dict never do.
+ZLIB_MAGIC = b"x"
+COMPACT_THRESHOLD = 256
+
+
+def _utcnow() -> datetime:
+    # Flask-Session stores naive UTC datetimes.
+    return datetime.utcnow()
+
+
+def _digest(payload: bytes) -> bytes:
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+class CompactSerializer(MsgSpecSerializer):
+    """Msgpack serializer that compresses payloads larger than ``threshold`` bytes.
+
+    Compressed and plain payloads are both read back, so the option can be turned
+    on or off without logging anybody out.
+    """
+
+    def __init__(self, app: Flask, format: str, compress: bool = False, threshold: int = COMPACT_THRESHOLD):
+        super().__init__(app=app, format=format)
+        self.compress = compress
+        self.threshold = threshold
+
+    def encode(self, session: ServerSideSession) -> bytes:
+        """Serialize the session data."""
+        payload = super().encode(session)
+        if self.compress and len(payload) > self.threshold:
+            compressed = zlib.compress(payload, 6)
+            if len(compressed) < len(payload):
+                return compressed
+        return payload
+
+    def decode(self, serialized_data: bytes) -> dict:
+        """Deserialize the session data."""
+        if serialized_data[:1] == ZLIB_MAGIC:
+            serialized_data = zlib.decompress(serialized_data)
+        return super().decode(serialized_data)
+
+
+class DatabaseSessionInterface(SqlAlchemySessionInterface):
+    """SQLAlchemy session interface that skips redundant writes and expires rows in the background."""
+
+    def __init__(
+        self,
+        app: Flask,
+        base: SqlAlchemySessionInterface,
+        *,
+        compress: bool = False,
+        cleanup_interval: int = 0,
+        cleanup_batch: int = 1000,
+    ) -> None:
+        """Build the interface on the database client and session model of ``base``.
+
+        The model Flask-Session mapped on the application metadata cannot be defined a
+        second time, so the parent constructor, which defines it, is skipped.
+        """
+        self.client = base.client
+        self.sql_session_model = base.sql_session_model
+        ServerSideSessionInterface.__init__(
+            self,
+            app,
+            key_prefix=base.key_prefix,
+            use_signer=base.use_signer,
+            permanent=base.permanent,
+            sid_length=base.sid_length,
+            # Expired rows are deleted by ``_cleanup_loop``, never from a request.
+            cleanup_n_requests=None,
+        )
+        self.serializer = CompactSerializer(app, app.config.get("SESSION_SERIALIZATION_FORMAT", "msgpack"), compress=compress)
+        self.cleanup_interval = cleanup_interval
+        self.cleanup_batch = cleanup_batch
+        # Digest and expiry of the row read by ``open_session`` in the current thread.
+        self._loaded = threading.local()
+
+    # Reading ------------------------------------------------------------------------
+    def _retrieve_session_data(self, store_id: str) -> Optional[dict]:
+        model = self.sql_session_model
+        row = self.client.session.execute(select(model.data, model.expiry).where(model.session_id == store_id)).first()
+        loaded = self._loaded
+        loaded.row = None
+        if row is None:
+            return None
+        if row.expiry is None or row.expiry <= _utcnow():
+            self._delete_session(store_id)
+            return None
+        payload = want_bytes(row.data)
+        loaded.row = (_digest(payload), row.expiry)
+        return self.serializer.decode(payload)
+
+    def open_session(self, app: Flask, request: Request) -> ServerSideSession:
+        """Open the session and remember the digest and expiry of the stored row."""
+        loaded = self._loaded
+        loaded.row = None
+        session = super().open_session(app, request)
+        session.stored = loaded.row
+        loaded.row = None
+        return session
+
+    # Writing ------------------------------------------------------------------------
+    def _upsert_session(self, session_lifetime: timedelta, session: ServerSideSession, store_id: str) -> None:
+        payload = self.serializer.encode(session)
+        digest = _digest(payload)
+        now = _utcnow()
+        stored = getattr(session, "stored", ())
+        if stored:
+            stored_digest, stored_expiry = stored
+            if stored_digest == digest and stored_expiry - now > session_lifetime / 2:
+                return
+
+        model = self.sql_session_model
+        expiry = now + session_lifetime
+        try:
+            # A session opened without a stored row is new: insert it right away.
+            updated = stored is not None and (
+                self.client.session.query(model)
+                .filter(model.session_id == store_id)
+                .update({model.data: payload, model.expiry: expiry}, synchronize_session=False)
+            )
+            if not updated:
+                self.client.session.add(model(session_id=store_id, data=payload, expiry=expiry))
+            self.client.session.commit()
+        except Exception:
+            self.client.session.rollback()
+            raise
+        session.stored = (digest, expiry)
+
+    # Expiry -------------------------------------------------------------------------
+    def _delete_expired_sessions(self) -> None:
+        delete_expired_sessions(self, self.cleanup_batch)
+
+    def _start_cleanup_thread(self) -> None:
+        """Start the cleanup thread of this process, once per process."""
+        if self.__dict__.get("_cleanup_pid") == os.getpid():
+            return
+        with _cleanup_lock:
+            if self.__dict__.get("_cleanup_pid") == os.getpid():
+                return
+            self._cleanup_pid = os.getpid()
+            threading.Thread(target=self._cleanup_loop, name="session-cleanup", daemon=True).start()
+
+    def _cleanup_loop(self) -> None:
+        while True:
+            # Jitter keeps the workers of one server from cleaning at the same moment.
+            time.sleep(self.cleanup_interval * random.uniform(0.75, 1.25))  # nosec B311
+            try:
+                with self.app.app_context():
+                    deleted = delete_expired_sessions(self, self.cleanup_batch)
+                if deleted:
+                    log.debug(f"Deleted {deleted} expired sessions.")
+            except Exception as exc:
+                log.warning(f"Expired session cleanup failed: {exc}")
+
+
+_cleanup_lock = threading.Lock()
+
+
+def delete_expired_sessions(interface: SqlAlchemySessionInterface, batch: int = 1000) -> int:
+    """Delete expired sessions ``batch`` rows at a time and return how many were deleted."""
+    model = interface.sql_session_model
+    db_session = interface.client.session
+    deleted = 0
+    while True:
+        ids = db_session.execute(select(model.id).where(model.expiry <= _utcnow()).limit(batch)).scalars().all()
+        if not ids:
+            break
+        try:
+            db_session.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            db_session.commit()
+        except Exception:
+            db_session.rollback()
+            raise
+        deleted += len(ids)
+        if len(ids) < batch:
+            break
+    return deleted
+
+
+def session_stats(interface: SqlAlchemySessionInterface, lifetime: timedelta) -> dict[str, Any]:
+    """Size and churn of the session table.
+
+    ``written_last_hour`` counts the rows whose expiry was set during the last hour,
+    that is sessions created or refreshed in that time.
+    """
+    model = interface.sql_session_model
+    db_session = interface.client.session
+    now = _utcnow()
+    total, active, payload_bytes = db_session.execute(
+        select(
+            func.count(model.id),
+            func.coalesce(func.sum(case((model.expiry > now, 1), else_=0)), 0),
+            func.coalesce(func.sum(func.length(model.data)), 0),
+        )
+    ).one()
+    written = db_session.execute(
+        select(func.count(model.id)).where(model.expiry > now + lifetime - timedelta(hours=1))
+    ).scalar_one()
+    stats: dict[str, Any] = {
+        "total": total,
+        "active": int(active),
+        "expired": total - int(active),
+        "payload_bytes": int(payload_bytes),
+        "average_bytes": int(payload_bytes) // total if total else 0,
+        "written_last_hour": written,
+        "table_bytes": None,
+    }
+    engine = db_session.get_bind()
+    if engine.dialect.name == "postgresql":
+        stats["table_bytes"] = db_session.execute(
+            select(func.pg_total_relation_size(cast(model.__table__.name, REGCLASS)))
+        ).scalar_one()
+    return stats
+
+
+def install_session_storage(app: Flask) -> None:
+    """Replace the SQLAlchemy session interface installed by Flask-Session."""
+    interface = app.session_interface
+    if not isinstance(interface, SqlAlchemySessionInterface) or isinstance(interface, DatabaseSessionInterface):
+        return
+    app.session_interface = storage = DatabaseSessionInterface(
+        app,
+        interface,
+        compress=bool(app.config.get("SESSION_COMPACT")),
+        cleanup_interval=int(app.config.get("SESSION_CLEANUP_INTERVAL", 900) or 0),
+        cleanup_batch=int(app.config.get("SESSION_CLEANUP_BATCH", 1000) or 1000),
+    )
+    if storage.cleanup_interval and not app.config.get("TESTING"):
+        # Threads do not survive fork(): every worker starts its own on its first request.
+        app.before_request(storage._start_cleanup_thread)
@@ -0,0 +1,124 @@
+/**
+ * Resumable uploads for large files.
+ *
+ * Forms with a data-resumable-upload attribute (the URL that creates the upload)
+ * send the file in chunks with PATCH requests instead of a single multipart POST.
+ * A dropped connection only repeats the current chunk, and reloading the page and
+ * choosing the same file resumes from the last byte received by the server.
+ * Protocol: now_lms/resumable_uploads.py
+ */
+
+const RESUMABLE_CHUNK_SIZE = 8 * 1024 * 1024;
+const RESUMABLE_MAX_RETRIES = 8;
+
+function resumableSleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+async function resumableOffset(location) {
+    const response = await fetch(location, { method: 'HEAD', credentials: 'same-origin' });
+    if (!response.ok) {
+        return null;
+    }
+    return parseInt(response.headers.get('Upload-Offset'), 10);
+}
+
+async function resumableUpload(createUrl, file, fields, onProgress) {
+    const storageKey = ['now-lms-upload', createUrl, file.name, file.size, file.lastModified].join(':');
+    let location = localStorage.getItem(storageKey);
+    let offset = location ? await resumableOffset(location) : null;
+
+    if (offset === null) {
+        const body = new FormData();
+        for (const [name, value] of fields) {
+            body.append(name, value);
+        }
+        body.append('filename', file.name);
+        body.append('size', file.size);
+        const response = await fetch(createUrl, { method: 'POST', body: body, credentials: 'same-origin' });
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error);
+        }
+        location = response.headers.get('Location');
+        localStorage.setItem(storageKey, location);
+        offset = 0;
+    }
+
+    let retries = 0;
+    for (;;) {
+        onProgress(file.size ? offset / file.size : 1);
+        let response;
+        try {
+            response = await fetch(location, {
+                method: 'PATCH',
+                credentials: 'same-origin',
+                headers: { 'Upload-Offset': String(offset), 'Content-Type': 'application/offset+octet-stream' },
+                body: file.slice(offset, Math.min(offset + RESUMABLE_CHUNK_SIZE, file.size)),
+            });
+        } catch (error) {
+            if (++retries > RESUMABLE_MAX_RETRIES) {
+                throw error;
+            }
+            await resumableSleep(Math.min(1000 * 2 ** retries, 30000));
+            offset = (await resumableOffset(location).catch(() => null)) ?? offset;
+            continue;
+        }
+        retries = 0;
+        if (response.status === 204) {
+            offset = parseInt(response.headers.get('Upload-Offset'), 10);
+            continue;
+        }
+        const data = await response.json();
+        if (response.status === 409 && data.offset !== null && data.offset !== undefined) {
+            offset = data.offset;
+            continue;
+        }
+        localStorage.removeItem(storageKey);
+        if (!response.ok) {
+            throw new Error(data.error);
+        }
+        onProgress(1);
+        return data;
+    }
+}
+
+window.addEventListener('load', () => {
+    if (!window.fetch || !window.FormData) {
+        return;
+    }
+    document.querySelectorAll('form[data-resumable-upload]').forEach((form) => {
+        form.addEventListener('submit', async (event) => {
+            const input = form.querySelector('input[type="file"]');
+            if (event.defaultPrevented || !input || !input.files.length || !form.checkValidity()) {
+                return;
+            }
+            event.preventDefault();
+            const fields = new FormData(form);
+            fields.delete(input.name);
+            const progress = form.querySelector('.progress');
+            const bar = progress ? progress.querySelector('.progress-bar') : null;
+            const button = form.querySelector('button[type="submit"]');
+            if (progress) {
+                progress.classList.remove('d-none');
+            }
+            if (button) {
+                button.disabled = true;
+            }
+            try {
+                const result = await resumableUpload(form.dataset.resumableUpload, input.files[0], fields, (ratio) => {
+                    if (bar) {
+                        bar.style.width = Math.round(ratio * 100) + '%';
+                        bar.textContent = Math.round(ratio * 100) + '%';
+                    }
+                });
+                window.location.assign(result.redirect);
+            } catch (error) {
+                if (button) {
+                    button.disabled = false;
+                }
+                alert(error.message);
+            }
+        });
+    });
+});
@@ -0,0 +1,229 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Archivos estáticos con huella de contenido.
+
+``lmsctl assets build`` copia cada archivo estático a un nombre que incluye un
+resumen de su contenido (``css/style.3f2a9c1b04.css``), crea variantes gzip y
+brotli de los archivos de texto y escribe un manifiesto. Cuando el manifiesto
+existe, ``url_for("static", filename=...)`` devuelve el nombre con huella y la
+ruta estática sirve esos archivos con ``Cache-Control: immutable`` eligiendo la
+variante comprimida según ``Accept-Encoding``.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import gzip
+import json
+import mimetypes
+import os
+from hashlib import sha256
+from pathlib import Path
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import Flask, current_app, request, send_from_directory
+from werkzeug.wrappers import Response
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+
+MANIFEST_NAME = "assets-manifest.json"
+HASH_LENGTH = 10
+IMMUTABLE_MAX_AGE = 31536000
+# User uploads and sample data are not build artifacts.
+EXCLUDED_DIRS = ("files", "examples")
+ASSET_EXTENSIONS = {
+    ".css",
+    ".js",
+    ".map",
+    ".json",
+    ".webmanifest",
+    ".svg",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".ico",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".eot",
+}
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".map", ".json", ".webmanifest", ".svg", ".ttf", ".eot"}
+# Preferred order when the client accepts several encodings.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _is_asset(relpath: str) -> bool:
+    """Decide si un archivo del directorio estático forma parte del build."""
+    parts = relpath.split("/")
+    if parts[0] in EXCLUDED_DIRS or relpath == MANIFEST_NAME:
+        return False
+    # From node_modules only the distributed files are referenced by the templates.
+    if parts[0] == "node_modules" and not ({"dist", "font", "fonts"} & set(parts[1:-1])):
+        return False
+    return Path(relpath).suffix.lower() in ASSET_EXTENSIONS
+
+
+def _hashed_name(relpath: str, digest: str) -> str:
+    stem, suffix = os.path.splitext(relpath)
+    return f"{stem}.{digest[:HASH_LENGTH]}{suffix}"
+
+
+def _compress(path: Path, data: bytes) -> list[str]:
+    """Escribe las variantes comprimidas que resulten más pequeñas que el original."""
+    encodings = []
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            path.with_name(path.name + ".br").write_bytes(compressed)
+            encodings.append("br")
+
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        path.with_name(path.name + ".gz").write_bytes(compressed)
+        encodings.append("gzip")
+    return encodings
+
+
+def load_manifest(static_dir: str | Path) -> dict[str, Any] | None:
+    """Lee el manifiesto del directorio estático; ``None`` si no existe o no es válido."""
+    manifest_path = Path(static_dir) / MANIFEST_NAME
+    try:
+        with manifest_path.open(encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        log.warning(f"Ignoring invalid static assets manifest {manifest_path}: {e}")
+        return None
+    if not isinstance(manifest.get("assets"), dict):
+        return None
+    manifest.setdefault("encodings", {})
+    return manifest
+
+
+def build_assets(static_dir: str | Path) -> dict[str, int]:
+    """Genera las copias con huella, sus variantes comprimidas y el manifiesto.
+
+    Es incremental: los archivos sin cambios conservan su nombre y las copias de
+    versiones anteriores que ya no están en el manifiesto se eliminan.
+    """
+    static_dir = Path(static_dir)
+    previous = load_manifest(static_dir) or {"assets": {}, "encodings": {}}
+    previous_outputs = set(previous["assets"].values())
+
+    assets: dict[str, str] = {}
+    encodings: dict[str, list[str]] = {}
+    stats = {"assets": 0, "written": 0, "compressed": 0, "removed": 0}
+    for root, dirs, filenames in os.walk(static_dir):
+        dirs.sort()
+        for filename in sorted(filenames):
+            path = Path(root) / filename
+            relpath = path.relative_to(static_dir).as_posix()
+            if relpath in previous_outputs or not _is_asset(relpath):
+                continue
+
+            data = path.read_bytes()
+            hashed = _hashed_name(relpath, sha256(data).hexdigest())
+            assets[relpath] = hashed
+            stats["assets"] += 1
+
+            target = static_dir / hashed
+            if hashed in previous_outputs and target.exists():
+                encodings[hashed] = previous["encodings"].get(hashed, [])
+                continue
+            target.write_bytes(data)
+            stats["written"] += 1
+            if path.suffix.lower() in COMPRESSIBLE_EXTENSIONS:
+                encodings[hashed] = _compress(target, data)
+                stats["compressed"] += bool(encodings[hashed])
+
+    for stale in previous_outputs - set(assets.values()):
+        for suffix in ("", ".br", ".gz"):
+            stale_path = static_dir / (stale + suffix)
+            if stale_path.exists():
+                stale_path.unlink()
+        stats["removed"] += 1
+
+    manifest = {"version": 1, "assets": assets, "encodings": {k: v for k, v in encodings.items() if v}}
+    manifest_path = static_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    tmp_path.replace(manifest_path)
+    return stats
+
+
+def hashed_static_filename(filename: str) -> str:
+    """Nombre con huella de un archivo estático, o el mismo nombre si no tiene."""
+    manifest = current_app.extensions.get("static_assets")
+    if not manifest:
+        return filename
+    return manifest["assets"].get(filename.lstrip("/"), filename)
+
+
+def _serve_static(filename: str) -> Response:
+    """Vista estática: archivos con huella son inmutables y se sirven precomprimidos."""
+    app = current_app
+    manifest = app.extensions.get("static_assets")
+    if not manifest or filename not in manifest["hashed"]:
+        return app.send_static_file(filename)
+
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    available = manifest["encodings"].get(filename, ())
+    encoding = next(
+        (
+            (name, suffix)
+            for name, suffix in ENCODINGS
+            if name in available and request.accept_encodings[name] > 0  # type: ignore[index]
+        ),
+        None,
+    )
+    if encoding is not None:
+        response = send_from_directory(app.static_folder, filename + encoding[1], mimetype=mimetype)  # type: ignore[arg-type]
+        response.headers["Content-Encoding"] = encoding[0]
+    else:
+        response = send_from_directory(app.static_folder, filename, mimetype=mimetype)  # type: ignore[arg-type]
+    if available:
+        response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+def init_static_assets(app: Flask) -> None:
+    """Activa los nombres con huella si existe un manifiesto generado por ``lmsctl assets build``."""
+    if not app.config.get("STATIC_ASSETS_MANIFEST", True) or not app.static_folder:
+        return
+    manifest = load_manifest(app.static_folder)
+    if not manifest:
+        return
+
+    manifest["hashed"] = frozenset(manifest["assets"].values())
+    app.extensions["static_assets"] = manifest
+
+    @app.url_defaults
+    def _static_asset_url(endpoint: str, values: dict[str, Any]) -> None:
+        if endpoint == "static" and "filename" in values:
+            values["filename"] = manifest["assets"].get(values["filename"].lstrip("/"), values["filename"])
+
+    app.view_functions["static"] = _serve_static
+    log.info(f"Serving {len(manifest['assets'])} fingerprinted static assets.")
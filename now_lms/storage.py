@@ -0,0 +1,332 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Almacenamiento de los archivos subidos por los usuarios.
+
+Las subidas siempre se escriben primero en el directorio local de archivos
+(``NOW_LMS_DATA_DIR/files``). Con ``NOW_LMS_STORAGE=s3`` además se copian a un
+bucket compatible con S3 (AWS, MinIO, Ceph, ...) usando como clave la ruta
+relativa a ese directorio, por ejemplo ``public/files/curso01/guia.pdf``. Las
+descargas protegidas se resuelven contra el bucket: una URL firmada de corta
+duración o, si están desactivadas, el contenido leído del bucket. Así varios
+nodos de la aplicación pueden servir los mismos archivos sin un NFS compartido.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import mimetypes
+import os
+import shutil
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import IO, Any, Iterator
+from urllib.parse import quote
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import current_app, redirect, request
+from werkzeug.http import dump_options_header
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+STORAGE_EXTENSION = "now_lms_storage"
+STORAGE_BACKENDS = ("local", "s3")
+# Archivos que nunca se copian al almacenamiento: el almacén por contenido, la caché
+# de plantillas y las subidas reanudables en curso (archivos ocultos).
+SKIPPED_DIRS = (".store", ".cache")
+
+
+def content_disposition(filename: str, as_attachment: bool = True) -> str:
+    """Valor de ``Content-Disposition`` con nombre ASCII y, si hace falta, ``filename*`` UTF-8."""
+    kind = "attachment" if as_attachment else "inline"
+    try:
+        filename.encode("ascii")
+        return dump_options_header(kind, {"filename": filename})
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+        return dump_options_header(kind, {"filename": simple, "filename*": f"UTF-8''{quote(filename, safe='')}"})
+
+
+class StorageBackend(ABC):
+    """Operaciones comunes a los controladores de almacenamiento."""
+
+    #: Los archivos viven fuera del disco local de este nodo.
+    remote = False
+
+    @abstractmethod
+    def put(self, key: str, file_path: str) -> None:
+        """Guarda el archivo local ``file_path`` bajo ``key``."""
+
+    @abstractmethod
+    def open(self, key: str) -> tuple[IO[bytes], int]:
+        """Devuelve un flujo de lectura y el tamaño en bytes del objeto."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Indica si ``key`` existe."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Elimina ``key``; no falla si no existe."""
+
+    @abstractmethod
+    def keys(self) -> Iterator[str]:
+        """Todas las claves almacenadas."""
+
+    def url(
+        self, key: str, filename: str | None = None, as_attachment: bool = False, mimetype: str | None = None
+    ) -> str | None:
+        """URL de descarga directa, o ``None`` si el archivo debe servirse desde la aplicación."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Archivos en el directorio local de datos, el comportamiento de siempre."""
+
+    def __init__(self, root: str):
+        """Directorio raíz de las claves."""
+        self.root = os.path.realpath(root)
+
+    def path(self, key: str) -> str:
+        """Ruta local de ``key``, sin salir del directorio raíz."""
+        file_path = os.path.realpath(os.path.join(self.root, key))
+        if not file_path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return file_path
+
+    def put(self, key: str, file_path: str) -> None:
+        """Copia el archivo salvo que ya esté en su lugar."""
+        destination = self.path(key)
+        if os.path.realpath(file_path) != destination:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(file_path, destination)
+
+    def open(self, key: str) -> tuple[IO[bytes], int]:
+        """Abre el archivo local."""
+        file_path = self.path(key)
+        return open(file_path, "rb"), os.path.getsize(file_path)
+
+    def exists(self, key: str) -> bool:
+        """Comprueba el archivo local."""
+        return os.path.isfile(self.path(key))
+
+    def delete(self, key: str) -> None:
+        """Elimina el archivo local."""
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self) -> Iterator[str]:
+        """Recorre el directorio raíz."""
+        for directory, dirs, filenames in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d not in SKIPPED_DIRS]
+            for filename in filenames:
+                if not filename.startswith("."):
+                    yield os.path.relpath(os.path.join(directory, filename), self.root).replace(os.sep, "/")
+
+
+class S3Storage(StorageBackend):
+    """Bucket compatible con S3 (AWS S3, MinIO, Ceph RGW, ...).
+
+    Las credenciales se leen como en cualquier cliente ``boto3``: variables
+    ``AWS_ACCESS_KEY_ID``/``AWS_SECRET_ACCESS_KEY``, perfil o rol de la instancia.
+    """
+
+    remote = True
+
+    def __init__(
+        self,
+        bucket: str,
+        *,
+        prefix: str = "",
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        presigned: bool = True,
+        expires: int = 300,
+        client: Any = None,
+    ):
+        """Configura el bucket; el cliente se crea al primer uso."""
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.presigned = presigned
+        self.expires = expires
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        """Cliente S3 de ``boto3``."""
+        if self._client is None:
+            if boto3 is None:
+                raise RuntimeError("NOW_LMS_STORAGE=s3 requires boto3: pip install boto3")
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url, region_name=self.region)
+        return self._client
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def put(self, key: str, file_path: str) -> None:
+        """Sube el archivo con su tipo de contenido."""
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        self.client.upload_file(file_path, self.bucket, self._key(key), ExtraArgs={"ContentType": content_type})
+
+    def open(self, key: str) -> tuple[IO[bytes], int]:
+        """Lee el objeto como flujo, sin cargarlo completo en memoria."""
+        obj = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        return obj["Body"], obj["ContentLength"]
+
+    def exists(self, key: str) -> bool:
+        """Consulta la cabecera del objeto."""
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except Exception as e:
+            error = getattr(e, "response", {}).get("Error", {})
+            if str(error.get("Code")) in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str) -> None:
+        """Elimina el objeto."""
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def keys(self) -> Iterator[str]:
+        """Lista los objetos bajo el prefijo configurado."""
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"][len(self.prefix) :]
+
+    def url(
+        self, key: str, filename: str | None = None, as_attachment: bool = False, mimetype: str | None = None
+    ) -> str | None:
+        """URL firmada válida por ``expires`` segundos."""
+        if not self.presigned:
+            return None
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if mimetype:
+            params["ResponseContentType"] = mimetype
+        if as_attachment:
+            params["ResponseContentDisposition"] = content_disposition(filename or os.path.basename(key))
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=self.expires)
+
+
+def create_storage(config: dict) -> StorageBackend:
+    """Crea el controlador indicado por ``STORAGE_BACKEND``."""
+    from now_lms.config import DIRECTORIO_BASE_ARCHIVOS_USUARIO
+
+    if config.get("STORAGE_BACKEND") == "s3":
+        return S3Storage(
+            config["S3_BUCKET"],
+            prefix=config.get("S3_PREFIX") or "",
+            endpoint_url=config.get("S3_ENDPOINT_URL") or None,
+            region=config.get("S3_REGION") or None,
+            presigned=config.get("S3_PRESIGNED_URLS", True),
+            expires=config.get("S3_PRESIGNED_EXPIRES", 300),
+        )
+    return LocalStorage(str(DIRECTORIO_BASE_ARCHIVOS_USUARIO))
+
+
+def get_storage() -> StorageBackend:
+    """Controlador de almacenamiento de la aplicación actual."""
+    storage = current_app.extensions.get(STORAGE_EXTENSION)
+    if storage is None:
+        storage = current_app.extensions[STORAGE_EXTENSION] = create_storage(current_app.config)
+    return storage
+
+
+def storage_key(file_path: str) -> str | None:
+    """Clave de un archivo local: su ruta relativa al directorio de archivos de usuario."""
+    from now_lms.config import DIRECTORIO_BASE_ARCHIVOS_USUARIO
+
+    base = os.path.realpath(DIRECTORIO_BASE_ARCHIVOS_USUARIO)
+    file_path = os.path.realpath(file_path)
+    if not file_path.startswith(base + os.sep):
+        return None
+    return os.path.relpath(file_path, base).replace(os.sep, "/")
+
+
+def publish(file_path: str) -> None:
+    """Copia un archivo recién subido al almacenamiento remoto, si hay uno configurado."""
+    storage = get_storage()
+    key = storage_key(file_path)
+    if not storage.remote or key is None:
+        return
+    try:
+        storage.put(key, file_path)
+    except Exception as e:
+        log.error(f"Error storing {key}: {e}")
+        raise
+
+
+def unpublish(file_path: str) -> None:
+    """Elimina del almacenamiento remoto la copia de un archivo borrado."""
+    storage = get_storage()
+    key = storage_key(file_path)
+    if not storage.remote or key is None:
+        return
+    try:
+        storage.delete(key)
+    except Exception as e:
+        log.warning(f"Error deleting {key} from storage: {e}")
+
+
+def stored_file_exists(file_path: str) -> bool:
+    """Indica si el archivo existe en este nodo o en el almacenamiento remoto."""
+    if os.path.isfile(file_path):
+        return True
+    storage = get_storage()
+    key = storage_key(file_path)
+    return storage.remote and key is not None and storage.exists(key)
+
+
+def stored_file_response(file_path: str, **kwargs) -> Response | None:
+    """Respuesta para un archivo protegido guardado en el almacenamiento remoto.
+
+    Redirige a una URL firmada o transmite el objeto desde el bucket. Devuelve
+    ``None`` cuando el archivo debe servirse desde el disco local: sin
+    almacenamiento remoto, sin URLs firmadas y con copia local, o fuera del
+    directorio de archivos de usuario.
+    """
+    storage = get_storage()
+    key = storage_key(file_path)
+    if not storage.remote or key is None:
+        return None
+
+    as_attachment = kwargs.get("as_attachment", False)
+    filename = kwargs.get("download_name") or os.path.basename(file_path)
+    mimetype = kwargs.get("mimetype") or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    url = storage.url(key, filename=filename, as_attachment=as_attachment, mimetype=mimetype)
+    if url:
+        response = redirect(url, 302)
+        # The signature expires, the redirect must not outlive it.
+        response.cache_control.no_store = True
+        return response
+    if os.path.isfile(file_path):
+        return None
+
+    body, size = storage.open(key)
+    response = current_app.response_class(wrap_file(request.environ, body), mimetype=mimetype, direct_passthrough=True)
+    response.content_length = size
+    if as_attachment:
+        response.headers["Content-Disposition"] = content_disposition(filename)
+    return response
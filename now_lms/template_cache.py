@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""
+NOW Learning Management System.
+
+Caché de bytecode de las plantillas Jinja.
+
+Cada worker nuevo de Gunicorn compila las plantillas la primera vez que las usa:
+las de los módulos, las variantes de cada tema y las macros de ``themes``. Con
+la caché de bytecode el resultado de esa compilación se comparte entre workers y
+reinicios, en el directorio de caché del usuario (``~/.cache/NOW-LMS/templates``
+por defecto, o ``NOW_LMS_TEMPLATE_CACHE_DIR``) o en el Redis configurado. Jinja compara la suma de verificación del código fuente al leer la
+caché, así que editar una plantilla o un tema no deja bytecode obsoleto.
+
+``lmsctl templates precompile`` compila todas las plantillas durante el
+despliegue para que ningún usuario pague la primera compilación.
+"""
+
+from __future__ import annotations
+
+# ---------------------------------------------------------------------------------------
+# Standard library
+# ---------------------------------------------------------------------------------------
+import os
+from typing import Any
+
+# ---------------------------------------------------------------------------------------
+# Third-party libraries
+# ---------------------------------------------------------------------------------------
+from flask import Flask
+from jinja2 import BytecodeCache, FileSystemBytecodeCache
+from jinja2.bccache import Bucket
+
+# ---------------------------------------------------------------------------------------
+# Local resources
+# ---------------------------------------------------------------------------------------
+from now_lms.logs import log
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+TEMPLATE_CACHE_EXTENSION = "now_lms_template_cache"
+TEMPLATE_CACHE_MODES = ("auto", "filesystem", "redis", "off")
+REDIS_KEY_PREFIX = "now_lms:jinja:"
+TEMPLATE_EXTENSIONS = ("html", "j2")
+
+
+class RedisBytecodeCache(BytecodeCache):
+    """Bytecode guardado en Redis, compartido por todos los nodos de la aplicación.
+
+    Si Redis no responde las plantillas se compilan como si no hubiera caché.
+    """
+
+    def __init__(self, client: Any, prefix: str = REDIS_KEY_PREFIX, timeout: int | None = None):
+        """Cliente de ``redis`` ya configurado."""
+        self.client = client
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        """Carga el bytecode de la plantilla, si existe."""
+        try:
+            data = self.client.get(self.prefix + bucket.key)
+        except Exception as e:
+            log.debug(f"Template bytecode cache unavailable: {e}")
+            return
+        if data:
+            bucket.bytecode_from_string(data)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        """Guarda el bytecode recién compilado."""
+        try:
+            self.client.set(self.prefix + bucket.key, bucket.bytecode_to_string(), ex=self.timeout)
+        except Exception as e:
+            log.debug(f"Template bytecode cache unavailable: {e}")
+
+    def clear(self) -> None:
+        """Elimina todo el bytecode guardado con el prefijo."""
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+def _redis_url() -> str | None:
+    return os.environ.get("CACHE_REDIS_URL") or os.environ.get("REDIS_URL")
+
+
+def create_bytecode_cache(config: dict) -> BytecodeCache | None:
+    """Crea la caché indicada por ``TEMPLATE_CACHE``, o ``None`` si está desactivada."""
+    mode = config.get("TEMPLATE_CACHE", "auto")
+    if mode == "off":
+        return None
+
+    redis_url = _redis_url()
+    if mode in ("auto", "redis") and redis_url and redis is not None:
+        return RedisBytecodeCache(redis.from_url(redis_url))
+    if mode == "redis":
+        log.warning("NOW_LMS_TEMPLATE_CACHE=redis requires REDIS_URL and the redis library, using the filesystem.")
+
+    directory = config.get("TEMPLATE_CACHE_DIR")
+    if not directory:
+        return None
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        log.warning(f"Cannot create template cache directory {directory}: {e}")
+        return None
+    return FileSystemBytecodeCache(directory)
+
+
+def init_template_cache(app: Flask) -> None:
+    """Conecta la caché de bytecode al entorno Jinja de la aplicación."""
+    if app.config.get("TESTING"):
+        return
+    bytecode_cache = create_bytecode_cache(app.config)
+    app.jinja_env.bytecode_cache = bytecode_cache
+    app.extensions[TEMPLATE_CACHE_EXTENSION] = bytecode_cache
+    if bytecode_cache is not None:
+        log.info(f"Template bytecode cache: {type(bytecode_cache).__name__}")
+
+
+def precompile_templates(app: Flask) -> dict[str, int]:
+    """Compila todas las plantillas para llenar la caché de bytecode."""
+    stats = {"templates": 0, "failed": 0}
+    env = app.jinja_env
+    for name in env.list_templates(extensions=TEMPLATE_EXTENSIONS):
+        try:
+            env.get_template(name)
+        except Exception as e:
+            log.warning(f"Could not compile template {name}: {e}")
+            stats["failed"] += 1
+            continue
+        stats["templates"] += 1
+    return stats
@@ -7,19 +7,25 @@ from __future__ import annotations
 # ---------------------------------------------------------------------------------------
 # Standard library
 # ---------------------------------------------------------------------------------------
+import mimetypes
+from os import path
 from pathlib import Path
+from urllib.parse import quote
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
 # ---------------------------------------------------------------------------------------
-from flask import flash
+from flask import abort, current_app, flash, send_from_directory
 from sqlalchemy.exc import OperationalError
+from werkzeug.security import safe_join
+from werkzeug.wrappers import Response
 
 # ---------------------------------------------------------------------------------------
 # Local resources
 # ---------------------------------------------------------------------------------------
-from now_lms.config import DIRECTORIO_ARCHIVOS_PUBLICOS
+from now_lms.config import DIRECTORIO_ARCHIVOS_PUBLICOS, DIRECTORIO_BASE_ARCHIVOS_USUARIO
 from now_lms.i18n import _
+from now_lms.storage import stored_file_response
 
 IMAGES_PATH = "/images/"
 
@@ -41,6 +47,48 @@ def safe_commit() -> bool:
         return False
 
 
+def send_protected_file(directory: str, filename: str, **kwargs) -> Response:
+    """Send a file after the access check, letting the front proxy stream it when configured.
+
+    With ``FILE_OFFLOAD`` set to ``x-accel`` the response carries an
+    ``X-Accel-Redirect`` URI below ``FILE_OFFLOAD_PREFIX`` that maps to the user
+    files directory; with ``x-sendfile`` it carries the absolute path. Otherwise,
+    or for files outside the user files directory, it behaves as ``send_from_directory``.
+    With an object storage backend the file is served from the bucket instead.
+    """
+    file_path = safe_join(str(directory), filename)
+    if file_path is None:
+        abort(404)
+    if (response := stored_file_response(file_path, **kwargs)) is not None:
+        return response
+
+    mode = current_app.config.get("FILE_OFFLOAD")
+    if not mode:
+        return send_from_directory(directory, filename, **kwargs)
+
+    if not path.isfile(file_path):
+        abort(404)
+    file_path = path.realpath(file_path)
+    base = path.realpath(DIRECTORIO_BASE_ARCHIVOS_USUARIO)
+    if not file_path.startswith(base + path.sep):
+        return send_from_directory(directory, filename, **kwargs)
+
+    response = current_app.response_class(
+        mimetype=kwargs.get("mimetype") or mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    )
+    if mode == "x-accel":
+        relpath = Path(file_path).relative_to(base).as_posix()
+        prefix = current_app.config.get("FILE_OFFLOAD_PREFIX") or "/_protected/"
+        response.headers["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(relpath)
+    else:
+        response.headers["X-Sendfile"] = file_path
+    if kwargs.get("as_attachment"):
+        response.headers.set(
+            "Content-Disposition", "attachment", filename=kwargs.get("download_name") or path.basename(file_path)
+        )
+    return response
+
+
 def get_current_course_logo(course_code: str) -> str | None:
     """Return the name of the logo file for the current course."""
     course_dir = Path(str(str(DIRECTORIO_ARCHIVOS_PUBLICOS) + IMAGES_PATH + course_code))
@@ -29,8 +29,10 @@ from now_lms.auth import perfil_requerido
 from now_lms.cache import cache, cache_key_with_auth_state, cache_key_with_query_string
 from now_lms.config import DIRECTORIO_PLANTILLAS, images
 from now_lms.db import MAXIMO_RESULTADOS_EN_CONSULTA_PAGINADA, BlogComment, BlogPost, BlogTag, database, select
+from now_lms.db.replicas import read_replica
 from now_lms.forms import BlogCommentForm, BlogPostForm, BlogTagForm
 from now_lms.i18n import _
+from now_lms.image_derivatives import schedule_derivatives
 from now_lms.logs import log
 
 # Route constants
@@ -72,6 +74,7 @@ def ensure_unique_slug(title: str, post_id: int | None = None) -> str:
 # Public blog routes
 @blog.route("/blog", methods=["GET"])
 @cache.cached(timeout=60, key_prefix=cache_key_with_query_string)  # type: ignore[arg-type]
+@read_replica
 def blog_index() -> str:
     """Public blog index page."""
     page = request.args.get("page", 1, type=int)
@@ -255,6 +258,7 @@ def _handle_cover_image_upload(form: BlogPostForm, post: BlogPost) -> None:
             post.cover_image = True
             post.cover_image_ext = cover_ext
             log.info("Blog post cover image saved")
+            schedule_derivatives(images.path(picture_file))
         else:
             log.warning("Blog post cover image not saved")
     except UploadNotAllowed:
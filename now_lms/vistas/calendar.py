@@ -10,19 +10,30 @@ import calendar as cal
 # ---------------------------------------------------------------------------------------
 # Standard library
 # ---------------------------------------------------------------------------------------
-from datetime import datetime, timedelta
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from typing import NamedTuple
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
 # ---------------------------------------------------------------------------------------
-from flask import Blueprint, Response, abort, render_template, request
+from flask import Blueprint, Response, abort, render_template, request, stream_with_context
 from flask_login import current_user, login_required
+from sqlalchemy import func
 
 # ---------------------------------------------------------------------------------------
 # Local resources
 # ---------------------------------------------------------------------------------------
+from now_lms.cache import cache
 from now_lms.config import DIRECTORIO_PLANTILLAS
-from now_lms.db import UserEvent, database
+from now_lms.db import CursoRecurso, CursoSeccion, Evaluation, UserEvent, database
+from now_lms.db.tools import (
+    verifica_docente_asignado_a_curso,
+    verifica_estudiante_asignado_a_curso,
+    verifica_moderador_asignado_a_curso,
+)
+from now_lms.i18n import _
 
 ICS_DATETIME_FORMAT_UTC = "%Y%m%dT%H%M%SZ"
 
@@ -111,36 +122,222 @@ def event_detail(event_id: int) -> str:
     return render_template("calendar/event_detail.html", event=event)
 
 
+# ---------------------------------------------------------------------------------------
+# Feeds ICS
+# ---------------------------------------------------------------------------------------
+# Calendar clients poll these feeds every few minutes. Each feed has a version derived
+# from the rows it is built from (row count plus newest creation/modification time), which
+# becomes a strong ETag; a client that already has that version gets a 304 without the
+# events being loaded. Deleting events does not advance the newest timestamp, so the
+# Last-Modified of a version is remembered in the cache and moved forward when the version
+# changes without a newer row; If-Modified-Since is only honoured for a remembered version.
+# Per-user feeds are streamed; the per-course feed is identical for every member of the
+# course, so its body is built once per version and kept in the shared cache.
+ICS_CACHE_CONTROL = "private, no-cache"
+ICS_COURSE_FEED_TIMEOUT = 3600
+ICS_FEED_VERSION_TIMEOUT = 30 * 24 * 3600
+
+
+class IcsEntry(NamedTuple):
+    """Event of a feed that is not backed by a `UserEvent` row."""
+
+    id: str
+    title: str
+    description: str | None
+    start_time: datetime
+    end_time: datetime | None
+    timezone: str | None
+    timestamp: datetime
+    status: str
+
+
+class FeedVersion(NamedTuple):
+    """Validators of a feed; `known` is False the first time a version is served."""
+
+    etag: str
+    last_modified: datetime | None
+    known: bool
+
+
+def _feed_version(scope: str, count: int, *timestamps: datetime | None) -> FeedVersion:
+    """Return the validators of a feed."""
+    known = [ts for ts in timestamps if ts is not None]
+    newest = max(known) if known else None
+    if newest is not None and newest.tzinfo is None:
+        newest = newest.replace(tzinfo=timezone.utc)
+    stamp = newest.isoformat() if newest else "-"
+    etag = sha256(f"{scope}:{count}:{stamp}".encode("utf-8")).hexdigest()[:32]
+
+    cache_key = f"ics/version/{scope}"
+    previous = cache.get(cache_key)
+    if previous is not None and previous[0] == etag:
+        return FeedVersion(etag, previous[1], True)
+    last_modified = newest
+    if previous is not None and previous[1] is not None and (newest is None or newest <= previous[1]):
+        # Same or older newest row with a different count: events were deleted.
+        last_modified = max(datetime.now(timezone.utc).replace(microsecond=0), previous[1] + timedelta(seconds=1))
+    cache.set(cache_key, (etag, last_modified), timeout=ICS_FEED_VERSION_TIMEOUT)
+    return FeedVersion(etag, last_modified, False)
+
+
+def _is_not_modified(version: FeedVersion) -> bool:
+    """Check the conditional request headers against the feed version."""
+    if request.if_none_match:
+        return request.if_none_match.contains(version.etag)
+    if version.known and version.last_modified is not None and request.if_modified_since is not None:
+        return version.last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def _ics_response(body, version: FeedVersion, filename: str) -> Response:
+    """Build a feed response; `body` is a string, an iterable or a callable producing one."""
+    if _is_not_modified(version):
+        response = Response(status=304)
+    else:
+        if callable(body):
+            body = body()
+        response = Response(
+            body,
+            mimetype="text/calendar",
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+    response.set_etag(version.etag)
+    if version.last_modified is not None:
+        response.last_modified = version.last_modified
+    response.headers["Cache-Control"] = ICS_CACHE_CONTROL
+    return response
+
+
 @calendar.route("/user/calendar/export.ics", methods=["GET"])
 @login_required
 def export_ics() -> Response:
     """Export user's calendar events as ICS file."""
     # Get all future events for the user
     now = datetime.now()
-    events = (
-        database.session.execute(
-            database.select(UserEvent)
-            .filter(UserEvent.user_id == current_user.usuario)
-            .filter(UserEvent.start_time >= now)
-            .order_by(UserEvent.start_time)
+    user_id = current_user.usuario
+    upcoming = (UserEvent.user_id == user_id, UserEvent.start_time >= now)
+
+    count, created, modified = database.session.execute(
+        database.select(func.count(UserEvent.id), func.max(UserEvent.timestamp), func.max(UserEvent.modificado)).filter(
+            *upcoming
         )
-        .scalars()
-        .all()
+    ).one()
+    version = _feed_version(f"user:{user_id}", count, created, modified)
+
+    def _stream():
+        events = database.session.execute(
+            database.select(UserEvent).filter(*upcoming).order_by(UserEvent.start_time).execution_options(yield_per=200)
+        ).scalars()
+        return stream_with_context(_iter_ics_content(events))
+
+    return _ics_response(_stream, version, f"calendar-{user_id}.ics")
+
+
+def _puede_ver_calendario_curso(course_code: str) -> bool:
+    """Members of a course (and admins) can subscribe to its shared feed."""
+    if current_user.tipo == "admin":
+        return True
+    return (
+        verifica_estudiante_asignado_a_curso(course_code)
+        or verifica_docente_asignado_a_curso(course_code)
+        or verifica_moderador_asignado_a_curso(course_code)
     )
 
-    # Generate ICS content
-    ics_content = _generate_ics_content(events)
 
-    return Response(
-        ics_content,
-        mimetype="text/calendar",
-        headers={"Content-Disposition": f"attachment; filename=calendar-{current_user.usuario}.ics"},
+def _course_feed_entries(course_code: str) -> Iterator[IcsEntry]:
+    """Meet sessions and evaluation deadlines of a course, in date order."""
+    from now_lms.calendar_utils import _combine_date_time, _get_app_timezone
+
+    app_timezone = _get_app_timezone()
+    entries: list[IcsEntry] = []
+
+    meets = database.session.execute(
+        database.select(CursoRecurso)
+        .filter(CursoRecurso.curso == course_code)
+        .filter(CursoRecurso.tipo == "meet")
+        .filter(CursoRecurso.fecha.is_not(None))
+    ).scalars()
+    for resource in meets:
+        entries.append(
+            IcsEntry(
+                id=resource.id,
+                title=resource.nombre,
+                description=resource.descripcion,
+                start_time=_combine_date_time(resource.fecha, resource.hora_inicio),
+                end_time=_combine_date_time(resource.fecha, resource.hora_fin) if resource.hora_fin else None,
+                timezone=app_timezone,
+                timestamp=resource.timestamp,
+                status="pending",
+            )
+        )
+
+    evaluations = database.session.execute(
+        database.select(Evaluation)
+        .join(Evaluation.section)
+        .filter(CursoSeccion.curso == course_code)
+        .filter(Evaluation.available_until.is_not(None))
+    ).scalars()
+    for evaluation in evaluations:
+        entries.append(
+            IcsEntry(
+                id=evaluation.id,
+                title=_("Fecha límite: {title}").format(title=evaluation.title),
+                description=evaluation.description,
+                start_time=evaluation.available_until,
+                end_time=None,
+                timezone=app_timezone,
+                timestamp=evaluation.timestamp,
+                status="pending",
+            )
+        )
+
+    return iter(sorted(entries, key=lambda entry: entry.start_time))
+
+
+@calendar.route("/course/<course_code>/calendar.ics", methods=["GET"])
+@login_required
+def export_course_ics(course_code: str) -> Response:
+    """Shared ICS feed with the live sessions and deadlines of a course."""
+    if not _puede_ver_calendario_curso(course_code):
+        abort(403)
+
+    meet_count, meet_created, meet_modified = database.session.execute(
+        database.select(func.count(CursoRecurso.id), func.max(CursoRecurso.timestamp), func.max(CursoRecurso.modificado))
+        .filter(CursoRecurso.curso == course_code)
+        .filter(CursoRecurso.tipo == "meet")
+        .filter(CursoRecurso.fecha.is_not(None))
+    ).one()
+    eval_count, eval_created, eval_modified = database.session.execute(
+        database.select(func.count(Evaluation.id), func.max(Evaluation.timestamp), func.max(Evaluation.modificado))
+        .join(Evaluation.section)
+        .filter(CursoSeccion.curso == course_code)
+        .filter(Evaluation.available_until.is_not(None))
+    ).one()
+    version = _feed_version(
+        f"course:{course_code}", meet_count + eval_count, meet_created, meet_modified, eval_created, eval_modified
     )
 
+    def _body() -> str:
+        cache_key = f"ics/course/{course_code}/{version.etag}"
+        content = cache.get(cache_key)
+        if content is None:
+            content = "".join(_iter_ics_content(_course_feed_entries(course_code)))
+            cache.set(cache_key, content, timeout=ICS_COURSE_FEED_TIMEOUT)
+        return content
+
+    return _ics_response(_body, version, f"calendar-{course_code}.ics")
+
 
 def _generate_ics_content(events) -> str:
     """Generate ICS calendar content from events."""
-    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//NOW LMS//Calendar//EN", "CALSCALE:GREGORIAN", "METHOD:PUBLISH"]
+    return "".join(_iter_ics_content(events))
+
+
+def _iter_ics_content(events) -> Iterator[str]:
+    """Yield the ICS document one CRLF-terminated line group at a time."""
+    yield "\r\n".join(
+        ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//NOW LMS//Calendar//EN", "CALSCALE:GREGORIAN", "METHOD:PUBLISH"]
+    ) + "\r\n"
 
     for event in events:
         # Convert to UTC for ICS format if timezone is specified
@@ -155,9 +352,9 @@ def _generate_ics_content(events) -> str:
                 local_tz = ZoneInfo(event.timezone)
 
                 if start_time.tzinfo is None:
-                    start_time = start_time.replace(tzinfo=local_tz).astimezone(datetime.timezone.utc)
+                    start_time = start_time.replace(tzinfo=local_tz).astimezone(timezone.utc)
                 if end_time.tzinfo is None:
-                    end_time = end_time.replace(tzinfo=local_tz).astimezone(datetime.timezone.utc)
+                    end_time = end_time.replace(tzinfo=local_tz).astimezone(timezone.utc)
             except KeyError:
                 pass
 
@@ -171,7 +368,7 @@ def _generate_ics_content(events) -> str:
         title = _escape_ics_text(event.title)
         description = _escape_ics_text(event.description or "")
 
-        lines.extend(
+        yield "\r\n".join(
             [
                 "BEGIN:VEVENT",
                 f"UID:{event.id}@nowlms.local",
@@ -183,10 +380,9 @@ def _generate_ics_content(events) -> str:
                 f'STATUS:{"CONFIRMED" if event.status == "confirmed" else "TENTATIVE"}',
                 "END:VEVENT",
             ]
-        )
+        ) + "\r\n"
 
-    lines.append("END:VCALENDAR")
-    return "\r\n".join(lines)
+    yield "END:VCALENDAR\r\n"
 
 
 def _escape_ics_text(text: str | None) -> str:
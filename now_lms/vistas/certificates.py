@@ -12,6 +12,9 @@ from __future__ import annotations
 # ---------------------------------------------------------------------------------------
 # Standard library
 # ---------------------------------------------------------------------------------------
+from base64 import b64encode
+from functools import lru_cache
+from hashlib import sha256
 from io import BytesIO
 from typing import Any
 
@@ -243,25 +246,83 @@ def certificate_inspect(ulid: str) -> str:
     return insert_style_in_html(consulta)
 
 
-@certificate.route("/certificate/get_as_qr/<cert_id>/", methods=["GET"])
-def certificacion_qr(cert_id: str) -> Response:
-    """Generate QR code for certificate verification."""
-    import qrcode
+# ---------------------------------------------------------------------------------------
+# Códigos QR de verificación
+# ---------------------------------------------------------------------------------------
+# The URL encoded in a verification QR never changes for a given certification, so the
+# image is generated once per process and served with a strong validator. Browsers and
+# proxies keep it for a year; a revalidation that matches the ETag is answered with a 304
+# without touching qrcode at all.
+QR_CACHE_CONTROL = "public, max-age=31536000, immutable"
+QR_BOX_SIZE = 4
+
+
+def _qr_verification_url(path: str) -> str:
+    """Return the absolute URL encoded in a certificate QR."""
+    return request.url_root + path
+
 
-    base_url = request.url_root
-    url = base_url + "/certificate/view/" + cert_id
-    qr = qrcode.make(url, box_size=4)
+def _qr_etag(url: str) -> str:
+    """Strong ETag for the QR of `url`; depends only on the encoded data."""
+    return sha256(f"{QR_BOX_SIZE}:{url}".encode("utf-8")).hexdigest()[:32]
+
+
+@lru_cache(maxsize=512)
+def _qr_png(url: str) -> bytes:
+    """Render the QR for `url` as PNG bytes, memoized per process."""
+    import qrcode
 
     buffer = BytesIO()
-    qr.save(buffer, format="PNG")
-    buffer.seek(0)
+    qrcode.make(url, box_size=QR_BOX_SIZE).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def qr_data_uri(path: str) -> str:
+    """Return the QR for `path` as a ``data:`` URI, for renders that cannot fetch back into the app."""
+    return "data:image/png;base64," + b64encode(_qr_png(_qr_verification_url(path))).decode("ascii")
+
+
+def _qr_response(path: str, filename: str) -> Response:
+    """Serve a cacheable QR image, answering conditional requests without rendering."""
+    url = _qr_verification_url(path)
+    etag = _qr_etag(url)
+
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = make_response(_qr_png(url))
+        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+        response.mimetype = "image/png"
 
-    response = make_response(buffer.getvalue())
-    response.headers["Content-Disposition"] = "attachment; filename=QR.png"
-    response.mimetype = "image/png"
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = QR_CACHE_CONTROL
     return response
 
 
+def _pdf_url_for(endpoint: str, **values: Any) -> str:
+    """`url_for` for PDF renders: verification QRs are inlined as data URIs.
+
+    WeasyPrint fetches every ``<img>`` over HTTP, which for the QR means a request back
+    into the same application while a worker is busy rendering the PDF. Certificate
+    templates are stored in the database and call ``url_for`` directly, so the swap is
+    done here rather than in each template.
+    """
+    from flask import current_app
+
+    if current_app.config.get("CERTIFICATE_QR_INLINE", True):
+        if endpoint == "certificate.certificacion_qr" and "cert_id" in values:
+            return qr_data_uri("/certificate/view/" + values["cert_id"])
+        if endpoint == "certificate.certificacion_programa_qr" and "certificate_id" in values:
+            return qr_data_uri("/certificate/program/view/" + values["certificate_id"])
+    return url_for(endpoint, **values)
+
+
+@certificate.route("/certificate/get_as_qr/<cert_id>/", methods=["GET"])
+def certificacion_qr(cert_id: str) -> Response:
+    """Generate QR code for certificate verification."""
+    return _qr_response("/certificate/view/" + cert_id, "QR.png")
+
+
 @certificate.route("/certificate/certificate/<ulid>/", methods=["GET"])
 def certificacion(ulid: str) -> str | Response:
     """Render a certificate based on certification ULID."""
@@ -341,7 +402,7 @@ def certificate_serve_pdf(ulid: str) -> Response:
         "usuario": CertificateHolder(usuario),
         "certificacion": certificacion_obj,
         "certificado": certificado_obj,
-        "url_for": url_for,
+        "url_for": _pdf_url_for,
         "content_type": content_type,
         "_": _,
     }
@@ -559,20 +620,7 @@ def certificacion_generar() -> str | Response:
 @certificate.route("/certificate/program/get_as_qr/<certificate_id>/", methods=["GET"])
 def certificacion_programa_qr(certificate_id: str) -> Response:
     """Generate QR code for program certificate verification."""
-    import qrcode
-
-    base_url = request.url_root
-    url = base_url + "/certificate/program/view/" + certificate_id
-    qr = qrcode.make(url, box_size=4)
-
-    buffer = BytesIO()
-    qr.save(buffer, format="PNG")
-    buffer.seek(0)
-
-    response = make_response(buffer.getvalue())
-    response.headers["Content-Disposition"] = "attachment; filename=QR_programa.png"
-    response.mimetype = "image/png"
-    return response
+    return _qr_response("/certificate/program/view/" + certificate_id, "QR_programa.png")
 
 
 class FakeCurso:
@@ -747,7 +795,7 @@ def certificate_programa_serve_pdf(ulid: str) -> Any:
         "certificacion_programa": certificacion_programa_obj,
         "certificado": certificado_obj,
         "programa": programa,
-        "url_for": url_for,
+        "url_for": _pdf_url_for,
         "database": db_ctx,  # For accessing Curso model in template
         "_": _,
     }
@@ -60,6 +60,7 @@ from now_lms.db import (
     database,
     select,
 )
+from now_lms.db.replicas import read_replica
 from now_lms.db.tools import (
     generate_category_choices,
     generate_tag_choices,
@@ -72,6 +73,7 @@ from now_lms.forms import (
     CursoSeccionForm,
 )
 from now_lms.i18n import _
+from now_lms.image_derivatives import schedule_derivatives
 from now_lms.logs import log
 from now_lms.misc import CURSO_NIVEL, TIPOS_RECURSOS
 from now_lms.cache import invalidar_cache_curso
@@ -166,6 +168,7 @@ def _save_course_logo(curso_) -> None:
             curso_.portada_ext = logo_ext
             database.session.commit()
             log.info("Course Logo saved")
+            schedule_derivatives(images.path(picture_file))
         else:
             curso_.portada = False
             database.session.commit()
@@ -564,6 +567,7 @@ def course_index() -> Response:
 
 @course.route("/course/explore", methods=["GET"])
 @cache.cached(key_prefix=cache_key_with_auth_state)  # type: ignore[arg-type]
+@read_replica
 def lista_cursos() -> str:
     """Lista de cursos."""
     max_count = 3 if DESARROLLO else 30
@@ -653,7 +657,7 @@ def _persist_admin_enrollment(course_code: str, curso, student, bypass_payment:
     )
     database.session.add(enrollment)
     database.session.commit()
-    _crear_indice_avance_curso(course_code)
+    _crear_indice_avance_curso(course_code, usuario=student.usuario)
     create_events_for_student_enrollment(student.usuario, course_code)
 
 
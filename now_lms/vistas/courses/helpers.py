@@ -12,7 +12,7 @@ from datetime import datetime, timezone
 from os import makedirs, path
 from os.path import splitext
 import re
-from typing import Any, Sequence
+from typing import Any, Iterable, Sequence
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
@@ -21,7 +21,7 @@ from bleach import clean, linkify
 from flask import flash
 from flask_login import current_user
 from markdown import markdown
-from sqlalchemy import func
+from sqlalchemy import func, insert
 
 # ---------------------------------------------------------------------------------------
 # Local resources
@@ -54,13 +54,12 @@ def _validate_course_code(course_code: str) -> None:
         raise ValueError(f"Invalid course code: {course_code!r}")
 
 
-def validate_downloadable_file(file, max_size_mb: int = 1) -> tuple[bool, str]:
-    """Valida archivo subido para recursos descargables."""
-    if not file or not getattr(file, "filename", None):
+def validate_downloadable_filename(filename: str) -> tuple[bool, str]:
+    """Valida la extensión de un archivo para recursos descargables."""
+    if not filename:
         return False, _("No se ha seleccionado ningún archivo")
 
-    filename = str(file.filename or "").lower()
-    file_ext = splitext(filename)[1].lower()
+    file_ext = splitext(filename.lower())[1]
 
     if file_ext in DANGEROUS_FILE_EXTENSIONS:
         return False, _("Tipo de archivo no permitido por seguridad: {}").format(file_ext)
@@ -68,6 +67,18 @@ def validate_downloadable_file(file, max_size_mb: int = 1) -> tuple[bool, str]:
     if file_ext not in SAFE_FILE_EXTENSIONS:
         return False, _("Tipo de archivo no soportado: {}").format(file_ext)
 
+    return True, ""
+
+
+def validate_downloadable_file(file, max_size_mb: int = 1) -> tuple[bool, str]:
+    """Valida archivo subido para recursos descargables."""
+    if not file or not getattr(file, "filename", None):
+        return False, _("No se ha seleccionado ningún archivo")
+
+    is_valid, error_msg = validate_downloadable_filename(str(file.filename or ""))
+    if not is_valid:
+        return False, error_msg
+
     # Calcular tamaño en bytes
     try:
         file.seek(0, 2)
@@ -174,33 +185,60 @@ def _get_user_resource_progress(curso_id: str, usuario: str | None = None) -> di
     return {p.recurso: {"completado": p.completado} for p in progress_data}
 
 
-def _crear_indice_avance_curso(course_code: str) -> None:
-    """Crea el índice de avance del curso para el usuario actual."""
-    recursos = (
+def _crear_indice_avance_curso(course_code: str, usuario: str | None = None) -> None:
+    """Crea el índice de avance del curso para el usuario indicado o el usuario actual."""
+    if _sembrar_avance_cursos(usuario or current_user.usuario, [course_code]):
+        database.session.commit()
+
+
+def _sembrar_avance_cursos(usuario: str, course_codes: Sequence[str]) -> int:
+    """Agrega las filas de avance faltantes de un usuario en varios cursos; no confirma la transacción."""
+    return _sembrar_avance_inscripciones([(usuario, course_code) for course_code in course_codes])
+
+
+def _sembrar_avance_inscripciones(inscripciones: Iterable[tuple[str, str]]) -> int:
+    """Agrega las filas de avance faltantes para pares (usuario, curso).
+
+    Usa una consulta para los recursos, otra para el avance existente y una sola
+    inserción masiva; no confirma la transacción. Devuelve el número de filas creadas.
+    """
+    cursos_por_usuario: dict[str, set[str]] = {}
+    for usuario, course_code in inscripciones:
+        cursos_por_usuario.setdefault(usuario, set()).add(course_code)
+    if not cursos_por_usuario:
+        return 0
+    course_codes = set().union(*cursos_por_usuario.values())
+
+    recursos = database.session.execute(
+        database.select(CursoRecurso.id, CursoRecurso.curso, CursoRecurso.requerido)
+        .filter(CursoRecurso.curso.in_(course_codes))
+        .order_by(CursoRecurso.curso, CursoRecurso.indice)
+    ).all()
+    if not recursos:
+        return 0
+
+    existentes = set(
         database.session.execute(
-            database.select(CursoRecurso).filter(CursoRecurso.curso == course_code).order_by(CursoRecurso.indice)
-        )
-        .scalars()
-        .all()
-    )
-    usuario = current_user.usuario
-
-    if recursos:
-        for recurso in recursos:
-            existing = database.session.execute(
-                database.select(CursoRecursoAvance).filter_by(usuario=usuario, curso=course_code, recurso=recurso.id)
-            ).scalar_one_or_none()
-            if existing:
-                continue
-            avance = CursoRecursoAvance(
-                usuario=usuario,
-                curso=course_code,
-                recurso=recurso.id,
-                completado=False,
-                requerido=recurso.requerido,
+            database.select(CursoRecursoAvance.usuario, CursoRecursoAvance.recurso).filter(
+                CursoRecursoAvance.usuario.in_(cursos_por_usuario), CursoRecursoAvance.curso.in_(course_codes)
             )
-            database.session.add(avance)
-        database.session.commit()
+        ).tuples()
+    )
+    filas = [
+        {
+            "usuario": usuario,
+            "curso": recurso.curso,
+            "recurso": recurso.id,
+            "completado": False,
+            "requerido": recurso.requerido,
+        }
+        for usuario, cursos in cursos_por_usuario.items()
+        for recurso in recursos
+        if recurso.curso in cursos and (usuario, recurso.id) not in existentes
+    ]
+    if filas:
+        database.session.execute(insert(CursoRecursoAvance), filas)
+    return len(filas)
 
 
 def _emitir_certificado(curso_id: str, usuario: str, plantilla: str) -> None:
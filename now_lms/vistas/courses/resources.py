@@ -15,10 +15,12 @@ from __future__ import annotations
 # ---------------------------------------------------------------------------------------
 # Standard library
 # ---------------------------------------------------------------------------------------
+import mimetypes
 from datetime import datetime, timedelta, timezone
+from hashlib import sha256
 from os import listdir, path, remove, stat
 from os.path import splitext
-from typing import Any, Sequence
+from typing import Any, Callable, Sequence
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
@@ -28,10 +30,10 @@ from flask import (
     abort,
     current_app,
     flash,
+    jsonify,
     redirect,
     render_template,
     request,
-    send_from_directory,
     url_for,
 )
 from flask_login import current_user, login_required
@@ -39,6 +41,7 @@ from flask_uploads import UploadNotAllowed
 from sqlalchemy import func
 from sqlalchemy.exc import OperationalError
 from ulid import ULID
+from werkzeug.exceptions import HTTPException
 from werkzeug.wrappers import Response
 
 # ---------------------------------------------------------------------------------------
@@ -65,11 +68,13 @@ from now_lms.db import (
     database,
     select,
 )
+from now_lms.db.replicas import read_replica
 from now_lms.db.tools import (
     crear_indice_recurso,
     verifica_docente_asignado_a_curso,
     verifica_estudiante_asignado_a_curso,
 )
+from now_lms.file_store import deduplicate
 from now_lms.forms import (
     CursoLibraryFileForm,
     CursoRecursoArchivoAudio,
@@ -83,9 +88,23 @@ from now_lms.forms import (
     CursoRecursoVideoYoutube,
     SlideShowForm,
 )
-from now_lms.cache import invalidar_cache_curso
+from now_lms.cache import cache, invalidar_cache_curso
 from now_lms.i18n import _
+from now_lms.logs import log
 from now_lms.misc import INICIO_SESION, sanitize_slide_content
+from now_lms.pdf_previews import load_manifest, load_text, page_filename, preview_dir, schedule_previews
+from now_lms.resumable_uploads import (
+    Upload,
+    UploadError,
+    append_chunk,
+    cancel_upload,
+    create_upload,
+    expire_uploads,
+    finish_upload,
+    load_upload,
+)
+from now_lms.storage import publish, stored_file_exists, unpublish
+from now_lms.vistas._helpers import send_protected_file
 from now_lms.vistas.courses.base import (
     NO_AUTORIZADO_MSG,
     RECURSO_AGREGADO,
@@ -95,6 +114,7 @@ from now_lms.vistas.courses.base import (
 )
 from now_lms.vistas.courses.helpers import (
     validate_downloadable_file,
+    validate_downloadable_filename,
     get_site_config,
     sanitize_filename,
     get_course_library_path,
@@ -115,6 +135,14 @@ MSG_RECURSO_ACTUALIZADO = _("Recurso actualizado correctamente.")
 MSG_RECURSO_ERROR_ACTUALIZAR = _("Hubo un error al actualizar el recurso.")
 TEMPLATE_LIBRARY_UPLOAD = "learning/curso/library_upload.html"
 ICS_DATETIME_FORMAT = "%Y%m%dT%H%M%S"
+# Archivos privados por usuario: el navegador los reutiliza unos minutos, ningún proxy compartido los guarda.
+PRIVATE_FILE_MAX_AGE = 300
+# Un reproductor de audio o visor de PDF pide el mismo archivo en muchos rangos; la
+# decisión de acceso se reutiliza durante ese tiempo en lugar de consultarse en cada petición.
+FILE_ACCESS_TIMEOUT = 300
+TEMPLATE_SLIDES_FRAGMENT = "learning/resources/slides_fragment.html"
+# Incrementar cuando cambie TEMPLATE_SLIDES_FRAGMENT: las presentaciones guardadas se renderizan de nuevo.
+SLIDES_RENDER_VERSION = 1
 
 
 def _read_vtt_content(field_name: str) -> str | None:
@@ -127,6 +155,39 @@ def _read_vtt_content(field_name: str) -> str | None:
     return vtt_file.read().decode("utf-8")
 
 
+def _cached_file_access(scope: str, key: str, check: Callable[[], bool]) -> bool:
+    """Evaluate a file access check once per user and file for ``FILE_ACCESS_TIMEOUT`` seconds.
+
+    Only granted access is cached: a student who enrolls or pays gets the file right away.
+    """
+    cache_key = f"file_access/{current_user.usuario}/{scope}/{key}"
+    if cache.get(cache_key):
+        return True
+    allowed = bool(check())
+    if allowed:
+        cache.set(cache_key, True, timeout=FILE_ACCESS_TIMEOUT)
+    return allowed
+
+
+def _private_file_response(response: Response) -> Response:
+    """Mark a per-user file response as cacheable by the browser only."""
+    response.cache_control.public = False
+    response.cache_control.no_cache = None
+    response.cache_control.private = True
+    response.cache_control.max_age = PRIVATE_FILE_MAX_AGE
+    response.expires = None
+    response.vary.add("Cookie")
+    return response
+
+
+def _vtt_response(content: str, doc: CursoRecurso) -> Response:
+    """Subtitle track with an ETag and Last-Modified so players can revalidate it."""
+    response = Response(content, mimetype="text/vtt", headers={"Content-Type": "text/vtt; charset=utf-8"})
+    response.set_etag(sha256(content.encode("utf-8")).hexdigest()[:32])
+    response.last_modified = doc.modificado or doc.timestamp
+    return _private_file_response(response.make_conditional(request))
+
+
 def _get_html_preformateado(form: Any) -> bool:
     """Get the html_preformateado setting from config and form."""
     config = database.session.execute(database.select(Configuracion)).scalars().first()
@@ -206,6 +267,7 @@ def _resource_completion(course_id: str, resource_id: str) -> bool:
 
 # Visualización y avance de recursos
 @resources.route("/course/<curso_id>/resource/<resource_type>/<codigo>", methods=["GET"])
+@read_replica
 def pagina_recurso(curso_id: str, resource_type: str, codigo: str) -> str:
     CURSO = database.session.execute(select(Curso).filter(Curso.codigo == curso_id)).scalars().first()
     # Filter on the course as well as the resource id: `curso_id` is attacker-controlled,
@@ -767,6 +829,7 @@ def nuevo_recurso_pdf(course_code: str, seccion: str) -> str | Response:
         try:
             database.session.add(nuevo_recurso_)
             database.session.commit()
+            schedule_previews(files.path(pdf_file))
             invalidar_cache_curso(course_code)
             flash(RECURSO_AGREGADO, "success")
             return redirect(url_for(VISTA_ADMINISTRAR_CURSO, course_code=course_code))
@@ -800,6 +863,7 @@ def editar_recurso_pdf(course_code: str, seccion: str, resource_id: str) -> str
 
         recurso.descripcion_html_preformateado = _get_html_preformateado(form)
 
+        pdf_file = None
         if "pdf" in request.files and request.files["pdf"].filename:
             file_name = str(ULID()) + ".pdf"
             pdf_file = files.save(request.files["pdf"], folder=course_code, name=file_name)
@@ -808,6 +872,8 @@ def editar_recurso_pdf(course_code: str, seccion: str, resource_id: str) -> str
 
         try:
             database.session.commit()
+            if pdf_file:
+                schedule_previews(files.path(pdf_file))
             invalidar_cache_curso(course_code)
             flash(MSG_RECURSO_ACTUALIZADO, "success")
             return redirect(url_for(VISTA_ADMINISTRAR_CURSO, course_code=course_code))
@@ -1357,9 +1423,34 @@ def _update_slideshow(slideshow: SlideShowResource, slideshow_id: str, slides: S
                 creado_por=current_user.usuario,
             )
         )
+    database.session.flush()
+    _render_slideshow(slideshow)
     database.session.commit()
 
 
+def _render_slideshow(slideshow: SlideShowResource) -> str:
+    """Render the deck's slides, already sanitized on save, into the stored HTML fragment."""
+    slides = (
+        database.session.execute(select(Slide).filter_by(slide_show_id=slideshow.id).order_by(Slide.order)).scalars().all()
+    )
+    slideshow.rendered_html = render_template(TEMPLATE_SLIDES_FRAGMENT, slides=slides)
+    slideshow.rendered_version = SLIDES_RENDER_VERSION
+    return slideshow.rendered_html
+
+
+def _slideshow_html(slideshow: SlideShowResource) -> str:
+    """Stored HTML of a deck; decks saved before the current renderer are rendered once here."""
+    if slideshow.rendered_html is not None and slideshow.rendered_version == SLIDES_RENDER_VERSION:
+        return slideshow.rendered_html
+    html = _render_slideshow(slideshow)
+    try:
+        database.session.commit()
+    except Exception as e:
+        database.session.rollback()
+        log.warning(f"Could not store the rendered slideshow {slideshow.id}: {e}")
+    return html
+
+
 @resources.route("/course/<course_code>/slideshow/<slideshow_id>/edit", methods=["GET", "POST"])
 @login_required
 @perfil_requerido("instructor")
@@ -1396,11 +1487,7 @@ def preview_slideshow(course_code: str, slideshow_id: str) -> str:
     if not slideshow or slideshow.course_id != course_code:
         abort(404)
 
-    slides = (
-        database.session.execute(select(Slide).filter_by(slide_show_id=slideshow_id).order_by(Slide.order)).scalars().all()
-    )
-
-    return render_template(TEMPLATE_SLIDE_SHOW, slideshow=slideshow, slides=slides)
+    return render_template(TEMPLATE_SLIDE_SHOW, slideshow=slideshow, slides_html=_slideshow_html(slideshow))
 
 
 @resources.route("/course/<course_code>/files/<recurso_code>", methods=["GET"])
@@ -1419,8 +1506,10 @@ def recurso_file(course_code: str, recurso_code: str) -> Response:
         abort(404)
 
     if current_user.is_authenticated:
-        if _resource_is_viewable(course_code, doc):
-            return send_from_directory(config.destination, doc.doc)
+        if _cached_file_access("resource", doc.id, lambda: _resource_is_viewable(course_code, doc)):
+            # Range, If-None-Match and If-Modified-Since are answered by send_from_directory
+            # or, with FILE_OFFLOAD, by the front proxy.
+            return _private_file_response(send_protected_file(config.destination, doc.doc))
         return abort(403)
     return INICIO_SESION
 
@@ -1438,8 +1527,8 @@ def recurso_vtt(course_code: str, recurso_code: str) -> Response:
         return abort(404)
 
     if current_user.is_authenticated:
-        if _resource_is_viewable(course_code, doc):
-            return Response(doc.subtitle_vtt, mimetype="text/vtt", headers={"Content-Type": "text/vtt; charset=utf-8"})
+        if _cached_file_access("resource", doc.id, lambda: _resource_is_viewable(course_code, doc)):
+            return _vtt_response(doc.subtitle_vtt, doc)
         return abort(403)
     return INICIO_SESION
 
@@ -1457,10 +1546,8 @@ def recurso_vtt_secondary(course_code: str, recurso_code: str) -> Response:
         return abort(404)
 
     if current_user.is_authenticated:
-        if _resource_is_viewable(course_code, doc):
-            return Response(
-                doc.subtitle_vtt_secondary, mimetype="text/vtt", headers={"Content-Type": "text/vtt; charset=utf-8"}
-            )
+        if _cached_file_access("resource", doc.id, lambda: _resource_is_viewable(course_code, doc)):
+            return _vtt_response(doc.subtitle_vtt_secondary, doc)
         return abort(403)
     return INICIO_SESION
 
@@ -1479,11 +1566,53 @@ def pdf_viewer(course_code: str, recurso_code: str) -> str | Response:
 
     if current_user.is_authenticated:
         if _resource_is_viewable(course_code, recurso):
-            return render_template("learning/resources/pdf_viewer.html", recurso=recurso)
+            pdf_path = _pdf_path(recurso)
+            preview = load_manifest(pdf_path) if pdf_path else None
+            return render_template("learning/resources/pdf_viewer.html", recurso=recurso, preview=preview)
         return abort(403)
     return INICIO_SESION
 
 
+def _pdf_path(recurso: CursoRecurso) -> str | None:
+    """Local path of a PDF resource, or None if its upload set is unknown."""
+    config = current_app.upload_set_config.get(recurso.base_doc_url)
+    if config is None or not recurso.doc:
+        return None
+    return path.join(config.destination, recurso.doc)
+
+
+def _pdf_preview_resource(course_code: str, recurso_code: str) -> tuple[str, dict]:
+    """Path and preview manifest of a PDF resource the current user may read, or abort."""
+    recurso = database.session.execute(
+        select(CursoRecurso).filter(CursoRecurso.id == recurso_code, CursoRecurso.curso == course_code)
+    ).scalar_one_or_none()
+    if recurso is None or recurso.tipo != "pdf":
+        abort(404)
+    if not _cached_file_access("resource", recurso.id, lambda: _resource_is_viewable(course_code, recurso)):
+        abort(403)
+    pdf_path = _pdf_path(recurso)
+    manifest = load_manifest(pdf_path) if pdf_path else None
+    if manifest is None:
+        abort(404)
+    return pdf_path, manifest
+
+
+@resources.route("/course/<course_code>/pdf_viewer/<recurso_code>/page/<int:page>", methods=["GET"])
+@login_required
+def pdf_page(course_code: str, recurso_code: str, page: int) -> Response:
+    pdf_path, manifest = _pdf_preview_resource(course_code, recurso_code)
+    if not 1 <= page <= len(manifest["pages"]):
+        abort(404)
+    return _private_file_response(send_protected_file(str(preview_dir(pdf_path)), page_filename(page)))
+
+
+@resources.route("/course/<course_code>/pdf_viewer/<recurso_code>/text", methods=["GET"])
+@login_required
+def pdf_text(course_code: str, recurso_code: str) -> Response:
+    pdf_path, _manifest = _pdf_preview_resource(course_code, recurso_code)
+    return _private_file_response(jsonify(pages=load_text(pdf_path)))
+
+
 @resources.route("/course/<course_code>/external_code/<recurso_code>", methods=["GET"])
 def external_code(course_code: str, recurso_code: str) -> str | Response:
     recurso = (
@@ -1511,9 +1640,14 @@ def external_code(course_code: str, recurso_code: str) -> str | Response:
 
 @resources.route("/course/slide_show/<recurso_code>", methods=["GET"])
 def slide_show(recurso_code: str) -> str:
-    recurso = database.session.execute(select(CursoRecurso).filter(CursoRecurso.id == recurso_code)).scalars().first()
-    if not recurso:
+    row = database.session.execute(
+        select(CursoRecurso, SlideShowResource)
+        .outerjoin(SlideShowResource, SlideShowResource.id == CursoRecurso.external_code)
+        .filter(CursoRecurso.id == recurso_code)
+    ).first()
+    if not row:
         abort(404)
+    recurso, slideshow = row
 
     # This route carried no authorization check at all, so it served slideshows from
     # draft, private and paid courses to anonymous visitors. The neighbouring
@@ -1523,15 +1657,10 @@ def slide_show(recurso_code: str) -> str:
     if not _resource_is_viewable(recurso.curso, recurso):
         abort(403)
 
-    if recurso.external_code:
-        slideshow = database.session.get(SlideShowResource, recurso.external_code)
-        if slideshow:
-            slides = (
-                database.session.execute(select(Slide).filter_by(slide_show_id=slideshow.id).order_by(Slide.order))
-                .scalars()
-                .all()
-            )
-            return render_template(TEMPLATE_SLIDE_SHOW, slideshow=slideshow, slides=slides, resource=recurso)
+    if slideshow:
+        return render_template(
+            TEMPLATE_SLIDE_SHOW, slideshow=slideshow, slides_html=_slideshow_html(slideshow), resource=recurso
+        )
 
     legacy_slide = (
         database.session.execute(select(CursoRecursoSlideShow).filter(CursoRecursoSlideShow.recurso == recurso_code))
@@ -1576,7 +1705,8 @@ def course_library(course_code: str) -> str:
     if path.exists(library_path):
         for filename in listdir(library_path):
             file_path = path.join(library_path, filename)
-            if path.isfile(file_path):
+            # Dotfiles are resumable uploads in progress.
+            if path.isfile(file_path) and not filename.startswith("."):
                 physical_files.add(filename)
 
     library_files = []
@@ -1591,7 +1721,8 @@ def course_library(course_code: str) -> str:
                 "modified": file_record.modificado or file_record.timestamp,
                 "url": url_for(".serve_library_file", course_code=course_code, filename=file_record.filename),
                 "has_db_record": True,
-                "file_exists": file_record.filename in physical_files,
+                "file_exists": file_record.filename in physical_files
+                or stored_file_exists(path.join(library_path, file_record.filename)),
             }
         )
 
@@ -1617,10 +1748,9 @@ def course_library(course_code: str) -> str:
     return render_template("learning/curso/library.html", curso=_curso, library_files=library_files)
 
 
-def _store_library_file(course_code: str, uploaded_file: Any, form: Any) -> str:
-    """Persist a validated library upload and its database record."""
-    library_path = ensure_course_library_directory(course_code)
-    sanitized_filename = sanitize_filename(uploaded_file.filename or "")
+def _library_filename(course_code: str, filename: str) -> str:
+    """Sanitize a library file name and reject names already in use."""
+    sanitized_filename = sanitize_filename(filename)
     if not sanitized_filename:
         raise ValueError(_("Nombre de archivo inválido."))
     existing_file = database.session.execute(
@@ -1628,29 +1758,51 @@ def _store_library_file(course_code: str, uploaded_file: Any, form: Any) -> str:
     ).scalar_one_or_none()
     if existing_file:
         raise ValueError(_("Ya existe un archivo con el nombre '{}' en la biblioteca.").format(sanitized_filename))
+    return sanitized_filename
+
+
+def _add_library_record(course_code: str, filename: str, original_filename: str, metadata: dict, size: int, mime_type):
+    """Register a stored library file; the caller removes the file if this fails."""
+    library_file = CourseLibrary(
+        curso=course_code,
+        filename=filename,
+        original_filename=original_filename,
+        nombre=metadata["nombre"],
+        descripcion=metadata["descripcion"],
+        file_size=size,
+        mime_type=mime_type,
+        creado_por=current_user.usuario,
+    )
+    database.session.add(library_file)
+    database.session.commit()
+
+
+def _store_library_file(course_code: str, uploaded_file: Any, form: Any) -> str:
+    """Persist a validated library upload and its database record."""
+    library_path = ensure_course_library_directory(course_code)
+    sanitized_filename = _library_filename(course_code, uploaded_file.filename or "")
 
     destination_path = path.realpath(path.join(library_path, sanitized_filename))
     if not destination_path.startswith(path.realpath(library_path)):
         raise ValueError(_("Ruta de destino inválida."))
     try:
         uploaded_file.save(destination_path)
-        library_file = CourseLibrary(
-            curso=course_code,
-            filename=sanitized_filename,
-            original_filename=uploaded_file.filename or "",
-            nombre=form.nombre.data,
-            descripcion=form.descripcion.data,
-            file_size=uploaded_file.content_length or path.getsize(destination_path),
-            mime_type=uploaded_file.content_type,
-            creado_por=current_user.usuario,
+        deduplicate(destination_path)
+        publish(destination_path)
+        _add_library_record(
+            course_code,
+            sanitized_filename,
+            uploaded_file.filename or "",
+            {"nombre": form.nombre.data, "descripcion": form.descripcion.data},
+            uploaded_file.content_length or path.getsize(destination_path),
+            uploaded_file.content_type,
         )
-        database.session.add(library_file)
-        database.session.commit()
         return sanitized_filename
     except Exception:
         database.session.rollback()
         if path.exists(destination_path):
-            path.remove(destination_path)
+            remove(destination_path)
+            unpublish(destination_path)
         raise
 
 
@@ -1696,6 +1848,225 @@ def upload_library_file(course_code: str) -> str | Response:
     return render_template(TEMPLATE_LIBRARY_UPLOAD, curso=_curso, form=form, max_file_size=site_config.max_file_size)
 
 
+# ---------------------------------------------------------------------------------------
+# Subidas reanudables (ver now_lms/resumable_uploads.py)
+# ---------------------------------------------------------------------------------------
+def _course_upload_allowed(course_code: str):
+    """Abort unless uploads are enabled and the user may manage the course; return the site config."""
+    site_config = get_site_config()
+    if not site_config.enable_file_uploads:
+        abort(403)
+    _curso = database.session.execute(database.select(Curso).filter_by(codigo=course_code)).scalar_one_or_none()
+    if not _curso:
+        abort(404)
+    if current_user.tipo != "admin":
+        instructor_assignment = database.session.execute(
+            database.select(DocenteCurso).filter_by(curso=course_code, usuario=current_user.usuario)
+        ).scalar_one_or_none()
+        if not instructor_assignment:
+            abort(403)
+    return site_config
+
+
+def _upload_error(message: str, status: int, upload: Upload | None = None) -> Response:
+    response = jsonify(error=message, offset=upload.offset if upload else None)
+    response.status_code = status
+    if upload is not None:
+        response.headers["Upload-Offset"] = str(upload.offset)
+    return response
+
+
+def _create_resumable_upload(directory: str, form: Any, max_size_mb: int, location_endpoint: str, **url_values) -> Response:
+    """Validate the form fields and file name, then register a new resumable upload."""
+    if not form.validate_on_submit():
+        return _upload_error("; ".join(str(e) for errors in form.errors.values() for e in errors), 400)
+    filename = request.form.get("filename", "")
+    is_valid, error_msg = validate_downloadable_filename(filename)
+    if not is_valid:
+        return _upload_error(error_msg, 400)
+    size = request.form.get("size", type=int)
+    if size is None:
+        return _upload_error("Missing upload size.", 400)
+
+    expire_uploads(directory)
+    metadata = {name: request.form.get(name) for name in ("nombre", "descripcion", "requerido") if name in request.form}
+    try:
+        upload = create_upload(
+            directory,
+            filename,
+            size,
+            current_user.usuario,
+            max_size=max_size_mb * 1024 * 1024,
+            checksum=request.form.get("checksum") or None,
+            metadata=metadata,
+        )
+    except UploadError as e:
+        if e.status == 413:
+            return _upload_error(_("El archivo es demasiado grande. Máximo permitido: {}MB").format(max_size_mb), 413)
+        return _upload_error(str(e), e.status)
+
+    response = jsonify(id=upload.id, offset=0, size=upload.size)
+    response.status_code = 201
+    response.headers["Location"] = url_for(location_endpoint, upload_id=upload.id, **url_values)
+    return response
+
+
+def _resumable_upload(directory: str, upload_id: str, on_complete: Callable[[Upload, str], Response]) -> Response:
+    """Answer HEAD, PATCH and DELETE for an upload owned by the current user."""
+    upload = load_upload(directory, upload_id)
+    if upload is None or upload.owner != current_user.usuario:
+        abort(404)
+
+    if request.method == "DELETE":
+        cancel_upload(directory, upload.id)
+        return Response(status=204)
+
+    if request.method == "HEAD":
+        response = Response(status=200)
+    else:
+        offset = request.headers.get("Upload-Offset", type=int)
+        if offset is None:
+            return _upload_error("Missing Upload-Offset header.", 400, upload)
+        try:
+            checksum = append_chunk(directory, upload, offset, request.stream)
+            if checksum is not None:
+                return on_complete(upload, checksum)
+        except UploadError as e:
+            return _upload_error(str(e), e.status, upload)
+        response = Response(status=204)
+    response.headers["Upload-Offset"] = str(upload.offset)
+    response.headers["Upload-Length"] = str(upload.size)
+    response.cache_control.no_store = True
+    return response
+
+
+@resources.route("/course/<course_code>/library/uploads", methods=["POST"])
+@login_required
+@perfil_requerido("instructor")
+def create_library_upload(course_code: str) -> Response:
+    site_config = _course_upload_allowed(course_code)
+    try:
+        _library_filename(course_code, request.form.get("filename", ""))
+    except ValueError as e:
+        return _upload_error(str(e), 409)
+    return _create_resumable_upload(
+        ensure_course_library_directory(course_code),
+        CursoLibraryFileForm(),
+        site_config.max_file_size,
+        ".library_upload",
+        course_code=course_code,
+    )
+
+
+@resources.route("/course/<course_code>/library/uploads/<upload_id>", methods=["HEAD", "PATCH", "DELETE"])
+@login_required
+@perfil_requerido("instructor")
+def library_upload(course_code: str, upload_id: str) -> Response:
+    _course_upload_allowed(course_code)
+    library_path = get_course_library_path(course_code)
+
+    def _complete(upload: Upload, checksum: str) -> Response:
+        try:
+            filename = _library_filename(course_code, upload.filename)
+            destination_path = finish_upload(library_path, upload, filename)
+            deduplicate(destination_path)
+            publish(destination_path)
+        except ValueError as e:
+            return _upload_error(str(e), 409, upload)
+        except UploadError as e:
+            return _upload_error(str(e), e.status, upload)
+        try:
+            _add_library_record(
+                course_code,
+                filename,
+                upload.filename,
+                upload.metadata,
+                upload.size,
+                mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            )
+        except Exception:
+            database.session.rollback()
+            remove(destination_path)
+            unpublish(destination_path)
+            raise
+        flash(_("Archivo '{}' subido exitosamente a la biblioteca del curso.").format(filename), "success")
+        response = jsonify(
+            filename=filename, sha256=checksum, redirect=url_for(COURSE_LIBRARY_ENDPOINT, course_code=course_code)
+        )
+        response.status_code = 201
+        return response
+
+    return _resumable_upload(library_path, upload_id, _complete)
+
+
+def _downloadable_directory(course_code: str) -> str:
+    directory = path.realpath(path.join(files.config.destination, course_code))
+    if path.dirname(directory) != path.realpath(files.config.destination):
+        abort(404)
+    return directory
+
+
+@resources.route("/course/<course_code>/<seccion>/descargable/uploads", methods=["POST"])
+@login_required
+@perfil_requerido("instructor")
+def create_downloadable_upload(course_code: str, seccion: str) -> Response:
+    site_config = _course_upload_allowed(course_code)
+    return _create_resumable_upload(
+        _downloadable_directory(course_code),
+        CursoRecursoArchivoDescargable(),
+        site_config.max_file_size,
+        ".downloadable_upload",
+        course_code=course_code,
+        seccion=seccion,
+    )
+
+
+@resources.route("/course/<course_code>/<seccion>/descargable/uploads/<upload_id>", methods=["HEAD", "PATCH", "DELETE"])
+@login_required
+@perfil_requerido("instructor")
+def downloadable_upload(course_code: str, seccion: str, upload_id: str) -> Response:
+    _course_upload_allowed(course_code)
+    directory = _downloadable_directory(course_code)
+
+    def _complete(upload: Upload, checksum: str) -> Response:
+        file_name = str(ULID()) + splitext(upload.filename)[1]
+        try:
+            destination_path = finish_upload(directory, upload, file_name)
+            deduplicate(destination_path)
+            publish(destination_path)
+        except UploadError as e:
+            return _upload_error(str(e), e.status, upload)
+        recursos = database.session.execute(select(func.count(CursoRecurso.id)).filter_by(seccion=seccion)).scalar()
+        try:
+            database.session.add(
+                CursoRecurso(
+                    curso=course_code,
+                    seccion=seccion,
+                    tipo="descargable",
+                    nombre=upload.metadata.get("nombre"),
+                    descripcion=upload.metadata.get("descripcion"),
+                    requerido=upload.metadata.get("requerido"),
+                    indice=int((recursos or 0) + 1),
+                    base_doc_url=files.name,
+                    doc=f"{course_code}/{file_name}",
+                    creado_por=current_user.usuario,
+                )
+            )
+            database.session.commit()
+        except Exception:
+            database.session.rollback()
+            remove(destination_path)
+            unpublish(destination_path)
+            raise
+        invalidar_cache_curso(course_code)
+        flash(RECURSO_AGREGADO, "success")
+        response = jsonify(sha256=checksum, redirect=url_for(VISTA_ADMINISTRAR_CURSO, course_code=course_code))
+        response.status_code = 201
+        return response
+
+    return _resumable_upload(directory, upload_id, _complete)
+
+
 def _library_access(course_code: str) -> bool:
     """Return whether the current user can access a course library."""
     _curso = database.session.execute(database.select(Curso).filter_by(codigo=course_code)).scalar_one_or_none()
@@ -1717,7 +2088,7 @@ def _library_access(course_code: str) -> bool:
 @resources.route("/course/<course_code>/library/file/<filename>", methods=["GET"])
 @login_required
 def serve_library_file(course_code: str, filename: str) -> Response:
-    if not _library_access(course_code):
+    if not _cached_file_access("library", course_code, lambda: _library_access(course_code)):
         abort(403)
 
     safe_filename = path.basename(filename)
@@ -1727,11 +2098,14 @@ def serve_library_file(course_code: str, filename: str) -> Response:
     file_path = path.realpath(path.join(library_path, safe_filename))
     if not file_path.startswith(path.realpath(library_path)):
         abort(403)
-    if not path.exists(file_path) or not path.isfile(file_path):
+    if not stored_file_exists(file_path):
         abort(404)
 
     try:
-        return send_from_directory(library_path, safe_filename, as_attachment=True)
+        return _private_file_response(send_protected_file(library_path, safe_filename, as_attachment=True))
+    except HTTPException:
+        # 416 for an unsatisfiable Range header.
+        raise
     except Exception:
         abort(404)
 
@@ -1767,6 +2141,7 @@ def delete_library_file(course_code: str, file_id: str) -> Response:
 
         if path.exists(file_path):
             remove(file_path)
+        unpublish(file_path)
 
         database.session.delete(library_file)
         database.session.commit()
@@ -15,6 +15,7 @@ from sqlalchemy import text
 # Local resources
 # ---------------------------------------------------------------------------------------
 from now_lms.db import database
+from now_lms.db_pool import pool_stats
 from now_lms.version import CODE_NAME, VERSION
 
 # ---------------------------------------------------------------------------------------
@@ -41,4 +42,7 @@ def health() -> tuple[Response, int]:
         status["status"] = "error"
         status["database"] = "error: database unavailable"
 
+    # Pool use of the worker that answered, to spot connection starvation.
+    status["database_pool"] = pool_stats(database.engine)
+
     return jsonify(status), 200 if status["status"] == "ok" else 503
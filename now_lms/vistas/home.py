@@ -31,6 +31,7 @@ from now_lms.db import (
     database,
     select,
 )
+from now_lms.db.reporting import course_summaries, site_summary, staff_summary
 from now_lms.db.tools import get_current_theme
 from now_lms.logs import log
 from now_lms.themes import get_home_template
@@ -128,26 +129,8 @@ def panel() -> str | Response:
         case "instructor":
             from now_lms.db import DocenteCurso
 
-            # Get courses created by this instructor
-            created_courses = database.session.execute(
-                select(func.count(Curso.id))
-                .join(DocenteCurso)
-                .filter(DocenteCurso.usuario == current_user.usuario, DocenteCurso.vigente)
-            ).scalar()
-
-            # Get enrolled students across instructor's courses
-            enrolled_students = database.session.execute(
-                select(func.count(EstudianteCurso.usuario.distinct()))
-                .join(DocenteCurso, EstudianteCurso.curso == DocenteCurso.curso)
-                .filter(DocenteCurso.usuario == current_user.usuario, DocenteCurso.vigente, EstudianteCurso.vigente)
-            ).scalar()
-
-            # Get certificates issued for courses taught by this instructor
-            issued_certificates = database.session.execute(
-                select(func.count(Certificacion.id))
-                .join(DocenteCurso, Certificacion.curso == DocenteCurso.curso)
-                .filter(DocenteCurso.usuario == current_user.usuario, DocenteCurso.vigente)
-            ).scalar()
+            # Totals come from the summary tables, see now_lms/db/reporting.py.
+            resumen = staff_summary(current_user.usuario, "instructor")
 
             # Get recent courses by this instructor
             cursos_por_fecha = (
@@ -164,27 +147,17 @@ def panel() -> str | Response:
 
             return render_template(
                 "inicio/panel_instructor.html",
-                created_courses=created_courses,
-                enrolled_students=enrolled_students,
-                issued_certificates=issued_certificates,
+                created_courses=resumen.courses,
+                enrolled_students=resumen.students,
+                issued_certificates=resumen.certificates,
                 cursos_por_fecha=cursos_por_fecha,
+                resumen_cursos=course_summaries([curso.codigo for curso in cursos_por_fecha]),
             )
         case "moderator":
-            from now_lms.db import MessageThread, ModeradorCurso
-
-            # Get courses moderated by this moderator
-            created_courses = database.session.execute(
-                select(func.count(Curso.id))
-                .join(ModeradorCurso)
-                .filter(ModeradorCurso.usuario == current_user.usuario, ModeradorCurso.vigente)
-            ).scalar()
+            from now_lms.db import ModeradorCurso
 
-            # Get enrolled students across moderator's courses
-            enrolled_students = database.session.execute(
-                select(func.count(EstudianteCurso.usuario.distinct()))
-                .join(ModeradorCurso, EstudianteCurso.curso == ModeradorCurso.curso)
-                .filter(ModeradorCurso.usuario == current_user.usuario, ModeradorCurso.vigente, EstudianteCurso.vigente)
-            ).scalar()
+            resumen = staff_summary(current_user.usuario, "moderator")
+            resumen_sitio = site_summary()
 
             # Get recent courses by this moderator
             cursos_por_fecha = (
@@ -199,22 +172,14 @@ def panel() -> str | Response:
                 .all()
             )
 
-            # Get open and closed message counts for moderator
-            open_messages = database.session.execute(
-                select(func.count(MessageThread.id)).filter(MessageThread.status == "open")
-            ).scalar()
-
-            closed_messages = database.session.execute(
-                select(func.count(MessageThread.id)).filter(MessageThread.status == "closed")
-            ).scalar()
-
             return render_template(
                 "inicio/panel_moderator.html",
-                created_courses=created_courses,
-                enrolled_students=enrolled_students,
+                created_courses=resumen.courses,
+                enrolled_students=resumen.students,
                 cursos_por_fecha=cursos_por_fecha,
-                open_messages=open_messages,
-                closed_messages=closed_messages,
+                resumen_cursos=course_summaries([curso.codigo for curso in cursos_por_fecha]),
+                open_messages=resumen_sitio.open_threads,
+                closed_messages=resumen_sitio.closed_threads,
             )
         case _:
             return redirect("/")
@@ -374,9 +374,12 @@ def _payment_record(payment_data: dict[str, object]) -> tuple[Any, tuple[FlaskRe
 
 def _save_payment_enrollment(pago: Any, course_code: str) -> None:
     """Persist payment and activate the student's course enrollment or program enrollment."""
+    from now_lms.calendar_utils import schedule_events_for_student_enrollments
     from now_lms.db import EstudianteCurso, ProgramaEstudiante, Programa
     from now_lms.vistas.programs import inscribir_usuario_en_cursos_de_programa
 
+    enrolled: list[str] = []
+
     if pago not in database.session:
         database.session.add(pago)
     database.session.flush()
@@ -396,7 +399,7 @@ def _save_payment_enrollment(pago: Any, course_code: str) -> None:
         # Automatically enroll the user in all courses of this program!
         programa = database.session.execute(database.select(Programa).filter_by(id=pago.programa)).scalars().first()
         if programa:
-            inscribir_usuario_en_cursos_de_programa(pago.usuario, programa)
+            enrolled = inscribir_usuario_en_cursos_de_programa(pago.usuario, programa)
     else:
         enrollment = (
             database.session.execute(database.select(EstudianteCurso).filter_by(usuario=pago.usuario, curso=course_code))
@@ -410,6 +413,9 @@ def _save_payment_enrollment(pago: Any, course_code: str) -> None:
             database.session.add(EstudianteCurso(curso=pago.curso, usuario=pago.usuario, vigente=True, pago=pago.id))
     database.session.commit()
 
+    if enrolled:
+        schedule_events_for_student_enrollments(pago.usuario, enrolled)
+
 
 def _update_coupon_usage(pago: Any, course_code: str, order_id: str) -> None:
     """Increment coupon usage after a successful payment."""
@@ -21,13 +21,15 @@ from werkzeug.wrappers import Response
 # ---------------------------------------------------------------------------------------
 # Local resources
 # ---------------------------------------------------------------------------------------
-from now_lms.auth import perfil_requerido
+from now_lms.auth import invalidar_identidad, perfil_requerido
 from now_lms.bi import cambia_tipo_de_usuario_por_id
 from now_lms.cache import cache, cache_key_with_auth_state
 from now_lms.config import DIRECTORIO_PLANTILLAS
-from now_lms.db import MAXIMO_RESULTADOS_EN_CONSULTA_PAGINADA, Certificacion, ContactMessage, Curso, CursoRecurso
-from now_lms.db import EstudianteCurso, Usuario, database
+from now_lms.db import MAXIMO_RESULTADOS_EN_CONSULTA_PAGINADA, Curso
+from now_lms.db import Usuario, database
 from now_lms.db import Pago
+from now_lms.db.replicas import read_replica
+from now_lms.db.reporting import recent_activity, site_summary
 from now_lms.i18n import _
 
 # Constants
@@ -44,61 +46,26 @@ admin_profile = Blueprint("admin_profile", __name__, template_folder=DIRECTORIO_
 @cache.cached(timeout=90, key_prefix=cache_key_with_auth_state)  # type: ignore[arg-type]
 def pagina_admin() -> str:
     """Perfil de usuario administrador."""
-    # Get admin statistics
-    total_users = database.session.execute(database.select(func.count(Usuario.id))).scalar() or 0
-    inactive_users = database.session.execute(database.select(func.count(Usuario.id)).filter_by(activo=False)).scalar() or 0
-    unverified_users = (
-        database.session.execute(
-            database.select(func.count(Usuario.id)).filter_by(correo_electronico_verificado=False)
-        ).scalar()
-        or 0
-    )
-    total_courses = database.session.execute(database.select(func.count(Curso.id))).scalar() or 0
+    # Totals come from the summary tables, see now_lms/db/reporting.py.
+    resumen = site_summary()
 
     # Get recent courses (for display)
     cursos_recientes = database.session.execute(database.select(Curso).order_by(Curso.creado.desc()).limit(5)).scalars().all()
 
-    # Get total enrollments
-    total_enrollments = database.session.execute(database.select(func.count(EstudianteCurso.id))).scalar() or 0
-
-    # Get content and engagement statistics
-    recursos_creados = database.session.execute(database.select(func.count(CursoRecurso.id))).scalar() or 0
-    certificados_emitidos = database.session.execute(database.select(func.count(Certificacion.id))).scalar() or 0
-    mensajes_sin_leer = (
-        database.session.execute(
-            database.select(func.count(ContactMessage.id)).filter(ContactMessage.status == "not_seen")
-        ).scalar()
-        or 0
-    )
-
-    from sqlalchemy import cast, Numeric
-
-    total_payments = (
-        database.session.execute(
-            database.select(func.count(Pago.id)).filter(Pago.estado == "completed", Pago.metodo == "paypal")
-        ).scalar()
-        or 0
-    )
-    total_ingresos = (
-        database.session.execute(
-            database.select(func.sum(cast(Pago.monto, Numeric))).filter(Pago.estado == "completed", Pago.metodo == "paypal")
-        ).scalar()
-        or 0
-    )
-
     return render_template(
         "perfiles/admin.html",
-        inactivos=inactive_users,
-        unverified_users=unverified_users,
-        total_users=total_users,
-        total_courses=total_courses,
-        total_enrollments=total_enrollments,
+        inactivos=resumen.inactive_users,
+        unverified_users=resumen.unverified_users,
+        total_users=resumen.users,
+        total_courses=resumen.courses,
+        total_enrollments=resumen.enrollments,
         cursos_recientes=cursos_recientes,
-        total_payments=total_payments,
-        total_ingresos=total_ingresos,
-        recursos_creados=recursos_creados,
-        certificados_emitidos=certificados_emitidos,
-        mensajes_sin_leer=mensajes_sin_leer,
+        total_payments=resumen.paypal_payments,
+        total_ingresos=resumen.paypal_revenue,
+        recursos_creados=resumen.resources,
+        certificados_emitidos=resumen.certificates,
+        mensajes_sin_leer=resumen.unread_messages,
+        ultimos_30_dias=recent_activity(30),
     )
 
 
@@ -166,6 +133,8 @@ def eliminar_usuario(user_id: str) -> Response:
     """Elimina un usuario por su id y redirecciona a la vista dada."""
     database.session.execute(delete(Usuario).where(Usuario.id == user_id))
     database.session.commit()
+    # A bulk delete skips the session events that drop the cached identity on edits.
+    invalidar_identidad(user_id)
     cache.delete(CACHE_VIEW_PREFIX + url_for(ADMIN_USERS_ROUTE))
     flash(_("Usuario eliminado correctamente."), "info")
     return redirect(url_for(request.form.get("ruta", default="home", type=str)))
@@ -309,9 +278,59 @@ def cambiar_tipo_usario() -> Response:
     return redirect(url_for("user_profile.usuario", id_usuario=user_id))
 
 
+@admin_profile.route("/admin/enrollments/import", methods=["GET", "POST"])
+@login_required
+@perfil_requerido("admin")
+def importar_inscripciones() -> str | Response:
+    """Importa inscripciones desde un archivo CSV o NDJSON en segundo plano."""
+    import shutil
+    from os import fdopen
+    from tempfile import mkstemp
+
+    from now_lms.enrollment_import import detect_format, import_job_report, start_import_job
+    from now_lms.forms import BulkEnrollmentImportForm
+
+    form = BulkEnrollmentImportForm()
+    if form.validate_on_submit():
+        archivo = form.archivo.data
+        fmt = detect_format(archivo.filename)
+        descriptor, file_path = mkstemp(prefix="now-lms-import-", suffix=f".{fmt}")
+        with fdopen(descriptor, "wb") as destino:
+            shutil.copyfileobj(archivo.stream, destino)
+        job_id = start_import_job(
+            file_path,
+            fmt,
+            course_code=(form.course_code.data or "").strip() or None,
+            program_code=(form.program_code.data or "").strip() or None,
+            created_by=current_user.usuario,
+            send_emails=form.send_emails.data,
+            base_url=request.host_url,
+        )
+        return redirect(url_for("admin_profile.importar_inscripciones", job=job_id))
+
+    report = None
+    if job_id := request.args.get("job"):
+        report = import_job_report(job_id)
+        if report is None:
+            flash(_("La importación se está procesando; actualice la página para ver el resumen."), "info")
+        else:
+            flash(
+                _(
+                    "Importación finalizada: %(created)s creadas, %(skipped)s omitidas, %(failed)s con error.",
+                    created=report.created,
+                    skipped=report.skipped,
+                    failed=report.failed,
+                ),
+                "success" if not report.failed else "warning",
+            )
+
+    return render_template("admin/enrollment_import.html", form=form, report=report)
+
+
 @admin_profile.route("/admin/payments", methods=["GET"])
 @login_required
 @perfil_requerido("admin")
+@read_replica
 def pagos() -> str:
     """Lista de pagos recibidos."""
     from sqlalchemy import Numeric, cast
@@ -24,6 +24,7 @@ from now_lms.db import Certificacion, Curso, DocenteCurso, EstudianteCurso, Usua
 from now_lms.db.tools import elimina_imagen_usuario
 from now_lms.forms import ChangePasswordForm, UserForm
 from now_lms.i18n import _
+from now_lms.image_derivatives import schedule_derivatives
 from now_lms.logs import log
 from now_lms.misc import GENEROS
 
@@ -48,6 +49,7 @@ def _update_profile_photo(usuario_: Usuario) -> None:
         if picture_file:
             usuario_.portada = True
             database.session.commit()
+            schedule_derivatives(images.path(picture_file))
             flash(_("Imagen de perfil actualizada."), "success")
     except UploadNotAllowed:
         log.warning("Could not update profile image.")
@@ -15,6 +15,7 @@ from collections import OrderedDict
 # Standard library
 # ---------------------------------------------------------------------------------------
 from datetime import datetime, timezone
+from typing import Any, Callable
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
@@ -22,7 +23,7 @@ from datetime import datetime, timezone
 from flask import Blueprint, abort, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
 from flask_uploads import UploadNotAllowed
-from sqlalchemy import delete
+from sqlalchemy import delete, insert
 from sqlalchemy.exc import OperationalError
 from werkzeug.wrappers import Response
 
@@ -31,6 +32,7 @@ from werkzeug.wrappers import Response
 # ---------------------------------------------------------------------------------------
 from now_lms.auth import perfil_requerido
 from now_lms.cache import cache, cache_key_with_auth_state, invalidar_cache_programa
+from now_lms.calendar_utils import schedule_events_for_student_enrollments, schedule_events_for_students
 from now_lms.config import DESARROLLO, DIRECTORIO_PLANTILLAS, images
 from now_lms.db import (
     MAXIMO_RESULTADOS_EN_CONSULTA_PAGINADA,
@@ -47,7 +49,9 @@ from now_lms.db import (
     ProgramaEstudiante,
     Usuario,
     database,
+    generador_de_codigos_unicos,
 )
+from now_lms.db.replicas import read_replica
 from now_lms.db.tools import (
     cuenta_cursos_por_programa,
     generate_category_choices,
@@ -61,6 +65,7 @@ from now_lms.db.tools import (
 )
 from now_lms.forms import AdminProgramEnrollmentForm, ProgramaForm
 from now_lms.i18n import _
+from now_lms.image_derivatives import schedule_derivatives
 from now_lms.themes import get_program_list_template, get_program_view_template
 
 # Constants
@@ -122,10 +127,11 @@ def _save_program_logo(programa: Programa) -> None:
     if "logo" not in request.files:
         return
     try:
-        if images.save(request.files["logo"], folder="program" + programa.codigo, name="logo.jpg"):
+        if picture_file := images.save(request.files["logo"], folder="program" + programa.codigo, name="logo.jpg"):
             programa.logo = True
             flash(_("Portada del curso actualizada correctamente"), "success")
             database.session.commit()
+            schedule_derivatives(images.path(picture_file))
     except UploadNotAllowed:
         flash(_("No se pudo actualizar la portada del curso."), "warning")
 
@@ -319,6 +325,7 @@ def pagina_programa(codigo: str) -> str:
 
 @program.route("/program/explore", methods=["GET"])
 @cache.cached(key_prefix=cache_key_with_auth_state)  # type: ignore[arg-type]
+@read_replica
 def lista_programas() -> str:
     """Lista de programas."""
     max_count = 3 if DESARROLLO else 30
@@ -349,127 +356,163 @@ def lista_programas() -> str:
     )
 
 
-def inscribir_usuario_en_cursos_de_programa(username: str, programa: Programa) -> list[str]:
-    """Enroll a user in all courses of a program. Returns list of enrolled course codes."""
-    from now_lms.calendar_utils import create_events_for_student_enrollment
-    from now_lms.vistas.courses import _crear_indice_avance_curso
-    from now_lms.vistas.paypal import get_site_currency
+def _inscribir_en_cursos(
+    username: str, course_codes: list[str], pago_valores: Callable[[Curso], dict[str, Any]], creado_por: str
+) -> list[str]:
+    """Inscribe a un usuario en varios cursos dentro de la transacción actual.
+
+    Devuelve los códigos de los cursos inscritos; ver ``_inscribir_usuarios_en_cursos``.
+    """
+    return _inscribir_usuarios_en_cursos([username], course_codes, pago_valores, creado_por).get(username, [])
+
+
+def _inscribir_usuarios_en_cursos(
+    usernames: list[str], course_codes: list[str], pago_valores: Callable[[Curso], dict[str, Any]], creado_por: str
+) -> dict[str, list[str]]:
+    """Inscribe a varios usuarios en varios cursos dentro de la transacción actual.
+
+    Lee los cursos, las inscripciones existentes y los usuarios con una consulta cada uno,
+    inserta pagos, inscripciones y el índice de avance de forma masiva y no confirma la
+    transacción. Las inscripciones inactivas se reactivan en lugar de duplicarse.
+    Devuelve los códigos de los cursos inscritos por usuario.
+    """
+    from now_lms.vistas.courses.helpers import _sembrar_avance_inscripciones
+
+    usernames = list(dict.fromkeys(usernames))
+    course_codes = list(dict.fromkeys(course_codes))
+    if not usernames or not course_codes:
+        return {}
+
+    cursos = {
+        c.codigo: c for c in database.session.execute(database.select(Curso).filter(Curso.codigo.in_(course_codes))).scalars()
+    }
+    existentes = {
+        (e.usuario, e.curso): e
+        for e in database.session.execute(
+            database.select(EstudianteCurso).filter(
+                EstudianteCurso.usuario.in_(usernames), EstudianteCurso.curso.in_(course_codes)
+            )
+        ).scalars()
+    }
+    usuarios = {
+        u.usuario: u
+        for u in database.session.execute(database.select(Usuario).filter(Usuario.usuario.in_(usernames))).scalars()
+    }
+    hoy = datetime.now(timezone.utc).date()
+
+    enrolled: dict[str, list[str]] = {}
+    pagos: list[dict[str, Any]] = []
+    inscripciones: list[dict[str, Any]] = []
+    for username in usernames:
+        usuario_obj = usuarios.get(username)
+        facturacion = {
+            "nombre": (usuario_obj.nombre if usuario_obj else None) or username,
+            "apellido": (usuario_obj.apellido if usuario_obj else None) or "",
+            "correo_electronico": (usuario_obj.correo_electronico if usuario_obj else None) or "",
+        }
+        for course_code in course_codes:
+            curso = cursos.get(course_code)
+            existente = existentes.get((username, course_code))
+            if curso is None or (existente is not None and existente.vigente):
+                continue
+
+            pago_id = generador_de_codigos_unicos()
+            pagos.append(
+                {
+                    "id": pago_id,
+                    "usuario": username,
+                    "curso": course_code,
+                    "estado": "completed",
+                    "creado": hoy,
+                    "creado_por": creado_por,
+                    **facturacion,
+                    **pago_valores(curso),
+                }
+            )
+            if existente is not None:
+                existente.vigente = True
+                existente.pago = pago_id
+            else:
+                inscripciones.append(
+                    {
+                        "curso": course_code,
+                        "usuario": username,
+                        "vigente": True,
+                        "pago": pago_id,
+                        "creado": hoy,
+                        "creado_por": creado_por,
+                    }
+                )
+            enrolled.setdefault(username, []).append(course_code)
 
-    program_courses = (
-        database.session.execute(database.select(ProgramaCurso).filter_by(programa=programa.codigo)).scalars().all()
+    if pagos:
+        database.session.execute(insert(Pago), pagos)
+    if inscripciones:
+        database.session.execute(insert(EstudianteCurso), inscripciones)
+    _sembrar_avance_inscripciones((username, course_code) for username, codes in enrolled.items() for course_code in codes)
+
+    return enrolled
+
+
+def _cursos_del_programa(programa: Programa) -> list[str]:
+    """Códigos de los cursos de un programa."""
+    return list(
+        database.session.execute(
+            database.select(ProgramaCurso.curso).filter(ProgramaCurso.programa == programa.codigo)
+        ).scalars()
     )
 
-    enrolled = []
-    for pc in program_courses:
-        # Check if already enrolled in this course
-        existing = database.session.execute(
-            database.select(EstudianteCurso).filter_by(curso=pc.curso, usuario=username, vigente=True)
-        ).scalar_one_or_none()
-        if existing:
-            continue
-
-        # Create Pago
-        curso = database.session.execute(database.select(Curso).filter_by(codigo=pc.curso)).scalar_one_or_none()
-        if not curso:
-            continue
-
-        pago = Pago()
-        pago.usuario = username
-        pago.curso = pc.curso
-        pago.estado = "completed"
-        pago.metodo = "program_enrollment"
-        pago.monto = 0
-        pago.moneda = get_site_currency()
-        pago.descripcion = _("Inscripción al curso como parte del programa '%(name)s'", name=programa.nombre)
-        pago.audit = False
-        pago.creado = datetime.now(timezone.utc).date()
-        pago.creado_por = current_user.usuario if (current_user and current_user.is_authenticated) else username
-
-        usuario_obj = database.session.execute(database.select(Usuario).filter_by(usuario=username)).scalar_one_or_none()
-        if usuario_obj:
-            pago.nombre = usuario_obj.nombre or username
-            pago.apellido = usuario_obj.apellido or ""
-            pago.correo_electronico = usuario_obj.correo_electronico or ""
-        else:
-            pago.nombre = username
-            pago.apellido = ""
-            pago.correo_electronico = ""
-
-        database.session.add(pago)
-        database.session.flush()
-
-        course_enrollment = EstudianteCurso(
-            curso=pc.curso,
-            usuario=username,
-            vigente=True,
-            pago=pago.id,
-            creado=datetime.now(timezone.utc).date(),
-            creado_por=current_user.usuario if (current_user and current_user.is_authenticated) else username,
-        )
-        database.session.add(course_enrollment)
-        enrolled.append(pc.curso)
 
-    if enrolled:
-        for course_code in enrolled:
-            _crear_indice_avance_curso(course_code)
-            create_events_for_student_enrollment(username, course_code)
+def inscribir_usuario_en_cursos_de_programa(username: str, programa: Programa) -> list[str]:
+    """Enroll a user in all courses of a program. Returns list of enrolled course codes.
+
+    The enrollment rows are added to the current transaction; the caller commits and
+    then queues the calendar events with ``schedule_events_for_student_enrollments``.
+    """
+    from now_lms.vistas.paypal import get_site_currency
 
-    return enrolled
+    moneda = get_site_currency()
+    descripcion = _("Inscripción al curso como parte del programa '%(name)s'", name=programa.nombre)
+
+    def _pago(curso: Curso) -> dict[str, Any]:
+        return {
+            "metodo": "program_enrollment",
+            "monto": 0,
+            "moneda": moneda,
+            "descripcion": descripcion,
+            "audit": False,
+        }
+
+    creado_por = current_user.usuario if (current_user and current_user.is_authenticated) else username
+    return _inscribir_en_cursos(username, _cursos_del_programa(programa), _pago, creado_por)
 
 
 def inscribir_usuario_en_curso_especifico_de_programa(username: str, course_code: str, programa: Programa) -> bool:
-    """Enrolls a single user in a single course of a program."""
-    from now_lms.calendar_utils import create_events_for_student_enrollment
-    from now_lms.vistas.courses import _crear_indice_avance_curso
+    """Enrolls a single user in a single course of a program; the caller commits."""
+    return bool(inscribir_usuarios_en_curso_de_programa([username], course_code, programa))
+
+
+def inscribir_usuarios_en_curso_de_programa(usernames: list[str], course_code: str, programa: Programa) -> list[str]:
+    """Enrolls several users in one course of a program in bulk; the caller commits.
+
+    Returns the users that were enrolled.
+    """
     from now_lms.vistas.paypal import get_site_currency
 
-    existing = database.session.execute(
-        database.select(EstudianteCurso).filter_by(curso=course_code, usuario=username, vigente=True)
-    ).scalar_one_or_none()
-    if existing:
-        return False
-
-    curso = database.session.execute(database.select(Curso).filter_by(codigo=course_code)).scalar_one_or_none()
-    if not curso:
-        return False
-
-    pago = Pago()
-    pago.usuario = username
-    pago.curso = course_code
-    pago.estado = "completed"
-    pago.metodo = "program_enrollment"
-    pago.monto = 0
-    pago.moneda = get_site_currency()
-    pago.descripcion = _("Inscripción al curso como parte del programa '%(name)s'", name=programa.nombre)
-    pago.audit = False
-    pago.creado = datetime.now(timezone.utc).date()
-    pago.creado_por = current_user.usuario if (current_user and current_user.is_authenticated) else "system"
-
-    usuario_obj = database.session.execute(database.select(Usuario).filter_by(usuario=username)).scalar_one_or_none()
-    if usuario_obj:
-        pago.nombre = usuario_obj.nombre or username
-        pago.apellido = usuario_obj.apellido or ""
-        pago.correo_electronico = usuario_obj.correo_electronico or ""
-    else:
-        pago.nombre = username
-        pago.apellido = ""
-        pago.correo_electronico = ""
-
-    database.session.add(pago)
-    database.session.flush()
-
-    course_enrollment = EstudianteCurso(
-        curso=course_code,
-        usuario=username,
-        vigente=True,
-        pago=pago.id,
-        creado=datetime.now(timezone.utc).date(),
-        creado_por=current_user.usuario if (current_user and current_user.is_authenticated) else "system",
-    )
-    database.session.add(course_enrollment)
-    _crear_indice_avance_curso(course_code)
-    create_events_for_student_enrollment(username, course_code)
-    return True
+    moneda = get_site_currency()
+    descripcion = _("Inscripción al curso como parte del programa '%(name)s'", name=programa.nombre)
+
+    def _pago(curso: Curso) -> dict[str, Any]:
+        return {
+            "metodo": "program_enrollment",
+            "monto": 0,
+            "moneda": moneda,
+            "descripcion": descripcion,
+            "audit": False,
+        }
+
+    creado_por = current_user.usuario if (current_user and current_user.is_authenticated) else "system"
+    return list(_inscribir_usuarios_en_cursos(usernames, [course_code], _pago, creado_por))
 
 
 @program.route("/program/<codigo>/enroll", methods=["GET", "POST"])
@@ -538,8 +581,9 @@ def inscribir_programa(codigo: str) -> str | Response:
 
         try:
             database.session.add(inscripcion)
-            inscribir_usuario_en_cursos_de_programa(current_user.usuario, programa)
+            enrolled = inscribir_usuario_en_cursos_de_programa(current_user.usuario, programa)
             database.session.commit()
+            schedule_events_for_student_enrollments(current_user.usuario, enrolled)
             print("PE IN THE VIEW:", database.session.execute(database.select(ProgramaEstudiante)).scalars().all())
             flash(_("Te has inscrito exitosamente al programa."), "success")
             return redirect(url_for("program.tomar_programa", codigo=codigo))
@@ -683,14 +727,14 @@ def gestionar_cursos_programa(codigo: str) -> str | Response:
 
                 # Enroll all students currently in the program in this new course
                 estudiantes = (
-                    database.session.execute(database.select(ProgramaEstudiante).filter_by(programa=programa.id))
+                    database.session.execute(database.select(ProgramaEstudiante.usuario).filter_by(programa=programa.id))
                     .scalars()
                     .all()
                 )
-                for est in estudiantes:
-                    inscribir_usuario_en_curso_especifico_de_programa(est.usuario, curso_codigo, programa)
+                inscritos = inscribir_usuarios_en_curso_de_programa(estudiantes, curso_codigo, programa)
 
                 database.session.commit()
+                schedule_events_for_students(inscritos, [curso_codigo])
                 flash(_("Curso {} agregado al programa.").format(curso_codigo), "success")
             else:
                 flash(_("El curso ya está en el programa."), "warning")
@@ -839,57 +883,28 @@ def _verify_student_and_enrollment(student_username: str) -> dict | None:
     return None
 
 
-def _get_or_create_course_enrollment(course_code, student_username, bypass_payment, notes, programa):
-    """Enroll a student into a single course of the program if not already enrolled. Returns course_code if enrolled."""
-    existing_course_enrollment = database.session.execute(
-        database.select(EstudianteCurso).filter_by(curso=course_code, usuario=student_username, vigente=True)
-    ).scalar_one_or_none()
-
-    if existing_course_enrollment:
-        return None
-
-    curso = database.session.execute(database.select(Curso).filter_by(codigo=course_code)).scalar_one_or_none()
-    if not curso:
-        return None
-
-    pago = Pago()
-    pago.usuario = student_username
-    pago.curso = course_code
-    pago.estado = "completed"
-    pago.metodo = "admin_program_enrollment"
-    pago.monto = 0 if bypass_payment else curso.precio
-    pago.descripcion = _(
+def _enroll_in_program_courses(student_username, bypass_payment, notes, programa):
+    """Enroll a student into every course of the program not already enrolled. Returns the enrolled course codes."""
+    descripcion = _(
         "Inscripción administrativa al programa '%(name)s' por %(user)s", name=programa.nombre, user=current_user.usuario
     )
     if notes:
-        pago.descripcion += _(" - Notas: %(notes)s", notes=notes)
-    pago.audit = not bypass_payment and curso.pagado
-    pago.creado = datetime.now(timezone.utc).date()
-    pago.creado_por = current_user.usuario
-    database.session.add(pago)
-    database.session.flush()
-
-    course_enrollment = EstudianteCurso(
-        curso=course_code,
-        usuario=student_username,
-        vigente=True,
-        pago=pago.id,
-        creado=datetime.now(timezone.utc).date(),
-        creado_por=current_user.usuario,
-    )
-    database.session.add(course_enrollment)
+        descripcion += _(" - Notas: %(notes)s", notes=notes)
 
-    return course_code
+    def _pago(curso):
+        return {
+            "metodo": "admin_program_enrollment",
+            "monto": 0 if bypass_payment else curso.precio,
+            "descripcion": descripcion,
+            "audit": bool(not bypass_payment and curso.pagado),
+        }
 
+    return _inscribir_en_cursos(student_username, _cursos_del_programa(programa), _pago, current_user.usuario)
 
-def _post_enrollment_processing(student_username, enrolled_courses, programa):
-    """Create progress indices and calendar events for enrolled courses."""
-    from now_lms.calendar_utils import create_events_for_student_enrollment
-    from now_lms.vistas.courses import _crear_indice_avance_curso
 
-    for course_code in enrolled_courses:
-        _crear_indice_avance_curso(course_code)
-        create_events_for_student_enrollment(student_username, course_code)
+def _post_enrollment_processing(student_username, enrolled_courses, programa):
+    """Queue calendar events for enrolled courses and build the confirmation message."""
+    schedule_events_for_student_enrollments(student_username, enrolled_courses)
 
     message = _("Estudiante '{}' inscrito exitosamente en el programa '{}'").format(student_username, programa.nombre)
     if enrolled_courses:
@@ -931,11 +946,6 @@ def admin_program_enrollment(codigo: str) -> str | Response:
         return render_template(ADMIN_PROGRAM_ENROLL_TEMPLATE, programa=programa, form=form)
 
     try:
-        # Get all courses in the program
-        program_courses = (
-            database.session.execute(database.select(ProgramaCurso).filter_by(programa=programa.id)).scalars().all()
-        )
-
         # Enroll student in program
         program_enrollment = ProgramaEstudiante(
             usuario=student_username,
@@ -945,15 +955,8 @@ def admin_program_enrollment(codigo: str) -> str | Response:
         )
         database.session.add(program_enrollment)
 
-        # Enroll student in all courses of the program
-        enrolled_courses = [
-            cid
-            for cid in (
-                _get_or_create_course_enrollment(c.curso, student_username, bypass_payment, notes, programa)
-                for c in program_courses
-            )
-            if cid is not None
-        ]
+        # Enroll student in all courses of the program, progress index included
+        enrolled_courses = _enroll_in_program_courses(student_username, bypass_payment, notes, programa)
 
         database.session.commit()
 
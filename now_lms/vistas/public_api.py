@@ -23,6 +23,7 @@ from now_lms.db import (
     MailConfig,
     ContactMessage,
 )
+from now_lms.db.replicas import read_replica
 from now_lms.i18n import _
 from now_lms.mail import send_mail
 from now_lms.version import VERSION
@@ -110,6 +111,7 @@ def ping():
 
 @public_api.route("/courses/<course_code>", methods=["GET"])
 @require_api_key
+@read_replica
 def get_course(course_code):
     """Consult public course information by code."""
     course = database.session.execute(database.select(Curso).filter_by(codigo=course_code)).scalar_one_or_none()
@@ -306,6 +308,7 @@ def send_enrollment_email(user, course, is_new_user, sync=False):
 
 @public_api.route("/contact-messages", methods=["GET"])
 @require_api_key
+@read_replica
 def list_unread_contact_messages():
     """List unread contact messages (status is 'not_seen')."""
     messages = (
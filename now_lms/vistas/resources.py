@@ -20,7 +20,7 @@ from os import path
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
 # ---------------------------------------------------------------------------------------
-from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, send_from_directory, url_for
+from flask import Blueprint, abort, current_app, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
 from sqlalchemy import delete
 from sqlalchemy.exc import OperationalError
@@ -37,6 +37,7 @@ from now_lms.forms import RecursoForm
 from now_lms.i18n import _
 from now_lms.misc import TIPOS_RECURSOS
 from now_lms.themes import get_resource_list_template, get_resource_view_template
+from now_lms.vistas._helpers import send_protected_file
 
 # ---------------------------------------------------------------------------------------
 # Interfaz de gestión de recursos descargables
@@ -135,7 +136,7 @@ def descargar_recurso(resource_code: str) -> Response:
 
     if current_user.is_authenticated:
         if current_user.tipo == "admin":
-            return send_from_directory(directorio, recurso.file_name)
+            return send_protected_file(directorio, recurso.file_name)
         return abort(403)
     return redirect("/login")
 
@@ -7,7 +7,7 @@ from __future__ import annotations
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
 # ---------------------------------------------------------------------------------------
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
 from flask_login import login_required
 from flask_uploads import UploadNotAllowed
 from sqlalchemy.exc import OperationalError
@@ -23,6 +23,7 @@ from now_lms.db import AdSense, Configuracion, MailConfig, PaypalConfig, Style,
 from now_lms.db.tools import elimina_logo_perzonalizado
 from now_lms.forms import AdSenseForm, CheckMailForm, ConfigForm, MailForm, PayaplForm, ThemeForm, ExternalApiKeyForm
 from now_lms.i18n import _
+from now_lms.image_derivatives import schedule_derivatives
 from now_lms.logs import log
 
 # ---------------------------------------------------------------------------------------
@@ -48,8 +49,9 @@ def _save_theme_asset(config: Style, field_name: str, filename: str, config_attr
     if field_name not in request.files:
         return
     try:
-        if images.save(request.files[field_name], name=filename):
+        if picture_file := images.save(request.files[field_name], name=filename):
             setattr(config, config_attribute, True)
+            schedule_derivatives(images.path(picture_file))
     except UploadNotAllowed:
         log.warning("An error occurred while updating the website %s.", field_name)
 
@@ -158,6 +160,17 @@ def _validate_email_verification(config: Configuracion, form: ConfigForm) -> Non
     config.verify_user_by_email = True
 
 
+def _aviso_modulos_pendientes() -> None:
+    """Avisa cuando se activó un módulo opcional que el servidor no cargó al iniciar."""
+    from now_lms.optional_modules import modules_needing_restart
+
+    if pendientes := modules_needing_restart(current_app):
+        flash(
+            _("Reinicie el servidor para habilitar: %(modules)s", modules=", ".join(pendientes)),
+            "warning",
+        )
+
+
 def invalidar_cache() -> bool:
     """
     Invalida comprensivamente todas las entradas de la cache relacionadas con la configuración del sistema.
@@ -290,6 +303,7 @@ def configuracion() -> str | Response:
 
             database.session.commit()
             flash(_("Sitio web actualizado exitosamente."), "success")
+            _aviso_modulos_pendientes()
             return redirect(url_for("setting.configuracion"))
         except OperationalError:
             flash(_("No se pudo actualizar la configuración del sitio web."), "warning")
@@ -658,6 +672,7 @@ def _save_paypal_config(form: PayaplForm, config: PaypalConfig) -> Response:
         database.session.commit()
         invalidar_cache()
         flash(_("Configuración de Paypal actualizada exitosamente."), "success")
+        _aviso_modulos_pendientes()
     except OperationalError:
         database.session.rollback()
         flash(_("No se pudo actualizar la configuración de Paypal."), "warning")
@@ -7,8 +7,11 @@ from __future__ import annotations
 # ---------------------------------------------------------------------------------------
 # Standard library
 # ---------------------------------------------------------------------------------------
+import json
+from math import ceil
 from os import cpu_count as os_cpu_count
-from os import environ
+from os import environ, makedirs, path, replace
+from tempfile import NamedTemporaryFile
 
 # ---------------------------------------------------------------------------------------
 # Third-party libraries
@@ -20,6 +23,13 @@ try:
 except ImportError:
     PSUTIL_AVAILABLE = False
 
+# Measured worker memory is multiplied by this factor, workers grow after startup.
+MEASURED_MEMORY_HEADROOM = 1.5
+# Lower bound for the planned memory, a worker measured before serving requests is smaller.
+MEASURED_MEMORY_FLOOR_MB = 64
+# Number of worker measurements kept.
+MEASURED_MEMORY_SAMPLES = 32
+
 
 def calculate_optimal_workers(
     worker_memory_mb: int = 200,
@@ -110,8 +120,8 @@ def get_worker_config_from_env() -> tuple[int, int]:
 
     # If workers not explicitly set, calculate optimal based on system resources
     if workers is None:
-        # Get worker memory estimate from environment (default: 200 MB)
-        worker_memory_mb = 200
+        # Get worker memory estimate from environment, the last measurement or the 200 MB default
+        worker_memory_mb = measured_worker_memory_mb() or 200
         worker_memory_str = environ.get("NOW_LMS_WORKER_MEMORY_MB") or environ.get("WORKER_MEMORY_MB")
         if worker_memory_str:
             try:
@@ -125,3 +135,81 @@ def get_worker_config_from_env() -> tuple[int, int]:
         )
 
     return workers, threads
+
+
+def worker_memory_file() -> str:
+    """Path of the file with the memory measured in the Gunicorn workers."""
+    from now_lms.config import DIRECTORIO_CACHE
+
+    return path.join(DIRECTORIO_CACHE, "worker_memory.json")
+
+
+def unique_memory_mb(pid: int | None = None) -> float | None:
+    """
+    Return the unique set size (USS) of a process in MB.
+
+    USS counts only the pages that belong to the process, so memory shared
+    copy-on-write with the Gunicorn master is not counted again per worker.
+    Returns None when psutil is not installed or the platform does not report it.
+    """
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        return psutil.Process(pid).memory_full_info().uss / (1024 * 1024)
+    except (psutil.Error, AttributeError, OSError):
+        return None
+
+
+def _read_measurements(file_name: str) -> dict:
+    try:
+        with open(file_name, encoding="utf-8") as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def record_worker_memory(file_name: str | None = None, pid: int | None = None) -> float | None:
+    """
+    Measure the unique memory of a worker and save it for the next worker plan.
+
+    Measurements from another NOW LMS version are discarded. Workers write the
+    file without locking, a measurement lost to a concurrent write is replaced
+    by the next one.
+    """
+    from now_lms.version import VERSION
+
+    memory_mb = unique_memory_mb(pid)
+    if memory_mb is None:
+        return None
+    file_name = file_name or worker_memory_file()
+    data = _read_measurements(file_name)
+    samples = data.get("samples", []) if data.get("version") == VERSION else []
+    samples = [*samples, round(memory_mb, 1)][-MEASURED_MEMORY_SAMPLES:]
+    try:
+        makedirs(path.dirname(file_name), exist_ok=True)
+        with NamedTemporaryFile("w", dir=path.dirname(file_name), delete=False, encoding="utf-8") as file:
+            json.dump({"version": VERSION, "samples": samples}, file)
+        replace(file.name, file_name)
+    except OSError:
+        return None
+    return memory_mb
+
+
+def measured_worker_memory_mb(file_name: str | None = None) -> int | None:
+    """
+    Return the per-worker memory to plan with, based on the measured workers.
+
+    Uses the largest measurement plus MEASURED_MEMORY_HEADROOM, and at least
+    MEASURED_MEMORY_FLOOR_MB. Returns None if there is no measurement for the
+    running version.
+    """
+    from now_lms.version import VERSION
+
+    data = _read_measurements(file_name or worker_memory_file())
+    if data.get("version") != VERSION:
+        return None
+    samples = [sample for sample in data.get("samples", []) if isinstance(sample, (int, float)) and sample > 0]
+    if not samples:
+        return None
+    return max(MEASURED_MEMORY_FLOOR_MB, ceil(max(samples) * MEASURED_MEMORY_HEADROOM))
@@ -80,6 +80,7 @@ if init_app():
                     def load(self):
                         return self.application
 
+                from now_lms.preload import preload_for_fork
                 from now_lms.session_config import reset_connections_after_fork
 
                 options = {
@@ -99,6 +100,8 @@ if init_app():
                     "accesslog": "-",
                     "errorlog": "-",
                     "loglevel": "info",
+                    # Compile templates and freeze the GC so workers share the startup heap.
+                    **preload_for_fork(lms_app),
                 }
 
                 log.info(
@@ -0,0 +1,182 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+
+"""Tests for the conditional ICS calendar feeds (now_lms/vistas/calendar.py)."""
+
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+import pytest
+
+from now_lms.auth import proteger_passwd
+from now_lms.calendar_utils import create_events_for_student_enrollment
+from now_lms.db import Curso, CursoRecurso, CursoSeccion, EstudianteCurso, Evaluation, Usuario
+
+
+@pytest.fixture
+def feed_data(app, db_session):
+    """A student enrolled in a free course with one live session and one deadline."""
+    for usuario, tipo in (("ics_student", "student"), ("ics_outsider", "student")):
+        db_session.add(
+            Usuario(
+                usuario=usuario,
+                acceso=proteger_passwd("pass"),
+                nombre="ICS",
+                correo_electronico=f"{usuario}@example.com",
+                tipo=tipo,
+                activo=True,
+                correo_electronico_verificado=True,
+            )
+        )
+    db_session.add(
+        Curso(
+            nombre="ICS Course",
+            codigo="ICS101",
+            descripcion_corta="Short desc",
+            descripcion="Long desc",
+            estado="open",
+            certificado=False,
+            publico=True,
+            pagado=False,
+        )
+    )
+    db_session.commit()
+
+    section = CursoSeccion(curso="ICS101", nombre="Week 1", descripcion="Section", indice=1)
+    db_session.add(section)
+    db_session.commit()
+    db_session.add(
+        CursoRecurso(
+            curso="ICS101",
+            seccion=section.id,
+            nombre="Live session",
+            descripcion="Meeting, with commas; and semicolons",
+            tipo="meet",
+            fecha=(datetime.now() + timedelta(days=3)).date(),
+            hora_inicio=time(10, 0),
+        )
+    )
+    db_session.add(
+        Evaluation(
+            section_id=section.id,
+            title="Quiz",
+            description="Quiz description",
+            passing_score=70.0,
+            available_until=datetime.now() + timedelta(days=7),
+        )
+    )
+    db_session.add(EstudianteCurso(curso="ICS101", usuario="ics_student", vigente=True))
+    db_session.commit()
+
+    create_events_for_student_enrollment("ics_student", "ICS101")
+    return {"section_id": section.id}
+
+
+class MemoryCache:
+    """Stand-in for a configured cache (the test default is NullCache)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+
+@pytest.fixture
+def version_cache(monkeypatch):
+    memory = MemoryCache()
+    monkeypatch.setattr("now_lms.vistas.calendar.cache", memory)
+    return memory
+
+
+def _login(client, usuario):
+    client.post("/user/login", data={"usuario": usuario, "acceso": "pass"})
+
+
+def test_user_feed_is_conditional(client, feed_data, version_cache):
+    """The personal feed has a strong validator and answers revalidation with 304."""
+    _login(client, "ics_student")
+
+    resp = client.get("/user/calendar/export.ics")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/calendar"
+    body = resp.get_data(as_text=True)
+    assert body.startswith("BEGIN:VCALENDAR\r\n")
+    assert body.endswith("END:VCALENDAR\r\n")
+    assert body.count("BEGIN:VEVENT") == 2
+    assert r"Meeting\, with commas\; and semicolons" in body
+    assert resp.headers["Cache-Control"] == "private, no-cache"
+    etag = resp.headers["ETag"]
+    last_modified = resp.headers["Last-Modified"]
+
+    resp = client.get("/user/calendar/export.ics", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.get_data() == b""
+
+    resp = client.get("/user/calendar/export.ics", headers={"If-Modified-Since": last_modified})
+    assert resp.status_code == 304
+
+
+def test_user_feed_version_changes_with_events(client, db_session, feed_data):
+    """Removing an event produces a new version of the feed."""
+    from now_lms.calendar_utils import cleanup_events_for_course_unenrollment
+
+    _login(client, "ics_student")
+    etag = client.get("/user/calendar/export.ics").headers["ETag"]
+
+    cleanup_events_for_course_unenrollment("ics_student", "ICS101")
+
+    resp = client.get("/user/calendar/export.ics", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert "BEGIN:VEVENT" not in resp.get_data(as_text=True)
+
+
+def test_if_modified_since_sees_deleted_events(client, db_session, feed_data, version_cache):
+    """Deleting events does not advance the newest timestamp, but Last-Modified still moves."""
+    from now_lms.calendar_utils import cleanup_events_for_course_unenrollment
+
+    _login(client, "ics_student")
+    client.get("/user/calendar/export.ics")
+    last_modified = client.get("/user/calendar/export.ics").headers["Last-Modified"]
+
+    cleanup_events_for_course_unenrollment("ics_student", "ICS101")
+
+    resp = client.get("/user/calendar/export.ics", headers={"If-Modified-Since": last_modified})
+    assert resp.status_code == 200
+    assert "BEGIN:VEVENT" not in resp.get_data(as_text=True)
+    assert resp.headers["Last-Modified"] != last_modified
+    resp = client.get("/user/calendar/export.ics", headers={"If-Modified-Since": resp.headers["Last-Modified"]})
+    assert resp.status_code == 304
+
+
+def test_if_modified_since_needs_a_remembered_version(client, feed_data):
+    """Without a cache the date alone cannot prove the feed is unchanged; the ETag still can."""
+    _login(client, "ics_student")
+    resp = client.get("/user/calendar/export.ics")
+    headers = {"If-Modified-Since": resp.headers["Last-Modified"]}
+    assert client.get("/user/calendar/export.ics", headers=headers).status_code == 200
+    assert client.get("/user/calendar/export.ics", headers={"If-None-Match": resp.headers["ETag"]}).status_code == 304
+
+
+def test_course_feed_is_shared_and_gated(client, feed_data):
+    """The course feed is built once per version and only members can read it."""
+    _login(client, "ics_outsider")
+    assert client.get("/course/ICS101/calendar.ics").status_code == 403
+    client.get("/user/logout")
+
+    _login(client, "ics_student")
+    resp = client.get("/course/ICS101/calendar.ics")
+    assert resp.status_code == 200
+    body = resp.get_data(as_text=True)
+    assert body.count("BEGIN:VEVENT") == 2
+    assert "SUMMARY:Live session" in body
+    etag = resp.headers["ETag"]
+
+    with mock.patch("now_lms.vistas.calendar._course_feed_entries") as entries:
+        resp = client.get("/course/ICS101/calendar.ics", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        entries.assert_not_called()
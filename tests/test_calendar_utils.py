@@ -14,6 +14,7 @@ from now_lms.calendar_utils import (
     _combine_date_time,
     cleanup_events_for_course_unenrollment,
     create_events_for_student_enrollment,
+    create_events_for_student_enrollments,
     get_upcoming_events_for_user,
     update_evaluation_events,
     update_meet_resource_events,
@@ -164,6 +165,50 @@ def test_create_events_already_exists(app, db_session, test_data):
     assert events_count_2 == 2
 
 
+def test_create_events_for_several_courses(app, db_session, test_data):
+    """Program enrollments create the events of every course in one batch."""
+    course = Curso(
+        nombre="Calendar Course 2",
+        codigo="CAL102",
+        descripcion_corta="Short desc",
+        descripcion="Long desc",
+        estado="open",
+        certificado=False,
+        publico=True,
+    )
+    db_session.add(course)
+    db_session.commit()
+    section = CursoSeccion(curso="CAL102", nombre="Week 1", descripcion="Section description", indice=1)
+    db_session.add(section)
+    db_session.commit()
+    db_session.add(
+        CursoRecurso(
+            curso="CAL102",
+            seccion=section.id,
+            nombre="Live Meet 2",
+            descripcion="Meeting description",
+            tipo="meet",
+            fecha=(datetime.now() + timedelta(days=5)).date(),
+            hora_inicio=time(8, 0),
+        )
+    )
+    db_session.commit()
+
+    # One course already has its events, only the missing ones are inserted.
+    create_events_for_student_enrollment(test_data["user_id"], test_data["course_id"])
+    create_events_for_student_enrollments(test_data["user_id"], [test_data["course_id"], "CAL102", "CAL102"])
+
+    events = db_session.execute(database.select(UserEvent).filter_by(user_id=test_data["user_id"])).scalars().all()
+    assert len(events) == 3
+    second = next(e for e in events if e.course_id == "CAL102")
+    assert second.title == "Live Meet 2"
+    assert second.section_id == section.id
+    assert second.end_time is None
+
+    # Nothing to do for an empty batch.
+    create_events_for_student_enrollments(test_data["user_id"], [])
+
+
 def test_create_events_exception_handling(app, db_session, test_data):
     """Test that exceptions in create_events are gracefully caught and logged."""
     with mock.patch("now_lms.calendar_utils.database.session.execute", side_effect=Exception("Database error")):
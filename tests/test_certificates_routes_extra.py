@@ -319,3 +319,44 @@ def test_program_certificate_view_invalid_and_exceptions(client, db_session, ext
     resp = client.get(f"/certificate/program/view/{cert_p.id}/")
     assert resp.status_code == 200
     assert b"Prog template" in resp.data
+
+
+def test_qr_codes_are_cacheable(client, db_session, extra_cert_setup):
+    """QR images carry a strong ETag and long-lived caching, and revalidation is a 304."""
+    for url in (
+        f"/certificate/get_as_qr/{extra_cert_setup['cert'].id}/",
+        f"/certificate/program/get_as_qr/{extra_cert_setup['cert_p'].id}/",
+    ):
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp.mimetype == "image/png"
+        assert "immutable" in resp.headers["Cache-Control"]
+        etag = resp.headers["ETag"]
+        assert etag and not etag.startswith("W/")
+
+        with patch("now_lms.vistas.certificates._qr_png") as qr_png:
+            resp = client.get(url, headers={"If-None-Match": etag})
+            assert resp.status_code == 304
+            assert resp.headers["ETag"] == etag
+            qr_png.assert_not_called()
+
+    # Different certifications encode different URLs.
+    first = client.get(f"/certificate/get_as_qr/{extra_cert_setup['cert'].id}/").headers["ETag"]
+    other = client.get("/certificate/get_as_qr/SOMETHING_ELSE/").headers["ETag"]
+    assert first != other
+
+
+def test_pdf_url_for_inlines_qr(app, extra_cert_setup):
+    """PDF renders get the QR as a data URI instead of an URL back into the app."""
+    from now_lms.vistas.certificates import _pdf_url_for
+
+    with app.test_request_context("/"):
+        src = _pdf_url_for("certificate.certificacion_qr", cert_id=extra_cert_setup["cert"].id)
+        assert src.startswith("data:image/png;base64,")
+        src = _pdf_url_for("certificate.certificacion_programa_qr", certificate_id=extra_cert_setup["cert_p"].id)
+        assert src.startswith("data:image/png;base64,")
+        assert _pdf_url_for("static", filename="x.css").endswith("/static/x.css")
+
+        app.config["CERTIFICATE_QR_INLINE"] = False
+        src = _pdf_url_for("certificate.certificacion_qr", cert_id=extra_cert_setup["cert"].id)
+        assert src.endswith(f"/certificate/get_as_qr/{extra_cert_setup['cert'].id}/")
@@ -226,3 +226,42 @@ def test_course_library_failures_and_permission_checks(client, db_session, extra
         follow_redirects=False
     )
     assert resp.status_code == 302
+def test_slideshow_rendered_once_on_save(client, db_session, extra_res_setup):
+    """Viewers read the stored HTML fragment; it is rendered and sanitized when the deck is saved."""
+    slideshow = SlideShowResource(course_id="C404", title="Deck", theme="simple")
+    db_session.add(slideshow)
+    db_session.commit()
+    db_session.add(Slide(slide_show_id=slideshow.id, title="Uno", content="<p>Primera</p>", order=1))
+    db_session.commit()
+    assert slideshow.rendered_html is None
+
+    login(client, "inst_res_ex")
+    # A deck saved before the fragment existed is rendered on its first view
+    resp = client.get(f"/course/C404/slideshow/{slideshow.id}/preview")
+    assert b"<p>Primera</p>" in resp.data
+    db_session.refresh(slideshow)
+    assert "<p>Primera</p>" in slideshow.rendered_html
+
+    slide = db_session.execute(database.select(Slide).filter_by(slide_show_id=slideshow.id)).scalar_one()
+    resp = client.post(
+        f"/course/C404/slideshow/{slideshow.id}/edit",
+        data={
+            "title": "Deck",
+            "theme": "simple",
+            "slide_count": 1,
+            "slide_0_id": slide.id,
+            "slide_0_order": 1,
+            "slide_0_title": "Uno",
+            "slide_0_content": "<p>Editada</p><script>alert(1)</script>",
+        },
+    )
+    assert resp.status_code == 302
+    db_session.refresh(slideshow)
+    assert "<p>Editada</p>" in slideshow.rendered_html
+    assert "<script>" not in slideshow.rendered_html
+
+    # The slides themselves are no longer read on view
+    db_session.execute(database.delete(Slide).filter_by(slide_show_id=slideshow.id))
+    db_session.commit()
+    resp = client.get(f"/course/C404/slideshow/{slideshow.id}/preview")
+    assert b"<p>Editada</p>" in resp.data
@@ -376,7 +376,7 @@ def test_course_library_management(client_instructor, db_session, resources_setu
         # Serve file
         with mock.patch("now_lms.vistas.courses.resources.path.exists", return_value=True), \
              mock.patch("now_lms.vistas.courses.resources.path.isfile", return_value=True), \
-             mock.patch("now_lms.vistas.courses.resources.send_from_directory") as mock_send:
+             mock.patch("now_lms.vistas.courses.resources.send_protected_file") as mock_send:
             client_instructor.get(f"/course/{course_code}/library/file/manual.pdf")
             mock_send.assert_called_once_with("/tmp", "manual.pdf", as_attachment=True)
 
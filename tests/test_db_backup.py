@@ -0,0 +1,53 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Online SQLite backups, compression, restore and retention."""
+
+import sqlite3
+
+import pytest
+
+from now_lms.db.backup import BACKUP_PREFIX, db_backup, db_backup_restore, rotate_backups
+
+
+def _rows(db_file):
+    with sqlite3.connect(db_file) as connection:
+        return [row[0] for row in connection.execute("SELECT nombre FROM curso ORDER BY nombre")]
+
+
+@pytest.mark.parametrize("compress", ["gzip", "none"])
+def test_sqlite_backup_and_restore(app, tmp_path, compress):
+    db_file = tmp_path / "lms.db"
+    with sqlite3.connect(db_file) as connection:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE curso (nombre TEXT)")
+        connection.execute("INSERT INTO curso VALUES ('Respaldo')")
+
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_file}"
+    with app.app_context():
+        backup_file = db_backup(compress=compress, directory=tmp_path / "backups")
+        assert backup_file.name.endswith(".sqlite.gz" if compress == "gzip" else ".sqlite")
+
+        with sqlite3.connect(db_file) as connection:
+            connection.execute("INSERT INTO curso VALUES ('Después del respaldo')")
+        db_backup_restore(backup_file)
+
+    assert _rows(db_file) == ["Respaldo"]
+
+
+def test_rotate_backups_keeps_newest(tmp_path):
+    for stamp in ("20260101-000000", "20260102-000000", "20260103-000000"):
+        (tmp_path / f"{BACKUP_PREFIX}{stamp}.sqlite.gz").write_bytes(b"x")
+    (tmp_path / f"{BACKUP_PREFIX}20260104-000000.pgdump").mkdir()
+    (tmp_path / "otro-archivo.txt").write_text("x")
+
+    removed = rotate_backups(tmp_path, keep=2)
+
+    assert [path.name for path in removed] == [
+        f"{BACKUP_PREFIX}20260101-000000.sqlite.gz",
+        f"{BACKUP_PREFIX}20260102-000000.sqlite.gz",
+    ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        f"{BACKUP_PREFIX}20260103-000000.sqlite.gz",
+        f"{BACKUP_PREFIX}20260104-000000.pgdump",
+        "otro-archivo.txt",
+    ]
@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Composite indexes of the hot lookup paths and the EXPLAIN report."""
+
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from now_lms.db.explain import explain_hot_queries
+
+MIGRATION_PATH = (
+    Path(__file__).resolve().parent.parent / "now_lms" / "migrations" / "20260805_000000_add_composite_lookup_indexes.py"
+)
+
+# The indexed columns of each table; message_thread is left out to cover a missing table.
+SCHEMA = {
+    "curso_recurso_avance": "usuario VARCHAR(150), recurso VARCHAR(32)",
+    "evaluation_attempt": "evaluation_id VARCHAR(26), user_id VARCHAR(150)",
+    "user_events": "user_id VARCHAR(150), resource_id VARCHAR(26)",
+    "curso_recurso": "seccion VARCHAR(32), indice INTEGER",
+    "curso_seccion": "curso VARCHAR(10), indice INTEGER",
+    "curso": "publico BOOLEAN, estado VARCHAR(10)",
+    "message": "thread_id VARCHAR(26), timestamp DATETIME",
+}
+
+
+def test_hot_queries_use_indexes(app, db_session):
+    results = explain_hot_queries()
+    assert len(results) == 10
+    assert all(result.plan for result in results)
+    assert [result.name for result in results if result.seq_scans] == []
+
+
+@pytest.fixture()
+def migration():
+    spec = importlib.util.spec_from_file_location("mig_hot_path_indexes", MIGRATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(engine, step):
+    with engine.begin() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            step()
+
+
+def _indexes(engine):
+    inspector = sa.inspect(engine)
+    return {table: {index["name"] for index in inspector.get_indexes(table)} for table in inspector.get_table_names()}
+
+
+def test_migration_creates_and_drops_the_indexes(tmp_path, migration):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'indexes.db'}")
+    with engine.begin() as conn:
+        for table, columns in SCHEMA.items():
+            conn.execute(sa.text(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, {columns})"))
+    expected = {(table, name) for table, name, _columns in migration.INDEXES if table in SCHEMA}
+
+    _run(engine, migration.upgrade)
+    created = {(table, name) for table, names in _indexes(engine).items() for name in names}
+    assert created == expected
+
+    # Running it again on an upgraded database changes nothing.
+    _run(engine, migration.upgrade)
+    assert {(table, name) for table, names in _indexes(engine).items() for name in names} == expected
+
+    _run(engine, migration.downgrade)
+    assert all(not names for names in _indexes(engine).values())
+    engine.dispose()
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Connection pool sizing from the worker plan and pool instrumentation."""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from now_lms.db_pool import InstrumentedQueuePool, max_connections_from_env, pool_options, pool_options_from_env, pool_stats
+
+
+def test_pool_options_follow_worker_plan():
+    options = pool_options(workers=4, threads=4)
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (5, 2)
+
+    # 9 workers x 4 threads on a database that allows the application 40 connections
+    options = pool_options(workers=9, threads=4, max_connections=40)
+    assert options["pool_size"] + options["max_overflow"] == 4
+    assert 9 * (options["pool_size"] + options["max_overflow"]) <= 40
+
+    assert pool_options_from_env("sqlite:///now_lms.db") == {}
+
+
+def test_max_connections_from_env(monkeypatch):
+    monkeypatch.delenv("NOW_LMS_DB_MAX_CONNECTIONS", raising=False)
+    monkeypatch.delenv("DB_MAX_CONNECTIONS", raising=False)
+    assert max_connections_from_env() == 0
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "40")
+    assert max_connections_from_env() == 40
+    monkeypatch.setenv("NOW_LMS_DB_MAX_CONNECTIONS", "25")
+    assert max_connections_from_env() == 25
+
+
+def test_pool_stats_record_waits_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 1
+        assert stats["saturation"] == 1.0
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["peak_saturation"] == 1.0
+    engine.dispose()
+
+
+def test_health_reports_pool(client):
+    response = client.get("/health")
+    assert response.json["database_pool"]["class"]
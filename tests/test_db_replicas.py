@@ -0,0 +1,85 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Read-only views served from database replicas."""
+
+import hashlib
+
+import pytest
+from flask import request
+from sqlalchemy.orm import Session
+
+from now_lms.db import Curso, ExternalApiKey, database, select
+from now_lms.db.replicas import PRIMARY_COOKIE, REPLICAS_EXTENSION, init_replicas
+
+API_KEY = "replica-api-key"
+
+
+@pytest.fixture
+def replica(app, db_session, tmp_path):
+    db_session.add(ExternalApiKey(name="Replica", key_hash=hashlib.sha256(API_KEY.encode()).hexdigest(), active=True))
+    db_session.commit()
+
+    app.config["REPLICA_URLS"] = [f"sqlite:///{tmp_path / 'replica.db'}"]
+    init_replicas(app)
+    engine = app.extensions[REPLICAS_EXTENSION][0]
+    database.metadata.create_all(engine)
+    # A course that only reached the replica tells where each query went.
+    with Session(engine) as session:
+        session.add(
+            Curso(
+                codigo="replica01",
+                nombre="Solo en la réplica",
+                descripcion_corta="d",
+                descripcion="d",
+                estado="open",
+                publico=True,
+            )
+        )
+        session.commit()
+
+    yield engine
+
+    engine.dispose()
+
+
+def test_read_only_view_uses_replica(app, replica):
+    headers = {"X-API-Key": API_KEY}
+    with app.test_client() as client:
+        response = client.get("/api/v1/public/courses/replica01", headers=headers)
+        assert response.status_code == 200
+        assert response.json["title"] == "Solo en la réplica"
+        # Bookkeeping writes of a GET do not pin the user to the primary
+        assert PRIMARY_COOKIE not in response.headers.get("Set-Cookie", "")
+
+        client.set_cookie(PRIMARY_COOKIE, "1", domain="localhost.localdomain")
+        assert client.get("/api/v1/public/courses/replica01", headers=headers).status_code == 404
+
+
+def test_writes_and_locks_stay_on_primary(app, replica):
+    with app.test_request_context("/course/explore"):
+        request.read_replica = True
+        assert database.session.get_bind(clause=select(Curso)) is replica
+        assert database.session.get_bind(clause=select(Curso).with_for_update()) is database.engine
+
+        database.session.add(ExternalApiKey(name="Pendiente", key_hash="pendiente", active=True))
+        database.session.flush()
+        assert database.session.get_bind(clause=select(Curso)) is database.engine
+        database.session.rollback()
+        assert database.session.get_bind(clause=select(Curso)) is replica
+
+    with app.test_request_context("/user/logout"):
+        assert database.session.get_bind(clause=select(Curso)) is database.engine
+
+    with app.test_request_context("/blog/new", method="POST"):
+        request.database_write = True
+        response = app.process_response(app.response_class("ok"))
+        assert f"{PRIMARY_COOKIE}=1" in response.headers["Set-Cookie"]
+
+
+def test_bulk_writes_stick_to_primary(app, replica):
+    with app.test_request_context("/admin/enrollments/import", method="POST"):
+        request.read_replica = True
+        database.session.execute(database.update(ExternalApiKey).where(ExternalApiKey.name == "Replica").values(active=True))
+        assert request.database_write
+        assert database.session.get_bind(clause=select(Curso)) is database.engine
+        database.session.rollback()
@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Dashboard summary tables refreshed from the source rows."""
+
+from datetime import date, datetime
+
+from now_lms.auth import proteger_passwd
+from now_lms.db import (
+    CourseSummary,
+    Curso,
+    CursoUsuarioAvance,
+    DailySummary,
+    DocenteCurso,
+    EstudianteCurso,
+    Pago,
+    SiteSummary,
+    StaffSummary,
+    Usuario,
+    database,
+    select,
+)
+from now_lms.db.reporting import SummaryChanges, _changed_columns, refresh_summaries
+
+
+def _user(usuario, tipo):
+    return Usuario(
+        usuario=usuario,
+        acceso=proteger_passwd("pass"),
+        nombre=usuario,
+        apellido="Test",
+        correo_electronico=f"{usuario}@example.com",
+        tipo=tipo,
+        activo=True,
+        correo_electronico_verificado=True,
+    )
+
+
+def _summaries():
+    database.session.expire_all()
+    return (
+        database.session.execute(select(CourseSummary).filter_by(curso="REP01")).scalar_one(),
+        database.session.execute(select(StaffSummary).filter_by(usuario="rep_teacher", rol="instructor")).scalar_one(),
+        database.session.execute(select(DailySummary).filter_by(fecha=date.today())).scalar_one(),
+        database.session.execute(select(SiteSummary)).scalar_one(),
+    )
+
+
+def _seed(db_session):
+    db_session.add_all([_user("rep_teacher", "instructor"), _user("rep_student", "student")])
+    db_session.add(
+        Curso(codigo="REP01", nombre="Reportes", descripcion_corta="d", descripcion="d", estado="open", publico=True)
+    )
+    db_session.commit()
+    db_session.add(DocenteCurso(curso="REP01", usuario="rep_teacher", vigente=True))
+    db_session.add(EstudianteCurso(curso="REP01", usuario="rep_student", vigente=True))
+    db_session.add(
+        Pago(
+            usuario="rep_student",
+            curso="REP01",
+            nombre="rep_student",
+            apellido="Test",
+            correo_electronico="rep_student@example.com",
+            monto=25,
+            moneda="USD",
+            metodo="paypal",
+            estado="completed",
+            fecha=datetime.now(),
+        )
+    )
+    db_session.commit()
+
+
+def test_summaries_follow_commits(app, db_session):
+    _seed(db_session)
+
+    course, staff, day, site = _summaries()
+    assert (course.students, course.payments, float(course.revenue)) == (1, 1, 25.0)
+    assert (staff.courses, staff.students) == (1, 1)
+    assert (day.enrollments, day.payments) == (1, 1)
+    assert day.new_users >= 2  # The administrator of the test database is also created today
+    assert (site.enrollments, site.paypal_payments, float(site.paypal_revenue)) == (1, 1, 25.0)
+
+    enrollment = db_session.execute(select(EstudianteCurso).filter_by(usuario="rep_student")).scalar_one()
+    enrollment.vigente = False
+    db_session.commit()
+
+    course, staff, _day, _site = _summaries()
+    assert course.students == 0
+    assert staff.students == 0
+
+    # A full rebuild gives the same rows.
+    database.session.execute(database.delete(StaffSummary))
+    database.session.commit()
+    assert refresh_summaries()
+    course, staff, day, _site = _summaries()
+    assert (course.students, staff.courses, staff.students, day.enrollments) == (0, 1, 0, 1)
+
+
+def test_bulk_statements_refresh_summaries(app, db_session):
+    _seed(db_session)
+    db_session.add(_user("rep_bulk", "student"))
+    db_session.commit()
+
+    db_session.execute(database.insert(EstudianteCurso), [{"curso": "REP01", "usuario": "rep_bulk", "vigente": True}])
+    db_session.commit()
+    course, staff, day, site = _summaries()
+    assert (course.students, staff.students, day.enrollments, site.enrollments) == (2, 2, 2, 2)
+
+    db_session.execute(database.update(EstudianteCurso).where(EstudianteCurso.usuario == "rep_bulk").values(vigente=False))
+    db_session.commit()
+    course, staff, _day, _site = _summaries()
+    assert (course.students, staff.students) == (1, 1)
+
+    db_session.execute(database.delete(EstudianteCurso).where(EstudianteCurso.usuario == "rep_bulk"))
+    db_session.commit()
+    _course, _staff, day, site = _summaries()
+    assert (day.enrollments, site.enrollments) == (1, 1)
+
+
+def test_progress_only_marks_the_course_completions():
+    changes = SummaryChanges()
+    changes.add(CursoUsuarioAvance(curso="REP01", usuario="rep_student"))
+    assert changes.completions == {"REP01"}
+    assert not (changes.courses or changes.staff or changes.dates or changes.site)
+
+
+def test_only_counted_columns_mark_summaries(app, db_session):
+    _seed(db_session)
+    usuario = db_session.execute(select(Usuario).filter_by(usuario="rep_student")).scalar_one()
+    progress = CursoUsuarioAvance(curso="REP01", usuario="rep_student", avance=0, completado=False)
+    db_session.add(progress)
+    db_session.commit()
+    course, _staff, _day, _site = _summaries()
+    assert course.completions == 0
+
+    # A login only stores the last access: no summary changes.
+    changes = SummaryChanges()
+    usuario.ultimo_acceso = datetime.now()
+    progress.avance = 50
+    changes.add(usuario, _changed_columns(usuario))
+    changes.add(progress, _changed_columns(progress))
+    assert not changes
+
+    usuario.activo = False
+    changes.add(usuario, _changed_columns(usuario))
+    assert changes.site and not changes.dates
+
+    progress.completado = True
+    db_session.commit()
+    course, _staff, _day, _site = _summaries()
+    assert course.completions == 1
+
+
+def test_instructor_panel_reads_summary(app, client, db_session):
+    _seed(db_session)
+    # Rows the panel reads instead of counting enrollments.
+    staff = db_session.execute(select(StaffSummary).filter_by(usuario="rep_teacher")).scalar_one()
+    staff.students = 4242
+    db_session.commit()
+
+    client.post("/user/login", data={"usuario": "rep_teacher", "acceso": "pass"})
+    response = client.get("/home/panel")
+    assert response.status_code == 200
+    assert b"4242" in response.data
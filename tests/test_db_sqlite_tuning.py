@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""SQLite production mode: connection pragmas, serialized writes and WAL checkpoints."""
+
+import threading
+
+from sqlalchemy import create_engine, text
+
+from now_lms.db import Etiqueta, database
+from now_lms.db.sqlite_tuning import (
+    SQLITE_EXTENSION,
+    apply_sqlite_pragmas,
+    checkpoint,
+    is_file_database,
+    sqlite_pragmas,
+)
+
+
+def test_pragmas_and_checkpoint(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'lms.db'}")
+    assert is_file_database(engine)
+    assert not is_file_database(create_engine("sqlite://"))
+
+    apply_sqlite_pragmas(engine, sqlite_pragmas({"SQLITE_BUSY_TIMEOUT": 2500}))
+    with engine.begin() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 2500
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        assert connection.execute(text("PRAGMA cache_size")).scalar() == -65536
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+        connection.execute(text("INSERT INTO t VALUES (1)"))
+
+    result = checkpoint(engine, "truncate")
+    assert result["busy"] == 0
+    assert result["log_pages"] == result["checkpointed"] == 0
+    engine.dispose()
+
+
+def test_writes_hold_the_lock_until_commit(app, db_session):
+    lock = threading.Lock()
+    app.extensions[SQLITE_EXTENSION] = lock
+    try:
+        database.session.add(Etiqueta(nombre="sqlite", color="#000000"))
+        database.session.flush()
+        assert lock.locked()
+        database.session.commit()
+        assert not lock.locked()
+
+        database.session.query(Etiqueta).filter_by(nombre="sqlite").update({"color": "#ffffff"})
+        assert lock.locked()
+        database.session.rollback()
+        assert not lock.locked()
+    finally:
+        app.extensions.pop(SQLITE_EXTENSION)
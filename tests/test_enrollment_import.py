@@ -0,0 +1,200 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Tests for the bulk enrollment importer."""
+
+from io import BytesIO, StringIO
+
+import pytest
+
+from now_lms.auth import proteger_passwd
+from now_lms.db import (
+    Curso,
+    CursoRecurso,
+    CursoRecursoAvance,
+    CursoSeccion,
+    EstudianteCurso,
+    Pago,
+    Programa,
+    ProgramaCurso,
+    ProgramaEstudiante,
+    Usuario,
+    database,
+)
+from now_lms import enrollment_import
+from now_lms.enrollment_import import detect_format, import_enrollments, parse_row
+
+
+class MemoryCache:
+    """Stand-in for a configured cache (the test default is NullCache)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.data[key] = value
+
+
+@pytest.fixture
+def import_data(app, db_session):
+    """Courses, a program and an existing student."""
+    db_session.add_all(
+        [
+            Usuario(
+                usuario="admin_imp",
+                acceso=proteger_passwd("pass"),
+                nombre="Admin",
+                correo_electronico="admin_imp@example.com",
+                tipo="admin",
+                activo=True,
+                correo_electronico_verificado=True,
+            ),
+            Usuario(
+                usuario="known",
+                acceso=proteger_passwd("pass"),
+                nombre="Known",
+                apellido="Student",
+                correo_electronico="known@example.com",
+                tipo="student",
+                activo=True,
+            ),
+            Curso(codigo="IMP1", nombre="Import 1", descripcion_corta="d", descripcion="d", estado="open"),
+            Curso(codigo="IMP2", nombre="Import 2", descripcion_corta="d", descripcion="d", estado="open"),
+            Programa(codigo="PIMP", nombre="Import Program", descripcion="d"),
+        ]
+    )
+    db_session.commit()
+    db_session.add_all([ProgramaCurso(programa="PIMP", curso="IMP1"), ProgramaCurso(programa="PIMP", curso="IMP2")])
+    seccion = CursoSeccion(curso="IMP1", nombre="S1", descripcion="S", indice=1)
+    db_session.add(seccion)
+    db_session.flush()
+    db_session.add(CursoRecurso(curso="IMP1", seccion=seccion.id, nombre="R1", descripcion="D", tipo="text", indice=1))
+    db_session.commit()
+
+
+def _enrollments():
+    return sorted(
+        (e.usuario, e.curso, e.vigente) for e in database.session.execute(database.select(EstudianteCurso)).scalars().all()
+    )
+
+
+def test_parse_row_validation():
+    row = parse_row(2, {"Email": " New@Example.com ", "course_code": "IMP1"})
+    assert row.email == "new@example.com"
+    assert row.username == "new@example.com"
+    assert row.first_name == "new"
+
+    with pytest.raises(ValueError):
+        parse_row(3, {"email": "not-an-email", "course_code": "IMP1"})
+    with pytest.raises(ValueError):
+        parse_row(4, {"email": "a@example.com"})
+    with pytest.raises(ValueError):
+        parse_row(5, {"email": "a@example.com", "course_code": "IMP1", "program_code": "PIMP"})
+    assert parse_row(6, {"email": "a@example.com"}, default_program="PIMP").program_code == "PIMP"
+
+    assert detect_format("students.ndjson") == "ndjson"
+    assert detect_format("students.CSV") == "csv"
+
+
+def test_import_csv_creates_users_and_enrollments(app, import_data):
+    data = StringIO(
+        "email,username,first_name,last_name,course_code\n"
+        "known@example.com,,,,IMP1\n"
+        "new@example.com,newbie,New,Person,IMP1\n"
+        "new@example.com,newbie,New,Person,IMP1\n"
+        "taken@example.com,known,,,IMP1\n"
+        "other@example.com,,,,NOPE\n"
+        "broken,,,,IMP1\n"
+    )
+    with app.test_request_context():
+        report = import_enrollments(data, "csv", send_emails=False, workers=1)
+
+    assert (report.created, report.skipped, report.failed, report.users_created) == (2, 1, 3, 1)
+    assert {line for line, _message in report.errors} == {5, 6, 7}
+    assert _enrollments() == [("known", "IMP1", True), ("newbie", "IMP1", True)]
+
+    nuevo = database.session.execute(database.select(Usuario).filter_by(usuario="newbie")).scalar_one()
+    assert nuevo.correo_electronico == "new@example.com"
+    assert nuevo.activo is False
+    assert nuevo.acceso.startswith(b"$argon2")
+
+    pagos = database.session.execute(database.select(Pago)).scalars().all()
+    assert {(p.usuario, p.metodo, p.nombre) for p in pagos} == {
+        ("known", "bulk_import", "Known"),
+        ("newbie", "bulk_import", "New"),
+    }
+    avance = database.session.execute(database.select(CursoRecursoAvance.usuario)).scalars().all()
+    assert sorted(avance) == ["known", "newbie"]
+
+    # Importing the same file again changes nothing
+    data.seek(0)
+    with app.test_request_context():
+        again = import_enrollments(data, "csv", send_emails=False, workers=1)
+    assert (again.created, again.skipped, again.users_created) == (0, 3, 0)
+
+
+def test_database_error_counts_each_row_once(app, import_data, monkeypatch):
+    def _fail(_pares):
+        raise RuntimeError("simulated database error")
+
+    monkeypatch.setattr("now_lms.vistas.courses.helpers._sembrar_avance_inscripciones", _fail)
+    data = StringIO("email,course_code\nknown@example.com,IMP1\nother@example.com,NOPE\n")
+    with app.test_request_context():
+        report = import_enrollments(data, "csv", send_emails=False, workers=1)
+
+    assert (report.created, report.failed) == (0, 2)
+    assert sorted(report.errors) == [(2, "database error"), (3, "course 'NOPE' not found")]
+    assert _enrollments() == []
+
+
+def test_import_ndjson_program_with_default(app, import_data):
+    database.session.add(EstudianteCurso(curso="IMP2", usuario="known", vigente=False))
+    database.session.commit()
+    data = StringIO('{"email": "known@example.com"}\n\nnot json\n{"email": "fresh@example.com", "first_name": "Fresh"}\n')
+
+    with app.test_request_context():
+        report = import_enrollments(data, "ndjson", program_code="PIMP", workers=1, chunk_size=1)
+
+    assert (report.created, report.skipped, report.failed, report.users_created) == (2, 0, 1, 1)
+    assert report.errors == [(3, "invalid JSON")]
+    assert _enrollments() == [
+        ("fresh@example.com", "IMP1", True),
+        ("fresh@example.com", "IMP2", True),
+        ("known", "IMP1", True),
+        ("known", "IMP2", True),
+    ]
+    programa = database.session.execute(database.select(Programa).filter_by(codigo="PIMP")).scalar_one()
+    inscritos = database.session.execute(database.select(ProgramaEstudiante.usuario).filter_by(programa=programa.id)).scalars()
+    assert sorted(inscritos) == ["fresh@example.com", "known"]
+
+
+def test_admin_import_endpoint(app, client, import_data, monkeypatch):
+    monkeypatch.setattr("now_lms.enrollment_import.cache", MemoryCache())
+    workers = []
+    original = enrollment_import.import_enrollments
+    monkeypatch.setattr(
+        enrollment_import, "import_enrollments", lambda *args, **kw: workers.append(kw["workers"]) or original(*args, **kw)
+    )
+    client.post("/user/login", data={"usuario": "admin_imp", "acceso": "pass"})
+    assert client.get("/admin/enrollments/import").status_code == 200
+
+    response = client.post(
+        "/admin/enrollments/import",
+        data={
+            "archivo": (BytesIO(b"email,course_code\nknown@example.com,IMP2\n"), "students.csv"),
+            "course_code": "",
+            "program_code": "",
+        },
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 302
+    assert "job=" in response.location
+    # The web path never forks a process pool.
+    assert workers == [1]
+    assert _enrollments() == [("known", "IMP2", True)]
+
+    response = client.get(response.location)
+    assert b"import_report" in response.data
+    assert client.get("/admin/enrollments/import?job=unknown").status_code == 200
@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Content-addressed upload store: identical uploads share one file on disk."""
+
+import io
+import os
+
+import pytest
+from flask_uploads import ALL, UploadConfiguration
+from werkzeug.datastructures import FileStorage
+
+from now_lms.file_store import (
+    ContentAddressedUploadSet,
+    blob_path,
+    collect_garbage,
+    deduplicate,
+    deduplicate_tree,
+    file_digest,
+    store_stats,
+)
+
+
+@pytest.fixture
+def store(app, tmp_path):
+    previous = app.config.get("FILE_STORE_DIR"), app.config.get("FILE_DEDUP")
+    app.config["FILE_STORE_DIR"] = str(tmp_path / ".store")
+    app.config["FILE_DEDUP"] = True
+    with app.app_context():
+        yield tmp_path / ".store"
+    app.config["FILE_STORE_DIR"], app.config["FILE_DEDUP"] = previous
+
+
+def test_identical_files_share_one_blob(store, tmp_path):
+    first = tmp_path / "c1" / "guia.pdf"
+    second = tmp_path / "c2" / "guia-copia.pdf"
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_bytes(b"same content")
+
+    digest = deduplicate(str(first))
+    assert deduplicate(str(second)) == digest
+    assert os.path.samefile(first, second)
+    assert os.path.samefile(first, blob_path(str(store), digest))
+    assert os.stat(first).st_nlink == 3
+    assert store_stats()["bytes_saved"] == len(b"same content")
+
+    # Referenced blobs survive garbage collection; orphans do not
+    assert collect_garbage()["removed"] == 0
+    first.unlink()
+    assert collect_garbage()["removed"] == 0
+    second.unlink()
+    assert collect_garbage(dry_run=True)["removed"] == 1
+    assert collect_garbage() == {"removed": 1, "bytes": len(b"same content")}
+    assert list(store.iterdir()) == []
+
+
+def test_deduplicate_tree_and_disabled(app, store, tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b" / "_sizes").mkdir(parents=True)
+    (tmp_path / "a" / "x.bin").write_bytes(b"x" * 100)
+    (tmp_path / "b" / "y.bin").write_bytes(b"x" * 100)
+    (tmp_path / "b" / "_sizes" / "y-320.webp").write_bytes(b"x" * 100)
+    (tmp_path / "b" / ".upload-part").write_bytes(b"x" * 100)
+
+    stats = deduplicate_tree(str(tmp_path))
+    assert stats == {"files": 2, "linked": 1, "bytes_saved": 100}
+    assert os.stat(tmp_path / "b" / "_sizes" / "y-320.webp").st_nlink == 1
+    assert os.stat(tmp_path / "b" / ".upload-part").st_nlink == 1
+    assert deduplicate_tree(str(tmp_path))["files"] == 0
+
+    app.config["FILE_DEDUP"] = False
+    (tmp_path / "c.bin").write_bytes(b"x" * 100)
+    assert deduplicate(str(tmp_path / "c.bin")) is None
+    assert os.stat(tmp_path / "c.bin").st_nlink == 1
+
+
+def test_upload_set_save_links_to_store(store, tmp_path):
+    files = ContentAddressedUploadSet("files", ALL)
+    files._config = UploadConfiguration(str(tmp_path / "uploads"))
+
+    first = files.save(FileStorage(io.BytesIO(b"pdf bytes"), filename="guia.pdf"), folder="c1")
+    second = files.save(FileStorage(io.BytesIO(b"pdf bytes"), filename="guia.pdf"), folder="c2")
+    assert os.path.samefile(files.path(first), files.path(second))
+    assert os.path.exists(blob_path(str(store), file_digest(files.path(first))))
+
+
+def test_default_store_is_outside_the_package():
+    from now_lms.config import DIRECTORIO_ALMACEN_ARCHIVOS, DIRECTORIO_APP
+
+    if os.environ.get("NOW_LMS_FILE_STORE_DIR") or os.environ.get("NOW_LMS_DATA_DIR"):
+        pytest.skip("store directory set in the environment")
+    assert not os.path.abspath(DIRECTORIO_ALMACEN_ARCHIVOS).startswith(str(DIRECTORIO_APP))
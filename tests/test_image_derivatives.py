@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Tests for resized copies of uploaded images."""
+
+import os
+
+from PIL import Image
+
+from now_lms.db import Curso
+from now_lms.image_derivatives import (
+    DERIVATIVES_DIR,
+    backfill_derivatives,
+    generate_derivatives,
+    image_variants,
+    remove_derivatives,
+)
+
+
+def _image(path, size=(1000, 500), mode="RGBA", fmt="PNG"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new(mode, size, (10, 20, 30, 128) if mode == "RGBA" else (10, 20, 30)).save(path, format=fmt)
+    return path
+
+
+def test_generate_derivatives(tmp_path):
+    original = _image(tmp_path / "logo.png")
+
+    written = generate_derivatives(original)
+    sizes = original.parent / DERIVATIVES_DIR
+    assert written > 0
+    assert (sizes / "logo-320.webp").exists()
+    assert (sizes / "logo-640.jpg").exists()
+    # The original is 1000px wide: copies at its own width, never upscaled to 1280
+    assert (sizes / "logo-1000.webp").exists()
+    assert not (sizes / "logo-1280.webp").exists()
+    with Image.open(sizes / "logo-320.jpg") as jpeg:
+        assert jpeg.size == (320, 160)
+        assert jpeg.mode == "RGB"
+
+    # Up to date copies are not written again
+    assert generate_derivatives(original) == 0
+
+    remove_derivatives(original)
+    assert not any(sizes.iterdir())
+
+
+def test_backfill_skips_derivatives_dir(tmp_path):
+    _image(tmp_path / "a" / "logo.jpg", size=(2000, 1000), mode="RGB", fmt="JPEG")
+    _image(tmp_path / "usuarios" / "u1.jpg", size=(200, 200), mode="RGB", fmt="JPEG")
+    (tmp_path / "notes.txt").write_text("not an image")
+
+    stats = backfill_derivatives(tmp_path)
+    assert stats["images"] == 2
+    assert (tmp_path / "a" / DERIVATIVES_DIR / "logo-1280.webp").exists()
+    assert (tmp_path / "usuarios" / DERIVATIVES_DIR / "u1-200.webp").exists()
+    assert backfill_derivatives(tmp_path)["written"] == 0
+
+
+def test_image_variants_and_catalog_srcset(app, db_session, tmp_path, monkeypatch):
+    app.static_folder = str(tmp_path)
+    original = _image(tmp_path / "files" / "public" / "images" / "img01" / "logo.jpg", mode="RGB", fmt="JPEG")
+
+    with app.test_request_context("/"):
+        assert image_variants("/files/public/images/img01/logo.jpg") == {}
+        assert image_variants("/files/public/images/../../etc/passwd") == {}
+
+    generate_derivatives(original)
+    with app.test_request_context("/"):
+        variants = image_variants("/files/public/images/img01/logo.jpg")
+    assert variants["webp"].split(", ")[0] == "/static/files/public/images/img01/_sizes/logo-320.webp 320w"
+    assert "logo-1000.jpg 1000w" in variants["jpg"]
+
+    # The copies found are remembered until the image or its copies change
+    scans = []
+    real_scandir = os.scandir
+    monkeypatch.setattr("now_lms.image_derivatives.os.scandir", lambda path: scans.append(path) or real_scandir(path))
+    with app.test_request_context("/"):
+        assert image_variants("/files/public/images/img01/logo.jpg") == variants
+    assert scans == []
+
+    # Copies older than the original (uploaded again) are stale until they are generated again
+    mtime = os.stat(original).st_mtime - 60
+    for copy in (original.parent / DERIVATIVES_DIR).iterdir():
+        os.utime(copy, (mtime, mtime))
+    os.utime(original)
+    with app.test_request_context("/"):
+        assert image_variants("/files/public/images/img01/logo.jpg") == {}
+    assert len(scans) == 1
+    assert generate_derivatives(original) > 0
+
+    db_session.add(
+        Curso(
+            nombre="Curso con portada",
+            codigo="img01",
+            descripcion_corta="d",
+            descripcion="d",
+            estado="open",
+            publico=True,
+            modalidad="self_paced",
+            portada=True,
+        )
+    )
+    db_session.commit()
+    response = app.test_client().get("/course/explore")
+    assert response.status_code == 200
+    assert b'type="image/webp"' in response.data
+    assert b"logo-640.webp 640w" in response.data
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Optional feature blueprints registered from the site configuration."""
+
+import pytest
+from flask import Flask, url_for
+from werkzeug.routing import BuildError
+
+from now_lms.db import Configuracion, PaypalConfig, database
+from now_lms.optional_modules import modules_needing_restart, register_optional_blueprints
+
+
+def _features(db_session, **flags):
+    config = database.session.execute(database.select(Configuracion)).scalar_one()
+    for name, value in flags.items():
+        setattr(config, name, value)
+    paypal = database.session.execute(database.select(PaypalConfig)).scalars().first()
+    if paypal is not None:
+        paypal.enable = False
+    db_session.commit()
+
+
+def test_only_enabled_modules_are_registered(app, db_session):
+    _features(db_session, enable_blog=True, enable_masterclass=False, enable_programs=False)
+    probe = Flask("probe")
+    probe.config.update(TESTING=False, LAZY_BLUEPRINTS=True, SERVER_NAME="localhost")
+
+    skipped = register_optional_blueprints(probe)
+
+    assert skipped == ["masterclass", "program", "paypal"]
+    assert "blog" in probe.blueprints
+    assert "program" not in probe.blueprints
+    with probe.test_request_context():
+        assert url_for("program.programas") == "#"
+        with pytest.raises(BuildError):
+            url_for("unknown.view")
+
+    assert modules_needing_restart(probe) == []
+    _features(db_session, enable_programs=True)
+    assert modules_needing_restart(probe) == ["program"]
+
+
+def test_all_modules_are_registered_when_testing(app, db_session):
+    _features(db_session, enable_blog=False, enable_masterclass=False, enable_programs=False)
+    probe = Flask("probe")
+    probe.config.update(TESTING=True)
+
+    assert register_optional_blueprints(probe) == []
+    assert {"blog", "masterclass", "program", "paypal"} <= set(probe.blueprints)
@@ -0,0 +1,153 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Server-side page images and text for PDF resources."""
+
+import io
+import os
+import shutil
+
+import pytest
+
+from now_lms.auth import proteger_passwd
+from now_lms.db import Curso, CursoRecurso, CursoSeccion, DocenteCurso, Usuario, database
+from now_lms.pdf_previews import PAGES_DIR, generate_previews, load_manifest, load_text, page_filename, preview_dir
+
+pytest.importorskip("pypdfium2")
+
+
+def _pdf(texts):
+    """A small valid PDF with one line of text per page."""
+    count = len(texts)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(count))
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {count} >>"]
+    for i, text in enumerate(texts):
+        stream = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {3 + 2 * count} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return data
+
+
+def test_generate_previews(tmp_path):
+    pdf_path = tmp_path / "deck.pdf"
+    pdf_path.write_bytes(_pdf(["Hola mundo", "Segunda pagina"]))
+
+    assert generate_previews(pdf_path) == 2
+    manifest = load_manifest(pdf_path)
+    assert len(manifest["pages"]) == 2
+    assert manifest["pages"][0]["width"] == 1280
+    assert (preview_dir(pdf_path) / page_filename(2)).exists()
+    assert preview_dir(pdf_path) == tmp_path / PAGES_DIR / "deck"
+    assert [text.strip() for text in load_text(pdf_path)] == ["Hola mundo", "Segunda pagina"]
+    assert generate_previews(pdf_path) == 0
+
+    # A replaced PDF makes the previews stale, and fewer pages remove the extra images
+    pdf_path.write_bytes(_pdf(["Nueva version"]))
+    assert load_manifest(pdf_path) is None
+    assert generate_previews(pdf_path) == 1
+    assert not (preview_dir(pdf_path) / page_filename(2)).exists()
+
+
+@pytest.fixture
+def pdf_course(app, db_session):
+    db_session.add_all(
+        [
+            Usuario(
+                usuario="docente_pdf",
+                acceso=proteger_passwd("docente_pdf"),
+                nombre="Docente",
+                correo_electronico="docente_pdf@example.com",
+                tipo="instructor",
+                activo=True,
+            ),
+            Usuario(
+                usuario="ajeno_pdf",
+                acceso=proteger_passwd("ajeno_pdf"),
+                nombre="Ajeno",
+                correo_electronico="ajeno_pdf@example.com",
+                tipo="student",
+                activo=True,
+            ),
+            Curso(
+                nombre="Curso PDF",
+                codigo="pdf01",
+                descripcion_corta="d",
+                descripcion="d",
+                estado="open",
+                publico=True,
+                modalidad="self_paced",
+            ),
+        ]
+    )
+    db_session.commit()
+    seccion = CursoSeccion(curso="pdf01", nombre="S1", descripcion="D", indice=1, estado=True)
+    db_session.add_all([seccion, DocenteCurso(curso="pdf01", usuario="docente_pdf")])
+    db_session.commit()
+    app.config["PDF_PREVIEWS"] = True
+
+    yield seccion.id
+
+    app.config["PDF_PREVIEWS"] = False
+    shutil.rmtree(os.path.join(app.upload_set_config["files"].destination, "pdf01"), ignore_errors=True)
+
+
+def test_pdf_viewer_uses_page_images(app, pdf_course):
+    with app.test_client() as client:
+        client.post("/user/login", data={"usuario": "docente_pdf", "acceso": "docente_pdf"})
+        response = client.post(
+            f"/course/pdf01/{pdf_course}/pdf/new",
+            data={
+                "nombre": "Slides",
+                "descripcion": "D",
+                "requerido": "required",
+                "pdf": (io.BytesIO(_pdf(["Uno", "Dos"])), "s.pdf"),
+            },
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 302
+        recurso = database.session.execute(database.select(CursoRecurso).filter_by(curso="pdf01", tipo="pdf")).scalar_one()
+
+        viewer = client.get(f"/course/pdf01/pdf_viewer/{recurso.id}").data.decode()
+        assert f"/course/pdf01/pdf_viewer/{recurso.id}/page/2" in viewer
+        assert "pdf.min.js" not in viewer
+
+        page = client.get(f"/course/pdf01/pdf_viewer/{recurso.id}/page/1")
+        assert page.status_code == 200
+        assert page.mimetype == "image/webp"
+        assert client.get(f"/course/pdf01/pdf_viewer/{recurso.id}/page/3").status_code == 404
+        assert [text.strip() for text in client.get(f"/course/pdf01/pdf_viewer/{recurso.id}/text").json["pages"]] == [
+            "Uno",
+            "Dos",
+        ]
+
+        # Same access rules as the PDF itself
+        client.get("/user/logout")
+        client.post("/user/login", data={"usuario": "ajeno_pdf", "acceso": "ajeno_pdf"})
+        assert client.get(f"/course/pdf01/pdf_viewer/{recurso.id}/page/1").status_code == 403
+
+
+def test_damaged_pdf_keeps_pdfjs_viewer(app, pdf_course):
+    with app.test_client() as client:
+        client.post("/user/login", data={"usuario": "docente_pdf", "acceso": "docente_pdf"})
+        response = client.post(
+            f"/course/pdf01/{pdf_course}/pdf/new",
+            data={"nombre": "Roto", "descripcion": "D", "requerido": "required", "pdf": (io.BytesIO(b"%PDF-1.4\n"), "r.pdf")},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 302
+        recurso = database.session.execute(database.select(CursoRecurso).filter_by(curso="pdf01", tipo="pdf")).scalar_one()
+        assert "pdf.min.js" in client.get(f"/course/pdf01/pdf_viewer/{recurso.id}").data.decode()
+        assert client.get(f"/course/pdf01/pdf_viewer/{recurso.id}/page/1").status_code == 404
@@ -551,3 +551,76 @@ def test_admin_enrollment_additional_coverage(client, db_session, extra_prog_set
         follow_redirects=True,
     )
     assert b"no est\xc3\xa1 inscrito en este programa" in response.data
+
+
+def test_admin_enrollment_batches_courses_and_progress(client, db_session, extra_prog_setup):
+    """Admin enrollment enrolls every program course once and seeds the student's progress."""
+    from now_lms.db import CursoRecurso, CursoRecursoAvance, CursoSeccion, EstudianteCurso
+
+    curso2 = Curso(codigo="C102", nombre="Curso 102", descripcion_corta="desc", descripcion="desc", estado="open")
+    db_session.add(curso2)
+    prog = Programa(codigo="PRG_BAT", nombre="Batch Prog", descripcion="desc", creado_por="admin_prog_ex")
+    db_session.add(prog)
+    db_session.commit()
+    db_session.add_all([ProgramaCurso(programa="PRG_BAT", curso="C101"), ProgramaCurso(programa="PRG_BAT", curso="C102")])
+    for codigo in ("C101", "C102"):
+        seccion = CursoSeccion(curso=codigo, nombre="S1", descripcion="S", indice=1)
+        db_session.add(seccion)
+        db_session.flush()
+        db_session.add_all(
+            [
+                CursoRecurso(curso=codigo, seccion=seccion.id, nombre=f"R{i}", descripcion="D", tipo="text", indice=i)
+                for i in (1, 2)
+            ]
+        )
+    # An inactive enrollment is reactivated instead of duplicated
+    db_session.add(EstudianteCurso(curso="C102", usuario="stud_p_ex", vigente=False))
+    db_session.commit()
+
+    login(client, "admin_prog_ex")
+    response = client.post(
+        "/program/PRG_BAT/admin/enroll",
+        data={"student_username": "stud_p_ex", "bypass_payment": True},
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+
+    inscripciones = db_session.execute(database.select(EstudianteCurso).filter_by(usuario="stud_p_ex")).scalars().all()
+    assert sorted((e.curso, e.vigente) for e in inscripciones) == [("C101", True), ("C102", True)]
+    assert all(e.pago for e in inscripciones)
+    pagos = db_session.execute(database.select(Pago).filter_by(usuario="stud_p_ex")).scalars().all()
+    assert {p.curso for p in pagos} == {"C101", "C102"}
+    assert all(p.metodo == "admin_program_enrollment" and p.nombre == "Student" for p in pagos)
+
+    avance = db_session.execute(database.select(CursoRecursoAvance)).scalars().all()
+    assert len(avance) == 4
+    assert {a.usuario for a in avance} == {"stud_p_ex"}
+
+
+def test_adding_a_course_enrolls_program_students_in_one_batch(client, db_session, extra_prog_setup):
+    """Adding a course to a program enrolls its students together and queues one calendar job."""
+    from now_lms.db import EstudianteCurso
+
+    second = Usuario(
+        usuario="stud_p_ex2",
+        acceso=proteger_passwd("pass"),
+        nombre="Second",
+        correo_electronico="stud_p_ex2@example.com",
+        tipo="student",
+        activo=True,
+    )
+    prog = Programa(codigo="PRG_ADD", nombre="Add Prog", descripcion="desc", creado_por="admin_prog_ex")
+    db_session.add_all([second, prog])
+    db_session.commit()
+    db_session.add_all([ProgramaEstudiante(usuario=u, programa=prog.id) for u in ("stud_p_ex", "stud_p_ex2")])
+    db_session.commit()
+
+    login(client, "admin_prog_ex")
+    with patch("now_lms.vistas.programs.schedule_events_for_students") as schedule:
+        client.post("/program/PRG_ADD/courses/manage", data={"action": "add_course", "curso_codigo": "C101"})
+
+    schedule.assert_called_once_with(["stud_p_ex", "stud_p_ex2"], ["C101"])
+    inscripciones = db_session.execute(database.select(EstudianteCurso).filter_by(curso="C101")).scalars().all()
+    assert sorted(e.usuario for e in inscripciones) == ["stud_p_ex", "stud_p_ex2"]
+    pagos = db_session.execute(database.select(Pago).filter_by(curso="C101", metodo="program_enrollment")).scalars()
+    assert {p.nombre for p in pagos} == {"Student", "Second"}
@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Range requests, conditional GET and cache headers on private course file routes."""
+
+import os
+import shutil
+
+import pytest
+
+from now_lms.auth import proteger_passwd
+from now_lms.db import Curso, CursoRecurso, CursoSeccion, EstudianteCurso, Usuario
+from now_lms.vistas.courses.helpers import get_course_library_path
+
+PAYLOAD = bytes(range(256)) * 40
+VTT = "WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nHola"
+
+
+@pytest.fixture
+def private_files(app, db_session):
+    """An enrolled student, an audio-like file resource with subtitles and a library file."""
+    db_session.add_all(
+        [
+            Usuario(
+                usuario="oyente",
+                acceso=proteger_passwd("oyente"),
+                nombre="Oyente",
+                correo_electronico="oyente@example.com",
+                tipo="student",
+                activo=True,
+            ),
+            Curso(
+                nombre="Curso rangos",
+                codigo="rng01",
+                descripcion_corta="d",
+                descripcion="d",
+                estado="open",
+                publico=True,
+                modalidad="self_paced",
+            ),
+        ]
+    )
+    db_session.commit()
+    seccion = CursoSeccion(curso="rng01", nombre="S1", descripcion="D", indice=1, estado=True)
+    db_session.add(seccion)
+    db_session.add(EstudianteCurso(curso="rng01", usuario="oyente", vigente=True))
+    db_session.commit()
+
+    destination = app.upload_set_config["files"].destination
+    os.makedirs(destination, exist_ok=True)
+    with open(os.path.join(destination, "rng01-lecture.bin"), "wb") as f:
+        f.write(PAYLOAD)
+    library = get_course_library_path("rng01")
+    os.makedirs(library, exist_ok=True)
+    with open(os.path.join(library, "notes.pdf"), "wb") as f:
+        f.write(PAYLOAD)
+
+    recurso = CursoRecurso(
+        curso="rng01",
+        seccion=seccion.id,
+        tipo="pdf",
+        nombre="Lecture",
+        descripcion="d",
+        indice=1,
+        base_doc_url="files",
+        doc="rng01-lecture.bin",
+        subtitle_vtt=VTT,
+    )
+    db_session.add(recurso)
+    db_session.commit()
+
+    yield recurso.id
+
+    os.remove(os.path.join(destination, "rng01-lecture.bin"))
+    shutil.rmtree(os.path.dirname(library), ignore_errors=True)
+
+
+def _login(client):
+    client.post("/user/login", data={"usuario": "oyente", "acceso": "oyente"})
+
+
+@pytest.mark.parametrize("kind", ["resource", "library"])
+def test_range_and_conditional_requests(app, private_files, kind):
+    url = f"/course/rng01/files/{private_files}" if kind == "resource" else "/course/rng01/library/file/notes.pdf"
+    with app.test_client() as client:
+        _login(client)
+
+        full = client.get(url)
+        assert full.status_code == 200
+        assert full.data == PAYLOAD
+        assert full.headers["Accept-Ranges"] == "bytes"
+        assert "private" in full.headers["Cache-Control"]
+        assert "public" not in full.headers["Cache-Control"]
+        etag = full.headers["ETag"]
+
+        partial = client.get(url, headers={"Range": "bytes=100-199"})
+        assert partial.status_code == 206
+        assert partial.data == PAYLOAD[100:200]
+        assert partial.headers["Content-Range"] == f"bytes 100-199/{len(PAYLOAD)}"
+
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        modified = client.get(url, headers={"If-Modified-Since": full.headers["Last-Modified"]})
+        assert modified.status_code == 304
+
+        assert client.get(url, headers={"Range": f"bytes={len(PAYLOAD) + 10}-"}).status_code == 416
+
+
+def test_vtt_is_conditional(app, private_files):
+    with app.test_client() as client:
+        _login(client)
+        first = client.get(f"/course/rng01/vtt/{private_files}")
+        assert first.status_code == 200
+        assert first.data.decode("utf-8") == VTT
+        assert "private" in first.headers["Cache-Control"]
+
+        again = client.get(f"/course/rng01/vtt/{private_files}", headers={"If-None-Match": first.headers["ETag"]})
+        assert again.status_code == 304
+        assert again.data == b""
+
+
+@pytest.mark.parametrize("kind", ["resource", "library"])
+def test_x_accel_offload(app, private_files, kind):
+    url = f"/course/rng01/files/{private_files}" if kind == "resource" else "/course/rng01/library/file/notes.pdf"
+    app.config["FILE_OFFLOAD"] = "x-accel"
+    try:
+        with app.test_client() as client:
+            _login(client)
+            response = client.get(url)
+    finally:
+        app.config["FILE_OFFLOAD"] = ""
+
+    assert response.status_code == 200
+    assert response.data == b""
+    assert response.headers["X-Accel-Redirect"].startswith("/_protected/public/files/")
+    assert "private" in response.headers["Cache-Control"]
+    if kind == "library":
+        assert response.headers["X-Accel-Redirect"].endswith("/rng01/library/notes.pdf")
+        assert response.headers["Content-Disposition"].startswith("attachment")
+
+
+def test_x_sendfile_offload_is_gated(app, private_files):
+    url = "/course/rng01/library/file/notes.pdf"
+    app.config["FILE_OFFLOAD"] = "x-sendfile"
+    try:
+        with app.test_client() as client:
+            assert "X-Sendfile" not in client.get(url).headers
+            _login(client)
+            response = client.get(url)
+    finally:
+        app.config["FILE_OFFLOAD"] = ""
+
+    library = get_course_library_path("rng01")
+    assert response.headers["X-Sendfile"] == os.path.join(os.path.realpath(library), "notes.pdf")
+    assert response.data == b""
+
+
+def test_only_granted_access_is_cached(app, private_files, monkeypatch):
+    from flask_login import login_user
+
+    from now_lms.db import database
+    from now_lms.vistas.courses.resources import _cached_file_access
+
+    memory = {}
+    monkeypatch.setattr("now_lms.vistas.courses.resources.cache.get", memory.get)
+    monkeypatch.setattr(
+        "now_lms.vistas.courses.resources.cache.set", lambda key, value, timeout=None: memory.update({key: value})
+    )
+    with app.test_request_context():
+        login_user(database.session.execute(database.select(Usuario).filter_by(usuario="oyente")).scalar_one())
+        assert _cached_file_access("course", "rng01", lambda: False) is False
+        assert memory == {}
+        assert _cached_file_access("course", "rng01", lambda: True) is True
+        assert _cached_file_access("course", "rng01", lambda: False) is True
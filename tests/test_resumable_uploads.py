@@ -0,0 +1,212 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Resumable, offset-based uploads for the course library and downloadable resources."""
+
+import io
+import os
+import time
+from hashlib import sha256
+
+import pytest
+
+from now_lms.auth import proteger_passwd
+from now_lms.db import Configuracion, CourseLibrary, Curso, CursoRecurso, CursoSeccion, DocenteCurso, Usuario, database
+from now_lms.resumable_uploads import UploadError, append_chunk, create_upload, expire_uploads, finish_upload, load_upload
+from now_lms.vistas.courses.helpers import get_course_library_path
+
+PAYLOAD = os.urandom(3 * 1024 * 1024 + 17)
+
+
+def test_append_resume_and_finish(tmp_path):
+    directory = str(tmp_path)
+    upload = create_upload(directory, "video.mp4", len(PAYLOAD), "maria", max_size=10 * 1024 * 1024)
+
+    assert append_chunk(directory, upload, 0, io.BytesIO(PAYLOAD[:1000])) is None
+    # A new request picks up the offset from the partial file
+    upload = load_upload(directory, upload.id)
+    assert upload.offset == 1000
+    with pytest.raises(UploadError) as error:
+        append_chunk(directory, upload, 0, io.BytesIO(PAYLOAD))
+    assert error.value.status == 409
+
+    checksum = append_chunk(directory, upload, 1000, io.BytesIO(PAYLOAD[1000:]))
+    assert checksum == sha256(PAYLOAD).hexdigest()
+
+    destination = finish_upload(directory, upload, "video.mp4")
+    assert open(destination, "rb").read() == PAYLOAD
+    assert os.listdir(directory) == ["video.mp4"]
+
+
+def test_chunks_are_hashed_while_written(tmp_path, monkeypatch):
+    from now_lms import resumable_uploads
+
+    hashed = []
+    real_hash_prefix = resumable_uploads._hash_prefix
+    monkeypatch.setattr(
+        resumable_uploads, "_hash_prefix", lambda path, length: hashed.append(length) or real_hash_prefix(path, length)
+    )
+    directory = str(tmp_path)
+    upload = create_upload(directory, "video.mp4", len(PAYLOAD), "maria", max_size=10 * 1024 * 1024)
+    chunk = 256 * 1024
+    checksum = None
+    for offset in range(0, len(PAYLOAD), chunk):
+        if offset == 4 * chunk:
+            # The next chunk lands in another process: only then is the received part read again.
+            resumable_uploads._hash_states.clear()
+        upload = load_upload(directory, upload.id)
+        checksum = append_chunk(directory, upload, offset, io.BytesIO(PAYLOAD[offset : offset + chunk]))
+    assert checksum == sha256(PAYLOAD).hexdigest()
+    assert hashed == [4 * chunk]
+    assert upload.id not in resumable_uploads._hash_states
+
+
+def test_limits_and_checksum(tmp_path):
+    directory = str(tmp_path)
+    with pytest.raises(UploadError) as error:
+        create_upload(directory, "big.zip", 2048, "maria", max_size=1024)
+    assert error.value.status == 413
+
+    upload = create_upload(directory, "a.txt", 10, "maria", max_size=1024)
+    with pytest.raises(UploadError) as error:
+        append_chunk(directory, upload, 0, io.BytesIO(b"x" * 11))
+    assert error.value.status == 413
+    assert load_upload(directory, upload.id).offset == 0
+
+    upload = create_upload(directory, "b.txt", 3, "maria", max_size=1024, checksum=sha256(b"abc").hexdigest())
+    with pytest.raises(UploadError) as error:
+        append_chunk(directory, upload, 0, io.BytesIO(b"abd"))
+    assert error.value.status == 460
+    assert load_upload(directory, upload.id).offset == 0
+
+    assert load_upload(directory, "../../etc/passwd") is None
+    old = time.time() - 2 * 24 * 60 * 60
+    for name in os.listdir(directory):
+        os.utime(os.path.join(directory, name), (old, old))
+    assert expire_uploads(directory) == 2
+    assert os.listdir(directory) == []
+
+
+@pytest.fixture
+def instructor_course(app, db_session, tmp_path, monkeypatch):
+    # Each test gets its own upload directories: xdist workers must not share (or clean up) the same course folder.
+    from now_lms.vistas.courses import helpers
+
+    monkeypatch.setattr(helpers, "DIRECTORIO_ARCHIVOS_PUBLICOS", str(tmp_path / "public"))
+    monkeypatch.setattr(app.upload_set_config["files"], "destination", str(tmp_path / "files"))
+    db_session.add_all(
+        [
+            Usuario(
+                usuario="autora",
+                acceso=proteger_passwd("autora"),
+                nombre="Autora",
+                correo_electronico="autora@example.com",
+                tipo="instructor",
+                activo=True,
+            ),
+            Usuario(
+                usuario="otro",
+                acceso=proteger_passwd("otro"),
+                nombre="Otro",
+                correo_electronico="otro@example.com",
+                tipo="instructor",
+                activo=True,
+            ),
+            Curso(
+                nombre="Curso video",
+                codigo="res01",
+                descripcion_corta="d",
+                descripcion="d",
+                estado="open",
+                publico=True,
+                modalidad="self_paced",
+            ),
+        ]
+    )
+    db_session.commit()
+    seccion = CursoSeccion(curso="res01", nombre="S1", descripcion="D", indice=1, estado=True)
+    db_session.add_all([seccion, DocenteCurso(curso="res01", usuario="autora"), DocenteCurso(curso="res01", usuario="otro")])
+    config = db_session.execute(database.select(Configuracion)).scalars().first()
+    config.enable_file_uploads = True
+    config.max_file_size = 10
+    db_session.commit()
+
+    return seccion.id
+
+
+def _upload(client, create_url, fields, payload, chunk_size=1024 * 1024):
+    created = client.post(create_url, data={**fields, "filename": fields.pop("filename"), "size": len(payload)})
+    assert created.status_code == 201, created.json
+    location = created.headers["Location"]
+    offset = 0
+    while True:
+        response = client.patch(location, data=payload[offset : offset + chunk_size], headers={"Upload-Offset": str(offset)})
+        if response.status_code != 204:
+            return location, response
+        offset = int(response.headers["Upload-Offset"])
+
+
+def test_library_resumable_upload(app, instructor_course):
+    with app.test_client() as client:
+        client.post("/user/login", data={"usuario": "autora", "acceso": "autora"})
+        created = client.post(
+            "/course/res01/library/uploads",
+            data={"nombre": "Clase", "descripcion": "Video", "filename": "clase 1.mp4", "size": len(PAYLOAD)},
+        )
+        assert created.status_code == 201
+        location = created.headers["Location"]
+
+        # Connection drops after the first megabyte: the client asks where to resume
+        assert client.patch(location, data=PAYLOAD[: 1024 * 1024], headers={"Upload-Offset": "0"}).status_code == 204
+        head = client.head(location)
+        assert head.headers["Upload-Offset"] == str(1024 * 1024)
+        assert head.headers["Upload-Length"] == str(len(PAYLOAD))
+        assert "clase" not in client.get("/course/res01/library").data.decode()
+
+        stale = client.patch(location, data=b"x", headers={"Upload-Offset": "0"})
+        assert stale.status_code == 409
+        assert stale.json["offset"] == 1024 * 1024
+
+        done = client.patch(location, data=PAYLOAD[1024 * 1024 :], headers={"Upload-Offset": str(1024 * 1024)})
+        assert done.status_code == 201
+        assert done.json["filename"] == "clase_1.mp4"
+        assert done.json["sha256"] == sha256(PAYLOAD).hexdigest()
+
+    record = database.session.execute(database.select(CourseLibrary).filter_by(curso="res01")).scalar_one()
+    assert record.file_size == len(PAYLOAD)
+    assert record.nombre == "Clase"
+    library = get_course_library_path("res01")
+    assert os.listdir(library) == ["clase_1.mp4"]
+    assert open(os.path.join(library, "clase_1.mp4"), "rb").read() == PAYLOAD
+
+
+def test_library_upload_rejections(app, instructor_course):
+    with app.test_client() as client:
+        client.post("/user/login", data={"usuario": "autora", "acceso": "autora"})
+        fields = {"nombre": "N", "descripcion": "D"}
+        assert client.post("/course/res01/library/uploads", data={**fields, "filename": "x.exe", "size": 1}).status_code == 400
+        too_big = client.post("/course/res01/library/uploads", data={**fields, "filename": "x.pdf", "size": 11 * 1024 * 1024})
+        assert too_big.status_code == 413
+        created = client.post("/course/res01/library/uploads", data={**fields, "filename": "x.pdf", "size": 4})
+        location = created.headers["Location"]
+
+        # Uploads are private to the user who created them
+        client.get("/user/logout")
+        client.post("/user/login", data={"usuario": "otro", "acceso": "otro"})
+        assert client.head(location).status_code == 404
+        assert client.patch(location, data=b"abcd", headers={"Upload-Offset": "0"}).status_code == 404
+
+
+def test_downloadable_resumable_upload(app, instructor_course):
+    seccion = instructor_course
+    with app.test_client() as client:
+        client.post("/user/login", data={"usuario": "autora", "acceso": "autora"})
+        fields = {"nombre": "Guía", "descripcion": "PDF", "requerido": "optional", "filename": "guia.pdf"}
+        _location, response = _upload(client, f"/course/res01/{seccion}/descargable/uploads", fields, PAYLOAD)
+        assert response.status_code == 201
+
+    recurso = database.session.execute(database.select(CursoRecurso).filter_by(curso="res01", tipo="descargable")).scalar_one()
+    assert recurso.nombre == "Guía"
+    assert recurso.requerido == "optional"
+    assert recurso.doc.startswith("res01/") and recurso.doc.endswith(".pdf")
+    path = os.path.join(app.upload_set_config["files"].destination, recurso.doc)
+    assert open(path, "rb").read() == PAYLOAD
@@ -145,18 +145,18 @@ def test_initial_setup_session_table_verification_success(monkeypatch):
     mock_inspector.get_table_names.return_value = ["flask_sessions"]
     monkeypatch.setattr("sqlalchemy.inspect", lambda engine: mock_inspector)
 
-    monkeypatch.setattr("now_lms.system_info", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.system_info", MagicMock())
     monkeypatch.setattr("now_lms.crear_configuracion_predeterminada", MagicMock())
-    monkeypatch.setattr("now_lms.crear_certificados", MagicMock())
-    monkeypatch.setattr("now_lms.crear_curso_predeterminado", MagicMock())
-    monkeypatch.setattr("now_lms.crear_curso_autoaprendizaje", MagicMock())
-    monkeypatch.setattr("now_lms.crear_evaluacion_predeterminada", MagicMock())
-    monkeypatch.setattr("now_lms.crear_usuarios_predeterminados", MagicMock())
-    monkeypatch.setattr("now_lms.crear_certificacion", MagicMock())
-    monkeypatch.setattr("now_lms.crear_blog_post_predeterminado", MagicMock())
-    monkeypatch.setattr("now_lms.crear_paginas_estaticas_predeterminadas", MagicMock())
-    monkeypatch.setattr("now_lms.populate_custmon_data_dir", MagicMock())
-    monkeypatch.setattr("now_lms.populate_custom_theme_dir", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.crear_certificados", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.crear_curso_predeterminado", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.crear_curso_autoaprendizaje", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.crear_evaluacion_predeterminada", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.crear_usuarios_predeterminados", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.crear_certificacion", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.crear_blog_post_predeterminado", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.crear_paginas_estaticas_predeterminadas", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.populate_custmon_data_dir", MagicMock())
+    monkeypatch.setattr("now_lms.db.initial_data.populate_custom_theme_dir", MagicMock())
 
     initial_setup(flask_app=app)
 
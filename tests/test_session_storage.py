@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Tests for the database-backed session storage."""
+
+from __future__ import annotations
+
+import importlib.util
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from flask import Flask, session
+from flask_session import Session
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect
+
+from now_lms.session_storage import (
+    CompactSerializer,
+    DatabaseSessionInterface,
+    delete_expired_sessions,
+    install_session_storage,
+    session_stats,
+)
+
+MIGRATION_PATH = (
+    Path(__file__).resolve().parent.parent / "now_lms" / "migrations" / "20260815_000000_add_session_expiry_index.py"
+)
+
+
+def _session_app(tmp_path, **config):
+    app = Flask("session_storage")
+    app.config.update(
+        SECRET_KEY="session-storage-test-secret-key-long-enough",
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'sessions.db'}",
+        SESSION_TYPE="sqlalchemy",
+        SESSION_SQLALCHEMY_TABLE="flask_sessions",
+        SESSION_PERMANENT=False,
+        SESSION_CLEANUP_INTERVAL=0,
+        **config,
+    )
+    db = SQLAlchemy(app)
+    app.config["SESSION_SQLALCHEMY"] = db
+    Session(app)
+    install_session_storage(app)
+
+    @app.get("/set/<value>")
+    def set_value(value):
+        session["value"] = value
+        return "ok"
+
+    @app.get("/get")
+    def get_value():
+        return session.get("value", "")
+
+    return app, db
+
+
+def test_unchanged_session_is_not_written_again(tmp_path):
+    app, db = _session_app(tmp_path)
+    assert isinstance(app.session_interface, DatabaseSessionInterface)
+    # The index on expiry comes from the migration, not from the application start.
+    with app.app_context():
+        indexes = {index["name"] for index in inspect(db.engine).get_indexes("flask_sessions")}
+    assert "ix_flask_sessions_expiry" not in indexes
+
+    writes = []
+    with app.app_context():
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _count_writes(_conn, _cursor, statement, *_args):
+            if statement.lstrip().upper().startswith(("INSERT", "UPDATE")):
+                writes.append(statement)
+
+    client = app.test_client()
+    client.get("/set/first")
+    assert len(writes) == 1
+    assert client.get("/get").get_data(as_text=True) == "first"
+    assert client.get("/get").get_data(as_text=True) == "first"
+    assert len(writes) == 1
+
+    client.get("/set/second")
+    assert len(writes) == 2
+    assert writes[-1].lstrip().upper().startswith("UPDATE")
+    assert client.get("/get").get_data(as_text=True) == "second"
+
+
+def test_compact_serializer_and_expired_session_cleanup(tmp_path):
+    app, db = _session_app(tmp_path, SESSION_COMPACT=True)
+    serializer = app.session_interface.serializer
+    assert isinstance(serializer, CompactSerializer)
+    data = {"value": "x" * 2000}
+    encoded = serializer.encode(data)
+    assert len(encoded) < 200
+    assert serializer.decode(encoded) == data
+    assert serializer.decode(CompactSerializer(app, "msgpack").encode(data)) == data
+
+    interface = app.session_interface
+    model = interface.sql_session_model
+    with app.app_context():
+        past = datetime.utcnow() - timedelta(hours=1)
+        future = datetime.utcnow() + timedelta(days=1)
+        db.session.add_all([model(f"session:old{number}", b"\x80", past) for number in range(5)])
+        db.session.add(model("session:live", b"\x80", future))
+        db.session.commit()
+
+        stats = session_stats(interface, timedelta(days=1))
+        assert stats["total"] == 6
+        assert stats["active"] == 1
+        assert stats["expired"] == 5
+        assert stats["written_last_hour"] == 1
+        assert stats["payload_bytes"] == 6
+
+        assert delete_expired_sessions(interface, batch=2) == 5
+        assert db.session.query(model).count() == 1
+
+
+def test_migration_indexes_the_expiry_column(tmp_path):
+    app, db = _session_app(tmp_path)
+    spec = importlib.util.spec_from_file_location("mig_session_expiry_index", MIGRATION_PATH)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    with app.app_context():
+        for step, expected in ((migration.upgrade, True), (migration.upgrade, True), (migration.downgrade, False)):
+            with db.engine.begin() as conn:
+                with Operations.context(MigrationContext.configure(conn)):
+                    step()
+            indexes = {index["name"] for index in inspect(db.engine).get_indexes("flask_sessions")}
+            assert ("ix_flask_sessions_expiry" in indexes) is expected
@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Tests for fingerprinted static assets."""
+
+import gzip
+import json
+
+from flask import url_for
+
+from now_lms.static_assets import MANIFEST_NAME, build_assets, init_static_assets, load_manifest
+
+CSS = b"body { color: #333; }\n" * 200
+
+
+def _static_tree(root):
+    (root / "css").mkdir()
+    (root / "css" / "site.css").write_bytes(CSS)
+    (root / "img").mkdir()
+    (root / "img" / "logo.png").write_bytes(b"\x89PNG fake")
+    (root / "files" / "public").mkdir(parents=True)
+    (root / "files" / "public" / "upload.css").write_bytes(b"uploaded")
+    return root
+
+
+def test_build_assets_is_incremental(tmp_path):
+    static = _static_tree(tmp_path)
+
+    stats = build_assets(static)
+    manifest = load_manifest(static)
+    assert stats["assets"] == 2
+    assert set(manifest["assets"]) == {"css/site.css", "img/logo.png"}
+
+    hashed = manifest["assets"]["css/site.css"]
+    assert hashed.startswith("css/site.") and hashed.endswith(".css")
+    assert (static / hashed).read_bytes() == CSS
+    assert gzip.decompress((static / (hashed + ".gz")).read_bytes()) == CSS
+    assert "gzip" in manifest["encodings"][hashed]
+    assert "img/logo.png" not in json.dumps(manifest["encodings"])
+
+    # Nothing changed: nothing is rewritten
+    assert build_assets(static)["written"] == 0
+
+    # A changed file gets a new name and the old copy goes away
+    (static / "css" / "site.css").write_bytes(CSS + b"a { color: red; }\n")
+    stats = build_assets(static)
+    new_hashed = load_manifest(static)["assets"]["css/site.css"]
+    assert new_hashed != hashed
+    assert stats["removed"] == 1
+    assert not (static / hashed).exists()
+    assert not (static / (hashed + ".gz")).exists()
+
+
+def test_fingerprinted_urls_and_headers(app, tmp_path):
+    static = _static_tree(tmp_path)
+    build_assets(static)
+    hashed = load_manifest(static)["assets"]["css/site.css"]
+
+    app.static_folder = str(static)
+    init_static_assets(app)
+
+    with app.test_request_context():
+        assert url_for("static", filename="css/site.css") == "/static/" + hashed
+        assert url_for("static", filename="/css/site.css") == "/static/" + hashed
+        assert url_for("static", filename="files/public/upload.css") == "/static/files/public/upload.css"
+
+    client = app.test_client()
+    response = client.get("/static/" + hashed, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.mimetype == "text/css"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == CSS
+
+    response = client.get("/static/" + hashed, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data == CSS
+
+    response = client.get("/static/css/site.css")
+    assert response.status_code == 200
+    assert "immutable" not in response.headers.get("Cache-Control", "")
+    assert (static / MANIFEST_NAME).exists()
@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Object storage backend for uploads, exercised against an in-memory S3 stand-in."""
+
+import io
+import os
+import shutil
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import pytest
+
+from now_lms.auth import proteger_passwd
+from now_lms.db import Configuracion, CourseLibrary, Curso, DocenteCurso, Usuario, database
+from now_lms.storage import STORAGE_EXTENSION, LocalStorage, S3Storage, StorageBackend, content_disposition
+from now_lms.vistas.courses.helpers import get_course_library_path
+
+
+class NotFound(Exception):
+    """Same shape as botocore's ClientError for a missing key."""
+
+    response = {"Error": {"Code": "404"}}
+
+
+class MemoryS3:
+    """The subset of the boto3 S3 client used by S3Storage, like a local MinIO."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, file_path, bucket, key, ExtraArgs=None):
+        with open(file_path, "rb") as f:
+            self.objects[(bucket, key)] = (f.read(), ExtraArgs["ContentType"])
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NotFound()
+        data = self.objects[(Bucket, Key)][0]
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def head_object(self, Bucket, Key):
+        self.get_object(Bucket, Key)
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        query = {k: v for k, v in Params.items() if k.startswith("Response")}
+        return f"http://minio:9000/{Params['Bucket']}/{Params['Key']}?{urlencode({**query, 'X-Amz-Expires': ExpiresIn})}"
+
+
+def test_s3_storage_operations(tmp_path):
+    client = MemoryS3()
+    storage = S3Storage("lms", prefix="/site-a/", client=client, expires=60)
+    source = tmp_path / "guía.pdf"
+    source.write_bytes(b"%PDF-1.4")
+
+    storage.put("public/files/c1/guia.pdf", str(source))
+    assert client.objects[("lms", "site-a/public/files/c1/guia.pdf")] == (b"%PDF-1.4", "application/pdf")
+    assert storage.exists("public/files/c1/guia.pdf")
+    assert not storage.exists("public/files/c1/otro.pdf")
+    body, size = storage.open("public/files/c1/guia.pdf")
+    assert (body.read(), size) == (b"%PDF-1.4", 8)
+
+    url = urlparse(storage.url("public/files/c1/guia.pdf", filename="guía.pdf", as_attachment=True))
+    query = parse_qs(url.query)
+    assert url.path == "/lms/site-a/public/files/c1/guia.pdf"
+    assert query["X-Amz-Expires"] == ["60"]
+    assert query["ResponseContentDisposition"] == [content_disposition("guía.pdf")]
+    assert "filename*=UTF-8''gu%C3%ADa.pdf" in content_disposition("guía.pdf")
+
+    storage.delete("public/files/c1/guia.pdf")
+    assert not storage.exists("public/files/c1/guia.pdf")
+    assert S3Storage("lms", presigned=False, client=client).url("x") is None
+
+
+def test_incomplete_driver_fails_when_created():
+    class PutOnly(StorageBackend):
+        def put(self, key, file_path):
+            pass
+
+    with pytest.raises(TypeError):
+        PutOnly()
+
+
+def test_local_storage_keys(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    (tmp_path / "private" / ".store" / "ab").mkdir(parents=True)
+    (tmp_path / "private" / ".store" / "ab" / "blob").write_bytes(b"x")
+    (tmp_path / "public").mkdir()
+    (tmp_path / "public" / ".upload-1.part").write_bytes(b"x")
+    source = tmp_path / "a.txt"
+    source.write_bytes(b"a")
+
+    storage.put("public/files/a.txt", str(source))
+    assert sorted(storage.keys()) == ["a.txt", "public/files/a.txt"]
+    with pytest.raises(ValueError):
+        storage.path("../outside")
+
+
+@pytest.fixture
+def s3_course(app, db_session):
+    client = MemoryS3()
+    app.extensions[STORAGE_EXTENSION] = S3Storage("lms", client=client)
+    db_session.add_all(
+        [
+            Usuario(
+                usuario="docente_s3",
+                acceso=proteger_passwd("docente_s3"),
+                nombre="Docente",
+                correo_electronico="docente_s3@example.com",
+                tipo="instructor",
+                activo=True,
+            ),
+            Curso(
+                nombre="Curso S3",
+                codigo="s3c01",
+                descripcion_corta="d",
+                descripcion="d",
+                estado="open",
+                publico=True,
+                modalidad="self_paced",
+            ),
+        ]
+    )
+    db_session.commit()
+    db_session.add(DocenteCurso(curso="s3c01", usuario="docente_s3"))
+    config = db_session.execute(database.select(Configuracion)).scalars().first()
+    config.enable_file_uploads = True
+    db_session.commit()
+
+    yield client
+
+    app.extensions.pop(STORAGE_EXTENSION, None)
+    shutil.rmtree(os.path.dirname(get_course_library_path("s3c01")), ignore_errors=True)
+
+
+def test_library_file_served_from_bucket(app, s3_course):
+    client = s3_course
+    with app.test_client() as http:
+        http.post("/user/login", data={"usuario": "docente_s3", "acceso": "docente_s3"})
+        created = http.post(
+            "/course/s3c01/library/uploads",
+            data={"nombre": "Guía", "descripcion": "PDF", "filename": "guia.pdf", "size": 8},
+        )
+        done = http.patch(created.headers["Location"], data=b"%PDF-1.4", headers={"Upload-Offset": "0"})
+        assert done.status_code == 201
+
+        (key,) = [key for _bucket, key in client.objects]
+        assert key.endswith("/library/guia.pdf")
+        # Another node without the local copy still serves the file from the bucket
+        os.remove(os.path.join(get_course_library_path("s3c01"), "guia.pdf"))
+        response = http.get("/course/s3c01/library/file/guia.pdf")
+        assert response.status_code == 302
+        assert response.location.startswith(f"http://minio:9000/lms/{key}?")
+        assert "no-store" in response.headers["Cache-Control"]
+
+        app.extensions[STORAGE_EXTENSION].presigned = False
+        response = http.get("/course/s3c01/library/file/guia.pdf")
+        assert response.status_code == 200
+        assert response.data == b"%PDF-1.4"
+        assert response.headers["Content-Disposition"] == "attachment; filename=guia.pdf"
+
+        record = database.session.execute(database.select(CourseLibrary).filter_by(curso="s3c01")).scalar_one()
+        http.post(f"/course/s3c01/library/delete/{record.id}")
+        assert client.objects == {}
+        assert http.get("/course/s3c01/library/file/guia.pdf").status_code == 404
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Jinja bytecode cache shared between workers."""
+
+import os
+
+import pytest
+from jinja2 import FileSystemBytecodeCache
+
+from now_lms.template_cache import RedisBytecodeCache, create_bytecode_cache, precompile_templates
+
+
+class MemoryRedis:
+    """Stand-in for the few redis client methods the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if key.startswith(match.rstrip("*"))]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def fresh_env(app):
+    """Jinja environment without compiled templates in memory, restored afterwards."""
+    env = app.jinja_env
+    previous = env.bytecode_cache
+    env.cache.clear()
+    yield env
+    env.bytecode_cache = previous
+    env.cache.clear()
+
+
+def _fail_compile(*args, **kwargs):
+    raise AssertionError("template compiled instead of loaded from the bytecode cache")
+
+
+def test_precompile_fills_filesystem_cache(app, fresh_env, tmp_path, monkeypatch):
+    directory = tmp_path / "templates"
+    cache = create_bytecode_cache({"TEMPLATE_CACHE": "filesystem", "TEMPLATE_CACHE_DIR": str(directory)})
+    assert isinstance(cache, FileSystemBytecodeCache)
+    assert create_bytecode_cache({"TEMPLATE_CACHE": "off", "TEMPLATE_CACHE_DIR": str(directory)}) is None
+
+    fresh_env.bytecode_cache = cache
+    stats = precompile_templates(app)
+    assert stats["failed"] == 0
+    assert stats["templates"] > 100
+    assert len(list(directory.iterdir())) == stats["templates"]
+
+    # A new worker loads the bytecode instead of compiling the source again
+    fresh_env.cache.clear()
+    monkeypatch.setattr(fresh_env, "compile", _fail_compile)
+    assert fresh_env.get_template("inicio/home.html") is not None
+
+
+def test_redis_cache_shared_between_workers(app, fresh_env, monkeypatch):
+    client = MemoryRedis()
+    fresh_env.bytecode_cache = RedisBytecodeCache(client)
+    fresh_env.get_template("inicio/home.html")
+    assert client.data and all(key.startswith("now_lms:jinja:") for key in client.data)
+
+    fresh_env.cache.clear()
+    monkeypatch.setattr(fresh_env, "compile", _fail_compile)
+    fresh_env.get_template("inicio/home.html")
+
+    fresh_env.bytecode_cache.clear()
+    assert client.data == {}
+
+
+def test_default_directory_is_outside_the_package():
+    from now_lms.config import DIRECTORIO_APP, DIRECTORIO_CACHE_PLANTILLAS
+
+    if os.environ.get("NOW_LMS_TEMPLATE_CACHE_DIR"):
+        pytest.skip("template cache directory set in the environment")
+    assert not os.path.abspath(DIRECTORIO_CACHE_PLANTILLAS).startswith(str(DIRECTORIO_APP))
@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Cached identity of the logged-in user."""
+
+from sqlalchemy import event
+
+from now_lms.auth import UsuarioSesion, cargar_identidad, proteger_passwd
+from now_lms.db import Usuario, database
+
+
+def _user():
+    return Usuario(
+        usuario="identity_user",
+        acceso=proteger_passwd("pass"),
+        nombre="Identity",
+        apellido="Test",
+        correo_electronico="identity_user@example.com",
+        tipo="student",
+        activo=True,
+        correo_electronico_verificado=True,
+    )
+
+
+def test_identity_is_cached_and_dropped_when_the_user_changes(db_session):
+    user = _user()
+    db_session.add(user)
+    db_session.commit()
+
+    statements = []
+
+    def _count(_conn, _cursor, statement, *_args):
+        if "FROM usuario" in statement:
+            statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", _count)
+    try:
+        identity = cargar_identidad(user.id)
+        assert isinstance(identity, UsuarioSesion)
+        assert (identity.usuario, identity.tipo, identity.activo) == ("identity_user", "student", True)
+        queries = len(statements)
+        again = cargar_identidad(user.id)
+        assert again.nombre == "Identity"
+        assert len(statements) == queries
+
+        # Attributes outside the identity load the full record.
+        database.session.expire_all()
+        assert again.correo_electronico == "identity_user@example.com"
+        assert len(statements) == queries + 1
+    finally:
+        event.remove(database.engine, "before_cursor_execute", _count)
+
+    user.activo = False
+    user.tipo = "instructor"
+    db_session.commit()
+    identity = cargar_identidad(user.id)
+    assert (identity.activo, identity.tipo) == (False, "instructor")
+    assert identity == user
+
+
+def test_inactive_user_is_blocked_with_cached_identity(app, db_session):
+    user = _user()
+    db_session.add(user)
+    db_session.commit()
+    client = app.test_client()
+    client.post("/user/login", data={"usuario": "identity_user", "acceso": "pass"})
+    assert client.get("/home/panel").status_code == 200
+
+    user.activo = False
+    db_session.commit()
+    response = client.get("/home/panel")
+    assert b"<h1>401</h1>" in response.data
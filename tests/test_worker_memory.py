@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: Apache-2.0
+# SPDX-FileCopyrightText: 2025 - 2026 BMO Soluciones, S.A.
+"""Measured worker memory and the Gunicorn preload hooks."""
+
+import gc
+import json
+
+import pytest
+
+from now_lms import preload, worker_config
+from now_lms.version import VERSION
+
+
+def test_measured_memory_feeds_the_worker_plan(tmp_path, monkeypatch):
+    if not worker_config.PSUTIL_AVAILABLE:
+        pytest.skip("psutil is not installed")
+    file_name = str(tmp_path / "cache" / "worker_memory.json")
+    monkeypatch.setattr(worker_config, "worker_memory_file", lambda: file_name)
+    for name in ("NOW_LMS_WORKERS", "WORKERS", "NOW_LMS_WORKER_MEMORY_MB", "WORKER_MEMORY_MB"):
+        monkeypatch.delenv(name, raising=False)
+    assert worker_config.measured_worker_memory_mb() is None
+
+    memory_mb = worker_config.record_worker_memory()
+    assert memory_mb > 0
+    assert worker_config.measured_worker_memory_mb() >= round(memory_mb, 1) * worker_config.MEASURED_MEMORY_HEADROOM
+
+    with open(file_name, "w", encoding="utf-8") as file:
+        json.dump({"version": VERSION, "samples": [10]}, file)
+    assert worker_config.measured_worker_memory_mb() == worker_config.MEASURED_MEMORY_FLOOR_MB
+
+    with open(file_name, "w", encoding="utf-8") as file:
+        json.dump({"version": VERSION, "samples": [40, 60]}, file)
+    assert worker_config.measured_worker_memory_mb() == 90
+
+    planned = []
+    monkeypatch.setattr(
+        worker_config, "calculate_optimal_workers", lambda worker_memory_mb, threads: planned.append(worker_memory_mb) or 4
+    )
+    worker_config.get_worker_config_from_env()
+    monkeypatch.setenv("NOW_LMS_WORKER_MEMORY_MB", "250")
+    worker_config.get_worker_config_from_env()
+    assert planned == [90, 250]
+
+    with open(file_name, "w", encoding="utf-8") as file:
+        json.dump({"version": "0.0.0", "samples": [40]}, file)
+    assert worker_config.measured_worker_memory_mb() is None
+
+
+def test_preload_warms_templates_and_freezes_before_fork(app, monkeypatch):
+    app.jinja_env.cache.clear()
+    monkeypatch.setitem(app.config, "WORKER_MEMORY_SAMPLE_DELAY", 0)
+    hooks = preload.preload_for_fork(app)
+    assert set(hooks) == {"pre_fork"}
+    assert len(app.jinja_env.cache) > 0
+
+    try:
+        hooks["pre_fork"](None, None)
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+    monkeypatch.setitem(app.config, "GC_FREEZE", False)
+    assert preload.preload_for_fork(app) == {}